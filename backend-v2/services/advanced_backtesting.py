@@ -8,7 +8,12 @@ from typing import Dict, List, Tuple, Optional, Any, Callable
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import itertools
 import json
+import os
+import random
 
 class OrderType(Enum):
     MARKET = "market"
@@ -229,49 +234,72 @@ class BacktestEngine:
             return {}
         
         equity_df = pd.DataFrame(self.equity_curve)
-        equity_df['returns'] = equity_df['equity'].pct_change()
-        
-        # Retorno total
-        total_return = (equity_df['equity'].iloc[-1] - self.initial_capital) / self.initial_capital * 100
-        
-        # Retorno anualizado
-        days = (equity_df['timestamp'].iloc[-1] - equity_df['timestamp'].iloc[0]).days
-        annualized_return = (1 + total_return/100) ** (365/days) - 1 if days > 0 else 0
-        
-        # Volatilidade
-        volatility = equity_df['returns'].std() * np.sqrt(252) if len(equity_df) > 1 else 0
-        
-        # Sharpe Ratio
-        risk_free_rate = 0.02  # 2% anual
-        sharpe_ratio = (annualized_return - risk_free_rate) / volatility if volatility > 0 else 0
-        
-        # Drawdown
-        equity_df['cummax'] = equity_df['equity'].cummax()
-        equity_df['drawdown'] = (equity_df['equity'] - equity_df['cummax']) / equity_df['cummax']
-        max_drawdown = equity_df['drawdown'].min() * 100
-        
-        # Win Rate
-        win_rate = (self.winning_trades / self.total_trades * 100) if self.total_trades > 0 else 0
-        
-        # Profit Factor
-        winning_pnl = sum(trade.pnl for trade in self.trades if trade.pnl > 0)
-        losing_pnl = abs(sum(trade.pnl for trade in self.trades if trade.pnl < 0))
-        profit_factor = winning_pnl / losing_pnl if losing_pnl > 0 else float('inf')
-        
-        return {
-            "total_return": total_return,
-            "annualized_return": annualized_return * 100,
-            "volatility": volatility * 100,
-            "sharpe_ratio": sharpe_ratio,
-            "max_drawdown": max_drawdown,
-            "win_rate": win_rate,
-            "profit_factor": profit_factor,
-            "total_trades": self.total_trades,
-            "winning_trades": self.winning_trades,
-            "losing_trades": self.losing_trades,
-            "final_equity": equity_df['equity'].iloc[-1],
-            "total_commission": sum(trade.commission for trade in self.trades)
-        }
+        return compute_performance_metrics(
+            equity_df['equity'],
+            equity_df['timestamp'],
+            self.initial_capital,
+            trade_pnls=[trade.pnl for trade in self.trades],
+            trade_commissions=[trade.commission for trade in self.trades],
+            total_trades=self.total_trades,
+            winning_trades=self.winning_trades,
+            losing_trades=self.losing_trades
+        )
+
+def compute_performance_metrics(equity: pd.Series, timestamps: pd.Series,
+                                initial_capital: float, trade_pnls,
+                                trade_commissions, total_trades: int,
+                                winning_trades: int, losing_trades: int) -> Dict[str, Any]:
+    """Métricas de performance a partir da curva de equity e dos trades.
+    
+    Compartilhado pelo engine por eventos e pelo backtest vetorizado para que
+    ambos produzam exatamente o mesmo dicionário.
+    """
+    equity = pd.Series(equity).reset_index(drop=True)
+    timestamps = pd.Series(timestamps).reset_index(drop=True)
+    trade_pnls = np.asarray(trade_pnls, dtype=float)
+    returns = equity.pct_change()
+    
+    # Retorno total
+    total_return = (equity.iloc[-1] - initial_capital) / initial_capital * 100
+    
+    # Retorno anualizado
+    days = (timestamps.iloc[-1] - timestamps.iloc[0]).days
+    annualized_return = (1 + total_return/100) ** (365/days) - 1 if days > 0 else 0
+    
+    # Volatilidade
+    volatility = returns.std() * np.sqrt(252) if len(equity) > 1 else 0
+    
+    # Sharpe Ratio
+    risk_free_rate = 0.02  # 2% anual
+    sharpe_ratio = (annualized_return - risk_free_rate) / volatility if volatility > 0 else 0
+    
+    # Drawdown
+    cummax = equity.cummax()
+    drawdown = (equity - cummax) / cummax
+    max_drawdown = drawdown.min() * 100
+    
+    # Win Rate
+    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+    
+    # Profit Factor
+    winning_pnl = float(trade_pnls[trade_pnls > 0].sum())
+    losing_pnl = abs(float(trade_pnls[trade_pnls < 0].sum()))
+    profit_factor = winning_pnl / losing_pnl if losing_pnl > 0 else float('inf')
+    
+    return {
+        "total_return": total_return,
+        "annualized_return": annualized_return * 100,
+        "volatility": volatility * 100,
+        "sharpe_ratio": sharpe_ratio,
+        "max_drawdown": max_drawdown,
+        "win_rate": win_rate,
+        "profit_factor": profit_factor,
+        "total_trades": total_trades,
+        "winning_trades": winning_trades,
+        "losing_trades": losing_trades,
+        "final_equity": equity.iloc[-1],
+        "total_commission": float(np.sum(trade_commissions))
+    }
 
 class Strategy:
     def __init__(self, name: str):
@@ -285,6 +313,23 @@ class Strategy:
     def generate_signals(self, df: pd.DataFrame, current_index: int) -> Dict[str, Any]:
         """Gera sinais de compra/venda. Deve ser implementado pelas subclasses."""
         raise NotImplementedError
+    
+    def compute_signals(self, df: pd.DataFrame) -> np.ndarray:
+        """Sinais de todas as barras de uma vez (1 compra, -1 venda, 0 hold).
+        
+        Deve reproduzir `generate_signals` barra a barra; usado pelo backtest vetorizado.
+        """
+        raise NotImplementedError
+
+def _signal_array(buy: np.ndarray, sell: np.ndarray, warmup: int) -> np.ndarray:
+    """Combina máscaras de compra/venda num array int8, zerando o aquecimento."""
+    signals = np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+    signals[:warmup] = 0
+    return signals
+
+def _shift(values: np.ndarray) -> np.ndarray:
+    """Desloca uma barra para frente (valor anterior), com NaN na primeira."""
+    return np.concatenate(([np.nan], values[:-1]))
 
 class MovingAverageCrossover(Strategy):
     def __init__(self, fast_period: int = 10, slow_period: int = 20):
@@ -311,6 +356,16 @@ class MovingAverageCrossover(Strategy):
             return {"signal": "sell", "strength": 1.0}
         
         return {"signal": "hold", "strength": 0}
+    
+    def compute_signals(self, df: pd.DataFrame) -> np.ndarray:
+        fast_ma = df['close'].rolling(window=self.parameters["fast_period"]).mean().to_numpy()
+        slow_ma = df['close'].rolling(window=self.parameters["slow_period"]).mean().to_numpy()
+        prev_fast = _shift(fast_ma)
+        prev_slow = _shift(slow_ma)
+        
+        buy = (prev_fast <= prev_slow) & (fast_ma > slow_ma)
+        sell = (prev_fast >= prev_slow) & (fast_ma < slow_ma)
+        return _signal_array(buy, sell, self.parameters["slow_period"])
 
 class RSIStrategy(Strategy):
     def __init__(self, rsi_period: int = 14, oversold: float = 30, overbought: float = 70):
@@ -338,6 +393,17 @@ class RSIStrategy(Strategy):
             return {"signal": "sell", "strength": (current_rsi - self.parameters["overbought"]) / (100 - self.parameters["overbought"])}
         
         return {"signal": "hold", "strength": 0}
+    
+    def compute_signals(self, df: pd.DataFrame) -> np.ndarray:
+        delta = df['close'].diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=self.parameters["rsi_period"]).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=self.parameters["rsi_period"]).mean()
+        rs = gain / loss
+        rsi = (100 - (100 / (1 + rs))).to_numpy()
+        
+        buy = rsi < self.parameters["oversold"]
+        sell = rsi > self.parameters["overbought"]
+        return _signal_array(buy, sell, self.parameters["rsi_period"])
 
 class BollingerBandsStrategy(Strategy):
     def __init__(self, period: int = 20, std_dev: float = 2):
@@ -367,6 +433,17 @@ class BollingerBandsStrategy(Strategy):
             return {"signal": "sell", "strength": (current_price - current_upper) / current_upper}
         
         return {"signal": "hold", "strength": 0}
+    
+    def compute_signals(self, df: pd.DataFrame) -> np.ndarray:
+        sma = df['close'].rolling(window=self.parameters["period"]).mean()
+        std = df['close'].rolling(window=self.parameters["period"]).std()
+        upper_band = (sma + (std * self.parameters["std_dev"])).to_numpy()
+        lower_band = (sma - (std * self.parameters["std_dev"])).to_numpy()
+        close = df['close'].to_numpy(dtype=float)
+        
+        buy = close <= lower_band
+        sell = close >= upper_band
+        return _signal_array(buy, sell, self.parameters["period"])
 
 class BacktestRunner:
     def __init__(self, engine: BacktestEngine):
@@ -463,6 +540,375 @@ class BacktestRunner:
             }
         }
 
+class VectorizedBacktestRunner:
+    """Backtest vetorizado com a mesma semântica do BacktestRunner.
+    
+    Os sinais são pré-calculados por `Strategy.compute_signals` e posições, fills,
+    comissões e curva de equity saem de operações com arrays, sem loop por barra.
+    Regras replicadas: votação por maioria, compra de `position_size` do capital
+    livre a cada sinal de compra e venda da posição inteira no sinal de venda.
+    """
+    
+    def __init__(self, engine: BacktestEngine):
+        self.engine = engine
+        self.strategies: List[Strategy] = []
+    
+    def add_strategy(self, strategy: Strategy):
+        """Adiciona estratégia ao backtest."""
+        self.strategies.append(strategy)
+    
+    def run_backtest(self, df: pd.DataFrame, symbol: str = "BTCUSDT", 
+                    position_size: float = 0.1) -> Dict[str, Any]:
+        """Executa backtest vetorizado com todas as estratégias."""
+        self.engine.reset()
+        n = len(df)
+        close = df['close'].to_numpy(dtype=float)
+        index = np.arange(n)
+        initial_capital = self.engine.initial_capital
+        commission_rate = self.engine.commission_rate
+        
+        # Votação: saldo de votos de compra menos votos de venda por barra
+        votes = np.zeros(n, dtype=np.int64)
+        for strategy in self.strategies:
+            votes += strategy.compute_signals(df)
+        action = np.sign(votes)
+        if n:
+            action[0] = 0
+        
+        # Cada compra consome position_size*(1+comissão) do capital livre
+        decay = 1.0 - position_size * (1 + commission_rate)
+        if decay < 0:
+            action[action > 0] = 0  # capital insuficiente: engine rejeita a ordem
+        
+        # Venda só executa se a última ação anterior foi compra (há posição)
+        last_action = action[np.maximum.accumulate(np.where(action != 0, index, 0))]
+        prev_action = np.concatenate(([0], last_action[:-1]))
+        is_buy = action > 0
+        is_sell = (action < 0) & (prev_action > 0)
+        
+        # Segmentos entre vendas: dentro de cada um o capital decai geometricamente
+        segment = np.cumsum(is_sell)
+        segment_start = np.maximum.accumulate(np.where(is_sell, index, 0))
+        buys_total = np.cumsum(is_buy)
+        buys_in_segment = buys_total - buys_total[segment_start]
+        weight = np.where(is_buy, decay ** np.maximum(buys_in_segment - 1, 0), 0.0)
+        # Quantidade e custo por unidade de capital inicial do segmento / position_size
+        units = pd.Series(weight / close).groupby(segment).cumsum().to_numpy()
+        cost_units = pd.Series(weight).groupby(segment).cumsum().to_numpy()
+        
+        # Fator de crescimento do capital em cada venda
+        sell_idx = np.flatnonzero(is_sell)
+        pre_sell = sell_idx - 1
+        growth = (decay ** buys_in_segment[pre_sell]
+                  + position_size * (1 - commission_rate) * close[sell_idx] * units[pre_sell])
+        segment_capital = initial_capital * np.concatenate(([1.0], np.cumprod(growth)))
+        base_capital = segment_capital[segment]
+        
+        capital = base_capital * decay ** buys_in_segment
+        quantity = base_capital * position_size * units
+        equity = capital + quantity * close
+        
+        held = quantity > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_price = np.where(held, cost_units / units, np.nan)
+        # Engine só atualiza PnL não realizado com posição aberta (valor persiste)
+        unrealized = pd.Series(np.where(held, quantity * (close - avg_price), np.nan)).ffill().fillna(0.0).to_numpy()
+        
+        sold_capital = segment_capital[segment[pre_sell] if len(pre_sell) else np.array([], dtype=int)]
+        sell_quantity = sold_capital * position_size * units[pre_sell]
+        sell_pnl = sell_quantity * close[sell_idx] - sold_capital * position_size * cost_units[pre_sell]
+        sell_commission = sell_quantity * close[sell_idx] * commission_rate
+        
+        buy_idx = np.flatnonzero(is_buy)
+        buy_quantity = base_capital[buy_idx] * position_size * weight[buy_idx] / close[buy_idx]
+        buy_commission = buy_quantity * close[buy_idx] * commission_rate
+        
+        pnl_by_bar = np.zeros(n)
+        pnl_by_bar[sell_idx] = sell_pnl
+        realized = np.cumsum(pnl_by_bar)
+        
+        total_trades = len(sell_idx)
+        winning_trades = int(np.sum(sell_pnl > 0))
+        losing_trades = total_trades - winning_trades
+        
+        timestamps = df.index[1:]
+        equity_curve = pd.DataFrame({
+            "timestamp": timestamps,
+            "equity": equity[1:],
+            "capital": capital[1:],
+            "unrealized_pnl": unrealized[1:],
+            "realized_pnl": realized[1:]
+        })
+        
+        metrics = {}
+        if len(equity_curve):
+            metrics = compute_performance_metrics(
+                equity_curve['equity'],
+                equity_curve['timestamp'],
+                initial_capital,
+                trade_pnls=sell_pnl,
+                trade_commissions=np.concatenate((buy_commission, sell_commission)),
+                total_trades=total_trades,
+                winning_trades=winning_trades,
+                losing_trades=losing_trades
+            )
+        
+        # Trades em ordem cronológica (só as barras com fill viram dicts)
+        fills = pd.DataFrame({
+            "bar": np.concatenate((buy_idx, sell_idx)),
+            "side": [OrderSide.BUY.value] * len(buy_idx) + [OrderSide.SELL.value] * len(sell_idx),
+            "quantity": np.concatenate((buy_quantity, sell_quantity)),
+            "pnl": np.concatenate((np.zeros(len(buy_idx)), sell_pnl)),
+            "commission": np.concatenate((buy_commission, sell_commission))
+        }).sort_values("bar", kind="stable")
+        stamp = int(datetime.now().timestamp())
+        trades = [
+            {
+                "id": f"trade_{number}_{stamp}",
+                "symbol": symbol,
+                "side": side,
+                "quantity": qty,
+                "price": close[bar],
+                "timestamp": df.index[bar].isoformat(),
+                "pnl": pnl,
+                "commission": commission
+            }
+            for number, (bar, side, qty, pnl, commission) in enumerate(
+                fills[["bar", "side", "quantity", "pnl", "commission"]].itertuples(index=False, name=None)
+            )
+        ]
+        
+        final_positions = {}
+        if len(buy_idx):
+            last_held = np.flatnonzero(held)[-1]
+            final_positions[symbol] = {
+                "quantity": quantity[-1],
+                "avg_price": avg_price[last_held],
+                "unrealized_pnl": unrealized[-1],
+                "realized_pnl": realized[-1]
+            }
+        
+        return {
+            "strategy_names": [s.name for s in self.strategies],
+            "metrics": metrics,
+            "equity_curve": equity_curve,
+            "trades": trades,
+            "final_positions": final_positions
+        }
+
+@dataclass
+class OHLCVBlock:
+    """OHLCV de vários símbolos alinhado num único eixo de timestamps.
+    
+    Armazenamento colunar: um array (barras × símbolos) por campo, em ordem
+    Fortran para que a série de cada símbolo fique contígua. Barras ausentes
+    ficam NaN e são marcadas em `available`.
+    """
+    index: pd.DatetimeIndex
+    symbols: List[str]
+    fields: Dict[str, np.ndarray]
+    available: np.ndarray
+    
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame],
+                    fields: Tuple[str, ...] = ("open", "high", "low", "close", "volume")) -> "OHLCVBlock":
+        """Alinha DataFrames por símbolo na união dos timestamps."""
+        symbols = list(frames.keys())
+        if not symbols:
+            raise ValueError("Nenhum símbolo informado")
+        index = frames[symbols[0]].index
+        for symbol in symbols[1:]:
+            index = index.union(frames[symbol].index)
+        present = [f for f in fields if all(f in frames[s].columns for s in symbols)]
+        if "close" not in present:
+            raise ValueError("Todos os símbolos precisam da coluna 'close'")
+        
+        n, m = len(index), len(symbols)
+        arrays = {f: np.full((n, m), np.nan, order="F") for f in present}
+        available = np.zeros((n, m), dtype=bool, order="F")
+        for j, symbol in enumerate(symbols):
+            rows = index.get_indexer(frames[symbol].index)
+            available[rows, j] = True
+            for f in present:
+                arrays[f][rows, j] = frames[symbol][f].to_numpy(dtype=float)
+        return cls(index=index, symbols=symbols, fields=arrays, available=available)
+    
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """DataFrame de um símbolo apenas com as barras disponíveis."""
+        j = self.symbols.index(symbol)
+        mask = self.available[:, j]
+        return pd.DataFrame({f: values[mask, j] for f, values in self.fields.items()},
+                            index=self.index[mask])
+
+class PortfolioBacktestRunner:
+    """Backtest multi-ativo com capital compartilhado.
+    
+    Sinais são pré-calculados por símbolo (`compute_signals`) e espalhados na
+    grade alinhada; o loop percorre apenas as barras com algum sinal e atualiza
+    o estado (capital, quantidades, custo) como arrays por símbolo. Em cada barra
+    as vendas liberam capital antes das compras, e cada compra usa
+    `position_size` do capital livre, como no BacktestRunner.
+    """
+    
+    def __init__(self, engine: BacktestEngine):
+        self.engine = engine
+        self.strategies: List[Strategy] = []
+    
+    def add_strategy(self, strategy: Strategy):
+        """Adiciona estratégia ao backtest."""
+        self.strategies.append(strategy)
+    
+    def run_backtest(self, data, position_size: float = 0.1) -> Dict[str, Any]:
+        """Executa o backtest sobre um OHLCVBlock ou dict símbolo -> DataFrame."""
+        self.engine.reset()
+        block = data if isinstance(data, OHLCVBlock) else OHLCVBlock.from_frames(data)
+        symbols = block.symbols
+        n, m = len(block.index), len(symbols)
+        close = block.fields["close"]
+        mark = pd.DataFrame(close).ffill().to_numpy()
+        commission_rate = self.engine.commission_rate
+        decay = 1.0 - position_size * (1 + commission_rate)
+        
+        votes = np.zeros((n, m), dtype=np.int16)
+        for j, symbol in enumerate(symbols):
+            rows = np.flatnonzero(block.available[:, j])
+            frame = block.frame(symbol)
+            for strategy in self.strategies:
+                votes[rows, j] += strategy.compute_signals(frame)
+        action = np.sign(votes)
+        if n:
+            action[0] = 0
+        
+        event_rows = np.flatnonzero(action.any(axis=1))
+        capital = float(self.engine.initial_capital)
+        quantity = np.zeros(m)
+        cost = np.zeros(m)
+        capital_at = np.empty(len(event_rows))
+        quantity_at = np.empty((len(event_rows), m))
+        fills: List[Tuple] = []
+        
+        for k, t in enumerate(event_rows):
+            row = action[t]
+            price = close[t]
+            
+            sells = np.flatnonzero((row < 0) & (quantity > 0))
+            if len(sells):
+                proceeds = quantity[sells] * price[sells]
+                commission = proceeds * commission_rate
+                pnl = proceeds - cost[sells]
+                capital += float((proceeds - commission).sum())
+                fills.extend(zip([t] * len(sells), sells, [OrderSide.SELL.value] * len(sells),
+                                 quantity[sells], pnl, commission))
+                quantity[sells] = 0.0
+                cost[sells] = 0.0
+            
+            buys = np.flatnonzero(row > 0)
+            if len(buys) and decay >= 0:
+                budget = capital * position_size * decay ** np.arange(len(buys))
+                bought = budget / price[buys]
+                commission = budget * commission_rate
+                capital -= float((budget + commission).sum())
+                fills.extend(zip([t] * len(buys), buys, [OrderSide.BUY.value] * len(buys),
+                                 bought, np.zeros(len(buys)), commission))
+                quantity[buys] += bought
+                cost[buys] += budget
+            
+            capital_at[k] = capital
+            quantity_at[k] = quantity
+        
+        # Estado é constante entre eventos: propaga o último snapshot por barra
+        state = np.searchsorted(event_rows, np.arange(n), side="right") - 1
+        has_state = state >= 0
+        capital_series = np.full(n, float(self.engine.initial_capital))
+        capital_series[has_state] = capital_at[state[has_state]]
+        holdings = np.zeros((n, m))
+        holdings[has_state] = quantity_at[state[has_state]] * np.nan_to_num(mark[has_state])
+        holdings_value = holdings.sum(axis=1)
+        equity = capital_series + holdings_value
+        
+        fills_df = pd.DataFrame(fills, columns=["bar", "symbol", "side", "quantity", "pnl", "commission"])
+        fills_df["price"] = close[fills_df["bar"].to_numpy(dtype=int), fills_df["symbol"].to_numpy(dtype=int)] if len(fills_df) else []
+        sells_df = fills_df[fills_df["side"] == OrderSide.SELL.value]
+        pnl_by_bar = np.zeros(n)
+        np.add.at(pnl_by_bar, sells_df["bar"].to_numpy(dtype=int), sells_df["pnl"].to_numpy(dtype=float))
+        
+        total_trades = len(sells_df)
+        winning_trades = int((sells_df["pnl"] > 0).sum())
+        equity_curve = pd.DataFrame({
+            "timestamp": block.index[1:],
+            "equity": equity[1:],
+            "capital": capital_series[1:],
+            "holdings_value": holdings_value[1:],
+            "realized_pnl": np.cumsum(pnl_by_bar)[1:]
+        })
+        
+        metrics = {}
+        if len(equity_curve):
+            metrics = compute_performance_metrics(
+                equity_curve["equity"],
+                equity_curve["timestamp"],
+                self.engine.initial_capital,
+                trade_pnls=sells_df["pnl"].to_numpy(dtype=float),
+                trade_commissions=fills_df["commission"].to_numpy(dtype=float),
+                total_trades=total_trades,
+                winning_trades=winning_trades,
+                losing_trades=total_trades - winning_trades
+            )
+        
+        return {
+            "strategy_names": [s.name for s in self.strategies],
+            "symbols": symbols,
+            "metrics": metrics,
+            "portfolio_metrics": self._portfolio_metrics(symbols, sells_df, holdings, equity, quantity_at),
+            "equity_curve": equity_curve,
+            "trades": [
+                {
+                    "id": f"trade_{number}_{symbols[j]}",
+                    "symbol": symbols[j],
+                    "side": side,
+                    "quantity": qty,
+                    "price": price,
+                    "timestamp": block.index[bar].isoformat(),
+                    "pnl": pnl,
+                    "commission": commission
+                }
+                for number, (bar, j, side, qty, pnl, commission, price) in enumerate(fills_df.itertuples(index=False, name=None))
+            ],
+            "final_positions": {
+                symbols[j]: {
+                    "quantity": quantity[j],
+                    "avg_price": cost[j] / quantity[j],
+                    "unrealized_pnl": quantity[j] * mark[-1, j] - cost[j]
+                }
+                for j in np.flatnonzero(quantity > 0)
+            }
+        }
+    
+    @staticmethod
+    def _portfolio_metrics(symbols: List[str], sells_df: pd.DataFrame, holdings: np.ndarray,
+                           equity: np.ndarray, quantity_at: np.ndarray) -> Dict[str, Any]:
+        """Exposição, concentração e contribuição por símbolo."""
+        by_symbol = sells_df.groupby("symbol")["pnl"].agg(["sum", "count", lambda pnl: (pnl > 0).sum()])
+        by_symbol.columns = ["realized_pnl", "trades", "winning_trades"]
+        contribution = {
+            symbols[int(j)]: {
+                "realized_pnl": float(row.realized_pnl),
+                "trades": int(row.trades),
+                "win_rate": float(row.winning_trades / row.trades * 100) if row.trades else 0.0
+            }
+            for j, row in by_symbol.iterrows()
+        }
+        with np.errstate(invalid="ignore", divide="ignore"):
+            exposure = np.where(equity > 0, holdings.sum(axis=1) / equity, 0.0)
+            largest = np.where(equity > 0, holdings.max(axis=1, initial=0.0) / equity, 0.0)
+        return {
+            "avg_exposure": float(exposure.mean() * 100) if len(exposure) else 0.0,
+            "max_exposure": float(exposure.max() * 100) if len(exposure) else 0.0,
+            "max_single_position": float(largest.max() * 100) if len(largest) else 0.0,
+            "max_concurrent_positions": int((quantity_at > 0).sum(axis=1).max()) if len(quantity_at) else 0,
+            "by_symbol": contribution
+        }
+
 # Funções de conveniência
 def run_single_strategy_backtest(df: pd.DataFrame, strategy: Strategy, 
                                 initial_capital: float = 10000, 
@@ -485,6 +931,31 @@ def run_multi_strategy_backtest(df: pd.DataFrame, strategies: List[Strategy],
     
     return runner.run_backtest(df, symbol)
 
+def run_vectorized_backtest(df: pd.DataFrame, strategies: List[Strategy], 
+                            initial_capital: float = 10000, 
+                            symbol: str = "BTCUSDT",
+                            position_size: float = 0.1) -> Dict[str, Any]:
+    """Executa backtest vetorizado (mesmas métricas, sem loop por barra)."""
+    engine = BacktestEngine(initial_capital)
+    runner = VectorizedBacktestRunner(engine)
+    
+    for strategy in strategies:
+        runner.add_strategy(strategy)
+    
+    return runner.run_backtest(df, symbol, position_size)
+
+def run_portfolio_backtest(frames: Dict[str, pd.DataFrame], strategies: List[Strategy],
+                           initial_capital: float = 10000,
+                           position_size: float = 0.1) -> Dict[str, Any]:
+    """Executa backtest multi-ativo com capital compartilhado."""
+    engine = BacktestEngine(initial_capital)
+    runner = PortfolioBacktestRunner(engine)
+    
+    for strategy in strategies:
+        runner.add_strategy(strategy)
+    
+    return runner.run_backtest(frames, position_size)
+
 def optimize_strategy_parameters(df: pd.DataFrame, strategy_class, 
                                 param_ranges: Dict[str, List], 
                                 initial_capital: float = 10000) -> Dict[str, Any]:
@@ -521,3 +992,187 @@ def optimize_strategy_parameters(df: pd.DataFrame, strategy_class,
 
 
 
+
+# Otimização paralela --------------------------------------------------------
+
+_SWEEP_STATE: Dict[str, Any] = {}
+
+def _attach_sweep_data(values_name: str, index_name: str, shape: Tuple[int, int],
+                       columns: List[str]):
+    """Inicializador do worker: mapeia OHLCV da memória compartilhada sem copiar."""
+    values_shm = shared_memory.SharedMemory(name=values_name)
+    index_shm = shared_memory.SharedMemory(name=index_name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=values_shm.buf)
+    index = np.ndarray((shape[0],), dtype=np.int64, buffer=index_shm.buf)
+    
+    _SWEEP_STATE["shm"] = (values_shm, index_shm)
+    _SWEEP_STATE["df"] = pd.DataFrame(values, index=pd.DatetimeIndex(index.view("datetime64[ns]")),
+                                      columns=columns, copy=False)
+
+def _evaluate_combination(task: Tuple) -> Dict[str, Any]:
+    """Roda uma combinação de parâmetros sobre as primeiras `bars` barras."""
+    strategy_class, params, bars, initial_capital, position_size, max_drawdown_limit = task
+    df = _SWEEP_STATE["df"]
+    bars = min(bars, len(df))
+    strategy = strategy_class(**params)
+    
+    # Early stop: avalia 1/4 do histórico antes de pagar a série inteira
+    if max_drawdown_limit is not None and bars >= 8:
+        probe = run_vectorized_backtest(df.iloc[:bars // 4], [strategy], initial_capital,
+                                        position_size=position_size)["metrics"]
+        if probe and probe["max_drawdown"] < max_drawdown_limit:
+            return _sweep_row(params, probe, bars // 4, "early_stopped")
+    
+    metrics = run_vectorized_backtest(df.iloc[:bars], [strategy], initial_capital,
+                                      position_size=position_size)["metrics"]
+    return _sweep_row(params, metrics, bars, "completed")
+
+def _sweep_row(params: Dict[str, Any], metrics: Dict[str, Any], bars: int, status: str) -> Dict[str, Any]:
+    """Linha da tabela de resultados da otimização."""
+    row = dict(params)
+    row.update({
+        "total_return": metrics.get("total_return", 0.0),
+        "sharpe_ratio": metrics.get("sharpe_ratio", 0.0),
+        "max_drawdown": metrics.get("max_drawdown", 0.0),
+        "win_rate": metrics.get("win_rate", 0.0),
+        "profit_factor": metrics.get("profit_factor", 0.0),
+        "total_trades": metrics.get("total_trades", 0),
+        "bars": bars,
+        "status": status
+    })
+    return row
+
+class ParallelOptimizer:
+    """Varredura de parâmetros em paralelo com OHLCV em memória compartilhada.
+    
+    Os arrays são copiados uma única vez para `SharedMemory` e cada worker do
+    pool monta um DataFrame sobre o mesmo buffer. Suporta busca em grade,
+    aleatória e successive halving, e devolve a tabela completa de resultados.
+    """
+    
+    def __init__(self, df: pd.DataFrame, strategy_class, initial_capital: float = 10000,
+                 position_size: float = 0.1, n_jobs: Optional[int] = None,
+                 max_drawdown_limit: Optional[float] = -50.0):
+        self.df = df
+        self.strategy_class = strategy_class
+        self.initial_capital = initial_capital
+        self.position_size = position_size
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.max_drawdown_limit = max_drawdown_limit
+    
+    def grid(self, param_ranges: Dict[str, List]) -> List[Dict[str, Any]]:
+        """Todas as combinações da grade."""
+        names = list(param_ranges.keys())
+        return [dict(zip(names, combo)) for combo in itertools.product(*param_ranges.values())]
+    
+    def sample(self, param_ranges: Dict[str, List], n_samples: int,
+               seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Amostra aleatória (sem repetição) da grade."""
+        combos = self.grid(param_ranges)
+        return random.Random(seed).sample(combos, min(n_samples, len(combos)))
+    
+    def run(self, param_ranges: Dict[str, List], method: str = "grid",
+            n_samples: int = 50, eta: int = 3, min_bars: Optional[int] = None,
+            seed: Optional[int] = None) -> Dict[str, Any]:
+        """Executa a otimização.
+        
+        method: "grid", "random" ou "halving" (successive halving: cada rodada
+        avalia os sobreviventes com `eta` vezes mais barras e mantém o melhor 1/eta).
+        """
+        if method == "grid":
+            candidates = self.grid(param_ranges)
+        elif method == "random":
+            candidates = self.sample(param_ranges, n_samples, seed)
+        elif method == "halving":
+            candidates = self.grid(param_ranges)
+        else:
+            raise ValueError(f"Método de otimização desconhecido: {method}")
+        
+        columns = [c for c in ("open", "high", "low", "close", "volume") if c in self.df.columns]
+        values = np.ascontiguousarray(self.df[columns].to_numpy(dtype=np.float64))
+        index = pd.DatetimeIndex(self.df.index).as_unit("ns").asi8
+        values_shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        index_shm = shared_memory.SharedMemory(create=True, size=max(index.nbytes, 1))
+        try:
+            np.ndarray(values.shape, dtype=np.float64, buffer=values_shm.buf)[:] = values
+            np.ndarray(index.shape, dtype=np.int64, buffer=index_shm.buf)[:] = index
+            init_args = (values_shm.name, index_shm.name, values.shape, columns)
+            
+            if self.n_jobs == 1:
+                _attach_sweep_data(*init_args)
+                try:
+                    rows = self._sweep(candidates, method, eta, min_bars, map)
+                finally:
+                    _SWEEP_STATE.clear()
+            else:
+                with ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_attach_sweep_data,
+                                         initargs=init_args) as pool:
+                    chunksize = max(1, len(candidates) // (self.n_jobs * 4))
+                    rows = self._sweep(candidates, method, eta, min_bars,
+                                       lambda fn, tasks: pool.map(fn, tasks, chunksize=chunksize))
+        finally:
+            for shm in (values_shm, index_shm):
+                shm.close()
+                shm.unlink()
+        
+        results = pd.DataFrame(rows)
+        if results.empty:
+            return {"best_params": None, "best_return": -float('inf'), "best_metrics": None, "results": results}
+        
+        # Configurações completas primeiro, ordenadas por Sharpe
+        results["_partial"] = results["status"] != "completed"
+        results = results.sort_values(["_partial", "sharpe_ratio"], ascending=[True, False])
+        results = results.drop(columns="_partial").reset_index(drop=True)
+        best = results.iloc[0].to_dict()
+        param_names = list(param_ranges.keys())
+        return {
+            "best_params": {name: best[name] for name in param_names},
+            "best_return": best["total_return"],
+            "best_metrics": {k: v for k, v in best.items() if k not in param_names},
+            "results": results
+        }
+    
+    def _sweep(self, candidates: List[Dict[str, Any]], method: str, eta: int,
+               min_bars: Optional[int], mapper) -> List[Dict[str, Any]]:
+        total_bars = len(self.df)
+        
+        def evaluate(params_list, bars):
+            tasks = [(self.strategy_class, params, bars, self.initial_capital,
+                      self.position_size, self.max_drawdown_limit) for params in params_list]
+            return list(mapper(_evaluate_combination, tasks))
+        
+        if method != "halving":
+            return evaluate(candidates, total_bars)
+        
+        # Successive halving: orçamento cresce eta vezes a cada rodada
+        rounds = max(1, int(np.ceil(np.log(max(len(candidates), 1)) / np.log(eta))))
+        bars = max(min_bars or 0, total_bars // (eta ** (rounds - 1)))
+        final_rows: List[Dict[str, Any]] = []
+        survivors = candidates
+        while survivors:
+            rows = evaluate(survivors, bars)
+            if bars >= total_bars or len(survivors) <= 1:
+                final_rows.extend(rows)
+                break
+            completed = sorted((r for r in rows if r["status"] == "completed"),
+                               key=lambda r: r["sharpe_ratio"], reverse=True)
+            keep = max(1, len(completed) // eta)
+            for row in rows:
+                if row["status"] == "completed":
+                    row["status"] = "halved"
+            final_rows.extend(completed[keep:])
+            final_rows.extend(r for r in rows if r["status"] == "early_stopped")
+            names = list(survivors[0].keys())
+            survivors = [{name: row[name] for name in names} for row in completed[:keep]]
+            bars = min(bars * eta, total_bars)
+        return final_rows
+
+def parallel_optimize_strategy_parameters(df: pd.DataFrame, strategy_class,
+                                          param_ranges: Dict[str, List],
+                                          initial_capital: float = 10000,
+                                          method: str = "grid",
+                                          n_jobs: Optional[int] = None,
+                                          **kwargs) -> Dict[str, Any]:
+    """Otimiza parâmetros em paralelo e retorna a tabela completa de resultados."""
+    optimizer = ParallelOptimizer(df, strategy_class, initial_capital, n_jobs=n_jobs)
+    return optimizer.run(param_ranges, method=method, **kwargs)
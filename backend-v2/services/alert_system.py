@@ -2,12 +2,22 @@
 # -*- coding: utf-8 -*-
 """Sistema de alertas baseado em thresholds"""
 
+import json
+import logging
+import os
+import threading
 import time
+import uuid
+from bisect import bisect_left, bisect_right
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable, Iterable, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+logger = logging.getLogger(__name__)
+
 class AlertType(Enum):
     PRICE = "price"
     VOLUME = "volume"
@@ -42,16 +52,266 @@ class Alert:
         if self.created_at is None:
             self.created_at = datetime.now()
 
-class AlertManager:
+class ThresholdIndex:
+    """Thresholds ordenados de um (símbolo, métrica, condição).
+    
+    Listas paralelas ordenadas por threshold: um tick localiza os thresholds
+    cruzados com bisect em O(log n + k).
+    """
+    
     def __init__(self):
+        self.thresholds: List[float] = []
+        self.alert_ids: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self.thresholds)
+    
+    def add(self, threshold: float, alert_id: str):
+        position = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(position, threshold)
+        self.alert_ids.insert(position, alert_id)
+    
+    def remove(self, threshold: float, alert_id: str) -> bool:
+        start = bisect_left(self.thresholds, threshold)
+        end = bisect_right(self.thresholds, threshold, lo=start)
+        for position in range(start, end):
+            if self.alert_ids[position] == alert_id:
+                del self.thresholds[position]
+                del self.alert_ids[position]
+                return True
+        return False
+    
+    def below(self, value: float, inclusive: bool = False) -> List[str]:
+        """Alertas com threshold < value (ou <= se inclusive)."""
+        end = bisect_right(self.thresholds, value) if inclusive else bisect_left(self.thresholds, value)
+        return self.alert_ids[:end]
+    
+    def above(self, value: float) -> List[str]:
+        """Alertas com threshold > value."""
+        return self.alert_ids[bisect_right(self.thresholds, value):]
+    
+    def between(self, low: float, high: float, low_inclusive: bool, high_inclusive: bool) -> List[str]:
+        """Alertas com threshold no intervalo entre low e high."""
+        start = bisect_left(self.thresholds, low) if low_inclusive else bisect_right(self.thresholds, low)
+        end = bisect_right(self.thresholds, high) if high_inclusive else bisect_left(self.thresholds, high)
+        return self.alert_ids[start:end] if start < end else []
+
+class AlertStore:
+    """Persistência dos alertas: Postgres como fonte da verdade e Redis como hot set.
+    
+    O hot set guarda, por símbolo, um hash alert_id -> JSON dos alertas ativos,
+    permitindo que o avaliador do feed aqueça o índice sem consultar o banco.
+    """
+    
+    HOT_KEY = "alerts:hot:{symbol}"
+    HOT_SYMBOLS_KEY = "alerts:hot:symbols"
+    
+    def __init__(self, db_connection=None, redis_client=None):
+        self.db = db_connection
+        self.redis = redis_client
+    
+    @contextmanager
+    def _transaction(self):
+        """Cursor numa transação; em falha faz rollback para não deixar a conexão abortada."""
+        try:
+            with self.db.cursor() as cur:
+                yield cur
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+    
+    def ensure_schema(self):
+        if self.db is None:
+            return
+        with self._transaction() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS user_alerts (
+                    id TEXT PRIMARY KEY,
+                    user_id BIGINT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    alert_type TEXT NOT NULL,
+                    condition TEXT NOT NULL,
+                    threshold DOUBLE PRECISION NOT NULL,
+                    message TEXT NOT NULL,
+                    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+                    created_at TIMESTAMP NOT NULL,
+                    triggered_at TIMESTAMP NULL,
+                    trigger_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_user_alerts_active_symbol "
+                        "ON user_alerts (symbol) WHERE is_active")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_user_alerts_user ON user_alerts (user_id)")
+    
+    @staticmethod
+    def _to_dict(alert: Alert) -> Dict[str, Any]:
+        return {
+            "id": alert.id,
+            "user_id": alert.user_id,
+            "symbol": alert.symbol,
+            "alert_type": alert.alert_type.value,
+            "condition": alert.condition.value,
+            "threshold": alert.threshold,
+            "message": alert.message,
+            "is_active": alert.is_active,
+            "created_at": alert.created_at.isoformat(),
+            "triggered_at": alert.triggered_at.isoformat() if alert.triggered_at else None,
+            "trigger_count": alert.trigger_count
+        }
+    
+    @staticmethod
+    def _from_row(row: Dict[str, Any]) -> Alert:
+        def _dt(value):
+            if value is None or isinstance(value, datetime):
+                return value
+            return datetime.fromisoformat(value)
+        
+        return Alert(
+            id=row["id"],
+            user_id=int(row["user_id"]),
+            symbol=row["symbol"],
+            alert_type=AlertType(row["alert_type"]),
+            condition=AlertCondition(row["condition"]),
+            threshold=float(row["threshold"]),
+            message=row["message"],
+            is_active=bool(row["is_active"]),
+            created_at=_dt(row["created_at"]),
+            triggered_at=_dt(row.get("triggered_at")),
+            trigger_count=int(row.get("trigger_count") or 0)
+        )
+    
+    def save(self, alert: Alert):
+        if self.db is not None:
+            with self._transaction() as cur:
+                cur.execute("""
+                    INSERT INTO user_alerts (id, user_id, symbol, alert_type, condition, threshold,
+                                             message, is_active, created_at, triggered_at, trigger_count)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (id) DO UPDATE SET user_id = EXCLUDED.user_id, symbol = EXCLUDED.symbol,
+                        alert_type = EXCLUDED.alert_type, condition = EXCLUDED.condition,
+                        threshold = EXCLUDED.threshold, message = EXCLUDED.message,
+                        is_active = EXCLUDED.is_active, created_at = EXCLUDED.created_at,
+                        triggered_at = EXCLUDED.triggered_at, trigger_count = EXCLUDED.trigger_count
+                """, (alert.id, alert.user_id, alert.symbol, alert.alert_type.value,
+                      alert.condition.value, alert.threshold, alert.message, alert.is_active,
+                      alert.created_at, alert.triggered_at, alert.trigger_count))
+        self._hot_put(alert)
+    
+    def save_triggers(self, alerts: Iterable[Alert]):
+        """Grava contadores de disparo em lote."""
+        alerts = list(alerts)
+        if not alerts:
+            return
+        if self.db is not None:
+            with self._transaction() as cur:
+                cur.executemany(
+                    "UPDATE user_alerts SET triggered_at = %s, trigger_count = %s WHERE id = %s",
+                    [(a.triggered_at, a.trigger_count, a.id) for a in alerts]
+                )
+        for alert in alerts:
+            self._hot_put(alert)
+    
+    def deactivate(self, alert: Alert):
+        if self.db is not None:
+            with self._transaction() as cur:
+                cur.execute("UPDATE user_alerts SET is_active = FALSE WHERE id = %s", (alert.id,))
+        self._hot_remove(alert)
+    
+    def delete(self, alert: Alert):
+        if self.db is not None:
+            with self._transaction() as cur:
+                cur.execute("DELETE FROM user_alerts WHERE id = %s", (alert.id,))
+        self._hot_remove(alert)
+    
+    def load_active(self) -> List[Alert]:
+        """Alertas ativos: do hot set se existir, senão do Postgres (e reaquece o Redis)."""
+        if self.redis is not None:
+            try:
+                symbols = self.redis.smembers(self.HOT_SYMBOLS_KEY) or []
+                alerts = []
+                for symbol in symbols:
+                    symbol = symbol.decode() if isinstance(symbol, bytes) else symbol
+                    for raw in (self.redis.hgetall(self.HOT_KEY.format(symbol=symbol)) or {}).values():
+                        alerts.append(self._from_row(json.loads(raw)))
+                if alerts:
+                    return alerts
+            except Exception as e:
+                logger.warning(f"Hot set de alertas indisponível: {e}")
+        
+        if self.db is None:
+            return []
+        with self._transaction() as cur:
+            cur.execute("SELECT * FROM user_alerts WHERE is_active")
+            alerts = [self._from_row(dict(row)) for row in cur.fetchall()]
+        for alert in alerts:
+            self._hot_put(alert)
+        return alerts
+    
+    def _hot_put(self, alert: Alert):
+        if self.redis is None:
+            return
+        if not alert.is_active:
+            self._hot_remove(alert)
+            return
+        try:
+            pipe = self.redis.pipeline()
+            pipe.hset(self.HOT_KEY.format(symbol=alert.symbol), alert.id, json.dumps(self._to_dict(alert)))
+            pipe.sadd(self.HOT_SYMBOLS_KEY, alert.symbol)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar hot set de alertas: {e}")
+    
+    def _hot_remove(self, alert: Alert):
+        if self.redis is None:
+            return
+        try:
+            self.redis.hdel(self.HOT_KEY.format(symbol=alert.symbol), alert.id)
+        except Exception as e:
+            logger.warning(f"Falha ao remover alerta do hot set: {e}")
+
+class AlertManager:
+    def __init__(self, store: Optional[AlertStore] = None, history_size: int = 10000):
         self.alerts: Dict[str, Alert] = {}
-        self.triggered_alerts: List[Dict] = []
+        self.triggered_alerts: deque = deque(maxlen=history_size)
         self.last_values: Dict[str, Dict] = {}  # Para detectar cruzamentos
+        # (símbolo, métrica) -> condição -> thresholds ordenados
+        self.index: Dict[Tuple[str, str], Dict[AlertCondition, ThresholdIndex]] = {}
+        self.store = store
+        self._dirty: Dict[str, Alert] = {}
+    
+    def load(self):
+        """Carrega alertas ativos do store e monta o índice."""
+        if self.store is None:
+            return
+        for alert in self.store.load_active():
+            if alert.id in self.alerts:
+                self._index_remove(self.alerts[alert.id])
+            self.alerts[alert.id] = alert
+            self._index_add(alert)
+    
+    def _index_add(self, alert: Alert):
+        if not alert.is_active:
+            return
+        by_condition = self.index.setdefault((alert.symbol, alert.alert_type.value), {})
+        by_condition.setdefault(alert.condition, ThresholdIndex()).add(alert.threshold, alert.id)
+    
+    def _index_remove(self, alert: Alert):
+        by_condition = self.index.get((alert.symbol, alert.alert_type.value))
+        if not by_condition or alert.condition not in by_condition:
+            return
+        thresholds = by_condition[alert.condition]
+        thresholds.remove(alert.threshold, alert.id)
+        if not len(thresholds):
+            del by_condition[alert.condition]
+        if not by_condition:
+            del self.index[(alert.symbol, alert.alert_type.value)]
     
     def create_alert(self, user_id: int, symbol: str, alert_type: AlertType, 
                     condition: AlertCondition, threshold: float, message: str) -> str:
         """Cria um novo alerta."""
-        alert_id = f"{user_id}_{symbol}_{alert_type.value}_{int(time.time())}"
+        # sufixo aleatório: dois alertas criados no mesmo segundo não colidem
+        alert_id = f"{user_id}_{symbol}_{alert_type.value}_{int(time.time())}_{uuid.uuid4().hex[:8]}"
         
         alert = Alert(
             id=alert_id,
@@ -64,6 +324,15 @@ class AlertManager:
         )
         
         self.alerts[alert_id] = alert
+        self._index_add(alert)
+        if self.store is not None:
+            try:
+                self.store.save(alert)
+            except Exception:
+                # não deixa em memória um alerta que não foi persistido
+                self._index_remove(alert)
+                del self.alerts[alert_id]
+                raise
         return alert_id
     
     def check_alerts(self, symbol: str, market_data: Dict[str, Any]) -> List[Dict]:
@@ -75,15 +344,18 @@ class AlertManager:
         current_values = self._extract_values(market_data)
         previous_values = self.last_values.get(symbol, {})
         
-        # Verificar cada alerta ativo para este símbolo
-        for alert_id, alert in self.alerts.items():
-            if not alert.is_active or alert.symbol != symbol:
+        # Consultar apenas os thresholds cruzados de cada métrica do tick
+        for metric, current_value in current_values.items():
+            by_condition = self.index.get((symbol, metric))
+            if not by_condition:
                 continue
             
-            if self._should_trigger(alert, current_values, previous_values):
+            for alert_id in self._crossed(by_condition, current_value, previous_values.get(metric)):
+                alert = self.alerts[alert_id]
                 # Disparar alerta
                 alert.triggered_at = current_time
                 alert.trigger_count += 1
+                self._dirty[alert_id] = alert
                 
                 triggered_alert = {
                     "alert_id": alert_id,
@@ -92,7 +364,7 @@ class AlertManager:
                     "alert_type": alert.alert_type.value,
                     "message": alert.message,
                     "threshold": alert.threshold,
-                    "current_value": current_values.get(alert.alert_type.value, 0),
+                    "current_value": current_value,
                     "triggered_at": current_time.isoformat(),
                     "trigger_count": alert.trigger_count
                 }
@@ -105,6 +377,64 @@ class AlertManager:
         
         return triggered
     
+    @staticmethod
+    def _crossed(by_condition: Dict[AlertCondition, ThresholdIndex], current_value: float,
+                 previous_value: Optional[float]) -> List[str]:
+        """Ids dos alertas cujas condições são satisfeitas pelo tick."""
+        alert_ids: List[str] = []
+        
+        if AlertCondition.ABOVE in by_condition:
+            alert_ids.extend(by_condition[AlertCondition.ABOVE].below(current_value))
+        
+        if AlertCondition.BELOW in by_condition:
+            alert_ids.extend(by_condition[AlertCondition.BELOW].above(current_value))
+        
+        if previous_value is not None:
+            # previous <= threshold < current
+            if AlertCondition.CROSSES_ABOVE in by_condition and current_value > previous_value:
+                alert_ids.extend(by_condition[AlertCondition.CROSSES_ABOVE].between(
+                    previous_value, current_value, low_inclusive=True, high_inclusive=False))
+            
+            # current < threshold <= previous
+            if AlertCondition.CROSSES_BELOW in by_condition and current_value < previous_value:
+                alert_ids.extend(by_condition[AlertCondition.CROSSES_BELOW].between(
+                    current_value, previous_value, low_inclusive=False, high_inclusive=True))
+            
+            if AlertCondition.PERCENTAGE_CHANGE in by_condition and previous_value != 0:
+                change_percent = ((current_value - previous_value) / previous_value) * 100
+                alert_ids.extend(by_condition[AlertCondition.PERCENTAGE_CHANGE].below(
+                    abs(change_percent), inclusive=True))
+        
+        return alert_ids
+    
+    def flush(self):
+        """Persiste em lote os contadores dos alertas disparados desde o último flush."""
+        if self.store is None or not self._dirty:
+            self._dirty.clear()
+            return
+        dirty, self._dirty = self._dirty, {}
+        try:
+            self.store.save_triggers(dirty.values())
+        except Exception as e:
+            logger.warning(f"Falha ao persistir disparos de alertas: {e}")
+            self._dirty.update(dirty)
+    
+    def run_feed(self, feed: Iterable[Tuple[str, Dict[str, Any]]],
+                 on_trigger: Optional[Callable[[List[Dict]], None]] = None,
+                 flush_interval: float = 5.0):
+        """Avalia alertas dirigido por um feed de mercado (símbolo, dados) em streaming."""
+        last_flush = time.monotonic()
+        try:
+            for symbol, market_data in feed:
+                triggered = self.check_alerts(symbol, market_data)
+                if triggered and on_trigger is not None:
+                    on_trigger(triggered)
+                if time.monotonic() - last_flush >= flush_interval:
+                    self.flush()
+                    last_flush = time.monotonic()
+        finally:
+            self.flush()
+    
     def _extract_values(self, market_data: Dict[str, Any]) -> Dict[str, float]:
         """Extrai valores relevantes dos dados de mercado."""
         values = {}
@@ -131,39 +461,6 @@ class AlertManager:
         
         return values
     
-    def _should_trigger(self, alert: Alert, current_values: Dict[str, float], 
-                       previous_values: Dict[str, float]) -> bool:
-        """Determina se um alerta deve ser disparado."""
-        current_value = current_values.get(alert.alert_type.value)
-        previous_value = previous_values.get(alert.alert_type.value)
-        
-        if current_value is None:
-            return False
-        
-        if alert.condition == AlertCondition.ABOVE:
-            return current_value > alert.threshold
-        
-        elif alert.condition == AlertCondition.BELOW:
-            return current_value < alert.threshold
-        
-        elif alert.condition == AlertCondition.CROSSES_ABOVE:
-            return (previous_value is not None and 
-                   previous_value <= alert.threshold and 
-                   current_value > alert.threshold)
-        
-        elif alert.condition == AlertCondition.CROSSES_BELOW:
-            return (previous_value is not None and 
-                   previous_value >= alert.threshold and 
-                   current_value < alert.threshold)
-        
-        elif alert.condition == AlertCondition.PERCENTAGE_CHANGE:
-            if previous_value is None or previous_value == 0:
-                return False
-            change_percent = ((current_value - previous_value) / previous_value) * 100
-            return abs(change_percent) >= alert.threshold
-        
-        return False
-    
     def get_user_alerts(self, user_id: int) -> List[Alert]:
         """Retorna alertas de um usuário específico."""
         return [alert for alert in self.alerts.values() if alert.user_id == user_id]
@@ -171,21 +468,30 @@ class AlertManager:
     def deactivate_alert(self, alert_id: str) -> bool:
         """Desativa um alerta."""
         if alert_id in self.alerts:
-            self.alerts[alert_id].is_active = False
+            alert = self.alerts[alert_id]
+            if alert.is_active:
+                self._index_remove(alert)
+            alert.is_active = False
+            if self.store is not None:
+                self.store.deactivate(alert)
             return True
         return False
     
     def delete_alert(self, alert_id: str) -> bool:
         """Remove um alerta."""
         if alert_id in self.alerts:
-            del self.alerts[alert_id]
+            alert = self.alerts.pop(alert_id)
+            self._index_remove(alert)
+            self._dirty.pop(alert_id, None)
+            if self.store is not None:
+                self.store.delete(alert)
             return True
         return False
     
     def get_triggered_alerts(self, user_id: Optional[int] = None, 
                            limit: int = 50) -> List[Dict]:
         """Retorna alertas disparados recentemente."""
-        alerts = self.triggered_alerts
+        alerts = list(self.triggered_alerts)
         
         if user_id is not None:
             alerts = [a for a in alerts if a['user_id'] == user_id]
@@ -199,11 +505,12 @@ class AlertManager:
         """Remove alertas antigos e disparados."""
         cutoff_date = datetime.now() - timedelta(days=days)
         
-        # Remover alertas disparados antigos
-        self.triggered_alerts = [
-            a for a in self.triggered_alerts 
-            if datetime.fromisoformat(a['triggered_at']) > cutoff_date
-        ]
+        # Remover alertas disparados antigos (o buffer já é limitado por tamanho)
+        self.triggered_alerts = deque(
+            (a for a in self.triggered_alerts
+             if datetime.fromisoformat(a['triggered_at']) > cutoff_date),
+            maxlen=self.triggered_alerts.maxlen
+        )
         
         # Remover alertas inativos antigos
         to_remove = []
@@ -214,14 +521,57 @@ class AlertManager:
                 to_remove.append(alert_id)
         
         for alert_id in to_remove:
-            del self.alerts[alert_id]
+            self.delete_alert(alert_id)
 
 # Instância global do gerenciador de alertas
 alert_manager = AlertManager()
+_store_lock = threading.Lock()
+_store_checked = False
+
+def configure_alert_store(db_connection=None, redis_client=None) -> AlertStore:
+    """Liga o gerenciador global a um AlertStore e carrega os alertas ativos."""
+    global _store_checked
+    store = AlertStore(db_connection=db_connection, redis_client=redis_client)
+    store.ensure_schema()
+    alert_manager.store = store
+    alert_manager.load()
+    _store_checked = True
+    return store
+
+def _ensure_alert_store():
+    """Na primeira chamada, persiste os alertas em DATABASE_URL/REDIS_URL se configurados."""
+    global _store_checked
+    if _store_checked:
+        return
+    with _store_lock:
+        if _store_checked or alert_manager.store is not None:
+            _store_checked = True
+            return
+        _store_checked = True
+        db_connection = redis_client = None
+        if os.getenv('DATABASE_URL'):
+            try:
+                from shared.database import get_db_connection
+                db_connection = get_db_connection()
+            except Exception as e:
+                logger.warning(f"Alertas sem Postgres: {e}")
+        if os.getenv('REDIS_URL'):
+            try:
+                import redis
+                redis_client = redis.from_url(os.environ['REDIS_URL'])
+            except Exception as e:
+                logger.warning(f"Alertas sem hot set no Redis: {e}")
+        if db_connection is None and redis_client is None:
+            return
+        try:
+            configure_alert_store(db_connection, redis_client)
+        except Exception as e:
+            logger.warning(f"Falha ao configurar persistência de alertas: {e}")
 
 def create_price_alert(user_id: int, symbol: str, condition: str, 
                       threshold: float, message: str) -> str:
     """Cria um alerta de preço."""
+    _ensure_alert_store()
     condition_enum = AlertCondition(condition)
     return alert_manager.create_alert(
         user_id, symbol, AlertType.PRICE, condition_enum, threshold, message
@@ -230,6 +580,7 @@ def create_price_alert(user_id: int, symbol: str, condition: str,
 def create_rsi_alert(user_id: int, symbol: str, condition: str, 
                     threshold: float, message: str) -> str:
     """Cria um alerta de RSI."""
+    _ensure_alert_store()
     condition_enum = AlertCondition(condition)
     return alert_manager.create_alert(
         user_id, symbol, AlertType.RSI, condition_enum, threshold, message
@@ -238,6 +589,7 @@ def create_rsi_alert(user_id: int, symbol: str, condition: str,
 def create_volume_alert(user_id: int, symbol: str, condition: str, 
                        threshold: float, message: str) -> str:
     """Cria um alerta de volume."""
+    _ensure_alert_store()
     condition_enum = AlertCondition(condition)
     return alert_manager.create_alert(
         user_id, symbol, AlertType.VOLUME, condition_enum, threshold, message
@@ -245,5 +597,9 @@ def create_volume_alert(user_id: int, symbol: str, condition: str,
 
 def check_market_alerts(symbol: str, market_data: Dict[str, Any]) -> List[Dict]:
     """Verifica alertas para dados de mercado."""
-    return alert_manager.check_alerts(symbol, market_data)
+    _ensure_alert_store()
+    triggered = alert_manager.check_alerts(symbol, market_data)
+    if triggered:
+        alert_manager.flush()
+    return triggered
 
@@ -6,8 +6,14 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
 from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import json
 import pickle
 import os
+import threading
+import uuid
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import LinearRegression, Ridge
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
@@ -16,13 +22,236 @@ from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import joblib
+except ImportError:  # joblib acompanha o scikit-learn, mas não é obrigatório
+    joblib = None
+
+MODEL_FEATURES = ['rsi', 'macd', 'bb_position', 'volume_ratio', 'price_change_1h', 'price_change_4h']
+MAX_TRAINING_JOBS = 50  # jobs concluídos mantidos para consulta de status
+
+class ModelRegistry:
+    """Registro versionado de modelos em disco com cache por processo.
+    
+    Layout: `<model_dir>/<modelo>/<versão>/model.joblib` + `meta.json`, com
+    `<model_dir>/<modelo>/LATEST` apontando para a versão ativa. Modelos são
+    carregados uma única vez por processo (joblib com mmap quando disponível);
+    o formato legado `<modelo>_model.pkl` continua sendo lido.
+    """
+    
+    def __init__(self, model_dir: str = "ml_models"):
+        self.model_dir = model_dir
+        os.makedirs(model_dir, exist_ok=True)
+        self._cache: Dict[Tuple[str, str], Tuple[Any, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+    
+    def save(self, model_name: str, model: Any, metadata: Dict[str, Any]) -> str:
+        """Persiste nova versão do modelo e a torna a versão ativa."""
+        version = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        version_dir = os.path.join(self.model_dir, model_name, version)
+        os.makedirs(version_dir, exist_ok=True)
+        
+        model_path = os.path.join(version_dir, "model.joblib" if joblib else "model.pkl")
+        if joblib:
+            joblib.dump(model, model_path)
+        else:
+            with open(model_path, 'wb') as f:
+                pickle.dump(model, f)
+        
+        meta = dict(metadata, version=version, model_path=model_path,
+                    trained_at=datetime.now().isoformat())
+        with open(os.path.join(version_dir, "meta.json"), 'w') as f:
+            json.dump(meta, f, default=float)
+        
+        # Troca atômica do ponteiro para a versão ativa
+        latest_path = os.path.join(self.model_dir, model_name, "LATEST")
+        with open(latest_path + ".tmp", 'w') as f:
+            f.write(version)
+        os.replace(latest_path + ".tmp", latest_path)
+        
+        with self._lock:
+            self._cache[(model_name, version)] = (model, meta)
+        return version
+    
+    def latest_version(self, model_name: str) -> Optional[str]:
+        """Versão ativa do modelo, se houver."""
+        latest_path = os.path.join(self.model_dir, model_name, "LATEST")
+        if not os.path.exists(latest_path):
+            return None
+        with open(latest_path) as f:
+            return f.read().strip() or None
+    
+    def versions(self, model_name: str) -> List[str]:
+        """Versões disponíveis, da mais antiga para a mais recente."""
+        model_root = os.path.join(self.model_dir, model_name)
+        if not os.path.isdir(model_root):
+            return []
+        return sorted(v for v in os.listdir(model_root) if os.path.isdir(os.path.join(model_root, v)))
+    
+    def load(self, model_name: str, version: Optional[str] = None) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """Retorna (modelo, metadados) da versão pedida ou da ativa."""
+        version = version or self.latest_version(model_name) or "legacy"
+        key = (model_name, version)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+            loaded = self._read(model_name, version)
+            if loaded is not None:
+                self._cache[key] = loaded
+            return loaded
+    
+    def _read(self, model_name: str, version: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        if version == "legacy":
+            legacy_path = os.path.join(self.model_dir, f"{model_name}_model.pkl")
+            if not os.path.exists(legacy_path):
+                return None
+            with open(legacy_path, 'rb') as f:
+                return pickle.load(f), {"version": "legacy", "features": MODEL_FEATURES}
+        
+        version_dir = os.path.join(self.model_dir, model_name, version)
+        meta_path = os.path.join(version_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        
+        model_path = meta.get("model_path") or os.path.join(version_dir, "model.joblib")
+        if model_path.endswith(".joblib") and joblib:
+            model = joblib.load(model_path, mmap_mode='r')
+        else:
+            with open(model_path, 'rb') as f:
+                model = pickle.load(f)
+        return model, meta
+
+_REGISTRIES: Dict[str, ModelRegistry] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+def get_model_registry(model_dir: str = "ml_models") -> ModelRegistry:
+    """Registro compartilhado por diretório (um cache de modelos por processo)."""
+    key = os.path.abspath(model_dir)
+    with _REGISTRIES_LOCK:
+        if key not in _REGISTRIES:
+            _REGISTRIES[key] = ModelRegistry(model_dir)
+        return _REGISTRIES[key]
+
+class IncrementalFeatures:
+    """Features de predição mantidas candle a candle.
+    
+    Reproduz as colunas de `MLPredictor.create_features` usadas pelos modelos:
+    EMAs com `adjust=True` viram razões numerador/denominador acumuladas e as
+    janelas móveis usam deques curtos, então cada candle novo custa O(janela).
+    """
+    
+    WARMUP = 50  # create_features descarta as primeiras 50 barras (sma_50)
+    
+    def __init__(self):
+        self.closes: deque = deque(maxlen=21)
+        self.volumes: deque = deque(maxlen=20)
+        self.ema_state = {12: [0.0, 0.0], 26: [0.0, 0.0]}
+        self.count = 0
+        self.last_timestamp = None
+    
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> "IncrementalFeatures":
+        """Inicializa o estado a partir do histórico em uma passada vetorizada."""
+        state = cls()
+        close = df['close'].astype(float)
+        state.closes.extend(close.iloc[-state.closes.maxlen:].tolist())
+        state.volumes.extend(df['volume'].astype(float).iloc[-state.volumes.maxlen:].tolist())
+        state.count = len(df)
+        state.last_timestamp = df.index[-1] if len(df) else None
+        for span in state.ema_state:
+            alpha = 2 / (span + 1)
+            # Com adjust=True, ema = num/den e den = (1 - (1-alpha)^n) / alpha
+            den = (1 - (1 - alpha) ** len(close)) / alpha
+            state.ema_state[span] = [close.ewm(span=span).mean().iloc[-1] * den, den]
+        return state
+    
+    def last_row(self) -> Tuple[Optional[float], Optional[float]]:
+        """Close e volume do último candle incorporado."""
+        if not self.closes:
+            return None, None
+        return self.closes[-1], self.volumes[-1]
+    
+    def replace_last(self, close: float, volume: float) -> Optional[Dict[str, float]]:
+        """Troca os valores do último candle (ainda aberto) sem avançar o estado.
+        
+        O último close entra nas EMAs com peso 1, então basta corrigir o numerador.
+        """
+        close = float(close)
+        for state in self.ema_state.values():
+            state[0] += close - self.closes[-1]
+        self.closes[-1] = close
+        self.volumes[-1] = float(volume)
+        return self.features()
+    
+    def update(self, close: float, volume: float, timestamp=None) -> Optional[Dict[str, float]]:
+        """Incorpora um candle fechado e retorna a linha de features."""
+        close = float(close)
+        self.closes.append(close)
+        self.volumes.append(float(volume))
+        for span, state in self.ema_state.items():
+            decay = 1 - 2 / (span + 1)
+            state[0] = state[0] * decay + close
+            state[1] = state[1] * decay + 1
+        self.count += 1
+        self.last_timestamp = timestamp
+        return self.features()
+    
+    def features(self) -> Optional[Dict[str, float]]:
+        """Linha de features atual, ou None durante o aquecimento."""
+        if self.count < self.WARMUP:
+            return None
+        
+        closes = np.fromiter(self.closes, dtype=float)
+        volumes = np.fromiter(self.volumes, dtype=float)
+        close = closes[-1]
+        
+        deltas = np.diff(closes[-15:])
+        gain = deltas[deltas > 0].sum() / 14
+        loss = -deltas[deltas < 0].sum() / 14
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + gain / loss))
+        
+        window = closes[-20:]
+        bb_middle = window.mean()
+        bb_std = window.std(ddof=1)
+        bb_lower = bb_middle - bb_std * 2
+        bb_upper = bb_middle + bb_std * 2
+        
+        ema_12 = self.ema_state[12][0] / self.ema_state[12][1]
+        ema_26 = self.ema_state[26][0] / self.ema_state[26][1]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            row = {
+                'rsi': float(rsi),
+                'macd': float(ema_12 - ema_26),
+                'bb_position': float((close - bb_lower) / (bb_upper - bb_lower)),
+                'volume_ratio': float(volumes[-1] / volumes.mean()),
+                'price_change_1h': float((close / closes[-2] - 1) * 100),
+                'price_change_4h': float((close / closes[-5] - 1) * 100)
+            }
+        return row
+
+_TRAINING_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ml-training")
+
 class MLPredictor:
     def __init__(self, model_dir: str = "ml_models"):
         self.model_dir = model_dir
         if not os.path.exists(model_dir):
             os.makedirs(model_dir)
         
+        self.registry = get_model_registry(model_dir)
+        self.feature_states: Dict[str, IncrementalFeatures] = {}
+        self.training_jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        
         self.models = {}
+        self.training_features: List[str] = list(MODEL_FEATURES)
         self.scalers = {}
         self.feature_importance = {}
         self.model_performance = {}
@@ -31,19 +260,19 @@ class MLPredictor:
         self.model_configs = {
             'random_forest': {
                 'model': RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1),
-                'features': ['rsi', 'macd', 'bb_position', 'volume_ratio', 'price_change_1h', 'price_change_4h']
+                'features': MODEL_FEATURES
             },
             'gradient_boosting': {
                 'model': GradientBoostingRegressor(n_estimators=100, random_state=42),
-                'features': ['rsi', 'macd', 'bb_position', 'volume_ratio', 'price_change_1h', 'price_change_4h']
+                'features': MODEL_FEATURES
             },
             'linear_regression': {
                 'model': LinearRegression(),
-                'features': ['rsi', 'macd', 'bb_position', 'volume_ratio', 'price_change_1h', 'price_change_4h']
+                'features': MODEL_FEATURES
             },
             'ridge_regression': {
                 'model': Ridge(alpha=1.0),
-                'features': ['rsi', 'macd', 'bb_position', 'volume_ratio', 'price_change_1h', 'price_change_4h']
+                'features': MODEL_FEATURES
             }
         }
     
@@ -122,7 +351,7 @@ class MLPredictor:
         for model_name, config in self.model_configs.items():
             feature_columns.extend(config['features'])
         
-        feature_columns = list(set(feature_columns))  # Remove duplicatas
+        feature_columns = list(dict.fromkeys(feature_columns))  # Remove duplicatas mantendo a ordem
         
         # Verificar se todas as features existem
         available_features = [col for col in feature_columns if col in features_df.columns]
@@ -131,6 +360,7 @@ class MLPredictor:
             return np.array([]), np.array([])
         
         X = features_df[available_features].values
+        self.training_features = available_features
         
         # Target: preço futuro
         y = features_df['close'].shift(-target_horizon).values
@@ -158,20 +388,14 @@ class MLPredictor:
         
         for model_name, config in self.model_configs.items():
             try:
-                # Selecionar features específicas do modelo
-                feature_columns = []
-                for model_name_check, model_config in self.model_configs.items():
-                    if model_name_check == model_name:
-                        feature_columns.extend(model_config['features'])
-                
-                # Verificar features disponíveis
-                available_features = [col for col in feature_columns if col in df.columns]
+                # Colunas de X, na ordem usada em prepare_training_data
+                available_features = list(self.training_features)
                 
                 if len(available_features) < 2:
                     continue
                 
-                # Treinar modelo
-                model = config['model']
+                # Treinar cópia do estimador (o modelo em uso segue servindo predições)
+                model = clone(config['model'])
                 model.fit(X_train, y_train)
                 
                 # Fazer predições
@@ -182,27 +406,34 @@ class MLPredictor:
                 mae = mean_absolute_error(y_test, y_pred)
                 r2 = r2_score(y_test, y_pred)
                 
-                # Salvar modelo
-                model_path = os.path.join(self.model_dir, f"{model_name}_model.pkl")
-                with open(model_path, 'wb') as f:
-                    pickle.dump(model, f)
-                
                 # Feature importance (se disponível)
                 importance = None
                 if hasattr(model, 'feature_importances_'):
                     importance = dict(zip(available_features, model.feature_importances_))
                 
+                # Salvar nova versão no registro
+                version = self.registry.save(model_name, model, {
+                    "features": available_features,
+                    "target_horizon": target_horizon,
+                    "mse": mse,
+                    "mae": mae,
+                    "r2": r2
+                })
+                _, meta = self.registry.load(model_name, version)
+                
                 results[model_name] = {
                     "mse": mse,
                     "mae": mae,
                     "r2": r2,
                     "feature_importance": importance,
-                    "model_path": model_path,
+                    "model_path": meta["model_path"],
+                    "model_version": version,
                     "features_used": available_features
                 }
                 
-                self.models[model_name] = model
-                self.model_performance[model_name] = results[model_name]
+                with self._lock:
+                    self.models[model_name] = model
+                    self.model_performance[model_name] = results[model_name]
                 
             except Exception as e:
                 results[model_name] = {"error": str(e)}
@@ -212,14 +443,8 @@ class MLPredictor:
     def predict_price(self, df: pd.DataFrame, model_name: str = "random_forest", 
                      horizon: int = 1) -> Dict[str, Any]:
         """Faz predição de preço usando modelo treinado."""
-        if model_name not in self.models:
-            # Tentar carregar modelo salvo
-            model_path = os.path.join(self.model_dir, f"{model_name}_model.pkl")
-            if os.path.exists(model_path):
-                with open(model_path, 'rb') as f:
-                    self.models[model_name] = pickle.load(f)
-            else:
-                return {"error": f"Modelo {model_name} não encontrado"}
+        if not self._ensure_model(model_name):
+            return {"error": f"Modelo {model_name} não encontrado"}
         
         # Criar features
         features_df = self.create_features(df)
@@ -261,23 +486,180 @@ class MLPredictor:
             "timestamp": datetime.now().isoformat()
         }
     
+    def _ensure_model(self, model_name: str) -> bool:
+        """Garante o modelo em memória, carregando do registro compartilhado."""
+        if model_name in self.models:
+            return True
+        loaded = self.registry.load(model_name)
+        if loaded is None:
+            return False
+        model, meta = loaded
+        with self._lock:
+            self.models[model_name] = model
+            if "r2" in meta:
+                self.model_performance.setdefault(model_name, {
+                    "mse": meta.get("mse"),
+                    "mae": meta.get("mae"),
+                    "r2": meta["r2"],
+                    "model_path": meta.get("model_path"),
+                    "model_version": meta.get("version"),
+                    "features_used": meta.get("features", MODEL_FEATURES)
+                })
+        return True
+    
+    def _model_features(self, model_name: str) -> List[str]:
+        """Ordem de features com que o modelo foi treinado."""
+        return self.model_performance.get(model_name, {}).get("features_used") or MODEL_FEATURES
+    
+    def update_features(self, symbol: str, df: pd.DataFrame) -> Optional[Dict[str, float]]:
+        """Atualiza o estado incremental do símbolo e retorna a última linha de features.
+        
+        Se o frame traz apenas candles novos em relação ao estado, eles são
+        incorporados um a um; caso contrário o estado é reconstruído do histórico.
+        O último candle do estado pode ter sido incorporado ainda aberto, então
+        seus valores são sempre conferidos com o frame antes de reutilizá-lo.
+        """
+        if df.empty or len(df) < IncrementalFeatures.WARMUP:
+            return None
+        
+        state = self.feature_states.get(symbol)
+        if state is not None and state.last_timestamp in df.index:
+            position = df.index.get_loc(state.last_timestamp)
+            if isinstance(position, int) and len(df) - position - 1 <= 16:
+                row = (float(df['close'].iloc[position]), float(df['volume'].iloc[position]))
+                if row != state.last_row():
+                    state.replace_last(*row)
+                for timestamp, close, volume in zip(df.index[position + 1:],
+                                                    df['close'].iloc[position + 1:],
+                                                    df['volume'].iloc[position + 1:]):
+                    state.update(close, volume, timestamp)
+                return state.features()
+        
+        state = IncrementalFeatures.from_history(df)
+        self.feature_states[symbol] = state
+        return state.features()
+    
+    def predict_batch(self, frames: Dict[str, pd.DataFrame], model_name: str = "random_forest",
+                      horizon: int = 1) -> Dict[str, Dict[str, Any]]:
+        """Prediz vários símbolos com uma única chamada ao modelo."""
+        if not self._ensure_model(model_name):
+            return {symbol: {"error": f"Modelo {model_name} não encontrado"} for symbol in frames}
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        symbols, rows = self._feature_matrix(frames, model_name, results)
+        if not symbols:
+            return results
+        
+        predictions = self.models[model_name].predict(rows)
+        confidence = self.model_performance.get(model_name, {}).get('r2', 0.5)
+        confidence = max(0.1, min(0.9, confidence))
+        timestamp = datetime.now().isoformat()
+        
+        for symbol, prediction in zip(symbols, predictions):
+            current_price = frames[symbol]['close'].iloc[-1]
+            results[symbol] = {
+                "current_price": current_price,
+                "predicted_price": float(prediction),
+                "direction": "up" if prediction > current_price else "down",
+                "change_percent": ((prediction - current_price) / current_price) * 100,
+                "confidence": confidence,
+                "model_used": model_name,
+                "horizon": horizon,
+                "timestamp": timestamp
+            }
+        return results
+    
+    def ensemble_predict_batch(self, frames: Dict[str, pd.DataFrame], horizon: int = 1) -> Dict[str, Dict[str, Any]]:
+        """Ensemble para vários símbolos: uma chamada `predict` por modelo."""
+        per_model = {
+            model_name: self.predict_batch(frames, model_name, horizon)
+            for model_name in self.model_configs.keys()
+            if self._ensure_model(model_name)
+        }
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        for symbol, df in frames.items():
+            predictions = {
+                model_name: preds[symbol]
+                for model_name, preds in per_model.items()
+                if "error" not in preds.get(symbol, {"error": True})
+            }
+            if not predictions:
+                results[symbol] = {"error": "Nenhum modelo disponível para predição"}
+                continue
+            results[symbol] = self._combine_predictions(df['close'].iloc[-1], predictions, horizon)
+        return results
+    
+    def _feature_matrix(self, frames: Dict[str, pd.DataFrame], model_name: str,
+                        errors: Dict[str, Dict[str, Any]]) -> Tuple[List[str], np.ndarray]:
+        features = self._model_features(model_name)
+        symbols: List[str] = []
+        rows: List[List[float]] = []
+        for symbol, df in frames.items():
+            row = self.update_features(symbol, df)
+            if row is None or any(not np.isfinite(row.get(f, np.nan)) for f in features):
+                errors[symbol] = {"error": "Não foi possível criar features"}
+                continue
+            symbols.append(symbol)
+            rows.append([row[f] for f in features])
+        return symbols, np.asarray(rows, dtype=float)
+    
+    def train_models_async(self, df: pd.DataFrame, target_horizon: int = 1) -> str:
+        """Agenda o treinamento em background e retorna o id do job."""
+        job_id = uuid.uuid4().hex
+        job = {"id": job_id, "status": "queued", "queued_at": datetime.now().isoformat()}
+        with self._lock:
+            self.training_jobs[job_id] = job
+            self._prune_training_jobs()
+        
+        def _run():
+            job.update(status="running", started_at=datetime.now().isoformat())
+            try:
+                job["results"] = self.train_models(df, target_horizon)
+                job["status"] = "failed" if "error" in job["results"] else "completed"
+            except Exception as e:
+                job.update(status="failed", error=str(e))
+            job["finished_at"] = datetime.now().isoformat()
+        
+        _TRAINING_EXECUTOR.submit(_run)
+        return job_id
+    
+    def _prune_training_jobs(self) -> None:
+        """Descarta os jobs concluídos mais antigos além de MAX_TRAINING_JOBS."""
+        excess = len(self.training_jobs) - MAX_TRAINING_JOBS
+        if excess <= 0:
+            return
+        finished = [job_id for job_id, job in self.training_jobs.items() if "finished_at" in job]
+        for job_id in finished[:excess]:
+            del self.training_jobs[job_id]
+    
+    def get_training_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado de um job de treinamento."""
+        return self.training_jobs.get(job_id)
+    
     def ensemble_prediction(self, df: pd.DataFrame, horizon: int = 1) -> Dict[str, Any]:
         """Faz predição usando ensemble de modelos."""
         predictions = {}
-        weights = {}
         
         # Coletar predições de todos os modelos disponíveis
         for model_name in self.model_configs.keys():
             pred_result = self.predict_price(df, model_name, horizon)
             if "error" not in pred_result:
                 predictions[model_name] = pred_result
-                # Peso baseado na performance (R²)
-                r2 = self.model_performance.get(model_name, {}).get('r2', 0.5)
-                weights[model_name] = max(0.1, r2)
         
         if not predictions:
             return {"error": "Nenhum modelo disponível para predição"}
         
+        return self._combine_predictions(df['close'].iloc[-1], predictions, horizon)
+    
+    def _combine_predictions(self, current_price: float, predictions: Dict[str, Dict[str, Any]],
+                             horizon: int) -> Dict[str, Any]:
+        """Combina predições individuais ponderando pelo R² de cada modelo."""
+        weights = {
+            model_name: max(0.1, self.model_performance.get(model_name, {}).get('r2', 0.5))
+            for model_name in predictions
+        }
+        
         # Calcular predição ponderada
         total_weight = sum(weights.values())
         weighted_prediction = sum(
@@ -291,7 +673,6 @@ class MLPredictor:
             for model_name, pred in predictions.items()
         ) / total_weight
         
-        current_price = df['close'].iloc[-1]
         direction = "up" if weighted_prediction > current_price else "down"
         change_percent = ((weighted_prediction - current_price) / current_price) * 100
         
@@ -332,6 +713,23 @@ def ensemble_predict(df: pd.DataFrame, horizon: int = 1) -> Dict[str, Any]:
     """Função para predição ensemble."""
     return ml_predictor.ensemble_prediction(df, horizon)
 
+def train_ml_models_async(df: pd.DataFrame) -> str:
+    """Agenda treinamento em background; consulte com get_training_status."""
+    return ml_predictor.train_models_async(df)
+
+def get_training_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """Estado de um treinamento agendado."""
+    return ml_predictor.get_training_job(job_id)
+
+def predict_prices_batch(frames: Dict[str, pd.DataFrame], model_name: str = "random_forest",
+                         horizon: int = 1) -> Dict[str, Dict[str, Any]]:
+    """Predição de preço para vários símbolos em uma chamada."""
+    return ml_predictor.predict_batch(frames, model_name, horizon)
+
+def ensemble_predict_batch(frames: Dict[str, pd.DataFrame], horizon: int = 1) -> Dict[str, Dict[str, Any]]:
+    """Predição ensemble para vários símbolos em uma chamada."""
+    return ml_predictor.ensemble_predict_batch(frames, horizon)
+
 def get_ml_performance() -> Dict[str, Any]:
     """Função para obter performance dos modelos."""
     return ml_predictor.get_model_performance()
@@ -152,9 +152,24 @@ def create_app():
     def health():
         return jsonify({'status': 'ok', 'service': 'sne-web', 'version': '1.0'}), 200
 
+    from .motor import configurar_catalogo_magnetico
+    configurar_catalogo_magnetico(app)
+
     from .radar_report_scheduler import start_radar_report_scheduler
     start_radar_report_scheduler()
 
+    from .intel_sources import start_intel_feed_poller
+    start_intel_feed_poller()
+
+    from .distribution_outbox import start_outbox_workers_if_enabled
+    start_outbox_workers_if_enabled()
+
+    from .tron_payment_watcher import start_tron_payment_watcher
+    start_tron_payment_watcher(app)
+
+    from .activation_executor import start_activation_executor
+    start_activation_executor(app)
+
     logger.info("Flask app created successfully")
     return app
 
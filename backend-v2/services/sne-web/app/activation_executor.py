@@ -0,0 +1,608 @@
+"""
+Pipelined Operator Key activation executor.
+
+process_activation_order only queues the order (status activation_pending,
+state "queued") when the executor is enabled. One leader thread, elected
+through Redis so only one process signs with the activation key:
+
+- drains queued orders in batches, checks entitlements for the whole batch
+  at once, reads the sale controller once and sends every mint back to back
+  with nonces handed out by a local NonceManager instead of asking the node
+  for the pending count per order;
+- tracks receipts for every submitted order from a single loop that only
+  fetches receipts when the head block advances;
+- commits each mint's tx hash and nonce before broadcasting it, so a failed
+  tick can never re-queue a mint that is already on the wire; receipt
+  transitions are committed per tracking pass.
+
+Throughput therefore follows the batch size rather than one
+send/wait/confirm round trip per order, which is what matters during a key
+sale spike.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+import uuid
+
+from sqlalchemy import func
+from web3 import Web3
+
+from . import http_client
+from .activation_service import (
+    _OPERATOR_KEY_WRITE_ABI,
+    _activation_account,
+    _activation_metadata,
+    _activation_web3,
+    _gas_limit,
+    _get_receipt_if_available,
+    _mark_activation_failed,
+    _mark_target_already_has_key,
+    _observe_activation_receipt,
+    _operator_key_contract,
+    _save_activation_metadata,
+    _tx_fee_fields,
+    _utcnow,
+)
+from .checkout_service import CheckoutError, serialize_activation_order
+from .config import Config
+from .extensions import db
+from .keys_entitlement_service import build_keys_entitlement
+from .models import ActivationOrder
+from .utils.redis_safe import SafeRedis
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "activation:executor:leader"
+DEFAULT_MINT_GAS = 250_000
+_NONCE_ERRORS = ("nonce too low", "already known", "replacement transaction underpriced", "invalid nonce")
+
+_THREAD: threading.Thread | None = None
+_THREAD_LOCK = threading.Lock()
+_WAKE = threading.Event()
+_PROCESS_TOKEN = f"{os.getpid()}:{uuid.uuid4().hex}"
+# metadata left behind by a previous attempt; a retried order starts clean
+_ATTEMPT_KEYS = (
+    "submittedAt",
+    "batchId",
+    "controllerTxHash",
+    "previousSaleController",
+    "restoreControllerRequested",
+    "restoredController",
+    "receiptBlock",
+    "confirmations",
+    "requiredConfirmations",
+    "lastObservedAt",
+    "confirmedAt",
+    "processedAt",
+    "failedAt",
+    "failureCode",
+    "skippedAt",
+    "skipReason",
+)
+
+
+def executor_enabled() -> bool:
+    return bool(Config.SNE_ACTIVATION_EXECUTOR_ENABLED)
+
+
+class NonceManager:
+    """
+    Hands out sequential nonces for one signer on one chain.
+
+    Seeded from the node's pending transaction count on first use; after that
+    nonces come from a local counter under a lock, so concurrent senders in
+    this process never collide. A reservation whose send fails resyncs from
+    the node, since the nonce was not consumed on-chain.
+    """
+
+    def __init__(self, w3: Web3, address: str):
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address)
+        self._lock = threading.Lock()
+        self._next: int | None = None
+
+    def resync(self) -> int:
+        with self._lock:
+            self._next = int(self.w3.eth.get_transaction_count(self.address, "pending"))
+            return self._next
+
+    def peek(self) -> int | None:
+        return self._next
+
+    @contextmanager
+    def reserve(self) -> Iterator[int]:
+        with self._lock:
+            if self._next is None:
+                self._next = int(self.w3.eth.get_transaction_count(self.address, "pending"))
+            nonce = self._next
+            self._next += 1
+        try:
+            yield nonce
+        except Exception:
+            self.resync()
+            raise
+
+
+_NONCE_MANAGERS: Dict[Tuple[str, str], NonceManager] = {}
+_NONCE_MANAGERS_LOCK = threading.Lock()
+
+
+def nonce_manager(w3: Web3, network_key: str, address: str) -> NonceManager:
+    key = (network_key, Web3.to_checksum_address(address).lower())
+    with _NONCE_MANAGERS_LOCK:
+        manager = _NONCE_MANAGERS.get(key)
+        if manager is None:
+            manager = _NONCE_MANAGERS[key] = NonceManager(w3, address)
+        else:
+            manager.w3 = w3
+        return manager
+
+
+def enqueue_activation(order: ActivationOrder) -> Dict[str, Any]:
+    """Queue a paid order for the executor and wake it if it runs in this process."""
+    metadata, activation = _activation_metadata(order)
+    activation.update({"state": "queued", "queuedAt": _utcnow().isoformat()})
+    for stale in _ATTEMPT_KEYS:
+        activation.pop(stale, None)
+    _save_activation_metadata(order, activation, metadata)
+    order.status = "activation_pending"
+    # a reverted mint leaves its hash behind; the send queue only picks up orders without one
+    order.activation_tx_hash = None
+    order.error_code = None
+    order.error_message = None
+    order.updated_at = _utcnow()
+    db.session.commit()
+    _WAKE.set()
+    return serialize_activation_order(order)
+
+
+def _is_nonce_error(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return any(marker in message for marker in _NONCE_ERRORS)
+
+
+@dataclass
+class _ChainState:
+    w3: Web3
+    nonces: NonceManager
+    last_block: int | None = None
+    # sale controller each contract ends up with once our pending txs are mined
+    controllers: Dict[str, str] = field(default_factory=dict)
+    previous_controllers: Dict[str, str] = field(default_factory=dict)
+
+
+class ActivationExecutor:
+    """Batch sender plus receipt tracker; run_once() is one tick of the leader loop."""
+
+    def __init__(
+        self,
+        *,
+        batch_size: int | None = None,
+        signer: Any = None,
+        lease: Callable[[], bool] | None = None,
+    ):
+        self.batch_size = max(1, batch_size or Config.SNE_ACTIVATION_EXECUTOR_BATCH_SIZE)
+        self._signer = signer
+        self._chains: Dict[str, _ChainState] = {}
+        # renews the leader lease; checked before every batch send so a process
+        # that lost the lease (e.g. after a long stall) never signs with stale nonces
+        self._lease = lease
+        self.lease_lost = False
+
+    @property
+    def signer(self):
+        if self._signer is None:
+            self._signer = _activation_account()
+        return self._signer
+
+    def reset(self) -> None:
+        """Forget local nonce/controller state, e.g. after another process held the lease."""
+        self.lease_lost = False
+        for state in self._chains.values():
+            state.nonces.resync()
+            state.controllers.clear()
+            state.last_block = None
+
+    def _chain(self, network_key: str) -> _ChainState:
+        state = self._chains.get(network_key)
+        if state is None:
+            w3 = _activation_web3(network_key)
+            state = self._chains[network_key] = _ChainState(
+                w3=w3,
+                nonces=nonce_manager(w3, network_key, self.signer.address),
+            )
+        return state
+
+    def run_once(self) -> Dict[str, Any]:
+        summary = {"submitted": 0, "failed": 0, "deferred": 0, "observed": 0, "activated": 0}
+        for key, value in self.send_queued().items():
+            summary[key] += value
+        for key, value in self.track_receipts().items():
+            summary[key] += value
+        return summary
+
+    # -- send queue ---------------------------------------------------------
+
+    def _in_flight_targets(self) -> set[str]:
+        rows = (
+            db.session.query(func.lower(ActivationOrder.target_arbitrum_address))
+            .filter(ActivationOrder.status == "activation_submitted")
+            .all()
+        )
+        return {row[0] for row in rows if row[0]}
+
+    def _queued_orders(self, busy: set[str]) -> List[ActivationOrder]:
+        query = ActivationOrder.query.filter(
+            ActivationOrder.status == "activation_pending",
+            ActivationOrder.activation_tx_hash.is_(None),
+        )
+        if busy:
+            query = query.filter(func.lower(ActivationOrder.target_arbitrum_address).notin_(busy))
+        return query.order_by(ActivationOrder.created_at.asc()).limit(self.batch_size).all()
+
+    def send_queued(self) -> Dict[str, int]:
+        counts = {"submitted": 0, "failed": 0, "deferred": 0}
+        busy = self._in_flight_targets()
+        orders = self._queued_orders(busy)
+        if not orders:
+            return counts
+
+        # one mint per target at a time: a second paid order for the same wallet
+        # waits until the first settles and then fails the entitlement check
+        batch: List[ActivationOrder] = []
+        for order in orders:
+            target = str(order.target_arbitrum_address or "").lower()
+            if target in busy:
+                counts["deferred"] += 1
+                continue
+            busy.add(target)
+            batch.append(order)
+
+        entitlements = http_client.run_concurrently(
+            [lambda order=order: build_keys_entitlement(order.target_arbitrum_address) for order in batch]
+        )
+        ready: List[ActivationOrder] = []
+        for order, entitlement in zip(batch, entitlements):
+            if isinstance(entitlement, Exception):
+                counts["deferred"] += 1
+                logger.warning("Activation entitlement check failed for %s: %s", order.id, entitlement)
+            elif entitlement.get("hasOperatorKey"):
+                _mark_target_already_has_key(order)
+                counts["failed"] += 1
+            else:
+                ready.append(order)
+
+        groups: Dict[Tuple[str, str], List[ActivationOrder]] = {}
+        for order in ready:
+            try:
+                groups.setdefault((order.activation_chain, _operator_key_contract(order)), []).append(order)
+            except CheckoutError as exc:
+                _mark_activation_failed(order, exc.code, exc.message)
+                counts["failed"] += 1
+
+        more_queued = len(orders) >= self.batch_size
+        for (network_key, contract_address), group in groups.items():
+            if self._lease is not None and not self._lease():
+                logger.warning("Activation executor lost its lease; deferring %s orders", len(group))
+                self.lease_lost = True
+                counts["deferred"] += len(group)
+                continue
+            for key, value in self._send_group(network_key, contract_address, group, restore=not more_queued).items():
+                counts[key] += value
+
+        db.session.commit()
+        return counts
+
+    def _send(
+        self,
+        state: _ChainState,
+        function_call: Any,
+        tx_fields: Dict[str, Any],
+        before_broadcast: Callable[[str, int], None] | None = None,
+    ) -> str:
+        """
+        Build, sign and send with the next local nonce; resyncs and retries once
+        on a nonce clash. before_broadcast(tx_hash, nonce) runs between signing
+        and sending, so the caller can persist the hash first.
+        """
+        for attempt in (1, 2):
+            try:
+                with state.nonces.reserve() as nonce:
+                    # every field is given, so build_transaction makes no RPC call
+                    tx = function_call.build_transaction({**tx_fields, "nonce": nonce})
+                    signed = self.signer.sign_transaction(tx)
+                    if before_broadcast is not None:
+                        before_broadcast(signed.hash.hex(), nonce)
+                    return state.w3.eth.send_raw_transaction(signed.raw_transaction).hex()
+            except Exception as exc:
+                if attempt == 1 and _is_nonce_error(exc):
+                    continue
+                raise
+        raise RuntimeError("unreachable")
+
+    def _prepare_controller(self, state: _ChainState, operator_key: Any, base_tx: Dict[str, Any]) -> Tuple[str, str | None]:
+        """
+        Make the signer the sale controller if it is not already (as seen after
+        our own pending txs). Returns the controller to restore and the
+        setSaleController tx hash, if one was sent.
+        """
+        contract_address = operator_key.address
+        signer_address = base_tx["from"]
+        controller = state.controllers.get(contract_address)
+        if controller is None:
+            controller = Web3.to_checksum_address(operator_key.functions.saleController().call())
+        if controller.lower() == signer_address.lower():
+            return state.previous_controllers.get(contract_address, controller), None
+
+        owner_address = operator_key.functions.owner().call()
+        if signer_address.lower() != Web3.to_checksum_address(owner_address).lower():
+            raise CheckoutError(
+                "ACTIVATION_SIGNER_INVALID",
+                "Activation signer must be the current sale controller or the Operator Key owner",
+                500,
+            )
+        tx_hash = self._send(
+            state,
+            operator_key.functions.setSaleController(signer_address),
+            {**base_tx, "gas": _gas_limit(80_000)},
+        )
+        state.previous_controllers[contract_address] = controller
+        state.controllers[contract_address] = signer_address
+        return controller, tx_hash
+
+    def _send_group(
+        self,
+        network_key: str,
+        contract_address: str,
+        orders: List[ActivationOrder],
+        *,
+        restore: bool,
+    ) -> Dict[str, int]:
+        counts = {"submitted": 0, "failed": 0, "deferred": 0}
+        signer_address = Web3.to_checksum_address(self.signer.address)
+        try:
+            state = self._chain(network_key)
+            operator_key = state.w3.eth.contract(address=contract_address, abi=_OPERATOR_KEY_WRITE_ABI)
+            base_tx = {"from": signer_address, **_tx_fee_fields(state.w3)}
+            previous_controller, controller_tx = self._prepare_controller(state, operator_key, base_tx)
+        except CheckoutError as exc:
+            if exc.code != "ACTIVATION_SIGNER_INVALID":
+                logger.warning("Activation batch on %s deferred: %s", network_key, exc.message)
+                counts["deferred"] += len(orders)
+                return counts
+            for order in orders:
+                _mark_activation_failed(order, exc.code, exc.message)
+            counts["failed"] += len(orders)
+            return counts
+        except Exception as exc:
+            logger.warning("Activation batch on %s deferred: %s", network_key, exc)
+            if network_key in self._chains:
+                self._chains[network_key].controllers.pop(contract_address, None)
+            counts["deferred"] += len(orders)
+            return counts
+
+        # all mints share one shape, so one estimate covers the batch
+        first_target = Web3.to_checksum_address(orders[0].target_arbitrum_address)
+        try:
+            gas_estimate = int(
+                operator_key.functions.mintOperator(first_target, Config.SNE_ACTIVATION_MINT_AMOUNT)
+                .estimate_gas({"from": signer_address})
+            )
+        except Exception:
+            gas_estimate = DEFAULT_MINT_GAS
+        mint_tx = {**base_tx, "gas": _gas_limit(gas_estimate)}
+        restore_requested = bool(restore and Config.SNE_ACTIVATION_RESTORE_CONTROLLER)
+
+        batch_id = uuid.uuid4().hex[:12]
+        for order in orders:
+            order_id = order.id
+            target_address = Web3.to_checksum_address(order.target_arbitrum_address)
+            attempts = int(order.activation_attempts or 0) + 1
+
+            def _record_submitted(tx_hash: str, nonce: int, order: ActivationOrder = order) -> None:
+                # committed before the broadcast: a later rollback of this tick
+                # can never put an already-sent mint back in the send queue
+                metadata, activation = _activation_metadata(order)
+                activation.update({
+                    "submittedAt": _utcnow().isoformat(),
+                    "state": "submitted",
+                    "batchId": batch_id,
+                    "nonce": nonce,
+                    "targetAddress": target_address,
+                    "operatorKeyContract": contract_address,
+                    "previousSaleController": previous_controller,
+                    "controllerTxHash": controller_tx,
+                    "restoreControllerRequested": restore_requested,
+                })
+                _save_activation_metadata(order, activation, metadata)
+                order.status = "activation_submitted"
+                order.activation_tx_hash = tx_hash
+                order.activation_attempts = attempts
+                order.error_code = None
+                order.error_message = None
+                order.updated_at = _utcnow()
+                db.session.commit()
+
+            try:
+                self._send(
+                    state,
+                    operator_key.functions.mintOperator(target_address, Config.SNE_ACTIVATION_MINT_AMOUNT),
+                    mint_tx,
+                    before_broadcast=_record_submitted,
+                )
+            except Exception as exc:
+                logger.error("Activation send failed for %s: %s", order_id, exc)
+                db.session.rollback()
+                order.activation_attempts = attempts
+                _mark_activation_failed(order, "ACTIVATION_FAILED", str(exc))
+                db.session.commit()
+                counts["failed"] += 1
+                continue
+            counts["submitted"] += 1
+
+        # the restore is only sent once the queue is drained; its nonce puts it
+        # after every mint of the batch, so no receipt wait is needed
+        if restore_requested and previous_controller.lower() != signer_address.lower():
+            try:
+                self._send(
+                    state,
+                    operator_key.functions.setSaleController(previous_controller),
+                    {**base_tx, "gas": _gas_limit(80_000)},
+                )
+                state.controllers[contract_address] = previous_controller
+            except Exception as exc:
+                logger.error("Failed to restore OperatorKey sale controller: %s", exc, exc_info=True)
+                state.controllers.pop(contract_address, None)
+
+        logger.info(
+            "Activation batch %s on %s: submitted=%s failed=%s next_nonce=%s",
+            batch_id,
+            network_key,
+            counts["submitted"],
+            counts["failed"],
+            state.nonces.peek(),
+        )
+        return counts
+
+    # -- receipt tracking ---------------------------------------------------
+
+    def track_receipts(self) -> Dict[str, int]:
+        counts = {"observed": 0, "activated": 0, "failed": 0}
+        submitted = (
+            ActivationOrder.query.filter(
+                ActivationOrder.status == "activation_submitted",
+                ActivationOrder.activation_tx_hash.isnot(None),
+            )
+            .order_by(ActivationOrder.updated_at.asc())
+            .all()
+        )
+        by_chain: Dict[str, List[ActivationOrder]] = {}
+        for order in submitted:
+            by_chain.setdefault(order.activation_chain, []).append(order)
+
+        for network_key, orders in by_chain.items():
+            try:
+                state = self._chain(network_key)
+                head = int(state.w3.eth.block_number)
+            except Exception as exc:
+                logger.warning("Activation receipt tracking on %s skipped: %s", network_key, exc)
+                continue
+            fresh = [order for order in orders if (_activation_metadata(order)[1].get("state") == "submitted")]
+            if state.last_block == head and not fresh:
+                continue
+            state.last_block = head
+
+            receipts = http_client.run_concurrently(
+                [lambda order=order: _get_receipt_if_available(state.w3, order.activation_tx_hash) for order in orders]
+            )
+            confirmed_blocks = max(int(Config.SNE_ACTIVATION_CONFIRMATIONS or 1), 1)
+            entitled_targets = [
+                order.target_arbitrum_address
+                for order, receipt in zip(orders, receipts)
+                if receipt is not None
+                and not isinstance(receipt, Exception)
+                and receipt.status == 1
+                and head - int(receipt.blockNumber) + 1 >= confirmed_blocks
+            ]
+            entitlements = dict(
+                zip(
+                    entitled_targets,
+                    http_client.run_concurrently(
+                        [lambda target=target: build_keys_entitlement(target) for target in entitled_targets]
+                    ),
+                )
+            )
+
+            for order, receipt in zip(orders, receipts):
+                if isinstance(receipt, Exception):
+                    logger.warning("Activation receipt lookup failed for %s: %s", order.id, receipt)
+                    continue
+                entitlement = entitlements.get(order.target_arbitrum_address)
+                result = _observe_activation_receipt(
+                    order,
+                    receipt,
+                    head,
+                    lambda entitlement=entitlement: isinstance(entitlement, dict) and bool(entitlement.get("hasOperatorKey")),
+                )
+                counts["observed"] += 1
+                if result == "confirmed":
+                    counts["activated"] += 1
+                elif result == "reverted":
+                    counts["failed"] += 1
+                    # a reverted mint may mean our view of the controller is wrong
+                    state.controllers.clear()
+
+        if counts["observed"]:
+            db.session.commit()
+        return counts
+
+
+def _claim_leadership(redis_client: SafeRedis, ttl_seconds: int) -> bool:
+    # renewable lease: only one process signs, so the local nonce counter stays authoritative.
+    # Renewal only extends a lease this process still holds; otherwise it is taken with SET NX.
+    if redis_client.expire_if_value(LEADER_KEY, _PROCESS_TOKEN, ttl_seconds):
+        return True
+    return bool(redis_client.set_nx(LEADER_KEY, _PROCESS_TOKEN, ttl_seconds))
+
+
+def _executor_loop(app) -> None:
+    interval = max(1, Config.SNE_ACTIVATION_EXECUTOR_POLL_SECONDS)
+    logger.info(
+        "Activation executor started: interval=%ss batch=%s",
+        interval,
+        Config.SNE_ACTIVATION_EXECUTOR_BATCH_SIZE,
+    )
+    redis_client = SafeRedis()
+    executor: ActivationExecutor | None = None
+    leading = False
+    while True:
+        if _claim_leadership(redis_client, interval * 4):
+            with app.app_context():
+                try:
+                    executor = executor or ActivationExecutor(
+                        lease=lambda: _claim_leadership(redis_client, interval * 4),
+                    )
+                    if not leading:
+                        executor.reset()
+                    leading = True
+                    summary = executor.run_once()
+                    # the lease lapsed mid-tick: resync nonces before signing again
+                    leading = not executor.lease_lost
+                    if any(summary.values()):
+                        logger.info("Activation executor tick: %s", summary)
+                except Exception as exc:
+                    db.session.rollback()
+                    logger.warning("Activation executor tick failed: %s", exc)
+                finally:
+                    db.session.remove()
+        else:
+            leading = False
+        _WAKE.wait(interval)
+        _WAKE.clear()
+
+
+def start_activation_executor(app) -> None:
+    if not executor_enabled():
+        logger.info("Activation executor disabled")
+        return
+    if not (Config.SNE_ACTIVATION_PRIVATE_KEY or "").strip():
+        logger.warning("Activation executor not started: SNE_ACTIVATION_PRIVATE_KEY missing")
+        return
+
+    global _THREAD
+    with _THREAD_LOCK:
+        if _THREAD and _THREAD.is_alive():
+            return
+        _THREAD = threading.Thread(
+            target=_executor_loop,
+            args=(app,),
+            name="activation-executor",
+            daemon=True,
+        )
+        _THREAD.start()
@@ -8,7 +8,7 @@ from datetime import datetime
 import json
 import logging
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from eth_account import Account
 from web3 import Web3
@@ -127,22 +127,31 @@ def _activation_web3(network_key: str) -> Web3:
     raise CheckoutError("RPC_ERROR", f"Failed to connect to {network_key} RPC", 502, {"error": str(last_error) if last_error else None})
 
 
-def _build_tx_params(w3: Web3, signer_address: str, nonce: int, gas_estimate: int) -> dict[str, Any]:
-    tx: dict[str, Any] = {
-        "from": signer_address,
-        "nonce": nonce,
-        "chainId": w3.eth.chain_id,
-        "gas": max(int(gas_estimate * 1.2), gas_estimate + 25_000),
-    }
+def _tx_fee_fields(w3: Web3) -> dict[str, Any]:
+    """chainId and fee fields shared by every tx built against the current head."""
+    fields: dict[str, Any] = {"chainId": w3.eth.chain_id}
     latest_block = w3.eth.get_block("latest")
     base_fee = latest_block.get("baseFeePerGas")
     if base_fee is not None:
         priority_fee = w3.to_wei(0.1, "gwei")
-        tx["maxPriorityFeePerGas"] = priority_fee
-        tx["maxFeePerGas"] = int(base_fee * 2 + priority_fee)
+        fields["maxPriorityFeePerGas"] = priority_fee
+        fields["maxFeePerGas"] = int(base_fee * 2 + priority_fee)
     else:
-        tx["gasPrice"] = w3.eth.gas_price
-    return tx
+        fields["gasPrice"] = w3.eth.gas_price
+    return fields
+
+
+def _gas_limit(gas_estimate: int) -> int:
+    return max(int(gas_estimate * 1.2), gas_estimate + 25_000)
+
+
+def _build_tx_params(w3: Web3, signer_address: str, nonce: int, gas_estimate: int) -> dict[str, Any]:
+    return {
+        "from": signer_address,
+        "nonce": nonce,
+        "gas": _gas_limit(gas_estimate),
+        **_tx_fee_fields(w3),
+    }
 
 
 def _activation_metadata(order: ActivationOrder) -> tuple[dict[str, Any], dict[str, Any]]:
@@ -199,26 +208,35 @@ def _get_receipt_if_available(w3: Web3, tx_hash: str) -> Any | None:
         return None
 
 
-def _finalize_submitted_activation(order: ActivationOrder, w3: Web3) -> dict[str, Any]:
+def _required_confirmations() -> int:
+    return max(int(Config.SNE_ACTIVATION_CONFIRMATIONS or 1), 1)
+
+
+def _observe_activation_receipt(
+    order: ActivationOrder,
+    receipt: Any | None,
+    latest_block: int | None,
+    has_operator_key: Callable[[], bool],
+) -> str:
+    """
+    Apply what the chain says about a submitted mint to the order, without
+    committing. Returns the activation state; `has_operator_key` is only
+    called once the receipt has enough confirmations.
+    """
     metadata, activation = _activation_metadata(order)
     activation["lastObservedAt"] = _utcnow().isoformat()
+    order.updated_at = _utcnow()
 
-    tx_hash = order.activation_tx_hash
-    if not tx_hash:
-        raise CheckoutError("INVALID_ORDER_STATE", "Order is marked as submitted but has no activation tx hash", 409)
-
-    receipt = _get_receipt_if_available(w3, tx_hash)
     if receipt is None:
         activation["state"] = "waiting_receipt"
         _save_activation_metadata(order, activation, metadata)
         order.status = "activation_submitted"
-        order.updated_at = _utcnow()
-        db.session.commit()
-        return serialize_activation_order(order)
+        return activation["state"]
 
-    activation["receiptBlock"] = int(receipt.blockNumber)
-    activation["confirmations"] = _activation_confirmations(w3, receipt)
-    activation["requiredConfirmations"] = max(int(Config.SNE_ACTIVATION_CONFIRMATIONS or 1), 1)
+    receipt_block = int(receipt.blockNumber)
+    activation["receiptBlock"] = receipt_block
+    activation["confirmations"] = max(int(latest_block if latest_block is not None else receipt_block) - receipt_block + 1, 0)
+    activation["requiredConfirmations"] = _required_confirmations()
 
     if receipt.status != 1:
         activation["state"] = "reverted"
@@ -226,35 +244,41 @@ def _finalize_submitted_activation(order: ActivationOrder, w3: Web3) -> dict[str
         order.status = "activation_failed"
         order.error_code = "ACTIVATION_TX_REVERTED"
         order.error_message = "Activation transaction reverted on-chain"
-        order.updated_at = _utcnow()
-        db.session.commit()
-        raise CheckoutError("ACTIVATION_TX_REVERTED", "Activation transaction reverted on-chain", 502)
+        return activation["state"]
 
-    if not _receipt_confirmed(w3, receipt):
+    if activation["confirmations"] < activation["requiredConfirmations"]:
         activation["state"] = "waiting_confirmations"
-        _save_activation_metadata(order, activation, metadata)
-        order.status = "activation_submitted"
-        order.updated_at = _utcnow()
-        db.session.commit()
-        return serialize_activation_order(order)
-
-    confirmation = build_keys_entitlement(order.target_arbitrum_address)
-    if not confirmation.get("hasOperatorKey"):
+    elif not has_operator_key():
         activation["state"] = "waiting_entitlement_projection"
+    else:
+        activation["state"] = "confirmed"
+        activation["confirmedAt"] = _utcnow().isoformat()
+        order.status = "activated"
+        order.error_code = None
+        order.error_message = None
         _save_activation_metadata(order, activation, metadata)
-        order.status = "activation_submitted"
-        order.updated_at = _utcnow()
-        db.session.commit()
-        return serialize_activation_order(order)
+        return activation["state"]
 
-    activation["state"] = "confirmed"
-    activation["confirmedAt"] = _utcnow().isoformat()
     _save_activation_metadata(order, activation, metadata)
-    order.status = "activated"
-    order.error_code = None
-    order.error_message = None
-    order.updated_at = _utcnow()
+    order.status = "activation_submitted"
+    return activation["state"]
+
+
+def _finalize_submitted_activation(order: ActivationOrder, w3: Web3) -> dict[str, Any]:
+    tx_hash = order.activation_tx_hash
+    if not tx_hash:
+        raise CheckoutError("INVALID_ORDER_STATE", "Order is marked as submitted but has no activation tx hash", 409)
+
+    receipt = _get_receipt_if_available(w3, tx_hash)
+    state = _observe_activation_receipt(
+        order,
+        receipt,
+        int(w3.eth.block_number) if receipt is not None else None,
+        lambda: bool(build_keys_entitlement(order.target_arbitrum_address).get("hasOperatorKey")),
+    )
     db.session.commit()
+    if state == "reverted":
+        raise CheckoutError("ACTIVATION_TX_REVERTED", "Activation transaction reverted on-chain", 502)
     return serialize_activation_order(order)
 
 
@@ -263,13 +287,51 @@ def refresh_activation_status(*, order_id: str, auth_address: Optional[str], tru
     if order.status != "activation_submitted" or not order.activation_tx_hash:
         return serialize_activation_order(order)
 
+    from .activation_executor import executor_enabled
+
+    if executor_enabled():
+        # the executor's receipt tracker observes every submitted order on each new block
+        return serialize_activation_order(order)
+
     w3 = _activation_web3(order.activation_chain)
     return _finalize_submitted_activation(order, w3)
 
 
+def _mark_target_already_has_key(order: ActivationOrder) -> None:
+    metadata = dict(order.session_metadata or {})
+    metadata["activation"] = {
+        **(metadata.get("activation") or {}),
+        "state": "skipped",
+        "skippedAt": _utcnow().isoformat(),
+        "skipReason": "target_already_has_operator_key",
+    }
+    order.status = "activation_failed"
+    order.error_code = "TARGET_ALREADY_HAS_KEY"
+    order.error_message = "Target wallet already holds an Operator Key"
+    order.session_metadata = metadata
+    order.updated_at = _utcnow()
+
+
+def _mark_activation_failed(order: ActivationOrder, code: str, message: str) -> None:
+    metadata, activation = _activation_metadata(order)
+    activation["state"] = "failed"
+    activation["failedAt"] = _utcnow().isoformat()
+    activation["failureCode"] = code
+    _save_activation_metadata(order, activation, metadata)
+    order.status = "activation_failed"
+    order.error_code = code
+    order.error_message = message
+    order.updated_at = _utcnow()
+
+
 def process_activation_order(*, order_id: str, auth_address: Optional[str], trusted: bool = False) -> dict[str, Any]:
+    from .activation_executor import enqueue_activation, executor_enabled
+
     order = _load_order(order_id, auth_address, trusted)
 
+    if order.status == "activation_pending" and executor_enabled():
+        return serialize_activation_order(order)
+
     if order.status == "activated":
         return serialize_activation_order(order)
 
@@ -280,6 +342,12 @@ def process_activation_order(*, order_id: str, auth_address: Optional[str], trus
         raise CheckoutError("PAYMENT_NOT_CONFIRMED", "Order has no confirmed Tron payment yet", 409)
 
     signer = _activation_account()
+
+    if executor_enabled():
+        if order.status == "activation_submitted" and order.activation_tx_hash:
+            return serialize_activation_order(order)
+        return enqueue_activation(order)
+
     w3 = _activation_web3(order.activation_chain)
 
     if order.status == "activation_submitted" and order.activation_tx_hash:
@@ -287,17 +355,7 @@ def process_activation_order(*, order_id: str, auth_address: Optional[str], trus
 
     entitlement = build_keys_entitlement(order.target_arbitrum_address)
     if entitlement.get("hasOperatorKey"):
-        metadata = dict(order.session_metadata or {})
-        metadata["activation"] = {
-            **(metadata.get("activation") or {}),
-            "skippedAt": _utcnow().isoformat(),
-            "skipReason": "target_already_has_operator_key",
-        }
-        order.status = "activation_failed"
-        order.error_code = "TARGET_ALREADY_HAS_KEY"
-        order.error_message = "Target wallet already holds an Operator Key"
-        order.session_metadata = metadata
-        order.updated_at = _utcnow()
+        _mark_target_already_has_key(order)
         db.session.commit()
         raise CheckoutError("TARGET_ALREADY_HAS_KEY", "Target wallet already has an Operator Key", 409)
 
@@ -371,7 +429,7 @@ def process_activation_order(*, order_id: str, auth_address: Optional[str], trus
 
         activation["receiptBlock"] = int(receipt.blockNumber)
         activation["confirmations"] = _activation_confirmations(w3, receipt)
-        activation["requiredConfirmations"] = max(int(Config.SNE_ACTIVATION_CONFIRMATIONS or 1), 1)
+        activation["requiredConfirmations"] = _required_confirmations()
         activation["lastObservedAt"] = _utcnow().isoformat()
 
         if receipt.status != 1:
@@ -420,27 +478,11 @@ def process_activation_order(*, order_id: str, auth_address: Optional[str], trus
         return serialize_activation_order(order)
 
     except CheckoutError as exc:
-        metadata, activation = _activation_metadata(order)
-        activation["state"] = "failed"
-        activation["failedAt"] = _utcnow().isoformat()
-        activation["failureCode"] = exc.code
-        _save_activation_metadata(order, activation, metadata)
-        order.status = "activation_failed"
-        order.error_code = exc.code
-        order.error_message = exc.message
-        order.updated_at = _utcnow()
+        _mark_activation_failed(order, exc.code, exc.message)
         db.session.commit()
         raise
     except Exception as exc:
         logger.error("Activation processing failed for %s: %s", order.id, exc, exc_info=True)
-        metadata, activation = _activation_metadata(order)
-        activation["state"] = "failed"
-        activation["failedAt"] = _utcnow().isoformat()
-        activation["failureCode"] = "ACTIVATION_FAILED"
-        _save_activation_metadata(order, activation, metadata)
-        order.status = "activation_failed"
-        order.error_code = "ACTIVATION_FAILED"
-        order.error_message = str(exc)
-        order.updated_at = _utcnow()
+        _mark_activation_failed(order, "ACTIVATION_FAILED", str(exc))
         db.session.commit()
         raise CheckoutError("ACTIVATION_FAILED", "Failed to activate Operator Key on Arbitrum", 502) from exc
@@ -0,0 +1,133 @@
+"""
+Columnar candle container.
+
+Klines are kept as contiguous numpy columns (int64 timestamps, float64 OHLCV)
+instead of one dict per candle. Slicing returns views over the same buffers,
+so report, chart and preview paths can share one normalization step and run
+their indicator math on arrays.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+PRICE_FIELDS = FIELDS[1:]
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _row_values(raw: Any) -> Optional[tuple]:
+    """
+    (timestamp, open, high, low, close, volume) from a Binance row or a candle dict.
+
+    Unparseable prices become 0.0 (rows without close are then filtered out);
+    rows without a usable timestamp are dropped.
+    """
+    try:
+        if isinstance(raw, dict):
+            timestamp = int(raw.get("timestamp") or raw.get("time") or raw.get("openTime") or 0)
+            return (timestamp, *(_to_float(raw.get(field)) for field in PRICE_FIELDS))
+        if isinstance(raw, (list, tuple)) and len(raw) >= 6:
+            return (int(raw[0]), *(_to_float(value) for value in raw[1:6]))
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+class CandleSeries:
+    """OHLCV candles as numpy columns with zero-copy slicing."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, timestamp, open, high, low, close, volume):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+
+    @classmethod
+    def empty(cls) -> "CandleSeries":
+        return cls(*([] for _ in FIELDS))
+
+    @classmethod
+    def from_klines(cls, raw: Optional[Iterable[Any]], *, require_close: bool = True) -> "CandleSeries":
+        """
+        Build from collector klines (Binance rows) or candle dicts.
+
+        Rows without a timestamp are dropped; with require_close, so are rows with close <= 0.
+        """
+        rows = list(raw or [])
+        if not rows:
+            return cls.empty()
+
+        columns = None
+        if all(isinstance(row, (list, tuple)) and len(row) >= 6 for row in rows):
+            try:
+                # one C-level parse of the numeric strings for the whole batch
+                columns = np.array([row[1:6] for row in rows], dtype=np.float64).T
+                timestamp = np.array([row[0] for row in rows], dtype=np.int64)
+            except (TypeError, ValueError):
+                columns = None
+        if columns is None:
+            parsed = [values for values in map(_row_values, rows) if values is not None]
+            if not parsed:
+                return cls.empty()
+            timestamp = np.array([values[0] for values in parsed], dtype=np.int64)
+            columns = np.array([values[1:] for values in parsed], dtype=np.float64).T
+
+        series = cls(timestamp, *columns)
+        if require_close:
+            valid = series.close > 0
+            if not valid.all():
+                series = series.take(valid)
+        return series
+
+    def take(self, selector) -> "CandleSeries":
+        return CandleSeries(*(getattr(self, field)[selector] for field in FIELDS))
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def __bool__(self) -> bool:
+        return len(self.close) > 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CandleSeries(*(getattr(self, field)[key] for field in FIELDS))
+        return self.candle(key)
+
+    def candle(self, index: int) -> Dict[str, Any]:
+        return {
+            "timestamp": int(self.timestamp[index]),
+            "open": float(self.open[index]),
+            "high": float(self.high[index]),
+            "low": float(self.low[index]),
+            "close": float(self.close[index]),
+            "volume": float(self.volume[index]),
+        }
+
+    def tail(self, count: int) -> "CandleSeries":
+        return self[-count:] if len(self) > count else self
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """JSON-ready list of candle dicts (same shape the APIs always returned)."""
+        columns = [getattr(self, field).tolist() for field in FIELDS]
+        return [dict(zip(FIELDS, values)) for values in zip(*columns)]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({field: getattr(self, field) for field in FIELDS}, copy=False)
+
+    def __repr__(self) -> str:
+        return f"CandleSeries(len={len(self)})"
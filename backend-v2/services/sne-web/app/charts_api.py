@@ -11,6 +11,7 @@ import hmac
 import hashlib
 from datetime import datetime
 import uuid
+import numpy as np
 from .auth_siwe import require_auth, check_tier_limits
 from app.utils.redis_safe import SafeRedis
 
@@ -21,6 +22,7 @@ logger = logging.getLogger(__name__)
 redis_client = SafeRedis()
 
 # Import do collector client (centralizado)
+from .candles import CandleSeries
 from .collector_client import get_klines, get_binance_data
 
 # Configuração Binance API (exemplo)
@@ -36,17 +38,8 @@ def get_candles_from_binance(symbol: str, interval: str, limit: int = 500):
             logger.error(f"No data returned from collector for {symbol}")
             return []
 
-        # Converter formato Binance para formato interno
-        candles = []
-        for candle in data:
-            candles.append({
-                'timestamp': int(candle[0]),
-                'open': float(candle[1]),
-                'high': float(candle[2]),
-                'low': float(candle[3]),
-                'close': float(candle[4]),
-                'volume': float(candle[5])
-            })
+        # Converter formato Binance para séries colunares
+        candles = CandleSeries.from_klines(data, require_close=False)
 
         logger.info(f"Candles from collector: {symbol} {len(candles)} candles")
         return candles
@@ -153,7 +146,7 @@ def get_candles():
         result = {
             'symbol': symbol,
             'timeframe': timeframe,
-            'candles': candles,
+            'candles': candles.to_records(),
             'timestamp': datetime.utcnow().isoformat()
         }
 
@@ -323,7 +316,7 @@ def calculate_indicators(symbol: str, timeframe: str, indicator_set: str, tier:
     indicators = {
         'rsi': calculate_rsi_simple(candles),
         'macd': calculate_macd_simple(candles),
-        'volume': sum(c['volume'] for c in candles[-24:])  # Volume 24h
+        'volume': float(candles.volume[-24:].sum())  # Volume 24h
     }
 
     # Indicadores avançados (tier premium+)
@@ -341,21 +334,9 @@ def calculate_rsi_simple(candles, period=14):
     if len(candles) < period + 1:
         return 50.0
 
-    closes = [c['close'] for c in candles[-period-1:]]
-    gains = []
-    losses = []
-
-    for i in range(1, len(closes)):
-        change = closes[i] - closes[i-1]
-        if change > 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
-
-    avg_gain = sum(gains) / period
-    avg_loss = sum(losses) / period
+    changes = np.diff(candles.close[-period-1:])
+    avg_gain = float(changes[changes > 0].sum()) / period
+    avg_loss = float(-changes[changes < 0].sum()) / period
 
     if avg_loss == 0:
         return 100.0
@@ -370,12 +351,12 @@ def calculate_macd_simple(candles):
     if len(candles) < 26:
         return {'signal': 0.0}
 
-    closes = [c['close'] for c in candles[-26:]]
+    closes = candles.close[-26:]
 
     # EMA 12
-    ema12 = sum(closes[-12:]) / 12
+    ema12 = float(closes[-12:].mean())
     # EMA 26
-    ema26 = sum(closes[-26:]) / 26
+    ema26 = float(closes.mean())
 
     macd = ema12 - ema26
 
@@ -389,11 +370,9 @@ def calculate_bollinger_simple(candles, period=20):
     if len(candles) < period:
         return {'upper': 0, 'middle': 0, 'lower': 0}
 
-    closes = [c['close'] for c in candles[-period:]]
-    middle = sum(closes) / period
-
-    variance = sum((x - middle) ** 2 for x in closes) / period
-    std = variance ** 0.5
+    closes = candles.close[-period:]
+    middle = float(closes.mean())
+    std = float(closes.std())
 
     return {
         'upper': round(middle + (std * 2), 2),
@@ -485,13 +464,9 @@ def calculate_stochastic_simple(candles, k_period=14):
     if len(candles) < k_period:
         return {'k': 50.0, 'd': 50.0}
 
-    highs = [c['high'] for c in candles[-k_period:]]
-    lows = [c['low'] for c in candles[-k_period:]]
-    closes = [c['close'] for c in candles[-k_period:]]
-
-    highest = max(highs)
-    lowest = min(lows)
-    current_close = closes[-1]
+    highest = float(candles.high[-k_period:].max())
+    lowest = float(candles.low[-k_period:].min())
+    current_close = float(candles.close[-1])
 
     if highest == lowest:
         k = 50.0
@@ -508,12 +483,9 @@ def calculate_williams_r_simple(candles, period=14):
     if len(candles) < period:
         return -50.0
 
-    highs = [c['high'] for c in candles[-period:]]
-    lows = [c['low'] for c in candles[-period:]]
-    current_close = candles[-1]['close']
-
-    highest = max(highs)
-    lowest = min(lows)
+    highest = float(candles.high[-period:].max())
+    lowest = float(candles.low[-period:].min())
+    current_close = float(candles.close[-1])
 
     if highest == lowest:
         return -50.0
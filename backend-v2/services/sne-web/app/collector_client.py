@@ -8,6 +8,8 @@ import requests
 import logging
 from typing import Any, Dict, List
 
+from . import http_client
+
 logger = logging.getLogger(__name__)
 BINANCE_PUBLIC_BASE = "https://api.binance.com/api/v3"
 RADAR_MARKET_UNIVERSE = {
@@ -56,7 +58,7 @@ def get_klines(symbol: str, interval: str, limit: int = 100):
         if COLLECTOR_URL:
             logger.info(f"Collecting via COLLECTOR_URL: {symbol} {interval} limit={limit}")
             url = f"{COLLECTOR_URL}/binance/klines"
-            r = requests.get(
+            r = http_client.get(
                 url,
                 params={"symbol": symbol.upper(), "interval": interval, "limit": limit},
                 headers=_headers(),
@@ -70,7 +72,7 @@ def get_klines(symbol: str, interval: str, limit: int = 100):
             return result["data"] if isinstance(result, dict) and "data" in result else result
 
         logger.info(f"Collecting directly from Binance public API: {symbol} {interval} limit={limit}")
-        r = requests.get(
+        r = http_client.get(
             f"{BINANCE_PUBLIC_BASE}/klines",
             params={"symbol": symbol.upper(), "interval": interval, "limit": limit},
             timeout=15,
@@ -91,10 +93,10 @@ def get_binance_data(endpoint: str, params: dict = None):
         endpoint = endpoint.lstrip("/")
         if COLLECTOR_URL:
             url = f"{COLLECTOR_URL}/binance/{endpoint}"
-            r = requests.get(url, params=params or {}, headers=_headers(), timeout=10)
+            r = http_client.get(url, params=params or {}, headers=_headers(), timeout=10)
         else:
             url = f"{BINANCE_PUBLIC_BASE}/{endpoint}"
-            r = requests.get(url, params=params or {}, timeout=10)
+            r = http_client.get(url, params=params or {}, timeout=10)
         r.raise_for_status()
 
         result = r.json()
@@ -135,6 +135,11 @@ class Config:
     TRON_API_KEY = os.getenv("TRON_API_KEY")
     TRON_WEBHOOK_SECRET = os.getenv("TRON_WEBHOOK_SECRET")
     TRON_HTTP_TIMEOUT_SECONDS = _env_int("TRON_HTTP_TIMEOUT_SECONDS", 20)
+    TRON_WATCHER_ENABLED = os.getenv("TRON_WATCHER_ENABLED", "false").strip().lower() in {"1", "true", "yes", "on"}
+    TRON_WATCHER_POLL_SECONDS = _env_int("TRON_WATCHER_POLL_SECONDS", 15)
+    TRON_WATCHER_BLOCK_RANGE = _env_int("TRON_WATCHER_BLOCK_RANGE", 200)
+    TRON_WATCHER_BACKFILL_BLOCKS = _env_int("TRON_WATCHER_BACKFILL_BLOCKS", 1200)
+    TRON_WATCHER_AUTO_PROCESS = os.getenv("TRON_WATCHER_AUTO_PROCESS", "true").strip().lower() in {"1", "true", "yes", "on"}
     SNE_ACTIVATION_PRIVATE_KEY = os.getenv("SNE_ACTIVATION_PRIVATE_KEY", os.getenv("DEPLOYER_PRIVATE_KEY"))
     SNE_ACTIVATION_CONFIRMATIONS = _env_int("SNE_ACTIVATION_CONFIRMATIONS", 1)
     SNE_ACTIVATION_MINT_AMOUNT = _env_int("SNE_ACTIVATION_MINT_AMOUNT", 1)
@@ -144,6 +149,9 @@ class Config:
         "yes",
         "on",
     }
+    SNE_ACTIVATION_EXECUTOR_ENABLED = os.getenv("SNE_ACTIVATION_EXECUTOR_ENABLED", "false").strip().lower() in {"1", "true", "yes", "on"}
+    SNE_ACTIVATION_EXECUTOR_POLL_SECONDS = _env_int("SNE_ACTIVATION_EXECUTOR_POLL_SECONDS", 3)
+    SNE_ACTIVATION_EXECUTOR_BATCH_SIZE = _env_int("SNE_ACTIVATION_EXECUTOR_BATCH_SIZE", 25)
 
     SIWE_ALLOWED_ORIGINS = tuple(
         origin
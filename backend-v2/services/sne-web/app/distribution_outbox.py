@@ -0,0 +1,465 @@
+"""
+Durable outbox for Intel distribution publishing.
+
+publish_distribution enqueues one job per channel and returns a tracking id;
+per-channel worker threads generate the asset, apply the auto-publish gates
+at send time and publish. Jobs live in Redis (JSON docs plus one pending-id
+list per channel), so a restarted process picks them up again.
+
+- Concurrency: INTEL_OUTBOX_<CHANNEL>_CONCURRENCY worker threads per channel;
+  a job is claimed with a per-job SET NX lease that is renewed while the job
+  runs, so workers in several processes never run the same job, and auto
+  jobs also hold a per-channel lease so the auto gates read-then-publish
+  one job at a time across processes
+- Scheduling: auto jobs blocked by channel cadence or hourly limit are
+  deferred to the next free slot instead of skipped
+- Retries: transient failures back off exponentially up to
+  INTEL_OUTBOX_MAX_ATTEMPTS; configuration errors fail immediately
+- Idempotency: one live job per idempotency key (defaults to the
+  publication fingerprint), claimed with SET NX, so repeated or concurrent
+  calls do not double-post
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, List
+
+from . import distribution_service as distribution
+from .institutional_service import fetch_combined_intel_post
+from .utils.redis_safe import SafeRedis
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PREFIX = "intel:distribution:outbox:"
+OUTBOX_TTL_SECONDS = 7 * 24 * 60 * 60
+JOB_LOCK_TTL_SECONDS = 60
+WORKER_POLL_SECONDS = 5
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 30 * 60
+MAX_DEFER_SECONDS = 6 * 60 * 60
+DEFAULT_CONCURRENCY = {"telegram": 2, "whatsapp": 1, "threads": 1, "x": 1}
+
+TERMINAL_STATUSES = {"published", "publish_failed", "skipped"}
+DEFERRABLE_REASONS = {"channel_cadence", "channel_hourly_limit"}
+NON_RETRYABLE_ERRORS = {"threads_body_empty", "x_preview_missing_slug_or_url", "post_not_found"}
+
+_WORKERS: Dict[str, "ChannelWorker"] = {}
+_WORKERS_LOCK = threading.Lock()
+
+
+def _job_key(job_id: str) -> str:
+    return f"{OUTBOX_PREFIX}job:{job_id}"
+
+
+def _batch_key(tracking_id: str) -> str:
+    return f"{OUTBOX_PREFIX}batch:{tracking_id}"
+
+
+def _queue_key(channel: str) -> str:
+    return f"{OUTBOX_PREFIX}queue-list:{channel}"
+
+
+def _legacy_queue_key(channel: str) -> str:
+    return f"{OUTBOX_PREFIX}queue:{channel}"
+
+
+def _idempotency_key(key: str) -> str:
+    return f"{OUTBOX_PREFIX}idem:{key}"
+
+
+def _max_attempts() -> int:
+    return distribution._env_int("INTEL_OUTBOX_MAX_ATTEMPTS", 4, minimum=1, maximum=10)
+
+
+def _channel_concurrency(channel: str) -> int:
+    return distribution._env_int(
+        f"INTEL_OUTBOX_{channel.upper()}_CONCURRENCY",
+        DEFAULT_CONCURRENCY.get(channel, 1),
+        minimum=1,
+        maximum=8,
+    )
+
+
+def _save_job(redis_client: SafeRedis, job: Dict[str, Any]) -> None:
+    job["updated_at"] = distribution._iso_now()
+    redis_client.setex(_job_key(job["id"]), OUTBOX_TTL_SECONDS, json.dumps(job, ensure_ascii=False))
+
+
+def _load_job(redis_client: SafeRedis, job_id: str) -> Dict[str, Any] | None:
+    payload = distribution._read_json(redis_client, _job_key(job_id))
+    return payload if isinstance(payload, dict) else None
+
+
+def _load_queue(redis_client: SafeRedis, channel: str) -> List[str]:
+    return [str(item) for item in redis_client.lrange(_queue_key(channel), 0, -1)]
+
+
+def _push_queue(redis_client: SafeRedis, channel: str, job_id: str) -> None:
+    # RPUSH is atomic, so concurrent enqueues from several processes never drop an id
+    redis_client.rpush(_queue_key(channel), job_id)
+
+
+def _migrate_legacy_queue(redis_client: SafeRedis, channel: str) -> None:
+    """Move ids from the old JSON-list queue doc onto the Redis list."""
+    payload = distribution._read_json(redis_client, _legacy_queue_key(channel))
+    if not isinstance(payload, list):
+        return
+    for job_id in payload:
+        _push_queue(redis_client, channel, str(job_id))
+    redis_client.delete(_legacy_queue_key(channel))
+
+
+def _job_lock_key(job_id: str) -> str:
+    return f"{_job_key(job_id)}:lock"
+
+
+def _auto_gate_key(channel: str) -> str:
+    return f"{OUTBOX_PREFIX}auto-gate:{channel}"
+
+
+def _claim_job(redis_client: SafeRedis, job_id: str, token: str) -> bool:
+    return redis_client.set_nx(_job_lock_key(job_id), token, JOB_LOCK_TTL_SECONDS)
+
+
+def _release_job(redis_client: SafeRedis, job_id: str, token: str) -> None:
+    # only our own claim: an expired lock may already belong to another worker
+    redis_client.delete_if_value(_job_lock_key(job_id), token)
+
+
+class _LeaseKeeper:
+    """Renews leases (keys holding our token) every third of their TTL until stopped."""
+
+    def __init__(self, redis_client: SafeRedis, token: str):
+        self.redis = redis_client
+        self.token = token
+        self.keys: List[str] = []
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "_LeaseKeeper":
+        self._thread = threading.Thread(target=self._renew, name="intel-outbox-lease", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def _renew(self) -> None:
+        while not self._stop.wait(JOB_LOCK_TTL_SECONDS / 3):
+            for key in list(self.keys):
+                if not self.redis.expire_if_value(key, self.token, JOB_LOCK_TTL_SECONDS):
+                    self.lost = True
+                    logger.warning("Intel outbox lease lost: %s", key)
+
+
+def _claim_next_job(redis_client: SafeRedis, channel: str, token: str) -> Dict[str, Any] | None:
+    """First due job of the channel queue; finished or expired ids are dropped from the queue."""
+    now = time.time()
+    queue = list(dict.fromkeys(_load_queue(redis_client, channel)))
+    jobs = redis_client.mget([_job_key(job_id) for job_id in queue])
+    for job_id, raw in zip(queue, jobs):
+        job = distribution._read_json_text(raw)
+        if not isinstance(job, dict) or job.get("status") in TERMINAL_STATUSES:
+            redis_client.lrem(_queue_key(channel), 0, job_id)
+            continue
+        if float(job.get("next_attempt_at") or 0) <= now and _claim_job(redis_client, job_id, token):
+            # re-read under the claim: another worker may have finished it since the MGET
+            job = _load_job(redis_client, job_id)
+            if job and job.get("status") not in TERMINAL_STATUSES:
+                return job
+            _release_job(redis_client, job_id, token)
+    return None
+
+
+def _next_channel_slot(redis_client: SafeRedis, channel: str) -> float:
+    """Earliest time the channel cadence and hourly limit allow another auto publish."""
+    now = datetime.now(timezone.utc)
+    slot = now
+    min_interval = distribution._channel_min_interval_seconds(channel)
+    last_published = distribution._parse_iso_datetime(
+        redis_client.get(f"{distribution.LAST_PUBLISHED_KEY_PREFIX}{channel}")
+    )
+    if min_interval > 0 and last_published:
+        slot = max(slot, last_published + timedelta(seconds=min_interval))
+
+    hourly_limit = distribution._channel_hourly_limit(channel)
+    if hourly_limit > 0:
+        counter_key = f"{distribution.RATE_COUNTER_KEY_PREFIX}{channel}:{distribution._hour_key()}"
+        try:
+            current = int(redis_client.get(counter_key) or 0)
+        except Exception:
+            current = 0
+        if current >= hourly_limit:
+            slot = max(slot, now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1))
+    return slot.timestamp() + 1
+
+
+def _retry_delay(attempts: int) -> float:
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _is_retryable(error: str | None) -> bool:
+    text = str(error or "")
+    return text not in NON_RETRYABLE_ERRORS and not text.endswith("_not_configured")
+
+
+def _finish(redis_client: SafeRedis, job: Dict[str, Any], status: str, **fields: Any) -> None:
+    job.update(fields)
+    job["status"] = status
+    job["next_attempt_at"] = None
+    _save_job(redis_client, job)
+
+
+def _process_job(redis_client: SafeRedis, job: Dict[str, Any]) -> None:
+    channel = job["channel"]
+    slug = job["slug"]
+    post = fetch_combined_intel_post(slug)
+    if not post:
+        _finish(redis_client, job, "publish_failed", error="post_not_found")
+        return
+
+    assets = distribution.generate_distribution_assets(slug, [channel]).get("assets", [])
+    if not assets:
+        _finish(redis_client, job, "publish_failed", error="asset_unavailable")
+        return
+    asset = assets[0]
+    if asset.get("status") == "published" and asset.get("published_at"):
+        _finish(redis_client, job, "skipped", reason="already_published")
+        return
+
+    job["status"] = "running"
+    _save_job(redis_client, job)
+    if job.get("auto"):
+        fingerprint = distribution._publication_fingerprint(post, channel)
+        allowed, reason = distribution._auto_channel_gate(redis_client, post, channel, fingerprint)
+        if not allowed:
+            waited = time.time() - float(job.get("enqueued_ts") or time.time())
+            if reason in DEFERRABLE_REASONS and waited < MAX_DEFER_SECONDS:
+                job.update(status="scheduled", reason=reason, next_attempt_at=_next_channel_slot(redis_client, channel))
+                _save_job(redis_client, job)
+            else:
+                _finish(redis_client, job, "skipped", reason=reason or "auto_gate")
+            return
+
+    status, error = distribution._publish_asset(asset)
+    job["attempts"] = int(job.get("attempts") or 0) + 1
+    if status != "published" and _is_retryable(error) and job["attempts"] < _max_attempts():
+        asset["status"] = "retrying"
+        asset["error"] = error
+        distribution._write_json(redis_client, distribution._asset_key(slug, channel), asset)
+        job.update(status="retry", error=error, next_attempt_at=time.time() + _retry_delay(job["attempts"]))
+        _save_job(redis_client, job)
+        return
+
+    distribution._store_publish_outcome(redis_client, post, asset, status, error, auto=bool(job.get("auto")))
+    _finish(redis_client, job, status, error=error, reason=None)
+
+
+class ChannelWorker:
+    """Worker threads draining one channel queue."""
+
+    def __init__(self, channel: str, concurrency: int):
+        self.channel = channel
+        self.concurrency = concurrency
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        _migrate_legacy_queue(SafeRedis(), self.channel)
+        for index in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._loop,
+                name=f"intel-outbox-{self.channel}-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _loop(self) -> None:
+        redis_client = SafeRedis()
+        token = f"{threading.current_thread().name}:{uuid.uuid4().hex}"
+        while True:
+            job = None
+            try:
+                job = _claim_next_job(redis_client, self.channel, token)
+                if job is None:
+                    self._wake.wait(WORKER_POLL_SECONDS)
+                    self._wake.clear()
+                    continue
+                with _LeaseKeeper(redis_client, token) as lease:
+                    lease.keys.append(_job_lock_key(job["id"]))
+                    if job.get("auto"):
+                        # auto gates read-then-publish: one auto job per channel across processes
+                        gate_key = _auto_gate_key(self.channel)
+                        if not redis_client.set_nx(gate_key, token, JOB_LOCK_TTL_SECONDS):
+                            job["next_attempt_at"] = time.time() + WORKER_POLL_SECONDS
+                            _save_job(redis_client, job)
+                            continue
+                        lease.keys.append(gate_key)
+                        try:
+                            _process_job(redis_client, job)
+                        finally:
+                            redis_client.delete_if_value(gate_key, token)
+                    else:
+                        _process_job(redis_client, job)
+            except Exception as exc:
+                logger.exception("Intel outbox worker error: channel=%s error=%s", self.channel, exc)
+                if job:
+                    job["attempts"] = int(job.get("attempts") or 0) + 1
+                    if job["attempts"] < _max_attempts():
+                        job.update(status="retry", error=str(exc), next_attempt_at=time.time() + _retry_delay(job["attempts"]))
+                        _save_job(redis_client, job)
+                    else:
+                        _finish(redis_client, job, "publish_failed", error=str(exc))
+                time.sleep(1)
+            finally:
+                if job:
+                    _release_job(redis_client, job["id"], token)
+
+
+def start_outbox_workers() -> None:
+    with _WORKERS_LOCK:
+        for channel in sorted(distribution.VALID_CHANNELS):
+            if channel not in _WORKERS:
+                worker = ChannelWorker(channel, _channel_concurrency(channel))
+                worker.start()
+                _WORKERS[channel] = worker
+
+
+def start_outbox_workers_if_enabled() -> None:
+    """Resume queued jobs at startup (otherwise workers start on the first enqueue)."""
+    if distribution._env_flag("INTEL_OUTBOX_WORKERS_ENABLED", default=False):
+        start_outbox_workers()
+
+
+def _claim_idempotency_key(redis_client: SafeRedis, key: str, job_id: str) -> Dict[str, Any] | None:
+    """
+    Bind the key to job_id with SET NX; returns the live job already holding
+    it instead. A key whose job failed, was skipped or expired is released
+    (only if it still names that job) and claimed again.
+    """
+    for _ in range(3):
+        if redis_client.set_nx(key, job_id, OUTBOX_TTL_SECONDS):
+            return None
+        existing_id = redis_client.get(key)
+        if not existing_id:
+            continue
+        existing = _load_job(redis_client, existing_id)
+        if existing and existing.get("status") not in {"publish_failed", "skipped"}:
+            return existing
+        redis_client.delete_if_value(key, existing_id)
+    existing_id = redis_client.get(key)
+    existing = _load_job(redis_client, existing_id) if existing_id else None
+    if existing is None:
+        raise RuntimeError(f"could not claim outbox idempotency key {key}")
+    return existing
+
+
+def enqueue_publication(
+    post: Dict[str, Any],
+    channels: List[str],
+    *,
+    auto: bool = False,
+    idempotency_key: str | None = None,
+    results: List[Dict[str, Any]] | None = None,
+) -> Dict[str, Any]:
+    """Queue one job per channel and return the batch (tracking id + per-channel results)."""
+    redis_client = SafeRedis()
+    slug = str(post["slug"])
+    tracking_id = uuid.uuid4().hex
+    results = list(results or [])
+    job_ids: List[str] = []
+
+    for channel in channels:
+        key = f"{idempotency_key}:{channel}" if idempotency_key else distribution._publication_fingerprint(post, channel)
+        job = {
+            "id": uuid.uuid4().hex,
+            "tracking_id": tracking_id,
+            "slug": slug,
+            "channel": channel,
+            "auto": auto,
+            "idempotency_key": key,
+            "status": "queued",
+            "attempts": 0,
+            "next_attempt_at": 0,
+            "enqueued_ts": time.time(),
+            "created_at": distribution._iso_now(),
+        }
+        # the job doc exists before its id is claimed, so a claimed key always points at a job
+        _save_job(redis_client, job)
+        existing = _claim_idempotency_key(redis_client, _idempotency_key(f"{slug}:{key}"), job["id"])
+        if existing is not None:
+            redis_client.delete(_job_key(job["id"]))
+            job_ids.append(existing["id"])
+            status = "already_published" if existing.get("status") == "published" else "already_queued"
+            results.append({"channel": channel, "status": status, "job_id": existing["id"]})
+            continue
+        _push_queue(redis_client, channel, job["id"])
+        job_ids.append(job["id"])
+        results.append({"channel": channel, "status": "queued", "job_id": job["id"]})
+
+    batch = {
+        "tracking_id": tracking_id,
+        "slug": slug,
+        "auto": auto,
+        "created_at": distribution._iso_now(),
+        "job_ids": job_ids,
+        "results": results,
+    }
+    redis_client.setex(_batch_key(tracking_id), OUTBOX_TTL_SECONDS, json.dumps(batch, ensure_ascii=False))
+
+    if job_ids:
+        start_outbox_workers()
+        for channel in channels:
+            _WORKERS[channel].notify()
+    return {"slug": slug, "tracking_id": tracking_id, "results": results}
+
+
+def fetch_outbox_batch(tracking_id: str) -> Dict[str, Any] | None:
+    redis_client = SafeRedis()
+    batch = distribution._read_json(redis_client, _batch_key(tracking_id))
+    if not isinstance(batch, dict):
+        return None
+    raw_jobs = redis_client.mget([_job_key(job_id) for job_id in batch.get("job_ids", [])])
+    jobs = {}
+    for raw in raw_jobs:
+        job = distribution._read_json_text(raw)
+        if isinstance(job, dict):
+            jobs[job["id"]] = job
+
+    results = []
+    for result in batch.get("results", []):
+        job = jobs.get(result.get("job_id"))
+        if job:
+            result = {
+                "channel": job["channel"],
+                "status": job["status"],
+                "job_id": job["id"],
+                "attempts": job.get("attempts", 0),
+                **({"error": job["error"]} if job.get("error") else {}),
+                **({"reason": job["reason"]} if job.get("reason") else {}),
+                **({"next_attempt_at": job["next_attempt_at"]} if job.get("next_attempt_at") else {}),
+            }
+        results.append(result)
+    done = all(item.get("status") in TERMINAL_STATUSES | {"already_published"} for item in results)
+    return {
+        "tracking_id": tracking_id,
+        "slug": batch.get("slug"),
+        "created_at": batch.get("created_at"),
+        "done": done,
+        "results": results,
+    }
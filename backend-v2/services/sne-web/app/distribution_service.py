@@ -16,14 +16,17 @@ from typing import Any, Dict, List
 
 import requests
 
+from . import http_client
+from .dedupe_index import DedupeIndex, overlap_ratio
 from .institutional_service import fetch_combined_intel_post, fetch_combined_intel_posts
 from .intel_enrichment import (
     _extract_json,
-    _extract_response_text,
     _openai_responses_payload,
     _truncate_response_body,
 )
+from .llm_service import GenerationRequest, get_generation_service
 from .og_image_service import build_intel_og_image_url, build_intel_share_url
+from .share_page_cache import prerender_intel_share
 from .telegram_delivery import send_telegram_text
 from .utils.redis_safe import SafeRedis
 from .x_api_service import x_official_configured, x_post_text, x_post_thread
@@ -33,13 +36,13 @@ logger = logging.getLogger(__name__)
 VALID_CHANNELS = {"telegram", "whatsapp", "x", "threads"}
 ASSET_KEY_PREFIX = "intel:distribution:asset:"
 ASSET_INDEX_PREFIX = "intel:distribution:index:"
-PUBLISHED_INDEX_KEY = "intel:distribution:published:index"
+LEGACY_PUBLISHED_INDEX_KEY = "intel:distribution:published:index"
+PUBLISHED_DEDUPE_NAMESPACE = "intel:distribution:dedupe"
 LAST_PUBLISHED_KEY_PREFIX = "intel:distribution:last:"
 RATE_COUNTER_KEY_PREFIX = "intel:distribution:rate:"
 URL_PATTERN = re.compile(r"https?://\S+")
 X_PREVIEW_TIMEOUT_SECONDS = 8
 DISTRIBUTION_FORMAT_VERSION = 4
-PUBLISHED_INDEX_LIMIT = 240
 DUPLICATE_LOOKBACK_SECONDS = 12 * 60 * 60
 TITLE_OVERLAP_THRESHOLD = 0.52
 TRAILING_STOPWORDS = {
@@ -52,6 +55,8 @@ TOPIC_STOPWORDS = TRAILING_STOPWORDS.union({
     "quando", "sobre", "sua", "suas", "tem", "uma", "vai",
 })
 
+_LEGACY_INDEX_CHECKED = False
+
 
 def _iso_now() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -106,8 +111,7 @@ def _normalize_string_list(value: Any) -> List[str]:
     return []
 
 
-def _read_json(redis_client: SafeRedis, key: str) -> Any:
-    cached = redis_client.get(key)
+def _read_json_text(cached: str | None) -> Any:
     if not cached:
         return None
     try:
@@ -116,6 +120,10 @@ def _read_json(redis_client: SafeRedis, key: str) -> Any:
         return None
 
 
+def _read_json(redis_client: SafeRedis, key: str) -> Any:
+    return _read_json_text(redis_client.get(key))
+
+
 def _write_json(redis_client: SafeRedis, key: str, payload: Any) -> None:
     redis_client.set(key, json.dumps(payload, ensure_ascii=False))
 
@@ -273,21 +281,59 @@ def _publication_fingerprint(post: Dict[str, Any], channel: str) -> str:
     return hashlib.sha1(json.dumps(raw, sort_keys=True).encode("utf-8")).hexdigest()
 
 
-def _load_published_index(redis_client: SafeRedis) -> List[Dict[str, Any]]:
-    payload = _read_json(redis_client, PUBLISHED_INDEX_KEY)
-    if not isinstance(payload, list):
-        return []
-    return [item for item in payload if isinstance(item, dict)]
+def _dedupe_lookback_seconds() -> int:
+    return _env_int(
+        "INTEL_DISTRIBUTION_DEDUPE_SECONDS",
+        DUPLICATE_LOOKBACK_SECONDS,
+        minimum=300,
+    )
+
 
+def _published_index(redis_client: SafeRedis) -> DedupeIndex:
+    index = DedupeIndex(
+        redis_client,
+        PUBLISHED_DEDUPE_NAMESPACE,
+        ttl_seconds=_dedupe_lookback_seconds(),
+        similarity_threshold=TITLE_OVERLAP_THRESHOLD,
+    )
+    _migrate_legacy_published_index(redis_client, index)
+    return index
 
-def _store_published_index(redis_client: SafeRedis, items: List[Dict[str, Any]]) -> None:
-    _write_json(redis_client, PUBLISHED_INDEX_KEY, items[:PUBLISHED_INDEX_LIMIT])
 
+def _published_keys(post: Dict[str, Any], fingerprint: str) -> Dict[str, List[str]]:
+    return {
+        "duplicate_fingerprint": [fingerprint],
+        "duplicate_source": _source_urls(post),
+        "duplicate_topic": [_topic_signature(post)],
+    }
 
-def _title_overlap(left: set[str], right: set[str]) -> float:
-    if not left or not right:
-        return 0.0
-    return len(left.intersection(right)) / max(1, min(len(left), len(right)))
+
+def _migrate_legacy_published_index(redis_client: SafeRedis, index: DedupeIndex) -> None:
+    """Moves the old single-blob published index (if any) into the dedupe index, once per process."""
+    global _LEGACY_INDEX_CHECKED
+    if _LEGACY_INDEX_CHECKED:
+        return
+    _LEGACY_INDEX_CHECKED = True
+    payload = _read_json(redis_client, LEGACY_PUBLISHED_INDEX_KEY)
+    if not isinstance(payload, list):
+        return
+    for item in reversed(payload):
+        published = _parse_iso_datetime(item.get("published_at")) if isinstance(item, dict) else None
+        if not published or item.get("channel") not in VALID_CHANNELS:
+            continue
+        index.add(
+            item["channel"],
+            str(item.get("fingerprint") or item.get("slug")),
+            {
+                "duplicate_fingerprint": [item.get("fingerprint")],
+                "duplicate_source": item.get("source_urls") or [],
+                "duplicate_topic": [item.get("topic_signature")],
+            },
+            set(item.get("topic_tokens") or []),
+            now=published.timestamp(),
+            record={"slug": item.get("slug"), "title": item.get("title")},
+        )
+    redis_client.delete(LEGACY_PUBLISHED_INDEX_KEY)
 
 
 def _recent_duplicate_reason(
@@ -299,31 +345,10 @@ def _recent_duplicate_reason(
     if not _env_flag("INTEL_DISTRIBUTION_DEDUPE_ENABLED", default=True):
         return None
 
-    lookback_seconds = _env_int(
-        "INTEL_DISTRIBUTION_DEDUPE_SECONDS",
-        DUPLICATE_LOOKBACK_SECONDS,
-        minimum=300,
-    )
-    topic_tokens = _topic_tokens(post)
-    topic_signature = _topic_signature(post)
-    source_urls = set(_source_urls(post))
-
-    for item in _load_published_index(redis_client):
-        if item.get("channel") != channel:
-            continue
-        age = _seconds_since(item.get("published_at"))
-        if age is None or age > lookback_seconds:
-            continue
-        if item.get("fingerprint") == fingerprint:
-            return "duplicate_fingerprint"
-        if source_urls and source_urls.intersection(set(item.get("source_urls") or [])):
-            return "duplicate_source"
-        if item.get("topic_signature") == topic_signature:
-            return "duplicate_topic"
-        previous_tokens = set(item.get("topic_tokens") or [])
-        if _title_overlap(topic_tokens, previous_tokens) >= TITLE_OVERLAP_THRESHOLD:
-            return "duplicate_similar_topic"
-    return None
+    match = _published_index(redis_client).find(channel, _published_keys(post, fingerprint), _topic_tokens(post))
+    if not match:
+        return None
+    return "duplicate_similar_topic" if match.reason == "similar" else match.reason
 
 
 def _channel_min_interval_seconds(channel: str) -> int:
@@ -385,18 +410,15 @@ def _record_published(redis_client: SafeRedis, post: Dict[str, Any], asset: Dict
     if count == 1:
         redis_client.expire(counter_key, 2 * 60 * 60)
 
-    index = _load_published_index(redis_client)
-    index.insert(0, {
-        "channel": channel,
-        "slug": post.get("slug"),
-        "title": post.get("title"),
-        "fingerprint": fingerprint,
-        "topic_signature": _topic_signature(post),
-        "topic_tokens": sorted(_topic_tokens(post)),
-        "source_urls": _source_urls(post),
-        "published_at": published_at,
-    })
-    _store_published_index(redis_client, index)
+    published = _parse_iso_datetime(published_at)
+    _published_index(redis_client).add(
+        channel,
+        fingerprint,
+        _published_keys(post, fingerprint),
+        _topic_tokens(post),
+        now=published.timestamp() if published else None,
+        record={"slug": post.get("slug"), "title": post.get("title"), "published_at": published_at},
+    )
 
 
 def _configured_for_channel(channel: str) -> bool:
@@ -821,7 +843,7 @@ def _threads_signal_line(post: Dict[str, Any], fallback: str, headline: str = ""
         if not candidate:
             continue
         candidate_tokens = _tokenize_topic_text(candidate)
-        if title_tokens and candidate_tokens and _title_overlap(title_tokens, candidate_tokens) > 0.72:
+        if title_tokens and candidate_tokens and overlap_ratio(title_tokens, candidate_tokens) > 0.72:
             continue
         return _truncate_copy_line(candidate, 138)
     return _truncate_copy_line(fallback or headline or "Leitura operacional em atualização.", 138)
@@ -1051,14 +1073,25 @@ def _fallback_body(post: Dict[str, Any], channel: str, cta_url: str) -> str:
     return _compose_x_body(post, cta_url, headline, impact_line, action_line)
 
 
-def _llm_asset(post: Dict[str, Any], channel: str, cta_url: str) -> Dict[str, str] | None:
+def _asset_output_valid(channel: str, text: str) -> bool:
+    parsed = _extract_json(text)
+    if not isinstance(parsed, dict):
+        return False
+    if channel in {"x", "telegram"}:
+        # both compose their body from the post when a field is missing
+        return True
+    if channel == "threads":
+        return bool(str(parsed.get("body") or parsed.get("impact_line") or "").strip())
+    return bool(str(parsed.get("body") or "").strip())
+
+
+def _llm_asset(post: Dict[str, Any], channel: str, cta_url: str, force: bool = False) -> Dict[str, str] | None:
     provider = (os.getenv("INTEL_DISTRIBUTION_PROVIDER") or os.getenv("INTEL_INSTITUTIONAL_PROVIDER") or os.getenv("INTEL_ENRICHMENT_PROVIDER") or "heuristic").strip().lower()
-    api_key = os.getenv("OPENAI_API_KEY")
-    if provider == "heuristic" or not api_key:
+    llm = get_generation_service()
+    if provider == "heuristic" or not llm.configured:
         return None
 
     model = (os.getenv("INTEL_DISTRIBUTION_MODEL") or os.getenv("INTEL_INSTITUTIONAL_MODEL") or os.getenv("INTEL_ENRICHMENT_MODEL") or "gpt-5.4-mini").strip()
-    base_url = (os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1").rstrip("/")
     prompt = {
         "post": {
             "title": post.get("title"),
@@ -1086,22 +1119,23 @@ def _llm_asset(post: Dict[str, Any], channel: str, cta_url: str) -> Dict[str, st
         1200,
     )
 
-    try:
-        response = requests.post(
-            f"{base_url}/responses",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
+    result = llm.generate(
+        GenerationRequest(
+            payload=payload,
+            label=f"distribution {post.get('slug')}/{channel}",
             timeout=30,
+            use_cache=not force,
+            validate=lambda text: _asset_output_valid(channel, text),
         )
-        response.raise_for_status()
-        data = response.json()
-        content = _extract_response_text(data)
-        if not content:
+    )
+    if result.error:
+        logger.warning("Distribution asset generation failed for %s/%s: %s", post.get("slug"), channel, result.error)
+        return None
+
+    try:
+        if not result.text:
             return None
-        parsed = _extract_json(content)
+        parsed = _extract_json(result.text)
         if not isinstance(parsed, dict):
             return None
         headline = str(parsed.get("headline") or post.get("title") or "SNELabs").strip()
@@ -1128,23 +1162,14 @@ def _llm_asset(post: Dict[str, Any], channel: str, cta_url: str) -> Dict[str, st
         if not body:
             return None
         return {"headline": headline, "body": body}
-    except requests.HTTPError as exc:
-        response = exc.response
-        logger.warning(
-            "Distribution asset generation failed for %s/%s: status=%s body=%s",
-            post.get("slug"),
-            channel,
-            response.status_code if response is not None else "unknown",
-            _truncate_response_body(response.text if response is not None else ""),
-        )
     except Exception as exc:
         logger.warning("Distribution asset generation failed for %s/%s: %s", post.get("slug"), channel, exc)
     return None
 
 
-def _build_asset(post: Dict[str, Any], channel: str) -> Dict[str, Any]:
+def _build_asset(post: Dict[str, Any], channel: str, force: bool = False) -> Dict[str, Any]:
     cta_url = _channel_cta_url(post, channel)
-    generated = _llm_asset(post, channel, cta_url)
+    generated = _llm_asset(post, channel, cta_url, force=force)
     headline = generated["headline"] if generated else str(post.get("title") or "SNELabs").strip()
     body = generated["body"] if generated else _fallback_body(post, channel, cta_url)
     x_format = None
@@ -1201,22 +1226,31 @@ def generate_distribution_assets(slug: str, channels: Any = None, force: bool =
     redis_client = SafeRedis()
     selected_channels = _normalize_channels(channels)
     stored_channels = _load_index(redis_client, slug)
-    assets: List[Dict[str, Any]] = []
-
+    assets_by_channel: Dict[str, Dict[str, Any]] = {}
+    pending: List[str] = []
     for channel in selected_channels:
         existing = _read_json(redis_client, _asset_key(slug, channel))
         if isinstance(existing, dict) and not force:
             already_published = existing.get("status") == "published" and existing.get("published_at")
             current_format = existing.get("format_version") == DISTRIBUTION_FORMAT_VERSION
             if already_published or current_format:
-                assets.append(existing)
+                assets_by_channel[channel] = existing
                 continue
-        asset = _build_asset(post, channel)
+        pending.append(channel)
+
+    # channel copies are independent LLM calls: generate them side by side
+    built = http_client.run_concurrently(
+        [lambda channel=channel: _build_asset(post, channel, force=force) for channel in pending],
+        return_exceptions=False,
+    )
+    for channel, asset in zip(pending, built):
         _write_json(redis_client, _asset_key(slug, channel), asset)
-        assets.append(asset)
+        assets_by_channel[channel] = asset
         if channel not in stored_channels:
             stored_channels.append(channel)
 
+    assets = [assets_by_channel[channel] for channel in selected_channels if channel in assets_by_channel]
+
     _store_index(redis_client, slug, stored_channels)
     return {"slug": slug, "assets": assets}
 
@@ -1238,7 +1272,7 @@ def _publish_to_whatsapp(asset: Dict[str, Any]) -> tuple[str, str | None]:
     if not access_token or not phone_number_id or not recipient:
         return "publish_failed", "whatsapp_not_configured"
 
-    response = requests.post(
+    response = http_client.post(
         f"https://graph.facebook.com/v22.0/{phone_number_id}/messages",
         headers={
             "Authorization": f"Bearer {access_token}",
@@ -1271,7 +1305,7 @@ def _publish_to_threads(asset: Dict[str, Any]) -> tuple[str, str | None]:
     if not text:
         return "publish_failed", "threads_body_empty"
 
-    create_response = requests.post(
+    create_response = http_client.post(
         f"{_threads_api_base()}/{user_id}/threads",
         data={
             "media_type": "TEXT",
@@ -1286,7 +1320,7 @@ def _publish_to_threads(asset: Dict[str, Any]) -> tuple[str, str | None]:
     if not creation_id:
         return "publish_failed", f"threads_missing_creation_id:{_truncate_response_body(create_response.text)}"
 
-    publish_response = requests.post(
+    publish_response = http_client.post(
         f"{_threads_api_base()}/{user_id}/threads_publish",
         data={
             "creation_id": creation_id,
@@ -1313,14 +1347,14 @@ def _validate_x_preview(asset: Dict[str, Any]) -> tuple[bool, str | None]:
 
     image_url = build_intel_og_image_url(slug)
     try:
-        share_response = requests.get(cta_url, timeout=X_PREVIEW_TIMEOUT_SECONDS)
+        share_response = http_client.get(cta_url, timeout=X_PREVIEW_TIMEOUT_SECONDS)
         if share_response.status_code != 200:
             return False, f"x_share_unavailable:{share_response.status_code}"
         share_html = share_response.text or ""
         if "twitter:image" not in share_html and "og:image" not in share_html:
             return False, "x_share_missing_preview_meta"
 
-        image_response = requests.get(image_url, timeout=X_PREVIEW_TIMEOUT_SECONDS)
+        image_response = http_client.get(image_url, timeout=X_PREVIEW_TIMEOUT_SECONDS)
         if image_response.status_code != 200:
             return False, f"x_og_unavailable:{image_response.status_code}"
         content_type = (image_response.headers.get("content-type") or "").lower()
@@ -1372,7 +1406,7 @@ def _publish_to_x(asset: Dict[str, Any]) -> tuple[str, str | None]:
     if bearer:
         headers["Authorization"] = f"Bearer {bearer}"
 
-    response = requests.post(
+    response = http_client.post(
         webhook_url,
         headers=headers,
         json={
@@ -1415,7 +1449,64 @@ def _http_error_detail(response: requests.Response | None) -> str:
     )
 
 
-def publish_distribution(slug: str, channels: Any = None, dry_run: bool = False, auto: bool = False) -> Dict[str, Any]:
+def _publish_asset(asset: Dict[str, Any]) -> tuple[str, str | None]:
+    channel = asset["channel"]
+    try:
+        if channel == "telegram":
+            return _publish_to_telegram(asset)
+        if channel == "whatsapp":
+            return _publish_to_whatsapp(asset)
+        if channel == "threads":
+            return _publish_to_threads(asset)
+        return _publish_to_x(asset)
+    except requests.HTTPError as exc:
+        response = exc.response
+        return "publish_failed", _http_error_detail(response) or _truncate_response_body(response.text if response is not None else "")
+    except Exception as exc:
+        return "publish_failed", str(exc)
+
+
+def _store_publish_outcome(
+    redis_client: SafeRedis,
+    post: Dict[str, Any],
+    asset: Dict[str, Any],
+    status: str,
+    error: str | None,
+    *,
+    auto: bool,
+) -> None:
+    asset["status"] = status
+    asset["published_at"] = _iso_now() if status == "published" else None
+    if error:
+        asset["error"] = error
+    elif "error" in asset:
+        asset.pop("error", None)
+    if status == "published" and auto:
+        _record_published(redis_client, post, asset)
+    _write_json(redis_client, _asset_key(asset["slug"], asset["channel"]), asset)
+
+
+def _preview_distribution(redis_client: SafeRedis, slug: str, channels: List[str], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    for asset in generate_distribution_assets(slug, channels).get("assets", []):
+        asset["status"] = "previewed"
+        _write_json(redis_client, _asset_key(slug, asset["channel"]), asset)
+        results.append({"channel": asset["channel"], "status": "previewed"})
+    return {"slug": slug, "results": results}
+
+
+def publish_distribution(
+    slug: str,
+    channels: Any = None,
+    dry_run: bool = False,
+    auto: bool = False,
+    idempotency_key: str | None = None,
+) -> Dict[str, Any]:
+    """
+    Queue the post for publishing and return immediately with a tracking id.
+
+    Channel jobs run on the outbox workers (see distribution_outbox); a dry
+    run still renders and stores the previews inline.
+    """
     post = fetch_combined_intel_post(slug)
     if not post:
         return {"slug": slug, "results": [], "error": "Intel post not found"}
@@ -1436,12 +1527,16 @@ def publish_distribution(slug: str, channels: Any = None, dry_run: bool = False,
         return {"slug": slug, "results": results}
 
     redis_client = SafeRedis()
-    if auto and not dry_run:
+    if dry_run:
+        return _preview_distribution(redis_client, slug, selected_channels, results)
+
+    if auto:
+        # duplicates are dropped now; cadence/hourly limits are scheduled by the outbox
         gated_channels: List[str] = []
         for channel in selected_channels:
             fingerprint = _publication_fingerprint(post, channel)
             allowed, reason = _auto_channel_gate(redis_client, post, channel, fingerprint)
-            if allowed:
+            if allowed or reason in {"channel_cadence", "channel_hourly_limit"}:
                 gated_channels.append(channel)
             else:
                 results.append({"channel": channel, "status": "skipped", "reason": reason or "auto_gate"})
@@ -1450,49 +1545,17 @@ def publish_distribution(slug: str, channels: Any = None, dry_run: bool = False,
     if not selected_channels:
         return {"slug": slug, "results": results}
 
-    preview = generate_distribution_assets(slug, selected_channels)
-    assets = preview.get("assets", [])
+    # X preview validation and the first crawler wave fetch the share page right after this
+    prerender_intel_share({**post, "slug": slug}, redis_client)
 
-    for asset in assets:
-        channel = asset["channel"]
-        if not dry_run and asset.get("status") == "published" and asset.get("published_at"):
-            results.append({"channel": channel, "status": "skipped", "reason": "already_published"})
-            continue
-        if dry_run:
-            asset["status"] = "previewed"
-            _write_json(redis_client, _asset_key(slug, channel), asset)
-            results.append({"channel": channel, "status": "previewed"})
-            continue
-
-        try:
-            if channel == "telegram":
-                status, error = _publish_to_telegram(asset)
-            elif channel == "whatsapp":
-                status, error = _publish_to_whatsapp(asset)
-            elif channel == "threads":
-                status, error = _publish_to_threads(asset)
-            else:
-                status, error = _publish_to_x(asset)
-        except requests.HTTPError as exc:
-            response = exc.response
-            status = "publish_failed"
-            error = _http_error_detail(response) or _truncate_response_body(response.text if response is not None else "")
-        except Exception as exc:
-            status = "publish_failed"
-            error = str(exc)
-
-        asset["status"] = status
-        asset["published_at"] = _iso_now() if status == "published" else None
-        if error:
-            asset["error"] = error
-        elif "error" in asset:
-            asset.pop("error", None)
-        if status == "published" and auto:
-            _record_published(redis_client, post, asset)
-        _write_json(redis_client, _asset_key(slug, channel), asset)
-        results.append({"channel": channel, "status": status, **({"error": error} if error else {})})
-
-    return {"slug": slug, "results": results}
+    from .distribution_outbox import enqueue_publication
+    return enqueue_publication(
+        {**post, "slug": slug},
+        selected_channels,
+        auto=auto,
+        idempotency_key=idempotency_key,
+        results=results,
+    )
 
 
 def auto_publish_enabled() -> bool:
@@ -1525,18 +1588,19 @@ def auto_publish_latest_posts(
             "items": [],
             "disabled": True,
         }
-    posts = fetch_combined_intel_posts(limit=max(normalized_limit * 4, normalized_limit), stream=stream)
+    posts = fetch_combined_intel_posts(limit=max(normalized_limit * 4, normalized_limit), stream=stream, include_body=False)
     published: List[Dict[str, Any]] = []
 
     for post in posts:
         if len(published) >= normalized_limit:
             break
         result = publish_distribution(str(post.get("slug") or ""), selected_channels, dry_run=False, auto=True)
-        delivered = any(item.get("status") == "published" for item in result.get("results", []))
-        if delivered:
+        queued = any(item.get("status") == "queued" for item in result.get("results", []))
+        if queued:
             published.append({
                 "slug": post.get("slug"),
                 "title": post.get("title"),
+                "tracking_id": result.get("tracking_id"),
                 "results": result.get("results", []),
             })
 
@@ -0,0 +1,256 @@
+"""
+Camada HTTP compartilhada para chamadas upstream (coletor, Binance, feeds de
+Intel, publicadores e RPC da Tron)
+
+- Uma requests.Session com pool keep-alive por host (reaproveita conexões TLS)
+- Limite de concorrência e timeout padrão por host
+- API síncrona (get/post/request) e asyncio (aget/apost/arequest)
+- Fan-out: run_concurrently() para chamadas síncronas em paralelo
+- Métricas por host: chamadas, erros, latência p50/p95
+
+A API asyncio roda as requisições no executor da própria camada; o resto do
+serviço é síncrono (Flask/gunicorn), então um cliente HTTP nativo async não
+traria ganho e adicionaria uma dependência.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) em segundos; chamadas podem sobrescrever com timeout=
+DEFAULT_TIMEOUT = (3.05, 15)
+DEFAULT_HOST_LIMIT = int(os.getenv("HTTP_HOST_CONCURRENCY", "8"))
+# Hosts com limite de taxa mais apertado ou mais fan-out
+HOST_LIMITS = {
+    "api.binance.com": 10,
+    "api.telegram.org": 4,
+    "graph.threads.net": 2,
+    "graph.facebook.com": 2,
+    "api.x.com": 2,
+    "api.twitter.com": 2,
+}
+# Tempo máximo esperando uma vaga no host antes de desistir
+HOST_WAIT_SECONDS = 30
+MAX_WORKERS = int(os.getenv("HTTP_MAX_WORKERS", "32"))
+METRICS_WINDOW = 512
+
+
+class HostBusyError(requests.exceptions.ConnectionError):
+    """Nenhuma vaga de concorrência liberada para o host dentro de HOST_WAIT_SECONDS"""
+
+
+class HostMetrics:
+    """Contadores e janela de latências recentes de um host"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.status: Dict[int, int] = {}
+        self.latencies = deque(maxlen=METRICS_WINDOW)
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, duration: float, status_code: Optional[int], failed: bool):
+        with self._lock:
+            self.in_flight -= 1
+            self.calls += 1
+            self.latencies.append(duration)
+            if status_code is not None:
+                self.status[status_code] = self.status.get(status_code, 0) + 1
+            if failed:
+                self.errors += 1
+
+    def reject(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = np.asarray(self.latencies) * 1000
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "error_rate": round(self.errors / self.calls, 4) if self.calls else 0.0,
+                "in_flight": self.in_flight,
+                "status": dict(self.status),
+                "p50_ms": round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+                "p95_ms": round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+            }
+
+
+_worker_state = threading.local()
+
+
+def _in_worker(task: Callable[[], Any]) -> Any:
+    _worker_state.active = True
+    try:
+        return task()
+    finally:
+        _worker_state.active = False
+
+
+class HttpClient:
+    """Cliente HTTP com sessão keep-alive, limites por host e métricas"""
+
+    def __init__(
+        self,
+        timeout=DEFAULT_TIMEOUT,
+        host_limits: Optional[Dict[str, int]] = None,
+        default_limit: int = DEFAULT_HOST_LIMIT,
+        max_workers: int = MAX_WORKERS,
+    ):
+        self.timeout = timeout
+        self.host_limits = {**HOST_LIMITS, **(host_limits or {})}
+        self.default_limit = default_limit
+        self.session = requests.Session()
+        pool = max([default_limit, *self.host_limits.values()])
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._metrics: Dict[str, HostMetrics] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http")
+
+    def _host_state(self, host: str):
+        with self._lock:
+            if host not in self._semaphores:
+                limit = self.host_limits.get(host, self.default_limit)
+                self._semaphores[host] = threading.BoundedSemaphore(limit)
+                self._metrics[host] = HostMetrics()
+            return self._semaphores[host], self._metrics[host]
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Mesma assinatura de requests.request; respeita o limite do host
+
+        Raises:
+            requests.exceptions.RequestException (HostBusyError se o host
+            estiver saturado por mais de HOST_WAIT_SECONDS)
+        """
+        host = urlsplit(url).hostname or ""
+        semaphore, metrics = self._host_state(host)
+        kwargs.setdefault("timeout", self.timeout)
+
+        if not semaphore.acquire(timeout=HOST_WAIT_SECONDS):
+            metrics.reject()
+            raise HostBusyError(f"Concurrency limit reached for {host}")
+        metrics.start()
+        inicio = time.perf_counter()
+        status_code = None
+        failed = True
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status_code = response.status_code
+            failed = status_code >= 500
+            return response
+        finally:
+            metrics.finish(time.perf_counter() - inicio, status_code, failed)
+            semaphore.release()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    async def arequest(self, method: str, url: str, **kwargs) -> requests.Response:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self.request, method, url, **kwargs))
+
+    async def aget(self, url: str, **kwargs) -> requests.Response:
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs) -> requests.Response:
+        return await self.arequest("POST", url, **kwargs)
+
+    def run_concurrently(self, tasks: Sequence[Callable[[], Any]], return_exceptions: bool = True) -> List[Any]:
+        """
+        Executa callables em paralelo e devolve os resultados na ordem recebida
+
+        Com return_exceptions, a exceção de uma tarefa entra na lista no lugar
+        do resultado (uma fonte ruim não derruba as outras). Chamado de dentro
+        de uma tarefa do próprio executor, roda em série (evita deadlock).
+        """
+        tasks = list(tasks)
+        if len(tasks) <= 1 or getattr(_worker_state, "active", False):
+            futures = None
+        else:
+            futures = [self._executor.submit(_in_worker, task) for task in tasks]
+
+        results: List[Any] = []
+        for index, task in enumerate(tasks):
+            try:
+                results.append(futures[index].result() if futures else task())
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                results.append(exc)
+        return results
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            hosts = dict(self._metrics)
+        return {host: metrics.snapshot() for host, metrics in sorted(hosts.items())}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    return get_client().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_client().request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return get_client().request("POST", url, **kwargs)
+
+
+async def aget(url: str, **kwargs) -> requests.Response:
+    return await get_client().arequest("GET", url, **kwargs)
+
+
+async def apost(url: str, **kwargs) -> requests.Response:
+    return await get_client().arequest("POST", url, **kwargs)
+
+
+def run_concurrently(tasks: Iterable[Callable[[], Any]], return_exceptions: bool = True) -> List[Any]:
+    return get_client().run_concurrently(list(tasks), return_exceptions=return_exceptions)
+
+
+def host_metrics() -> Dict[str, Dict[str, Any]]:
+    return get_client().metrics()
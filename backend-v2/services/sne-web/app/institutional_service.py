@@ -11,18 +11,18 @@ import logging
 import os
 from typing import Any, Dict, List
 
-import requests
-
 from .intel_enrichment import (
     _extract_json,
-    _extract_response_text,
     _openai_responses_payload,
     _slugify,
-    _truncate_response_body,
 )
 from .intel_service import fetch_intel_post as fetch_external_intel_post
 from .intel_service import fetch_intel_posts as fetch_external_intel_posts
 from .intel_visuals import apply_visual_entities
+from .llm_service import GenerationRequest, get_generation_service
+from .post_store import PostStore
+from .share_page_cache import prerender_intel_share
+from .sitemap_service import refresh_sitemaps
 from .utils.redis_safe import SafeRedis
 
 logger = logging.getLogger(__name__)
@@ -38,8 +38,9 @@ VALID_VISIBILITY = {"internal", "public"}
 
 FACT_PACK_KEY_PREFIX = "intel:institutional:fact-pack:"
 FACT_PACK_INDEX_KEY = "intel:institutional:fact-packs"
-POST_KEY_PREFIX = "intel:institutional:post:"
-POST_INDEX_KEY = "intel:institutional:posts"
+POST_STORE_NAMESPACE = "intel:institutional"
+# slug list kept before the post store; records already live at the store's keys
+LEGACY_POST_INDEX_KEY = "intel:institutional:posts"
 POST_SOURCE_MAP_PREFIX = "intel:institutional:fact-pack:post:"
 
 
@@ -117,6 +118,15 @@ def _sort_posts(posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     )
 
 
+def _legacy_posts(redis_client: SafeRedis) -> List[Dict[str, Any]]:
+    slugs = _load_index(redis_client, LEGACY_POST_INDEX_KEY)
+    return PostStore(redis_client, POST_STORE_NAMESPACE).get_many(slugs)
+
+
+def _post_store(redis_client: SafeRedis) -> PostStore:
+    return PostStore(redis_client, POST_STORE_NAMESPACE, legacy_loader=_legacy_posts)
+
+
 def _normalize_fact_pack(raw_payload: Dict[str, Any]) -> Dict[str, Any]:
     source_id = str(raw_payload.get("source_id") or "").strip() or _slugify(
         str(raw_payload.get("headline_hint") or raw_payload.get("type") or f"institutional-{_iso_now()}")
@@ -289,14 +299,18 @@ def _fallback_post(pack: Dict[str, Any]) -> Dict[str, Any]:
     })
 
 
-def _llm_post(pack: Dict[str, Any]) -> Dict[str, Any] | None:
+def _has_post_body(text: str) -> bool:
+    parsed = _extract_json(text)
+    return isinstance(parsed, dict) and bool(str(parsed.get("body_markdown") or "").strip())
+
+
+def _llm_post(pack: Dict[str, Any], force: bool = False) -> Dict[str, Any] | None:
     provider = (os.getenv("INTEL_INSTITUTIONAL_PROVIDER") or os.getenv("INTEL_ENRICHMENT_PROVIDER") or "heuristic").strip().lower()
-    api_key = os.getenv("OPENAI_API_KEY")
-    if provider == "heuristic" or not api_key:
+    llm = get_generation_service()
+    if provider == "heuristic" or not llm.configured:
         return None
 
     model = (os.getenv("INTEL_INSTITUTIONAL_MODEL") or os.getenv("INTEL_ENRICHMENT_MODEL") or "gpt-5.4-mini").strip()
-    base_url = (os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1").rstrip("/")
     editorial_kind = _editorial_kind_for_type(pack.get("type", "institutional-brief"))
     prompt = {
         "fact_pack": pack,
@@ -318,22 +332,23 @@ def _llm_post(pack: Dict[str, Any]) -> Dict[str, Any] | None:
         3200 if editorial_kind == "briefing" else 5200,
     )
 
-    try:
-        response = requests.post(
-            f"{base_url}/responses",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
+    result = llm.generate(
+        GenerationRequest(
+            payload=payload,
+            label=f"institutional {pack.get('source_id')}",
             timeout=40,
+            use_cache=not force,
+            validate=_has_post_body,
         )
-        response.raise_for_status()
-        data = response.json()
-        content = _extract_response_text(data)
-        if not content:
+    )
+    if result.error:
+        logger.warning("Institutional post request failed for %s: %s", pack.get("source_id"), result.error)
+        return None
+
+    try:
+        if not result.text:
             return None
-        parsed = _extract_json(content)
+        parsed = _extract_json(result.text)
         if not isinstance(parsed, dict):
             return None
 
@@ -377,14 +392,6 @@ def _llm_post(pack: Dict[str, Any]) -> Dict[str, Any] | None:
             },
             "distribution_ready": pack.get("visibility") == "public",
         })
-    except requests.HTTPError as exc:
-        response = exc.response
-        logger.warning(
-            "Institutional post request failed for %s: status=%s body=%s",
-            pack.get("source_id"),
-            response.status_code if response is not None else "unknown",
-            _truncate_response_body(response.text if response is not None else ""),
-        )
     except Exception as exc:
         logger.warning("Institutional post generation failed for %s: %s", pack.get("source_id"), exc)
     return None
@@ -419,10 +426,12 @@ def generate_institutional_post(source_id: str, force: bool = False) -> Dict[str
                 "post": existing,
             }
 
-    post = _llm_post(pack) or _fallback_post(pack)
-    _write_json(redis_client, f"{POST_KEY_PREFIX}{post['slug']}", post)
-    _store_index(redis_client, POST_INDEX_KEY, [post["slug"], *_load_index(redis_client, POST_INDEX_KEY)])
+    post = _llm_post(pack, force=force) or _fallback_post(pack)
+    _post_store(redis_client).upsert(post)
     redis_client.set(f"{POST_SOURCE_MAP_PREFIX}{pack['source_id']}", post["slug"])
+    # a regenerated post replaces its cached share pages right away
+    prerender_intel_share(post, redis_client)
+    refresh_sitemaps(redis_client=redis_client)
     return {
         "started": True,
         "post_slug": post["slug"],
@@ -434,9 +443,8 @@ def generate_institutional_post(source_id: str, force: bool = False) -> Dict[str
 def fetch_institutional_post(slug: str) -> Dict[str, Any] | None:
     if not slug.strip():
         return None
-    redis_client = SafeRedis()
-    payload = _read_json(redis_client, f"{POST_KEY_PREFIX}{slug.strip()}")
-    return apply_visual_entities(payload) if isinstance(payload, dict) else None
+    payload = _post_store(SafeRedis()).get(slug.strip())
+    return apply_visual_entities(payload) if payload else None
 
 
 def fetch_institutional_posts(
@@ -445,22 +453,23 @@ def fetch_institutional_posts(
     institutional_type: str | None = None,
     stage: str | None = None,
     visibility: str | None = None,
+    include_body: bool = True,
+    facet: str | None = None,
+    facet_value: str | None = None,
 ) -> List[Dict[str, Any]]:
-    redis_client = SafeRedis()
-    slugs = _load_index(redis_client, POST_INDEX_KEY)
-    posts: List[Dict[str, Any]] = []
-    for slug in slugs:
-        post = fetch_institutional_post(slug)
-        if not post:
-            continue
+    def matches(post: Dict[str, Any]) -> bool:
         if institutional_type and post.get("institutional_type") != institutional_type:
-            continue
+            return False
         if stage and post.get("stage") != stage:
-            continue
+            return False
         if visibility and post.get("visibility") != visibility:
-            continue
-        posts.append(apply_visual_entities(post))
-    return _sort_posts(posts)[: max(1, min(limit, 240))]
+            return False
+        return True
+
+    store = _post_store(SafeRedis())
+    selected = store.summaries(limit=max(1, min(limit, 240)), facet=facet, value=facet_value, where=matches)
+    posts = store.get_many(post["slug"] for post in selected) if include_body else selected
+    return [apply_visual_entities(post) for post in posts]
 
 
 def fetch_combined_intel_posts(
@@ -470,24 +479,30 @@ def fetch_combined_intel_posts(
     institutional_type: str | None = None,
     stage: str | None = None,
     visibility: str | None = None,
+    include_body: bool = True,
+    facet: str | None = None,
+    facet_value: str | None = None,
 ) -> List[Dict[str, Any]]:
     normalized_stream = (stream or "all").strip().lower()
+    selection = {"include_body": include_body, "facet": facet, "facet_value": facet_value}
     if normalized_stream == "institutional":
         return fetch_institutional_posts(
             limit=limit,
             institutional_type=institutional_type,
             stage=stage,
             visibility=visibility,
+            **selection,
         )
     if normalized_stream == "external":
-        return fetch_external_intel_posts(limit=limit)
+        return fetch_external_intel_posts(limit=limit, **selection)
 
-    external = fetch_external_intel_posts(limit=max(limit, 48))
+    external = fetch_external_intel_posts(limit=max(limit, 48), **selection)
     institutional = fetch_institutional_posts(
         limit=max(limit, 48),
         institutional_type=institutional_type,
         stage=stage,
         visibility=visibility,
+        **selection,
     )
     return _sort_posts([*external, *institutional])[: max(1, min(limit, 240))]
 
@@ -9,6 +9,7 @@ import os
 
 from flask import Blueprint, jsonify, request
 
+from .distribution_outbox import fetch_outbox_batch
 from .distribution_service import (
     auto_publish_latest_posts,
     fetch_distribution_status,
@@ -71,6 +72,15 @@ def _index_post(post: dict[str, object]) -> dict[str, object]:
     return shaped
 
 
+def _facet_filter() -> tuple[str | None, str | None]:
+    """?topic=, ?chain= or ?asset= narrow a post list through the store's secondary indexes."""
+    for facet, arg in (("topics", "topic"), ("chains", "chain"), ("assets", "asset")):
+        value = (request.args.get(arg) or "").strip().lower()
+        if value:
+            return facet, value
+    return None, None
+
+
 @intel_bp.get("/briefing")
 def intel_briefing():
     try:
@@ -100,12 +110,16 @@ def intel_posts():
         stage = (request.args.get("stage") or "").strip().lower() or None
         visibility = (request.args.get("visibility") or "").strip().lower() or None
         include_body = request.args.get("include_body") == "1"
+        facet, facet_value = _facet_filter()
         posts = fetch_combined_intel_posts(
             limit=normalized_limit,
             stream=stream,
             institutional_type=institutional_type,
             stage=stage,
             visibility=visibility,
+            include_body=include_body,
+            facet=facet,
+            facet_value=facet_value,
         )
         items = posts if include_body else [_index_post(post) for post in posts]
         state = fetch_intel_posts_state(limit=normalized_limit) if stream != "institutional" else {
@@ -245,12 +259,13 @@ def distribution_publish(slug: str):
         slug,
         payload.get("channels"),
         dry_run=bool(payload.get("dry_run")),
+        idempotency_key=(request.headers.get("Idempotency-Key") or payload.get("idempotency_key") or None),
     )
     if result.get("error") == "Intel post not found":
         return jsonify(result), 404
     if result.get("error"):
         return jsonify(result), 400
-    return jsonify(result), 200
+    return jsonify(result), 202 if result.get("tracking_id") else 200
 
 
 @intel_bp.get("/distribution/status/<slug>")
@@ -258,6 +273,14 @@ def distribution_status(slug: str):
     return jsonify(fetch_distribution_status(slug)), 200
 
 
+@intel_bp.get("/distribution/jobs/<tracking_id>")
+def distribution_job_status(tracking_id: str):
+    batch = fetch_outbox_batch(tracking_id)
+    if not batch:
+        return jsonify({"error": "Tracking id not found"}), 404
+    return jsonify(batch), 200
+
+
 @intel_bp.post("/distribution/autopublish")
 def distribution_autopublish():
     if not _secret_authorized("INTEL_DISTRIBUTION_SECRET", required=True):
@@ -11,11 +11,10 @@ import json
 import logging
 import os
 import re
-import time
 from typing import Any, Dict, List
 
-import requests
-
+from .intel_entities import EntityMatcher
+from .llm_service import GenerationRequest, GenerationResult, get_generation_service
 from .utils.redis_safe import SafeRedis
 
 logger = logging.getLogger(__name__)
@@ -34,16 +33,6 @@ def _env_int(name: str, default: int, minimum: int = 1) -> int:
         return default
 
 
-def _parse_retry_after_seconds(value: str | None) -> int | None:
-    if not value:
-        return None
-    try:
-        seconds = int(value)
-    except (TypeError, ValueError):
-        return None
-    return max(1, min(seconds, 30))
-
-
 INTEL_BRIEF_MAX_OUTPUT_TOKENS = _env_int("INTEL_BRIEF_MAX_OUTPUT_TOKENS", 4000)
 INTEL_DOSSIER_MAX_OUTPUT_TOKENS = _env_int("INTEL_DOSSIER_MAX_OUTPUT_TOKENS", 10000)
 INTEL_LLM_TIMEOUT_SECONDS = _env_int("INTEL_LLM_TIMEOUT_SECONDS", 40)
@@ -124,28 +113,14 @@ def _normalized_text(text: str) -> str:
     return re.sub(r"\s+", " ", lowered).strip()
 
 
-def _tokenize(text: str) -> set[str]:
-    return set(re.findall(r"[a-z0-9]+", _normalized_text(text)))
+_ENTITY_MATCHER = EntityMatcher(
+    {"topics": TOPIC_RULES, "chains": CHAIN_RULES, "protocols": PROTOCOL_RULES, "assets": ASSET_RULES},
+    _normalized_text,
+)
 
 
-def _extract_matches(text: str, rules: Dict[str, List[str]]) -> List[str]:
-    matches: List[str] = []
-    haystack = _normalized_text(text)
-    word_tokens = _tokenize(text)
-    for label, rule_tokens in rules.items():
-        found = False
-        for token in rule_tokens:
-            normalized = _normalized_text(token)
-            if " " in normalized:
-                if f" {normalized} " in f" {haystack} ":
-                    found = True
-                    break
-            elif normalized in word_tokens:
-                found = True
-                break
-        if found:
-            matches.append(label)
-    return matches
+def _extract_matches(text: str) -> Dict[str, List[str]]:
+    return _ENTITY_MATCHER.match(text)
 
 
 def _impact_score(points: int, comments: int, topics: List[str], chains: List[str], source_tier: str) -> Dict[str, Any]:
@@ -343,28 +318,6 @@ def _openai_responses_payload(model: str, instructions: str, user_input: str, ma
     return payload
 
 
-def _extract_response_text(data: Dict[str, Any]) -> str:
-    output_text = data.get("output_text")
-    if isinstance(output_text, str) and output_text.strip():
-        return output_text
-
-    output = data.get("output")
-    if not isinstance(output, list):
-        return ""
-
-    chunks: List[str] = []
-    for item in output:
-        if not isinstance(item, dict):
-            continue
-        for content in item.get("content", []):
-            if not isinstance(content, dict):
-                continue
-            text = content.get("text")
-            if isinstance(text, str) and text.strip():
-                chunks.append(text)
-    return "\n".join(chunks).strip()
-
-
 def _truncate_response_body(value: str | None, max_chars: int = 1200) -> str:
     text = (value or "").strip()
     if len(text) <= max_chars:
@@ -376,10 +329,9 @@ class IntelEnricher:
     def __init__(self):
         self.provider = os.getenv("INTEL_ENRICHMENT_PROVIDER", "heuristic").strip().lower()
         self.model = os.getenv("INTEL_ENRICHMENT_MODEL", "gpt-4.1-mini")
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+        self.llm = get_generation_service()
         self.redis = SafeRedis()
-        provider_state = "enabled" if self.provider != "heuristic" and self.api_key else "fallback"
+        provider_state = "enabled" if self.provider != "heuristic" and self.llm.configured else "fallback"
         logger.info(
             "Intel enrichment provider=%s model=%s state=%s",
             self.provider,
@@ -405,42 +357,71 @@ class IntelEnricher:
         return item
 
     def build_post(self, item: Dict[str, Any]) -> Dict[str, Any]:
-        slug = _slugify(item.get("title_pt") or item.get("title") or item["id"])
-        cache_key = self._cache_key("post", slug)
-        cached = self.redis.get(cache_key)
-        if cached:
+        return self.build_posts([item])[0]
+
+    def build_posts(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Posts for a batch of items, in the same order.
+
+        Cached posts are reused; the LLM calls for the rest run concurrently
+        through the generation service, so a batch costs about as much as
+        its slowest call.
+        """
+        posts: List[Dict[str, Any] | None] = [None] * len(items)
+        pending: List[int] = []
+        for index, item in enumerate(items):
+            cached = self.redis.get(self._cache_key("post", self._item_slug(item)))
+            if cached:
+                try:
+                    posts[index] = json.loads(cached)
+                    continue
+                except Exception:
+                    pass
+            pending.append(index)
+
+        requests_by_index = {index: self._post_request(items[index]) for index in pending}
+        batch = [index for index in pending if requests_by_index[index] is not None]
+        results = self.llm.generate_many([requests_by_index[index] for index in batch]) if batch else []
+        generated = dict(zip(batch, results))
+
+        for index in pending:
+            item = items[index]
+            slug = self._item_slug(item)
+            post = self._post_from_result(item, generated[index]) if index in generated else None
+            if not post:
+                posts[index] = self._failed_post(item, slug)
+                continue
             try:
-                return json.loads(cached)
+                self.redis.setex(self._cache_key("post", slug), 1800, json.dumps(post))
             except Exception:
                 pass
+            posts[index] = post
+        return [post for post in posts if post is not None]
 
-        post = self._llm_post(item)
-        if not post:
-            editorial_kind = _normalize_post_kind(item.get("editorial_kind"))
-            return {
-                "id": f"post:{slug}",
-                "slug": slug,
-                "title": item.get("title_pt") or item.get("title") or item.get("title_original") or slug,
-                "subtitle": "",
-                "excerpt": "",
-                "body_markdown": "",
-                "tldr": [],
-                "topics": item.get("topics", []),
-                "chains": item.get("chains", []),
-                "protocols": item.get("protocols", []),
-                "assets": item.get("assets", []),
-                "sources": [{"name": item.get("source", "Unknown"), "url": item.get("url", "")}],
-                "status": "generation_failed",
-                "generated_at": _iso_now(),
-                "reading_time_minutes": 0,
-                "editorial_kind": editorial_kind,
-            }
+    @staticmethod
+    def _item_slug(item: Dict[str, Any]) -> str:
+        return _slugify(item.get("title_pt") or item.get("title") or item["id"])
 
-        try:
-            self.redis.setex(cache_key, 1800, json.dumps(post))
-        except Exception:
-            pass
-        return post
+    @staticmethod
+    def _failed_post(item: Dict[str, Any], slug: str) -> Dict[str, Any]:
+        return {
+            "id": f"post:{slug}",
+            "slug": slug,
+            "title": item.get("title_pt") or item.get("title") or item.get("title_original") or slug,
+            "subtitle": "",
+            "excerpt": "",
+            "body_markdown": "",
+            "tldr": [],
+            "topics": item.get("topics", []),
+            "chains": item.get("chains", []),
+            "protocols": item.get("protocols", []),
+            "assets": item.get("assets", []),
+            "sources": [{"name": item.get("source", "Unknown"), "url": item.get("url", "")}],
+            "status": "generation_failed",
+            "generated_at": _iso_now(),
+            "reading_time_minutes": 0,
+            "editorial_kind": _normalize_post_kind(item.get("editorial_kind")),
+        }
 
     def _cache_key(self, kind: str, seed: str) -> str:
         digest = hashlib.sha1(seed.encode("utf-8")).hexdigest()
@@ -450,10 +431,11 @@ class IntelEnricher:
         title_original = raw_item["title"]
         text = f"{raw_item['title']} {raw_item['url']} {' '.join(raw_item.get('tags', []))}"
         module = _module_hint(title_original, raw_item["url"])
-        topics = _extract_matches(text, TOPIC_RULES)
-        chains = _extract_matches(text, CHAIN_RULES)
-        protocols = _extract_matches(text, PROTOCOL_RULES)
-        assets = _extract_matches(text, ASSET_RULES)
+        matches = _extract_matches(text)
+        topics = matches["topics"]
+        chains = matches["chains"]
+        protocols = matches["protocols"]
+        assets = matches["assets"]
         impact = _impact_score(
             raw_item.get("points", 0),
             raw_item.get("comments", 0),
@@ -489,13 +471,13 @@ class IntelEnricher:
             "surface": _surface(module),
         }
 
-    def _llm_post(self, item: Dict[str, Any]) -> Dict[str, Any] | None:
+    def _post_request(self, item: Dict[str, Any]) -> GenerationRequest | None:
         item_id = item.get("id") or _slugify(item.get("title_pt") or item.get("title") or "intel-item")
         if self.provider == "heuristic":
             logger.info("Intel LLM post skipped for %s: provider set to heuristic", item_id)
             return None
 
-        if not self.api_key:
+        if not self.llm.configured:
             logger.warning("Intel LLM post skipped for %s: OPENAI_API_KEY missing", item_id)
             return None
 
@@ -536,100 +518,51 @@ class IntelEnricher:
             json.dumps(prompt, ensure_ascii=False),
             max_output_tokens,
         )
+        return GenerationRequest(
+            payload=payload,
+            label=f"intel post {item_id}",
+            timeout=INTEL_LLM_TIMEOUT_SECONDS,
+            max_attempts=INTEL_LLM_MAX_ATTEMPTS,
+            validate=lambda text: isinstance(_extract_json(text), dict),
+        )
 
-        for attempt in range(1, INTEL_LLM_MAX_ATTEMPTS + 1):
-            try:
-                response = requests.post(
-                    f"{self.base_url}/responses",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json=payload,
-                    timeout=INTEL_LLM_TIMEOUT_SECONDS,
-                )
-                response.raise_for_status()
-                data = response.json()
-                content = _extract_response_text(data)
-                if not content:
-                    logger.warning(
-                        "Intel LLM post returned empty output for %s: status=%s incomplete_details=%s usage=%s max_output_tokens=%s",
-                        item_id,
-                        data.get("status"),
-                        data.get("incomplete_details"),
-                        data.get("usage"),
-                        max_output_tokens,
-                    )
-                    return None
-                parsed = _extract_json(content)
-                if not isinstance(parsed, dict):
-                    logger.warning("Intel LLM post returned non-JSON payload for %s", item_id)
-                    return None
-
-                slug = _slugify(parsed.get("title") or item.get("title_pt") or item.get("title") or item_id)
-                logger.info("Intel LLM post generation succeeded for %s", item_id)
-                return {
-                    "id": f"post:{slug}",
-                    "slug": slug,
-                    "title": parsed.get("title") or item.get("title_pt") or item.get("title") or item_id,
-                    "subtitle": parsed.get("subtitle") or item.get("why_it_matters", ""),
-                    "excerpt": parsed.get("excerpt") or item.get("summary_pt", ""),
-                    "body_markdown": _clean_body_markdown(parsed.get("body_markdown")),
-                    "tldr": _normalize_tldr(parsed.get("tldr")) or [value for value in [item.get("summary_pt", ""), item.get("why_it_matters", "")] if value],
-                    "topics": item.get("topics", []),
-                    "chains": item.get("chains", []),
-                    "protocols": item.get("protocols", []),
-                    "assets": item.get("assets", []),
-                    "sources": [{"name": item.get("source", "Unknown"), "url": item.get("url", "")}],
-                    "status": "draft",
-                    "generated_at": _iso_now(),
-                    "reading_time_minutes": max(1, round(len((parsed.get("body_markdown") or "").split()) / 180)),
-                    "editorial_kind": editorial_kind,
-                }
-            except requests.HTTPError as exc:
-                response = exc.response
-                status_code = response.status_code if response is not None else None
-                response_body = _truncate_response_body(response.text if response is not None else "")
-                if status_code in {429, 500, 502, 503, 504} and attempt < INTEL_LLM_MAX_ATTEMPTS:
-                    retry_after = _parse_retry_after_seconds(response.headers.get("Retry-After") if response is not None else None)
-                    delay_seconds = retry_after or min(12, attempt * 3)
-                    logger.warning(
-                        "Intel LLM post request retry for %s: attempt=%s/%s status=%s delay=%ss body=%s",
-                        item_id,
-                        attempt,
-                        INTEL_LLM_MAX_ATTEMPTS,
-                        status_code,
-                        delay_seconds,
-                        response_body,
-                    )
-                    time.sleep(delay_seconds)
-                    continue
-
-                logger.warning(
-                    "Intel LLM post request failed for %s: attempt=%s/%s status=%s body=%s",
-                    item_id,
-                    attempt,
-                    INTEL_LLM_MAX_ATTEMPTS,
-                    status_code if status_code is not None else "unknown",
-                    response_body,
-                )
-                return None
-            except requests.Timeout:
-                if attempt < INTEL_LLM_MAX_ATTEMPTS:
-                    delay_seconds = min(10, attempt * 2)
-                    logger.warning(
-                        "Intel LLM post timeout for %s: attempt=%s/%s delay=%ss",
-                        item_id,
-                        attempt,
-                        INTEL_LLM_MAX_ATTEMPTS,
-                        delay_seconds,
-                    )
-                    time.sleep(delay_seconds)
-                    continue
-                logger.warning("Intel LLM post timed out for %s after %s attempts", item_id, INTEL_LLM_MAX_ATTEMPTS)
-                return None
-            except Exception as exc:
-                logger.warning(f"Intel LLM post generation failed: {exc}")
-                return None
+    def _post_from_result(self, item: Dict[str, Any], result: GenerationResult) -> Dict[str, Any] | None:
+        item_id = item.get("id") or _slugify(item.get("title_pt") or item.get("title") or "intel-item")
+        if result.error:
+            logger.warning("Intel LLM post request failed for %s: %s", item_id, result.error)
+            return None
+        if not result.text:
+            logger.warning(
+                "Intel LLM post returned empty output for %s: status=%s incomplete_details=%s usage=%s",
+                item_id,
+                result.data.get("status"),
+                result.data.get("incomplete_details"),
+                result.data.get("usage"),
+            )
+            return None
+        parsed = _extract_json(result.text)
+        if not isinstance(parsed, dict):
+            logger.warning("Intel LLM post returned non-JSON payload for %s", item_id)
+            return None
 
-        return None
+        editorial_kind = _normalize_post_kind(item.get("editorial_kind"))
+        slug = _slugify(parsed.get("title") or item.get("title_pt") or item.get("title") or item_id)
+        logger.info("Intel LLM post generation succeeded for %s (cached=%s)", item_id, result.cached)
+        return {
+            "id": f"post:{slug}",
+            "slug": slug,
+            "title": parsed.get("title") or item.get("title_pt") or item.get("title") or item_id,
+            "subtitle": parsed.get("subtitle") or item.get("why_it_matters", ""),
+            "excerpt": parsed.get("excerpt") or item.get("summary_pt", ""),
+            "body_markdown": _clean_body_markdown(parsed.get("body_markdown")),
+            "tldr": _normalize_tldr(parsed.get("tldr")) or [value for value in [item.get("summary_pt", ""), item.get("why_it_matters", "")] if value],
+            "topics": item.get("topics", []),
+            "chains": item.get("chains", []),
+            "protocols": item.get("protocols", []),
+            "assets": item.get("assets", []),
+            "sources": [{"name": item.get("source", "Unknown"), "url": item.get("url", "")}],
+            "status": "draft",
+            "generated_at": _iso_now(),
+            "reading_time_minutes": max(1, round(len((parsed.get("body_markdown") or "").split()) / 180)),
+            "editorial_kind": editorial_kind,
+        }
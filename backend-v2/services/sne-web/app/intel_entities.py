@@ -0,0 +1,133 @@
+"""
+Compiled entity matching for Intel enrichment, curation and visuals.
+
+Rule terms are normalized once and compiled into an Aho-Corasick automaton
+over words, so a haystack is scanned in a single linear pass no matter how
+many rule groups (topics, chains, assets, countries, organizations...) are
+being extracted.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_FULL_TOKEN_RE = re.compile(r"[a-z0-9]+\Z")
+
+RuleGroups = Mapping[str, Mapping[str, Iterable[str]]]
+
+
+class WordAutomaton:
+    """Aho-Corasick automaton whose alphabet is words instead of characters."""
+
+    def __init__(self, patterns: Iterable[Tuple[Sequence[str], Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+
+        for words, payload in patterns:
+            state = 0
+            for word in words:
+                nxt = self._goto[state].get(word)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][word] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(words), payload))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self._goto[state].items():
+                queue.append(nxt)
+                if state:
+                    fallback = self._fail[state]
+                    while fallback and word not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[nxt] = self._goto[fallback].get(word, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, words: Sequence[str]) -> Iterator[Tuple[int, Any]]:
+        """Yield (start word index, payload) for every occurrence of every pattern."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, word in enumerate(words):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for length, payload in out[state]:
+                yield index - length + 1, payload
+
+
+class EntityMatcher:
+    """
+    Labelled rule groups compiled into word automata built once.
+
+    With split_tokens (enrichment/curation semantics), single-word terms
+    match any [a-z0-9]+ token of the haystack and multi-word terms match
+    whole space-separated words; otherwise every term matches whole
+    space-separated words (visuals semantics).
+    """
+
+    def __init__(
+        self,
+        groups: RuleGroups,
+        normalize: Callable[[str], str],
+        *,
+        split_tokens: bool = True,
+    ):
+        self.normalize = normalize
+        self.split_tokens = split_tokens
+        self.groups = tuple(groups)
+        self._order = {
+            group: {label: index for index, label in enumerate(rules)}
+            for group, rules in groups.items()
+        }
+        phrases: List[Tuple[Sequence[str], Any]] = []
+        tokens: List[Tuple[Sequence[str], Any]] = []
+        for group, rules in groups.items():
+            for label, terms in rules.items():
+                for term in terms:
+                    normalized = normalize(str(term))
+                    if not normalized:
+                        continue
+                    target = (group, label)
+                    if split_tokens and " " not in normalized:
+                        # compared against [a-z0-9]+ tokens; anything else can never match
+                        if _FULL_TOKEN_RE.match(normalized):
+                            tokens.append(((normalized,), target))
+                    else:
+                        phrases.append((tuple(normalized.split(" ")), target))
+        self._phrases = WordAutomaton(phrases)
+        self._tokens = WordAutomaton(tokens)
+
+    def positions(self, text: str, *, normalized: bool = False) -> Dict[str, Dict[str, int]]:
+        """
+        First word index of each matched label, per group.
+
+        Labels come back in rule order; indexes are only comparable within
+        the same group kind (phrase words vs tokens).
+        """
+        haystack = text if normalized else self.normalize(text)
+        found: Dict[Tuple[str, str], int] = {}
+        for position, target in self._phrases.scan(haystack.split(" ")):
+            if position < found.get(target, position + 1):
+                found[target] = position
+        if self.split_tokens:
+            for position, target in self._tokens.scan(_TOKEN_RE.findall(haystack)):
+                if target not in found:
+                    found[target] = position
+
+        result: Dict[str, Dict[str, int]] = {group: {} for group in self.groups}
+        for (group, label), position in sorted(found.items(), key=lambda item: self._order[item[0][0]][item[0][1]]):
+            result[group][label] = position
+        return result
+
+    def match(self, text: str, *, normalized: bool = False) -> Dict[str, List[str]]:
+        """Matched labels per group, in rule order."""
+        return {group: list(labels) for group, labels in self.positions(text, normalized=normalized).items()}
@@ -6,6 +6,7 @@ Combines multi-source ingestion, curation, enrichment and editorial drafts.
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 import logging
 import os
 import re
@@ -14,10 +15,14 @@ from typing import Any, Dict, List
 from urllib.parse import urlparse
 from zoneinfo import ZoneInfo
 
+from .dedupe_index import DedupeIndex, MemoryStore
 from .intel_enrichment import IntelEnricher
+from .intel_entities import EntityMatcher
 from .intel_sources import fetch_multi_source_entries
 from .intel_visuals import apply_visual_entities
 from .market_service import build_home_market_payload
+from .post_store import PostStore
+from .sitemap_service import refresh_sitemaps
 from .utils.redis_safe import SafeRedis
 
 logger = logging.getLogger(__name__)
@@ -120,13 +125,16 @@ BLOG_REFRESH_INSERT_LIMIT = _env_int("INTEL_BLOG_REFRESH_INSERT_LIMIT", 3)
 MARKET_POST_ASSET_DAILY_LIMIT = 1
 MARKET_POST_RECENT_WINDOW = 3
 MARKET_POST_RECENT_CAP = 1
-POST_CACHE_KEY = "intel:enterprise:posts"
-POST_CACHE_META_KEY = "intel:enterprise:posts:meta"
+POST_STORE_NAMESPACE = "intel:enterprise"
+# single-blob cache used before the post store; read once to migrate
+LEGACY_POST_CACHE_KEY = "intel:enterprise:posts"
 POST_REFRESH_LOCK_KEY = "intel:enterprise:refreshing"
 POST_CACHE_TTL_SECONDS = 86400
 POST_REFRESH_INTERVAL = timedelta(minutes=_env_int("INTEL_POST_REFRESH_INTERVAL_MINUTES", 5))
 POST_REFRESH_LOCK_TTL_SECONDS = _env_int("INTEL_POST_REFRESH_LOCK_TTL_SECONDS", 600, minimum=60)
 DEFAULT_INTEL_RESET_TZ = "America/Sao_Paulo"
+# in-call dedupe (feed entries, stored posts): markers never age out
+ENTRY_DEDUPE_TTL_SECONDS = 365 * 24 * 60 * 60
 
 
 def _iso_now() -> str:
@@ -172,28 +180,30 @@ def _normalized_text(text: str) -> str:
     return re.sub(r"\s+", " ", lowered).strip()
 
 
-def _tokenize(text: str) -> set[str]:
-    return set(re.findall(r"[a-z0-9]+", _normalized_text(text)))
+_RELEVANCE_MATCHER = EntityMatcher(
+    {
+        "crypto": {token: [token] for token in CRYPTO_RELEVANCE_TOKENS},
+        "broader": {token: [token] for token in BROADER_RELEVANCE_TOKENS},
+    },
+    _normalized_text,
+)
 
 
-def _relevance_hits(entry: Dict[str, Any]) -> set[str]:
-    text = " ".join([
-        entry.get("title", ""),
-        entry.get("url", ""),
-        " ".join(entry.get("tags", [])),
-        entry.get("source", ""),
-    ])
-    return _tokenize(text).intersection(CRYPTO_RELEVANCE_TOKENS)
+@lru_cache(maxsize=2048)
+def _relevance_hits_for_text(text: str) -> tuple[frozenset[str], frozenset[str]]:
+    matches = _RELEVANCE_MATCHER.match(text)
+    return frozenset(matches["crypto"]), frozenset(matches["broader"])
 
 
-def _broader_relevance_hits(entry: Dict[str, Any]) -> set[str]:
+def _relevance_hits(entry: Dict[str, Any]) -> tuple[frozenset[str], frozenset[str]]:
+    """Crypto and broader relevance tokens found in the entry, from one scan."""
     text = " ".join([
         entry.get("title", ""),
         entry.get("url", ""),
         " ".join(entry.get("tags", [])),
         entry.get("source", ""),
     ])
-    return _tokenize(text).intersection(BROADER_RELEVANCE_TOKENS)
+    return _relevance_hits_for_text(text)
 
 
 def _recency_score(created_at: str) -> int:
@@ -221,8 +231,7 @@ def _source_weight(source_tier: str) -> int:
 
 
 def _curation_score(entry: Dict[str, Any]) -> int:
-    relevance_hits = _relevance_hits(entry)
-    broader_hits = _broader_relevance_hits(entry)
+    relevance_hits, broader_hits = _relevance_hits(entry)
     keyword_bonus = (len(relevance_hits) * 8) + (len(broader_hits) * 5)
     source_penalty = -18 if entry.get("source_key") in GENERALIST_SOURCES else 0
     return (
@@ -239,8 +248,7 @@ def _is_relevant_entry(entry: Dict[str, Any]) -> bool:
     if entry.get("source_tier") in {"protocol"}:
         return True
 
-    relevance_hits = _relevance_hits(entry)
-    broader_hits = _broader_relevance_hits(entry)
+    relevance_hits, broader_hits = _relevance_hits(entry)
     if entry.get("source_tier") == "media" and entry.get("source_key") not in GENERALIST_SOURCES:
         return True
     if entry.get("source_key") in GENERALIST_SOURCES:
@@ -249,17 +257,17 @@ def _is_relevant_entry(entry: Dict[str, Any]) -> bool:
 
 
 def _dedupe(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    seen_titles: set[str] = set()
-    seen_urls: set[str] = set()
+    index = DedupeIndex(MemoryStore(), "intel:entries", ttl_seconds=ENTRY_DEDUPE_TTL_SECONDS)
     deduped: List[Dict[str, Any]] = []
 
     for entry in entries:
-        normalized_title = _normalize_title(entry["title"])
-        normalized_url = urlparse(entry["url"])._replace(query="", fragment="").geturl()
-        if normalized_title in seen_titles or normalized_url in seen_urls:
+        keys = {
+            "title": [_normalize_title(entry["title"])],
+            "url": [urlparse(entry["url"])._replace(query="", fragment="").geturl()],
+        }
+        if index.find("all", keys):
             continue
-        seen_titles.add(normalized_title)
-        seen_urls.add(normalized_url)
+        index.add("all", str(len(deduped)), keys)
         deduped.append(entry)
 
     return deduped
@@ -431,7 +439,7 @@ def _recent_market_count(posts: List[Dict[str, Any]], window: int = MARKET_POST_
 def _prune_redundant_posts(posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     ordered = sorted((_normalize_post(post) for post in posts), key=_post_sort_key, reverse=True)
     pruned: List[Dict[str, Any]] = []
-    seen_market_assets: set[tuple[str, str]] = set()
+    index = DedupeIndex(MemoryStore(), "intel:posts", ttl_seconds=ENTRY_DEDUPE_TTL_SECONDS)
 
     for post in ordered:
         if _is_stale_fallback_post(post):
@@ -440,10 +448,10 @@ def _prune_redundant_posts(posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             asset = _post_primary_asset(post)
             if asset:
                 day_key = _reset_day_key(_parse_generated_datetime(post.get("generated_at")))
-                market_key = (day_key, asset)
-                if market_key in seen_market_assets:
+                keys = {"market_asset": [f"{day_key}:{asset}"]}
+                if index.find("market", keys):
                     continue
-                seen_market_assets.add(market_key)
+                index.add("market", str(post.get("id") or len(pruned)), keys)
         pruned.append(post)
 
     return pruned
@@ -613,8 +621,8 @@ def _market_blog_candidates(limit: int = BLOG_MARKET_DAILY_LIMIT) -> List[Dict[s
     return candidates
 
 
-def _load_cached_posts(redis_client: SafeRedis) -> List[Dict[str, Any]]:
-    cached = redis_client.get(POST_CACHE_KEY)
+def _legacy_cached_posts(redis_client: SafeRedis) -> List[Dict[str, Any]]:
+    cached = redis_client.get(LEGACY_POST_CACHE_KEY)
     if not cached:
         return []
     try:
@@ -628,16 +636,21 @@ def _load_cached_posts(redis_client: SafeRedis) -> List[Dict[str, Any]]:
         return []
 
 
-def _load_cached_posts_meta(redis_client: SafeRedis) -> Dict[str, Any]:
-    cached = redis_client.get(POST_CACHE_META_KEY)
-    if not cached:
-        return {}
+def _post_store(redis_client: SafeRedis) -> PostStore:
+    return PostStore(
+        redis_client,
+        POST_STORE_NAMESPACE,
+        ttl_seconds=POST_CACHE_TTL_SECONDS,
+        legacy_loader=_legacy_cached_posts,
+    )
+
+
+def _load_cached_posts(store: PostStore, *, include_body: bool = False) -> List[Dict[str, Any]]:
+    """Stored posts newest first; summaries unless the markdown body is needed."""
     try:
-        import json
-        payload = json.loads(cached)
-        return payload if isinstance(payload, dict) else {}
+        return store.posts() if include_body else store.summaries()
     except Exception:
-        return {}
+        return []
 
 
 def _parse_iso_datetime(value: str | None) -> datetime | None:
@@ -657,18 +670,17 @@ def _latest_posts_timestamp(posts: List[Dict[str, Any]]) -> str:
     return _iso_now()
 
 
-def _cached_posts_last_updated(redis_client: SafeRedis, posts: List[Dict[str, Any]]) -> str:
-    meta = _load_cached_posts_meta(redis_client)
-    cached_at = str(meta.get("cached_at") or "").strip()
+def _cached_posts_last_updated(store: PostStore, posts: List[Dict[str, Any]]) -> str:
+    cached_at = str(store.meta().get("cached_at") or "").strip()
     if cached_at:
         return cached_at
     return _latest_posts_timestamp(posts)
 
 
-def _cached_posts_are_stale(redis_client: SafeRedis, posts: List[Dict[str, Any]]) -> bool:
+def _cached_posts_are_stale(store: PostStore, posts: List[Dict[str, Any]]) -> bool:
     if not posts:
         return True
-    last_updated = _cached_posts_last_updated(redis_client, posts)
+    last_updated = _cached_posts_last_updated(store, posts)
     last_updated_dt = _parse_iso_datetime(last_updated)
     if not last_updated_dt:
         return True
@@ -684,40 +696,29 @@ def _needs_daily_backfill(posts: List[Dict[str, Any]]) -> bool:
     return _blog_daily_post_count(posts) < BLOG_MIN_DAILY_POSTS
 
 
-def _posts_need_refresh(redis_client: SafeRedis, posts: List[Dict[str, Any]], limit: int) -> bool:
+def _posts_need_refresh(store: PostStore, posts: List[Dict[str, Any]], limit: int) -> bool:
     return (
         len(posts) < min(limit, BLOG_TOTAL_LIMIT)
-        or _cached_posts_are_stale(redis_client, posts)
+        or _cached_posts_are_stale(store, posts)
         or _needs_daily_backfill(posts)
     )
 
 
-def _store_cached_posts(redis_client: SafeRedis, posts: List[Dict[str, Any]]) -> None:
+def _store_cached_posts(store: PostStore, posts: List[Dict[str, Any]]) -> None:
     try:
-        import json
         ordered = _prune_redundant_posts(posts)
-        cached_at = _iso_now()
-        posts_stored = redis_client.setex(POST_CACHE_KEY, POST_CACHE_TTL_SECONDS, json.dumps(ordered))
-        meta_stored = redis_client.setex(
-            POST_CACHE_META_KEY,
-            POST_CACHE_TTL_SECONDS,
-            json.dumps(
-                {
-                    "cached_at": cached_at,
-                    "latest_generated_at": _latest_posts_timestamp(ordered),
-                    "count": len(ordered),
-                }
-            ),
+        written = store.sync(
+            ordered,
+            meta={
+                "cached_at": _iso_now(),
+                "latest_generated_at": _latest_posts_timestamp(ordered),
+            },
         )
-        if not posts_stored or not meta_stored:
-            logger.warning(
-                "Intel post cache store failed: posts_stored=%s meta_stored=%s count=%s",
-                posts_stored,
-                meta_stored,
-                len(ordered),
-            )
+        logger.info("Intel post store synced: count=%s written=%s", len(ordered), written)
     except Exception as exc:
         logger.warning("Intel post cache store failed: %s", exc)
+        return
+    refresh_sitemaps()
 
 
 def _blog_daily_count(redis_client: SafeRedis) -> int:
@@ -763,9 +764,10 @@ def _auto_publish_new_intel_post(slug: str) -> None:
 
 def _refresh_enterprise_posts(limit: int = BLOG_DAILY_LIMIT) -> None:
     redis_client = SafeRedis()
+    store = _post_store(redis_client)
     try:
-        existing = _load_cached_posts(redis_client)
-        cache_stale = _cached_posts_are_stale(redis_client, existing)
+        existing = _load_cached_posts(store, include_body=True)
+        cache_stale = _cached_posts_are_stale(store, existing)
 
         enricher = IntelEnricher()
         posts = list(existing)[:BLOG_TOTAL_LIMIT]
@@ -800,35 +802,37 @@ def _refresh_enterprise_posts(limit: int = BLOG_DAILY_LIMIT) -> None:
         for group in ordered_groups:
             candidates.extend(group)
 
-        for item, category in candidates:
-            if daily_count >= BLOG_DAILY_LIMIT:
-                break
-            if inserted_this_refresh >= refresh_insert_limit:
-                break
+        position = 0
+        while position < len(candidates) and daily_count < BLOG_DAILY_LIMIT and inserted_this_refresh < refresh_insert_limit:
+            # build as many posts as there are open slots at once; the LLM calls run concurrently
+            open_slots = min(refresh_insert_limit - inserted_this_refresh, BLOG_DAILY_LIMIT - daily_count)
+            batch = candidates[position:position + open_slots]
+            position += len(batch)
             try:
-                post = enricher.build_post(item)
+                built = enricher.build_posts([item for item, _ in batch])
             except Exception as exc:
-                logger.warning("Intel enterprise post build failed for %s: %s", item.get("id", item.get("title", "unknown")), exc)
-                continue
-            if post["status"] != "draft":
+                logger.warning("Intel enterprise post build failed for %s items: %s", len(batch), exc)
                 continue
-            if post["slug"] in existing_slugs:
-                continue
-            post["category"] = category
-            post["editorial_kind"] = item.get("editorial_kind") or ("briefing" if category == "market" else "dossier")
-            posts.insert(0, post)
-            existing_slugs.add(post["slug"])
-            _increment_blog_daily_count(redis_client)
-            daily_count += 1
-            inserted_this_refresh += 1
-            if category == "market":
-                market_daily_count += 1
-            posts = _prune_redundant_posts(posts)[:BLOG_TOTAL_LIMIT]
-            inserted_slugs.append(post["slug"])
+            for (item, category), post in zip(batch, built):
+                if post["status"] != "draft":
+                    continue
+                if post["slug"] in existing_slugs:
+                    continue
+                post["category"] = category
+                post["editorial_kind"] = item.get("editorial_kind") or ("briefing" if category == "market" else "dossier")
+                posts.insert(0, post)
+                existing_slugs.add(post["slug"])
+                _increment_blog_daily_count(redis_client)
+                daily_count += 1
+                inserted_this_refresh += 1
+                if category == "market":
+                    market_daily_count += 1
+                posts = _prune_redundant_posts(posts)[:BLOG_TOTAL_LIMIT]
+                inserted_slugs.append(post["slug"])
 
         posts = posts[:BLOG_TOTAL_LIMIT]
 
-        _store_cached_posts(redis_client, posts)
+        _store_cached_posts(store, posts)
         for slug in inserted_slugs:
             _auto_publish_new_intel_post(slug)
     finally:
@@ -861,22 +865,23 @@ def _trigger_enterprise_post_refresh() -> None:
 
 
 def build_intel_briefing(limit: int = 6, limit_per_source: int = 4, include_blog: bool = True) -> Dict[str, Any]:
-    raw_entries = fetch_multi_source_entries(limit_per_source=limit_per_source)
+    redis_client = SafeRedis()
+    raw_entries = fetch_multi_source_entries(limit_per_source=limit_per_source, redis_client=redis_client)
     curated_entries = _curate(raw_entries, limit=max(limit, 8))
     enricher = IntelEnricher()
     raw_items = [apply_visual_entities(enricher.enrich_item(entry)) for entry in curated_entries[:limit]]
     items = list(raw_items)
 
     if include_blog:
-        redis_client = SafeRedis()
-        blog_posts = _load_cached_posts(redis_client)
+        store = _post_store(redis_client)
+        blog_posts = _load_cached_posts(store)
         curated_posts = _curate_home_editorial_posts(blog_posts, max(limit, BLOG_SURFACE_LIMIT))
         blog_items = [_shape_blog_item(post) for post in curated_posts]
-        if blog_posts and (len(blog_posts) < BLOG_DAILY_LIMIT or _cached_posts_are_stale(redis_client, blog_posts)):
+        if blog_posts and (len(blog_posts) < BLOG_DAILY_LIMIT or _cached_posts_are_stale(store, blog_posts)):
             trigger_enterprise_post_refresh(async_refresh=True)
         elif not blog_posts:
             _trigger_enterprise_post_refresh()
-            blog_posts = _load_cached_posts(redis_client)
+            blog_posts = _load_cached_posts(_post_store(redis_client))
             curated_posts = _curate_home_editorial_posts(blog_posts, max(limit, BLOG_SURFACE_LIMIT))
             blog_items = [_shape_blog_item(post) for post in curated_posts]
         items = blog_items[:limit] if blog_items else raw_items[:limit]
@@ -895,35 +900,40 @@ def fetch_intel_items(limit: int = 6) -> List[Dict[str, Any]]:
     return build_intel_briefing(limit=limit)["items"]
 
 
-def fetch_intel_posts(limit: int = 8) -> List[Dict[str, Any]]:
-    redis_client = SafeRedis()
-    posts = _load_cached_posts(redis_client)
-    if _posts_need_refresh(redis_client, posts, limit):
+def fetch_intel_posts(
+    limit: int = 8,
+    *,
+    include_body: bool = True,
+    facet: str | None = None,
+    facet_value: str | None = None,
+) -> List[Dict[str, Any]]:
+    store = _post_store(SafeRedis())
+    posts = _load_cached_posts(store)
+    if _posts_need_refresh(store, posts, limit):
         trigger_enterprise_post_refresh(async_refresh=True)
-    return posts[:limit]
+    if facet:
+        posts = store.summaries(facet=facet, value=facet_value)
+    posts = posts[:limit]
+    return store.get_many(post["slug"] for post in posts) if include_body else posts
 
 
 def fetch_intel_posts_last_updated(limit: int = 8) -> str:
-    redis_client = SafeRedis()
-    posts = _load_cached_posts(redis_client)[:limit]
+    posts = _load_cached_posts(_post_store(SafeRedis()))[:limit]
     return _latest_posts_timestamp(posts)
 
 
 def fetch_intel_posts_state(limit: int = 8) -> Dict[str, Any]:
     redis_client = SafeRedis()
-    posts = _load_cached_posts(redis_client)
+    store = _post_store(redis_client)
+    posts = _load_cached_posts(store)
     return {
         "count": len(posts),
-        "stale": _posts_need_refresh(redis_client, posts, limit),
+        "stale": _posts_need_refresh(store, posts, limit),
         "refreshing": _refresh_is_running(redis_client),
         "last_updated": _latest_posts_timestamp(posts),
-        "cache_updated_at": _cached_posts_last_updated(redis_client, posts) if posts else None,
+        "cache_updated_at": _cached_posts_last_updated(store, posts) if posts else None,
     }
 
 
 def fetch_intel_post(slug: str) -> Dict[str, Any] | None:
-    posts = fetch_intel_posts(limit=BLOG_TOTAL_LIMIT)
-    for post in posts:
-        if post["slug"] == slug:
-            return post
-    return None
+    return _post_store(SafeRedis()).get(slug.strip())
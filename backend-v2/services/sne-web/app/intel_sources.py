@@ -1,6 +1,10 @@
 """
 Intel source ingestion for SNE Web.
 Standardizes public feeds into raw intel entries before enrichment.
+
+Feeds are polled concurrently into a merged entry store (one Redis key) with
+conditional GETs, so unchanged feeds cost a 304 and the request path only
+reads the store.
 """
 
 from __future__ import annotations
@@ -8,18 +12,46 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
+from functools import partial
+import hashlib
+import io
 import json
 import logging
-from typing import Any, Dict, List
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List
 from urllib.parse import urlparse
 import xml.etree.ElementTree as ET
 
-import requests
-
+from . import http_client
 from .utils.redis_safe import SafeRedis
 
 logger = logging.getLogger(__name__)
 
+FEED_STORE_KEY = "intel:feeds:store"
+FEED_POLL_LOCK_KEY = "intel:feeds:poll-lock"
+FEED_POLL_INTERVAL_SECONDS = max(60, int(os.getenv("INTEL_FEED_POLL_INTERVAL_SECONDS", "300")))
+# one poll per interval across workers; a little short so the next tick is not skipped
+FEED_POLL_LOCK_TTL_SECONDS = FEED_POLL_INTERVAL_SECONDS - 5
+FEED_STALE_SECONDS = FEED_POLL_INTERVAL_SECONDS * 2
+FEED_FETCH_TIMEOUT_SECONDS = 12
+# entries kept per source; also how deep a feed is scanned on each poll
+FEED_ENTRIES_PER_SOURCE = 20
+# feeds are newest-first: after this many already-stored items in a row the rest is old
+FEED_KNOWN_STREAK_STOP = 3
+
+_RSS_NAMESPACES = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "content": "http://purl.org/rss/1.0/modules/content/",
+}
+_RSS_ITEM_TAGS = {"item", f"{{{_RSS_NAMESPACES['atom']}}}entry"}
+
+_POLLER_THREAD: threading.Thread | None = None
+_POLLER_LOCK = threading.Lock()
+_REFRESH_LOCK = threading.Lock()
+
 
 @dataclass(frozen=True)
 class IntelSource:
@@ -122,7 +154,9 @@ def _rss_text(node: ET.Element | None, path: str, namespace: Dict[str, str] | No
 
 
 def _entry_id(source_key: str, title: str, url: str) -> str:
-    return f"{source_key}:{abs(hash((title, url))) % 10_000_000_000}"
+    # stable across processes (hash() is salted), since ids now key the shared store
+    digest = hashlib.sha1(f"{title}\n{url}".encode("utf-8")).hexdigest()
+    return f"{source_key}:{int(digest[:12], 16) % 10_000_000_000}"
 
 
 def _parse_hn(payload: Dict[str, Any], source: IntelSource, limit: int) -> List[Dict[str, Any]]:
@@ -149,94 +183,240 @@ def _parse_hn(payload: Dict[str, Any], source: IntelSource, limit: int) -> List[
     return entries
 
 
-def _parse_rss(text: str, source: IntelSource, limit: int) -> List[Dict[str, Any]]:
-    entries: List[Dict[str, Any]] = []
-    root = ET.fromstring(text)
-    namespace = {
-        "atom": "http://www.w3.org/2005/Atom",
-        "dc": "http://purl.org/dc/elements/1.1/",
-        "content": "http://purl.org/rss/1.0/modules/content/",
+def _rss_entry(item: ET.Element, source: IntelSource, entry_id: str, title: str, link: str) -> Dict[str, Any]:
+    created_at = (
+        _rss_text(item, "pubDate")
+        or _rss_text(item, "updated")
+        or _rss_text(item, "atom:updated", _RSS_NAMESPACES)
+    )
+    author = (
+        _rss_text(item, "dc:creator", _RSS_NAMESPACES)
+        or _rss_text(item, "author")
+        or _rss_text(item, "atom:author/atom:name", _RSS_NAMESPACES)
+        or urlparse(source.url).netloc
+    )
+    return {
+        "id": entry_id,
+        "title": title,
+        "url": link,
+        "source": source.name,
+        "source_key": source.key,
+        "source_tier": source.source_tier,
+        "author": author,
+        "created_at": _safe_datetime(created_at),
+        "points": 0,
+        "comments": 0,
+        "tags": list(source.tags),
     }
 
-    items = root.findall(".//channel/item")
-    if not items:
-        items = root.findall(".//atom:entry", namespace)
 
-    for item in items[:limit]:
-        title = _rss_text(item, "title") or _rss_text(item, "atom:title", namespace)
+def _parse_rss(
+    content: bytes | str,
+    source: IntelSource,
+    limit: int,
+    known_ids: Iterable[str] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Parse RSS items / Atom entries one at a time, returning only unknown ones.
+
+    Scans at most `limit` items and stops early once FEED_KNOWN_STREAK_STOP
+    consecutive items are already in `known_ids`.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    known_ids = set(known_ids)
+    entries: List[Dict[str, Any]] = []
+    scanned = 0
+    known_streak = 0
+
+    for _, item in ET.iterparse(io.BytesIO(content), events=("end",)):
+        if item.tag not in _RSS_ITEM_TAGS:
+            continue
+        title = _rss_text(item, "title") or _rss_text(item, "atom:title", _RSS_NAMESPACES)
         link = _rss_text(item, "link")
         if not link:
-            atom_link = item.find("atom:link", namespace)
+            atom_link = item.find("atom:link", _RSS_NAMESPACES)
             if atom_link is not None:
                 link = atom_link.attrib.get("href")
-        created_at = (
-            _rss_text(item, "pubDate")
-            or _rss_text(item, "updated")
-            or _rss_text(item, "atom:updated", namespace)
-        )
-        author = (
-            _rss_text(item, "dc:creator", namespace)
-            or _rss_text(item, "author")
-            or _rss_text(item, "atom:author/atom:name", namespace)
-            or urlparse(source.url).netloc
-        )
-        if not title or not link:
-            continue
-        entries.append({
-            "id": _entry_id(source.key, title, link),
-            "title": title,
-            "url": link,
-            "source": source.name,
-            "source_key": source.key,
-            "source_tier": source.source_tier,
-            "author": author,
-            "created_at": _safe_datetime(created_at),
-            "points": 0,
-            "comments": 0,
-            "tags": list(source.tags),
-        })
+        if title and link:
+            scanned += 1
+            entry_id = _entry_id(source.key, title, link)
+            if entry_id in known_ids:
+                known_streak += 1
+            else:
+                known_streak = 0
+                entries.append(_rss_entry(item, source, entry_id, title, link))
+        item.clear()
+        if scanned >= limit or known_streak >= FEED_KNOWN_STREAK_STOP:
+            break
 
     return entries
 
 
-def _fetch_source(source: IntelSource, limit: int) -> List[Dict[str, Any]]:
-    redis_client = SafeRedis()
-    cache_key = f"intel:source:{source.key}:{limit}"
-    cached = redis_client.get(cache_key)
-    if cached:
-        try:
-            return json.loads(cached)
-        except Exception:
-            pass
+def _merge_entries(fresh: List[Dict[str, Any]], stored: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    fresh_ids = {entry["id"] for entry in fresh}
+    merged = fresh + [entry for entry in stored if entry.get("id") not in fresh_ids]
+    return merged[:FEED_ENTRIES_PER_SOURCE]
+
+
+def _poll_source(source: IntelSource, feed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Conditional GET of one feed; returns its updated store record.
 
-    response = requests.get(source.url, timeout=12)
+    A 304 keeps the stored entries untouched. Otherwise only entries whose
+    id is not stored yet are parsed and put in front of the stored ones.
+    """
+    headers = {}
+    if feed.get("etag"):
+        headers["If-None-Match"] = feed["etag"]
+    if feed.get("last_modified"):
+        headers["If-Modified-Since"] = feed["last_modified"]
+
+    response = http_client.get(source.url, headers=headers, timeout=FEED_FETCH_TIMEOUT_SECONDS)
+    stored = feed.get("entries") or []
+    if response.status_code == 304:
+        return {**feed, "checked_at": _iso_now()}
     response.raise_for_status()
 
     if source.format == "json_hn":
-        entries = _parse_hn(response.json(), source, limit)
+        fresh = _parse_hn(response.json(), source, FEED_ENTRIES_PER_SOURCE)
     elif source.format == "rss":
-        entries = _parse_rss(response.text, source, limit)
+        fresh = _parse_rss(
+            response.content,
+            source,
+            FEED_ENTRIES_PER_SOURCE,
+            known_ids=[entry.get("id") for entry in stored],
+        )
     else:
         raise ValueError(f"Unsupported intel source format: {source.format}")
 
-    if entries:
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "checked_at": _iso_now(),
+        "new_entries": len(fresh),
+        "entries": _merge_entries(fresh, stored),
+    }
+
+
+def _load_store(redis_client: SafeRedis) -> Dict[str, Any]:
+    raw = redis_client.get(FEED_STORE_KEY)
+    if raw:
         try:
-            redis_client.setex(cache_key, 300, json.dumps(entries))
+            store = json.loads(raw)
+            if isinstance(store, dict) and isinstance(store.get("sources"), dict):
+                return store
         except Exception:
             pass
+    return {"updated_at": 0, "sources": {}}
 
-    return entries
 
+def _store_is_stale(store: Dict[str, Any]) -> bool:
+    return time.time() - float(store.get("updated_at") or 0) > FEED_STALE_SECONDS
+
+
+def refresh_sources(redis_client: SafeRedis | None = None) -> Dict[str, Any]:
+    """
+    Poll every configured source concurrently and persist the merged store.
+    Source failures are isolated: a failing feed keeps its stored entries.
+    """
+    redis_client = redis_client or SafeRedis()
+    store = _load_store(redis_client)
+    feeds = store["sources"]
+    results = http_client.run_concurrently(
+        [partial(_poll_source, source, feeds.get(source.key) or {}) for source in DEFAULT_SOURCES]
+    )
+    for source, result in zip(DEFAULT_SOURCES, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Intel source fetch failed for {source.name}: {result}")
+            continue
+        feeds[source.key] = result
+
+    store["updated_at"] = time.time()
+    try:
+        redis_client.set(FEED_STORE_KEY, json.dumps(store))
+    except Exception:
+        pass
+    return store
+
+
+def _claim_poll(redis_client: SafeRedis) -> bool:
+    return bool(redis_client.set_nx(FEED_POLL_LOCK_KEY, "1", FEED_POLL_LOCK_TTL_SECONDS))
 
-def fetch_multi_source_entries(limit_per_source: int = 4) -> List[Dict[str, Any]]:
+
+def _refresh_in_background(redis_client: SafeRedis) -> None:
+    try:
+        refresh_sources(redis_client)
+    except Exception as exc:
+        logger.warning(f"Intel feed refresh failed: {exc}")
+    finally:
+        _REFRESH_LOCK.release()
+
+
+def trigger_source_refresh(redis_client: SafeRedis | None = None) -> bool:
+    """Start a background poll unless one is already running (here or in another worker)."""
+    if not _REFRESH_LOCK.acquire(blocking=False):
+        return False
+    redis_client = redis_client or SafeRedis()
+    if not _claim_poll(redis_client):
+        _REFRESH_LOCK.release()
+        return False
+    thread = threading.Thread(
+        target=_refresh_in_background,
+        args=(redis_client,),
+        name="intel-feed-refresh",
+        daemon=True,
+    )
+    thread.start()
+    return True
+
+
+def fetch_multi_source_entries(limit_per_source: int = 4, redis_client: SafeRedis | None = None) -> List[Dict[str, Any]]:
     """
-    Fetch raw entries from the configured public sources.
-    Source failures are isolated so one bad feed does not break Intel.
+    Latest entries per source, read from the merged feed store.
+
+    Only a cold store (first request, no poller yet) polls inline; a stale
+    store is served as is while a background poll refreshes it.
     """
+    redis_client = redis_client or SafeRedis()
+    store = _load_store(redis_client)
+    if not store["sources"]:
+        store = refresh_sources(redis_client)
+    elif _store_is_stale(store):
+        trigger_source_refresh(redis_client)
+
     entries: List[Dict[str, Any]] = []
     for source in DEFAULT_SOURCES:
-        try:
-            entries.extend(_fetch_source(source, limit_per_source))
-        except Exception as exc:
-            logger.warning(f"Intel source fetch failed for {source.name}: {exc}")
+        feed = store["sources"].get(source.key) or {}
+        entries.extend((feed.get("entries") or [])[:limit_per_source])
     return entries
+
+
+def _poller_loop(interval_seconds: int) -> None:
+    logger.info("Intel feed poller started: sources=%s interval=%ss", len(DEFAULT_SOURCES), interval_seconds)
+    redis_client = SafeRedis()
+    while True:
+        if _claim_poll(redis_client):
+            try:
+                refresh_sources(redis_client)
+            except Exception as exc:
+                logger.exception("Intel feed poll failed: %s", exc)
+        time.sleep(interval_seconds)
+
+
+def start_intel_feed_poller() -> None:
+    if os.getenv("INTEL_FEED_POLLER_ENABLED", "").strip().lower() not in {"1", "true", "yes", "on", "sim"}:
+        logger.info("Intel feed poller disabled")
+        return
+
+    global _POLLER_THREAD
+    with _POLLER_LOCK:
+        if _POLLER_THREAD and _POLLER_THREAD.is_alive():
+            return
+        _POLLER_THREAD = threading.Thread(
+            target=_poller_loop,
+            args=(FEED_POLL_INTERVAL_SECONDS,),
+            name="intel-feed-poller",
+            daemon=True,
+        )
+        _POLLER_THREAD.start()
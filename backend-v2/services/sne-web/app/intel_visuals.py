@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+from functools import lru_cache
 import re
 from typing import Any, Dict, List
 
+from .intel_entities import EntityMatcher
+
 IntelVisualEntity = Dict[str, Any]
 
 _ENTITY_REGISTRY = [
@@ -208,6 +211,27 @@ def _normalize_key(value: Any) -> str:
     return text.strip()
 
 
+def _long_terms(terms: List[Any]) -> List[str]:
+    return [str(term) for term in terms if len(_normalize_key(term)) >= 3]
+
+
+# Editorial haystacks are scanned once for both countries and organizations
+_EDITORIAL_MATCHER = EntityMatcher(
+    {
+        "countries": {country["country_id"]: country["aliases"] for country in _COUNTRY_REGISTRY},
+        "country_terms": {
+            country["id"]: _long_terms([country["label"], *country["aliases"]]) for country in _COUNTRY_REGISTRY
+        },
+        "organizations": {
+            organization["id"]: _long_terms(organization["aliases"]) for organization in _ORGANIZATION_REGISTRY
+        },
+    },
+    _normalize_key,
+    split_tokens=False,
+)
+_COUNTRY_BY_CODE = {str(country["country_id"]): country for country in _COUNTRY_REGISTRY}
+
+
 def _normalize_list(value: Any) -> List[str]:
     if isinstance(value, list):
         return [str(item).strip() for item in value if str(item).strip()]
@@ -239,13 +263,13 @@ def _editorial_haystack(payload: Dict[str, Any]) -> str:
     ])) + " "
 
 
+@lru_cache(maxsize=1024)
+def _haystack_matches(haystack: str) -> Dict[str, Dict[str, int]]:
+    return _EDITORIAL_MATCHER.positions(haystack.strip(" "), normalized=True)
+
+
 def _country_matches_haystack(country: Dict[str, Any], haystack: str) -> bool:
-    terms = [country.get("label"), *country.get("aliases", [])]
-    for term in terms:
-        normalized = _normalize_key(term)
-        if len(normalized) >= 3 and f" {normalized} " in haystack:
-            return True
-    return False
+    return str(country["id"]) in _haystack_matches(haystack)["country_terms"]
 
 
 def infer_countries(payload: Dict[str, Any]) -> List[str]:
@@ -258,7 +282,7 @@ def infer_countries(payload: Dict[str, Any]) -> List[str]:
                 explicit.append(str(resolved["id"]).replace("country-", ""))
         else:
             normalized = _normalize_key(country)
-            country_by_code = next((item for item in _COUNTRY_REGISTRY if str(item.get("country_id")) == normalized), None)
+            country_by_code = _COUNTRY_BY_CODE.get(normalized)
             if country_by_code:
                 if _country_matches_haystack(country_by_code, haystack):
                     explicit.append(str(country_by_code["country_id"]))
@@ -270,11 +294,7 @@ def infer_countries(payload: Dict[str, Any]) -> List[str]:
     if not haystack.strip():
         return []
 
-    matches: List[str] = []
-    for country in _COUNTRY_REGISTRY:
-        if any(f" {_normalize_key(alias)} " in haystack for alias in country["aliases"]):
-            matches.append(str(country["country_id"]))
-    return list(dict.fromkeys(matches))[:2]
+    return list(_haystack_matches(haystack)["countries"])[:2]
 
 
 def infer_organizations(payload: Dict[str, Any]) -> List[str]:
@@ -291,21 +311,9 @@ def infer_organizations(payload: Dict[str, Any]) -> List[str]:
     if not haystack.strip():
         return []
 
-    matches: List[tuple[int, str]] = []
-    for organization in _ORGANIZATION_REGISTRY:
-        positions = []
-        for alias in organization["aliases"]:
-            normalized = _normalize_key(alias)
-            if len(normalized) < 3:
-                continue
-            position = haystack.find(f" {normalized} ")
-            if position >= 0:
-                positions.append(position)
-        if positions:
-            matches.append((min(positions), str(organization["id"])))
-
-    ordered = [entity_id for _, entity_id in sorted(matches, key=lambda item: item[0])]
-    return list(dict.fromkeys(ordered))[:3]
+    # first mention wins; ties keep registry order
+    matches = _haystack_matches(haystack)["organizations"]
+    return sorted(matches, key=matches.__getitem__)[:3]
 
 
 def build_visual_entities(payload: Dict[str, Any], limit: int = 4) -> List[IntelVisualEntity]:
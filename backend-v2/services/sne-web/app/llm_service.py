@@ -0,0 +1,411 @@
+"""
+Shared LLM generation service for Intel posts, institutional posts,
+distribution assets and the market editorial.
+
+Every Responses API call goes through one service that:
+- caches outputs by a hash of the request payload (model, instructions and
+  input), so regenerated slugs and repeated channel assets reuse the answer
+  instead of paying the latency again. Only complete responses that pass the
+  caller's `validate` check are written, so a truncated or non-JSON answer
+  is retried on the next run instead of being served for a week;
+- bounds how many requests run at once and fans batches out on the shared
+  http_client executor, so N candidates take about as long as the slowest;
+- honours Retry-After on 429/5xx and pauses every caller while the provider
+  is throttling, instead of each thread retrying on its own clock.
+
+INTEL_LLM_BACKEND=stub swaps the provider for a local deterministic backend
+(no network, no API key) for tests and local runs.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import requests
+
+from . import http_client
+from .utils.redis_safe import SafeRedis
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return max(minimum, int(raw))
+    except (TypeError, ValueError):
+        logger.warning("Invalid %s=%s. Falling back to %s.", name, raw, default)
+        return default
+
+
+LLM_CACHE_VERSION = "v2"
+LLM_CACHE_PREFIX = f"intel:llm:response:{LLM_CACHE_VERSION}:"
+LLM_CACHE_TTL_SECONDS = _env_int("INTEL_LLM_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60, minimum=60)
+LLM_CONCURRENCY = _env_int("INTEL_LLM_CONCURRENCY", 4)
+LLM_RETRY_STATUSES = {429, 500, 502, 503, 504}
+LLM_STUB_LATENCY_MS = _env_int("INTEL_LLM_STUB_LATENCY_MS", 0, minimum=0)
+
+
+def parse_retry_after_seconds(value: str | None) -> int | None:
+    if not value:
+        return None
+    try:
+        seconds = int(value)
+    except (TypeError, ValueError):
+        return None
+    return max(1, min(seconds, 30))
+
+
+def extract_response_text(data: Dict[str, Any]) -> str:
+    output_text = data.get("output_text")
+    if isinstance(output_text, str) and output_text.strip():
+        return output_text
+
+    output = data.get("output")
+    if not isinstance(output, list):
+        return ""
+
+    chunks: List[str] = []
+    for item in output:
+        if not isinstance(item, dict):
+            continue
+        for content in item.get("content", []):
+            if not isinstance(content, dict):
+                continue
+            text = content.get("text")
+            if isinstance(text, str) and text.strip():
+                chunks.append(text)
+    return "\n".join(chunks).strip()
+
+
+def _truncate(value: str | None, max_chars: int = 1200) -> str:
+    text = (value or "").strip()
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars].rstrip()}…"
+
+
+@dataclass
+class GenerationRequest:
+    """
+    One Responses API call; `label` only identifies it in logs. `validate`
+    receives the output text and decides whether it may be cached (and
+    whether a cached answer is still usable).
+    """
+
+    payload: Dict[str, Any]
+    label: str = "llm"
+    timeout: int = 40
+    max_attempts: int = 1
+    use_cache: bool = True
+    validate: Callable[[str], bool] | None = None
+
+
+@dataclass
+class GenerationResult:
+    text: str = ""
+    cached: bool = False
+    status_code: int | None = None
+    error: str | None = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.text)
+
+    @property
+    def complete(self) -> bool:
+        # the Responses API marks output cut short by max_output_tokens as "incomplete"
+        return self.ok and self.data.get("status", "completed") != "incomplete"
+
+
+class OpenAIBackend:
+    name = "openai"
+
+    def __init__(self, api_key: str | None = None, base_url: str | None = None):
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY")
+        self.base_url = (base_url or os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1").rstrip("/")
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def send(self, payload: Dict[str, Any], timeout: int) -> requests.Response:
+        return http_client.post(
+            f"{self.base_url}/responses",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            json=payload,
+            timeout=timeout,
+        )
+
+
+class _StubResponse:
+    def __init__(self, data: Dict[str, Any], status_code: int = 200, headers: Dict[str, str] | None = None):
+        self._data = data
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = json.dumps(data, ensure_ascii=False)
+
+    def json(self) -> Dict[str, Any]:
+        return self._data
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} stub error", response=self)
+
+
+def _stub_subject(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """The item/post/fact pack the prompt is about, when the input is a JSON prompt."""
+    try:
+        content = str(payload["input"][0]["content"])
+        prompt = json.loads(content[content.index("{"):])
+    except Exception:
+        return {}
+    for key in ("item", "post", "fact_pack"):
+        if isinstance(prompt.get(key), dict):
+            return prompt[key]
+    return prompt if isinstance(prompt, dict) else {}
+
+
+def stub_output(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Deterministic JSON with the fields every caller reads."""
+    subject = _stub_subject(payload)
+    title = str(subject.get("title_pt") or subject.get("title") or subject.get("headline_hint") or "SNE Intel").strip()
+    summary = str(subject.get("summary_pt") or subject.get("excerpt") or subject.get("impact") or title).strip()
+    body = f"{summary}\n\n" + " ".join([f"{title}."] * 40)
+    return {
+        "title": title,
+        "subtitle": summary,
+        "excerpt": summary,
+        "body_markdown": body,
+        "tldr": [summary],
+        "tags": [],
+        "headline": title,
+        "body": f"{title}\n\n{summary}",
+        "impact_line": summary,
+        "action_line": summary,
+        "summary_pt": summary,
+        "watch_items": [],
+        "highlights": [],
+    }
+
+
+class StubBackend:
+    """
+    Local backend answering from a responder callable (stub_output by
+    default) after an optional fixed latency; never touches the network.
+    """
+
+    name = "stub"
+    configured = True
+
+    def __init__(
+        self,
+        responder: Callable[[Dict[str, Any]], Any] | None = None,
+        latency_seconds: float | None = None,
+    ):
+        self.responder = responder or stub_output
+        self.latency_seconds = LLM_STUB_LATENCY_MS / 1000 if latency_seconds is None else latency_seconds
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def send(self, payload: Dict[str, Any], timeout: int) -> _StubResponse:
+        with self._lock:
+            self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        answer = self.responder(payload)
+        if isinstance(answer, _StubResponse):
+            return answer
+        text = answer if isinstance(answer, str) else json.dumps(answer, ensure_ascii=False)
+        return _StubResponse({"status": "completed", "output_text": text})
+
+
+def _default_backend() -> OpenAIBackend | StubBackend:
+    if (os.getenv("INTEL_LLM_BACKEND") or "openai").strip().lower() == "stub":
+        return StubBackend()
+    return OpenAIBackend()
+
+
+class GenerationService:
+    """Cached, concurrency-bounded and throttle-aware Responses API calls."""
+
+    def __init__(
+        self,
+        backend: Any = None,
+        redis_client: Any = None,
+        *,
+        concurrency: int = LLM_CONCURRENCY,
+        cache_ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+    ):
+        self.backend = backend or _default_backend()
+        self.redis = redis_client or SafeRedis()
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._cooldown_until = 0.0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.backend.configured)
+
+    def cache_key(self, payload: Dict[str, Any]) -> str:
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.sha256(f"{self.backend.name}\n{encoded}".encode("utf-8")).hexdigest()
+        return f"{LLM_CACHE_PREFIX}{digest}"
+
+    def _cached_text(self, key: str) -> str | None:
+        cached = self.redis.get(key)
+        if not cached:
+            return None
+        try:
+            text = json.loads(cached).get("text")
+        except Exception:
+            return None
+        return text if isinstance(text, str) and text else None
+
+    @staticmethod
+    def _cacheable(request: GenerationRequest, result: GenerationResult) -> bool:
+        if not result.complete:
+            return False
+        if request.validate is None:
+            return True
+        try:
+            return bool(request.validate(result.text))
+        except Exception as exc:
+            logger.warning("LLM output validation failed for %s: %s", request.label, exc)
+            return False
+
+    def generate(self, request: GenerationRequest) -> GenerationResult:
+        if not request.use_cache:
+            return self._call(request)
+
+        key = self.cache_key(request.payload)
+        while True:
+            text = self._cached_text(key)
+            if text:
+                cached = GenerationResult(text=text, cached=True)
+                if self._cacheable(request, cached):
+                    return cached
+            with self._lock:
+                waiter = self._in_flight.get(key)
+                if waiter is None:
+                    self._in_flight[key] = threading.Event()
+                    break
+            # same prompt already being generated by another thread: reuse its answer
+            waiter.wait(request.timeout * request.max_attempts)
+            if key not in self._in_flight and not self._cached_text(key):
+                return self._call(request)
+
+        try:
+            result = self._call(request)
+            if self._cacheable(request, result):
+                self.redis.setex(
+                    key,
+                    self.cache_ttl_seconds,
+                    json.dumps({"text": result.text, "stored_at": time.time()}, ensure_ascii=False),
+                )
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key).set()
+
+    def generate_many(self, requests_: Sequence[GenerationRequest]) -> List[GenerationResult]:
+        """Run a batch concurrently; results come back in request order."""
+        results = http_client.run_concurrently(
+            [lambda request=request: self.generate(request) for request in requests_]
+        )
+        return [
+            result if isinstance(result, GenerationResult) else GenerationResult(error=str(result))
+            for result in results
+        ]
+
+    def _wait_cooldown(self) -> None:
+        delay = self._cooldown_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _throttle(self, seconds: float) -> None:
+        with self._lock:
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + seconds)
+
+    def _call(self, request: GenerationRequest) -> GenerationResult:
+        attempts = max(1, request.max_attempts)
+        for attempt in range(1, attempts + 1):
+            self._wait_cooldown()
+            try:
+                with self._slots:
+                    response = self.backend.send(request.payload, request.timeout)
+                response.raise_for_status()
+                data = response.json()
+                return GenerationResult(
+                    text=extract_response_text(data),
+                    status_code=response.status_code,
+                    data=data if isinstance(data, dict) else {},
+                )
+            except requests.HTTPError as exc:
+                response = exc.response
+                status_code = response.status_code if response is not None else None
+                body = _truncate(response.text if response is not None else "")
+                if status_code in LLM_RETRY_STATUSES and attempt < attempts:
+                    retry_after = parse_retry_after_seconds(response.headers.get("Retry-After") if response is not None else None)
+                    delay_seconds = retry_after or min(12, attempt * 3)
+                    if retry_after:
+                        self._throttle(retry_after)
+                    logger.warning(
+                        "LLM request retry for %s: attempt=%s/%s status=%s delay=%ss body=%s",
+                        request.label,
+                        attempt,
+                        attempts,
+                        status_code,
+                        delay_seconds,
+                        body,
+                    )
+                    time.sleep(delay_seconds)
+                    continue
+                return GenerationResult(
+                    status_code=status_code,
+                    error=f"status={status_code if status_code is not None else 'unknown'} body={body}",
+                )
+            except requests.Timeout:
+                if attempt < attempts:
+                    delay_seconds = min(10, attempt * 2)
+                    logger.warning(
+                        "LLM request timeout for %s: attempt=%s/%s delay=%ss",
+                        request.label,
+                        attempt,
+                        attempts,
+                        delay_seconds,
+                    )
+                    time.sleep(delay_seconds)
+                    continue
+                return GenerationResult(error=f"timed out after {attempts} attempts")
+            except Exception as exc:
+                return GenerationResult(error=str(exc))
+        return GenerationResult(error="no attempts left")
+
+
+_service: Optional[GenerationService] = None
+_service_lock = threading.Lock()
+
+
+def get_generation_service() -> GenerationService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = GenerationService()
+    return _service
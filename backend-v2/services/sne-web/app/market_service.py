@@ -13,9 +13,8 @@ import re
 import threading
 from typing import Any, Dict, List
 
-import requests
-
 from .collector_client import RADAR_MARKET_UNIVERSE, get_binance_data
+from .llm_service import GenerationRequest, get_generation_service
 from .utils.redis_safe import SafeRedis
 
 logger = logging.getLogger(__name__)
@@ -91,35 +90,6 @@ def _openai_responses_payload(model: str, instructions: str, user_input: str) ->
     return payload
 
 
-def _extract_response_text(data: Dict[str, Any]) -> str:
-    output_text = data.get("output_text")
-    if isinstance(output_text, str) and output_text.strip():
-        return output_text
-
-    output = data.get("output")
-    if not isinstance(output, list):
-        return ""
-
-    chunks: List[str] = []
-    for item in output:
-        if not isinstance(item, dict):
-            continue
-        for content in item.get("content", []):
-            if not isinstance(content, dict):
-                continue
-            text = content.get("text")
-            if isinstance(text, str) and text.strip():
-                chunks.append(text)
-    return "\n".join(chunks).strip()
-
-
-def _truncate_response_body(value: str | None, max_chars: int = 1200) -> str:
-    text = (value or "").strip()
-    if len(text) <= max_chars:
-        return text
-    return f"{text[:max_chars].rstrip()}…"
-
-
 def _is_ready_editorial(payload: Dict[str, Any] | None) -> bool:
     return bool(payload) and payload.get("status") == "ready"
 
@@ -217,11 +187,10 @@ def _store_cached_json(redis_client: SafeRedis, key: str, ttl: int, payload: Dic
 
 def _market_editorial_payload(snapshot: Dict[str, Any]) -> Dict[str, Any] | None:
     provider = os.getenv("INTEL_ENRICHMENT_PROVIDER", "heuristic").strip().lower()
-    api_key = os.getenv("OPENAI_API_KEY")
+    llm = get_generation_service()
     model = os.getenv("MARKET_EDITORIAL_MODEL") or os.getenv("INTEL_ENRICHMENT_MODEL", "gpt-4.1-mini")
-    base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
 
-    if provider != "openai" or not api_key:
+    if provider != "openai" or not llm.configured:
         return None
 
     market_payload = {
@@ -231,14 +200,9 @@ def _market_editorial_payload(snapshot: Dict[str, Any]) -> Dict[str, Any] | None
         "volume_leaders": snapshot.get("volume_leaders", [])[:3],
     }
 
-    try:
-        response = requests.post(
-            f"{base_url}/responses",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json=_openai_responses_payload(
+    result = llm.generate(
+        GenerationRequest(
+            payload=_openai_responses_payload(
                 model,
                 (
                     "Voce e um editor de mercado cripto multichain para a Home do SNE OS. "
@@ -247,17 +211,23 @@ def _market_editorial_payload(snapshot: Dict[str, Any]) -> Dict[str, Any] | None
                 ),
                 json.dumps(market_payload, ensure_ascii=False),
             ),
+            label="market editorial",
             timeout=20,
+            validate=lambda text: isinstance(_extract_json(text), dict),
         )
-        response.raise_for_status()
-        data = response.json()
-        content = _extract_response_text(data)
+    )
+    if result.error:
+        logger.warning("Market editorial generation failed: %s", result.error)
+        return None
+
+    try:
+        content = result.text
         if not content:
             logger.warning(
                 "Market editorial returned empty output: status=%s incomplete_details=%s usage=%s",
-                data.get("status"),
-                data.get("incomplete_details"),
-                data.get("usage"),
+                result.data.get("status"),
+                result.data.get("incomplete_details"),
+                result.data.get("usage"),
             )
             return None
         parsed = _extract_json(content)
@@ -284,14 +254,6 @@ def _market_editorial_payload(snapshot: Dict[str, Any]) -> Dict[str, Any] | None
             "highlights": highlights[:3],
             "generated_at": _iso_now(),
         }
-    except requests.HTTPError as exc:
-        response = exc.response
-        logger.warning(
-            "Market editorial generation failed: status=%s body=%s",
-            response.status_code if response is not None else "unknown",
-            _truncate_response_body(response.text if response is not None else ""),
-        )
-        return None
     except Exception as exc:
         logger.warning("Market editorial generation failed: %s", exc)
         return None
@@ -50,25 +50,43 @@ def make_json_serializable(obj):
         except (TypeError, ValueError):
             return str(obj)
 
-def analisar_par(symbol: str = "BTCUSDT", timeframe: str = "1h") -> dict:
+# Seções que alimentam o resumo da resposta (sempre calculadas)
+SECOES_RESUMO = ("sintese", "confluencia", "niveis_operacionais")
+
+
+def analisar_par(symbol: str = "BTCUSDT", timeframe: str = "1h", secoes=None) -> dict:
     """
     Analisa um par de trading usando o motor SNE completo
     
     Args:
         symbol: Par de trading (ex: BTCUSDT)
         timeframe: Timeframe (ex: 1h, 15m)
+        secoes: Seções extras do motor em full_analysis (ex: ["estrutura", "padroes"]);
+            None devolve a análise completa
     
     Returns:
         dict: Resultado da análise completa
     """
     try:
         # Importar motor_renan
-        from motor_renan import analise_completa
+        from motor_renan import analise_completa, normalizar_secoes
         
         logger.info(f"Analisando {symbol} no timeframe {timeframe}")
         
-        # Executar análise completa
-        resultado = analise_completa(symbol, timeframe)
+        if secoes is not None:
+            try:
+                secoes = normalizar_secoes(list(secoes) + list(SECOES_RESUMO))
+            except ValueError as e:
+                return {
+                    'status': 'error',
+                    'error': str(e),
+                    'error_type': 'invalid_sections',
+                    'symbol': symbol,
+                    'timeframe': timeframe
+                }
+        
+        # Executar análise (só as seções pedidas e suas dependências)
+        resultado = analise_completa(symbol, timeframe, secoes=secoes)
         
         # Verificar se houve erro
         if 'erro' in resultado:
@@ -172,3 +190,25 @@ def obter_sinal(symbol: str = "BTCUSDT", timeframe: str = "15m") -> dict:
             'error': str(e)
         }
 
+
+
+def configurar_catalogo_magnetico(app) -> None:
+    """
+    Liga o catálogo de zonas magnéticas ao Postgres e ao Redis do app
+
+    Sem Postgres o catálogo segue no CSV local do processo.
+    """
+    try:
+        from catalogo_magnetico import configurar_store
+        from .extensions import db
+        from .utils.redis_safe import SafeRedis
+
+        with app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                logger.info("Catálogo magnético em CSV local (banco não é Postgres)")
+                return
+            conexao = db.engine.raw_connection()
+        configurar_store(db_connection=conexao, redis_client=SafeRedis())
+        logger.info("Catálogo magnético persistido no Postgres")
+    except Exception as e:
+        logger.warning(f"Catálogo magnético sem persistência compartilhada: {e}")
@@ -0,0 +1,229 @@
+"""
+Structured storage for Intel posts.
+
+Each post is its own record keyed by slug, and a small index document keeps
+the posts ordered by generated_at as summary projections (everything but the
+markdown body), plus secondary indexes by topic, chain and asset. A slug
+lookup is one GET, a list page is one GET of the index (plus one MGET when
+bodies are needed) and a sync only rewrites the records whose content
+changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BODY_FIELDS = ("body_markdown",)
+FACET_FIELDS = ("topics", "chains", "assets")
+_INDEX_FIELDS = ("count", "posts", "hashes", "facets")
+
+
+def post_sort_key(post: Dict[str, Any]) -> str:
+    return str(post.get("generated_at") or post.get("created_at") or "")
+
+
+def summarize_post(post: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary projection: the post without its body fields."""
+    return {key: value for key, value in post.items() if key not in BODY_FIELDS}
+
+
+def facet_value(value: Any) -> str:
+    return str(value).strip().lower()
+
+
+def _content_hash(post: Dict[str, Any]) -> str:
+    encoded = json.dumps(post, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def _loads(raw: Optional[str]) -> Any:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except Exception:
+        return None
+
+
+class PostStore:
+    """
+    Post records plus an ordered summary index over a SafeRedis-like store.
+
+    Records live at `{namespace}:post:{slug}` and the index at
+    `{namespace}:posts:index`. With ttl_seconds every key is written with
+    SETEX and unchanged records only get their TTL renewed on sync; without
+    it keys are persistent. `legacy_loader` is called once when the index is
+    missing and may return the posts of an older storage layout to migrate.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        namespace: str,
+        *,
+        ttl_seconds: int | None = None,
+        legacy_loader: Callable[[Any], Optional[List[Dict[str, Any]]]] | None = None,
+    ):
+        self.redis = redis_client
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.legacy_loader = legacy_loader
+        self._index: Dict[str, Any] | None = None
+
+    @property
+    def index_key(self) -> str:
+        return f"{self.namespace}:posts:index"
+
+    def record_key(self, slug: str) -> str:
+        return f"{self.namespace}:post:{slug}"
+
+    def _write(self, key: str, payload: Any) -> bool:
+        encoded = json.dumps(payload, ensure_ascii=False)
+        if self.ttl_seconds:
+            return bool(self.redis.setex(key, self.ttl_seconds, encoded))
+        return bool(self.redis.set(key, encoded))
+
+    def load_index(self) -> Dict[str, Any]:
+        """Index document: caller meta plus {count, posts: [summaries], hashes: {slug: hash}, facets}."""
+        if self._index is not None:
+            return self._index
+        payload = _loads(self.redis.get(self.index_key))
+        if not isinstance(payload, dict) and self.legacy_loader is not None:
+            legacy = self.legacy_loader(self.redis)
+            if legacy:
+                self.sync(legacy)
+                return self._index or {}
+        self._index = payload if isinstance(payload, dict) else {}
+        return self._index
+
+    def summaries(
+        self,
+        *,
+        limit: int | None = None,
+        facet: str | None = None,
+        value: Any = None,
+        where: Callable[[Dict[str, Any]], bool] | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Summaries newest first, optionally restricted to one facet value and/or a predicate."""
+        index = self.load_index()
+        posts = [post for post in index.get("posts") or [] if isinstance(post, dict)]
+        if facet:
+            slugs = set((index.get("facets") or {}).get(facet, {}).get(facet_value(value), []))
+            posts = [post for post in posts if post.get("slug") in slugs]
+        if where is not None:
+            posts = [post for post in posts if where(post)]
+        return posts if limit is None else posts[: max(0, limit)]
+
+    def meta(self) -> Dict[str, Any]:
+        """Caller metadata stored alongside the index (e.g. cached_at)."""
+        return {key: value for key, value in self.load_index().items() if key not in _INDEX_FIELDS}
+
+    def facet_values(self, facet: str) -> List[str]:
+        return sorted((self.load_index().get("facets") or {}).get(facet, {}))
+
+    def get(self, slug: str) -> Dict[str, Any] | None:
+        if not slug:
+            return None
+        payload = _loads(self.redis.get(self.record_key(slug)))
+        return payload if isinstance(payload, dict) else None
+
+    def get_many(self, slugs: Iterable[str]) -> List[Dict[str, Any]]:
+        """Full records in the order given; missing records are skipped."""
+        slugs = [slug for slug in slugs if slug]
+        if not slugs:
+            return []
+        records = [_loads(raw) for raw in self.redis.mget([self.record_key(slug) for slug in slugs])]
+        return [record for record in records if isinstance(record, dict)]
+
+    def posts(self, *, limit: int | None = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Same selection as summaries(), with the full records."""
+        return self.get_many(post.get("slug") for post in self.summaries(limit=limit, **filters))
+
+    def _previous_index(self) -> Dict[str, Any]:
+        if self._index is None:
+            payload = _loads(self.redis.get(self.index_key))
+            self._index = payload if isinstance(payload, dict) else {}
+        return self._index
+
+    def _store_record(self, post: Dict[str, Any], previous_hash: str | None) -> str | None:
+        """Write a record unless its content hash is unchanged; returns the stored hash."""
+        slug = post["slug"]
+        digest = _content_hash(post)
+        if previous_hash == digest:
+            if self.ttl_seconds:
+                self.redis.expire(self.record_key(slug), self.ttl_seconds)
+            return digest
+        if not self._write(self.record_key(slug), post):
+            logger.warning("Post store write failed for %s:%s", self.namespace, slug)
+            return None
+        return digest
+
+    def _store_index(self, summaries: List[Dict[str, Any]], hashes: Dict[str, str], meta: Dict[str, Any]) -> None:
+        facets: Dict[str, Dict[str, List[str]]] = {field: {} for field in FACET_FIELDS}
+        for post in summaries:
+            for field in FACET_FIELDS:
+                values = post.get(field)
+                if not isinstance(values, list):
+                    continue
+                for value in dict.fromkeys(facet_value(item) for item in values if facet_value(item)):
+                    facets[field].setdefault(value, []).append(post["slug"])
+
+        index = {**meta, "count": len(summaries), "posts": summaries, "hashes": hashes, "facets": facets}
+        if not self._write(self.index_key, index):
+            logger.warning("Post store index write failed for %s (count=%s)", self.namespace, len(summaries))
+        self._index = index
+
+    def sync(self, posts: List[Dict[str, Any]], *, meta: Dict[str, Any] | None = None) -> int:
+        """
+        Make the stored set equal to `posts`.
+
+        Only new or changed records are written; unchanged ones get their TTL
+        renewed, records no longer listed are deleted and the index is
+        rewritten. Returns how many records were written.
+        """
+        previous_hashes: Dict[str, str] = self._previous_index().get("hashes") or {}
+
+        ordered: List[Dict[str, Any]] = []
+        seen: set[str] = set()
+        for post in sorted(posts, key=post_sort_key, reverse=True):
+            slug = str(post.get("slug") or "").strip()
+            if slug and slug not in seen:
+                seen.add(slug)
+                ordered.append(post)
+
+        hashes: Dict[str, str] = {}
+        stored: List[Dict[str, Any]] = []
+        for post in ordered:
+            digest = self._store_record(post, previous_hashes.get(post["slug"]))
+            if digest:
+                hashes[post["slug"]] = digest
+                stored.append(post)
+        written = sum(1 for slug, digest in hashes.items() if previous_hashes.get(slug) != digest)
+
+        for slug in set(previous_hashes) - set(hashes):
+            self.redis.delete(self.record_key(slug))
+
+        self._store_index([summarize_post(post) for post in stored], hashes, meta or {})
+        return written
+
+    def upsert(self, post: Dict[str, Any], *, meta: Dict[str, Any] | None = None) -> bool:
+        """Add or replace one post; only its record and the index are written."""
+        slug = str(post.get("slug") or "").strip()
+        if not slug:
+            return False
+        index = self.load_index()
+        hashes = dict(index.get("hashes") or {})
+        digest = self._store_record(post, hashes.get(slug))
+        if not digest:
+            return False
+        hashes[slug] = digest
+        summaries = [summary for summary in index.get("posts") or [] if summary.get("slug") != slug]
+        summaries.append(summarize_post(post))
+        summaries.sort(key=post_sort_key, reverse=True)
+        self._store_index(summaries, hashes, {**self.meta(), **(meta or {})})
+        return True
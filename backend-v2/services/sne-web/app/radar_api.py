@@ -10,6 +10,7 @@ import os
 import time
 from datetime import datetime
 from .common.auth import get_auth_context, require_authenticated_user
+from .candles import CandleSeries
 from .collector_client import get_live_market_snapshot, get_klines
 from .radar_report_delivery import send_radar_report_to_telegram, send_radar_report_to_threads
 from .radar_report_media import get_radar_report_media, store_radar_report_media
@@ -36,23 +37,6 @@ def fail(code: str, message: str, status: int = 400, **details):
 radar_bp = Blueprint("radar", __name__)
 
 
-def _normalize_preview_candle(raw):
-    if not isinstance(raw, (list, tuple)) or len(raw) < 6:
-        return None
-
-    try:
-        return {
-            "timestamp": int(raw[0]),
-            "open": float(raw[1]),
-            "high": float(raw[2]),
-            "low": float(raw[3]),
-            "close": float(raw[4]),
-            "volume": float(raw[5]),
-        }
-    except (TypeError, ValueError):
-        return None
-
-
 def _normalize_report_channels(value):
     requested = value if isinstance(value, list) else [value] if isinstance(value, str) else ["telegram"]
     ordered = []
@@ -210,13 +194,12 @@ def candles_preview():
               pass
 
       raw = get_klines(symbol, timeframe, limit=limit)
-      candles = [_normalize_preview_candle(item) for item in raw or []]
-      candles = [item for item in candles if item and item["close"] > 0]
+      candles = CandleSeries.from_klines(item for item in raw or [] if isinstance(item, (list, tuple)))
 
       payload = {
           "symbol": symbol,
           "timeframe": timeframe,
-          "candles": candles[-limit:],
+          "candles": candles.tail(limit).to_records(),
           "last_updated": datetime.utcnow().isoformat(),
       }
 
@@ -676,7 +659,10 @@ def analyze():
     """
     Request market analysis for specific symbol using SNE motor
     POST /api/radar/analyze
-    Body: { "symbol": "BTCUSDT", "timeframe": "15m", "market": "crypto" }
+    Body: { "symbol": "BTCUSDT", "timeframe": "15m", "market": "crypto", "sections": ["sintese", "niveis"] }
+
+    "sections" is optional; when present only those engine sections (plus the
+    summary ones) are computed and returned in full_analysis.
     """
     from .motor import analisar_par
     from app.utils.redis_safe import SafeRedis
@@ -689,9 +675,16 @@ def analyze():
         symbol = body.get("symbol")
         timeframe = body.get("timeframe", "15m")
         market = body.get("market", "crypto")
+        sections = body.get("sections")
 
         if not symbol:
             return fail("BAD_REQUEST", "Missing symbol", 400)
+        if sections is not None:
+            if isinstance(sections, str):
+                sections = [item for item in sections.split(",") if item.strip()]
+            if not isinstance(sections, list) or not all(isinstance(item, str) for item in sections):
+                return fail("BAD_REQUEST", "sections must be a list of section names", 400)
+            sections = sorted({item.strip().lower() for item in sections})
 
         addr = auth["address"]
         tier = auth.get("tier", "free")
@@ -704,6 +697,8 @@ def analyze():
 
         # Cache key para análise
         cache_key = f"radar:analysis:{addr.lower()}:{symbol}:{timeframe}"
+        if sections is not None:
+            cache_key += f":{','.join(sections)}"
 
         # Verificar cache (5min para análises)
         cached_result = redis_client.get(cache_key)
@@ -716,8 +711,10 @@ def analyze():
         try:
             logger.info(f"Running SNE analysis for {symbol} on {timeframe}")
 
-            resultado = analisar_par(symbol, timeframe)
+            resultado = analisar_par(symbol, timeframe, secoes=sections)
 
+            if resultado.get('error_type') == 'invalid_sections':
+                return fail("BAD_REQUEST", resultado.get('error', 'Invalid sections'), 400)
             if resultado.get('status') == 'error':
                 logger.error(f"SNE motor error: {resultado}")
                 return fail("ANALYSIS_ERROR", "Failed to analyze market data", 500)
@@ -10,6 +10,9 @@ from __future__ import annotations
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
+from .candles import CandleSeries
 from .collector_client import get_klines
 from .radar_service import build_radar_overview
 
@@ -74,96 +77,62 @@ def _valid_until(timeframe: str) -> str:
     return (datetime.now(timezone.utc) + timedelta(minutes=ttl_minutes)).isoformat()
 
 
-def _normalize_candle(raw: Any) -> Optional[Dict[str, float]]:
-    try:
-        if isinstance(raw, dict):
-            return {
-                "timestamp": int(raw.get("timestamp") or raw.get("time") or raw.get("openTime") or 0),
-                "open": _to_float(raw.get("open")),
-                "high": _to_float(raw.get("high")),
-                "low": _to_float(raw.get("low")),
-                "close": _to_float(raw.get("close")),
-                "volume": _to_float(raw.get("volume")),
-            }
-        if isinstance(raw, (list, tuple)) and len(raw) >= 6:
-            return {
-                "timestamp": int(raw[0]),
-                "open": _to_float(raw[1]),
-                "high": _to_float(raw[2]),
-                "low": _to_float(raw[3]),
-                "close": _to_float(raw[4]),
-                "volume": _to_float(raw[5]),
-            }
-    except Exception:
-        return None
-    return None
-
-
-def _fetch_candles(symbol: str, timeframe: str, limit: int = 160) -> List[Dict[str, float]]:
+def _fetch_candles(symbol: str, timeframe: str, limit: int = 160) -> CandleSeries:
     try:
         raw = get_klines(symbol, timeframe, limit=limit)
     except Exception:
-        return []
-    candles = [_normalize_candle(item) for item in raw or []]
-    return [item for item in candles if item and item["close"] > 0]
+        return CandleSeries.empty()
+    return CandleSeries.from_klines(raw)
 
 
-def _sma(values: List[float], period: int) -> Optional[float]:
+def _sma(values: np.ndarray, period: int) -> Optional[float]:
     if len(values) < period:
         return None
-    return sum(values[-period:]) / period
+    return float(values[-period:].mean())
 
 
-def _ema(values: List[float], period: int) -> Optional[float]:
+def _ema(values: np.ndarray, period: int) -> Optional[float]:
     if len(values) < period:
         return None
-    ema_value = sum(values[:period]) / period
+    seed = float(values[:period].mean())
+    rest = values[period:]
+    if not len(rest):
+        return seed
+    # closed form of ema = (value - ema) * k + ema, seeded with the SMA
     multiplier = 2 / (period + 1)
-    for value in values[period:]:
-        ema_value = (value - ema_value) * multiplier + ema_value
-    return ema_value
+    decay = (1 - multiplier) ** np.arange(len(rest) - 1, -1, -1)
+    return float(seed * (1 - multiplier) ** len(rest) + multiplier * np.dot(decay, rest))
 
 
-def _rsi(values: List[float], period: int = 14) -> float:
+def _rsi(values: np.ndarray, period: int = 14) -> float:
     if len(values) < period + 1:
         return 50.0
-    gains: List[float] = []
-    losses: List[float] = []
-    for previous, current in zip(values[-period - 1:-1], values[-period:]):
-        change = current - previous
-        gains.append(max(change, 0.0))
-        losses.append(abs(min(change, 0.0)))
-    avg_gain = sum(gains) / period
-    avg_loss = sum(losses) / period
+    changes = np.diff(values[-period - 1:])
+    avg_gain = float(changes[changes > 0].sum()) / period
+    avg_loss = float(-changes[changes < 0].sum()) / period
     if avg_loss == 0:
         return 100.0
     rs = avg_gain / avg_loss
     return round(100 - (100 / (1 + rs)), 2)
 
 
-def _atr(candles: List[Dict[str, float]], period: int = 14) -> float:
+def _atr(candles: CandleSeries, period: int = 14) -> float:
     if len(candles) < period + 1:
         return 0.0
-    ranges: List[float] = []
     sample = candles[-period - 1:]
-    for index in range(1, len(sample)):
-        current = sample[index]
-        previous = sample[index - 1]
-        true_range = max(
-            current["high"] - current["low"],
-            abs(current["high"] - previous["close"]),
-            abs(current["low"] - previous["close"]),
-        )
-        ranges.append(true_range)
-    return sum(ranges) / len(ranges) if ranges else 0.0
-
-
-def _volume_ratio(candles: List[Dict[str, float]], period: int = 20) -> float:
+    high = sample.high[1:]
+    low = sample.low[1:]
+    previous_close = sample.close[:-1]
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - previous_close), np.abs(low - previous_close)))
+    return float(true_range.mean())
+
+
+def _volume_ratio(candles: CandleSeries, period: int = 20) -> float:
     if len(candles) < 2:
         return 0.0
-    current = candles[-1]["volume"]
-    sample = candles[-period - 1:-1] if len(candles) > period else candles[:-1]
-    average = sum(item["volume"] for item in sample) / max(1, len(sample))
+    current = float(candles.volume[-1])
+    sample = candles.volume[-period - 1:-1] if len(candles) > period else candles.volume[:-1]
+    average = float(sample.sum()) / max(1, len(sample))
     return round(current / average, 2) if average else 0.0
 
 
@@ -191,14 +160,14 @@ def _classify_regime(change_pct: float, trend: str, atr_pct: float) -> str:
     return "consolidacao"
 
 
-def _indicators(candles: List[Dict[str, float]]) -> Dict[str, Any]:
-    closes = [item["close"] for item in candles]
-    price = closes[-1] if closes else 0.0
+def _indicators(candles: CandleSeries) -> Dict[str, Any]:
+    closes = candles.close
+    price = float(closes[-1]) if len(closes) else 0.0
     ema8 = _ema(closes, 8)
     ema21 = _ema(closes, 21)
     sma50 = _sma(closes, 50)
     atr_value = _atr(candles)
-    first_close = closes[0] if closes else price
+    first_close = float(closes[0]) if len(closes) else price
     change_window = ((price - first_close) / first_close) if first_close else 0.0
     trend = _trend_label(price, ema8, ema21, sma50)
     atr_pct = (atr_value / price) * 100 if price else 0.0
@@ -242,12 +211,13 @@ def _score_timeframe(indicators: Dict[str, Any]) -> int:
     return max(0, min(95, score))
 
 
-def _levels(candles: List[Dict[str, float]], price: float) -> Dict[str, Any]:
-    sample = candles[-80:] if len(candles) > 80 else candles
-    lows = sorted({round(item["low"], 8) for item in sample if item["low"] < price}, reverse=True)
-    highs = sorted({round(item["high"], 8) for item in sample if item["high"] > price})
-    support = lows[:3]
-    resistance = highs[:3]
+def _levels(candles: CandleSeries, price: float) -> Dict[str, Any]:
+    sample = candles.tail(80)
+    lows = np.unique(np.round(sample.low[sample.low < price], 8))
+    highs = np.unique(np.round(sample.high[sample.high > price], 8))
+    support = lows[::-1][:3].tolist()
+    resistance = highs[:3].tolist()
+    last = sample.candle(-1) if sample else None
 
     return {
         "supports": [
@@ -258,14 +228,14 @@ def _levels(candles: List[Dict[str, float]], price: float) -> Dict[str, Any]:
             {"price": level, "distance_pct": _distance_pct(price, level), "basis": "recent_high"}
             for level in resistance
         ],
-        "pivot": round((sample[-1]["high"] + sample[-1]["low"] + sample[-1]["close"]) / 3, 8) if sample else None,
+        "pivot": round((last["high"] + last["low"] + last["close"]) / 3, 8) if last else None,
     }
 
 
-def _current_candle(candles: List[Dict[str, float]], timeframe: str) -> Dict[str, Any] | None:
+def _current_candle(candles: CandleSeries, timeframe: str) -> Dict[str, Any] | None:
     if not candles:
         return None
-    candle = candles[-1]
+    candle = candles.candle(-1)
     range_value = candle["high"] - candle["low"]
     body = abs(candle["close"] - candle["open"])
     direction = "alta" if candle["close"] > candle["open"] else "baixa" if candle["close"] < candle["open"] else "neutra"
@@ -9,7 +9,7 @@ HALO distribution card instead of a raw dashboard export.
 from __future__ import annotations
 
 from io import BytesIO
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Tuple
 
 import matplotlib
 
@@ -21,6 +21,7 @@ import mplfinance as mpf
 import pandas as pd
 from matplotlib.transforms import blended_transform_factory
 
+from .candles import CandleSeries
 from .radar_report_service import _fetch_candles
 
 
@@ -103,20 +104,19 @@ def _report_parts(report: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _candles_frame(candles: List[Dict[str, float]]) -> pd.DataFrame:
-    frame = pd.DataFrame(candles)
-    if frame.empty:
-        return frame
-    frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="ms", utc=True)
-    frame = frame.set_index("timestamp")
-    frame = frame.rename(columns={
-        "open": "Open",
-        "high": "High",
-        "low": "Low",
-        "close": "Close",
-        "volume": "Volume",
-    })
-    frame = frame[["Open", "High", "Low", "Close", "Volume"]].astype(float)
+def _candles_frame(candles: CandleSeries) -> pd.DataFrame:
+    if not candles:
+        return pd.DataFrame()
+    frame = pd.DataFrame(
+        {
+            "Open": candles.open,
+            "High": candles.high,
+            "Low": candles.low,
+            "Close": candles.close,
+            "Volume": candles.volume,
+        },
+        index=pd.DatetimeIndex(pd.to_datetime(candles.timestamp, unit="ms", utc=True), name="timestamp"),
+    )
     frame["EMA8"] = frame["Close"].ewm(span=8, adjust=False).mean()
     frame["EMA21"] = frame["Close"].ewm(span=21, adjust=False).mean()
     frame["SMA50"] = frame["Close"].rolling(window=50).mean()
@@ -319,7 +319,7 @@ def render_radar_report_chart(
 ) -> bytes:
     parts = _report_parts(report)
     candles = _fetch_candles(parts["symbol"], parts["timeframe"], limit=max(80, candle_limit))
-    frame = _candles_frame(candles[-candle_limit:])
+    frame = _candles_frame(candles.tail(candle_limit))
 
     fig = plt.figure(figsize=(16, 10), facecolor=BG)
     grid = fig.add_gridspec(
@@ -3,11 +3,19 @@ Radar service for SNE OS.
 Builds regime-first market and decision view models for the Radar page.
 """
 
+import threading
+import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
 from .collector_client import get_live_market_snapshot
 
+# The ticker snapshot only moves every few seconds; overviews inside this window share one ranking pass
+SNAPSHOT_TTL_SECONDS = 5
+RANKING_SIZE = 5
+
 
 def _to_float(value: Any) -> float:
     try:
@@ -39,8 +47,8 @@ def get_radar_snapshot(limit: int = 6) -> List[Dict[str, Any]]:
     return get_live_market_snapshot(limit=limit)
 
 
-def _market_regime(markets: List[Dict[str, Any]]) -> Dict[str, Any]:
-    if not markets:
+def _market_regime(changes: np.ndarray) -> Dict[str, Any]:
+    if not len(changes):
         return {
             "label": "sem dados",
             "tone": "pending",
@@ -48,18 +56,18 @@ def _market_regime(markets: List[Dict[str, Any]]) -> Dict[str, Any]:
             "summary": "O Radar ainda nao tem snapshot suficiente para classificar o mercado.",
         }
 
-    avg_change = sum(_to_float(item.get("change24h")) for item in markets) / len(markets)
-    positive = sum(1 for item in markets if _to_float(item.get("change24h")) > 0)
-    negative = sum(1 for item in markets if _to_float(item.get("change24h")) < 0)
+    avg_change = sum(changes.tolist()) / len(changes)
+    positive = int((changes > 0).sum())
+    negative = int((changes < 0).sum())
 
-    if avg_change >= 0.015 and positive >= max(3, len(markets) // 2):
+    if avg_change >= 0.015 and positive >= max(3, len(changes) // 2):
         return {
             "label": "compra dominante",
             "tone": "active",
             "avg_change_24h": avg_change,
             "summary": "Fluxo comprador domina o universo liquido monitorado pelo Radar.",
         }
-    if avg_change <= -0.015 and negative >= max(3, len(markets) // 2):
+    if avg_change <= -0.015 and negative >= max(3, len(changes) // 2):
         return {
             "label": "venda dominante",
             "tone": "warning",
@@ -74,7 +82,12 @@ def _market_regime(markets: List[Dict[str, Any]]) -> Dict[str, Any]:
     }
 
 
-def _build_rankings(markets: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+def _build_rankings(
+    markets: List[Dict[str, Any]],
+    changes: np.ndarray,
+    volumes: np.ndarray,
+    scores: np.ndarray,
+) -> Dict[str, Any]:
     base = [
         {
             "symbol": item["symbol"],
@@ -86,20 +99,13 @@ def _build_rankings(markets: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, A
         for item in markets
     ]
 
-    momentum = sorted(
-        base,
-        key=lambda item: (abs(_to_float(item.get("change24h"))), _to_float(item.get("score"))),
-        reverse=True,
-    )[:5]
-    liquidity = sorted(
-        base,
-        key=lambda item: _to_float(item.get("volume")),
-        reverse=True,
-    )[:5]
+    # lexsort is stable, so ties keep snapshot order like sorted(..., reverse=True)
+    momentum_order = np.lexsort((-scores, -np.abs(changes)))[:RANKING_SIZE]
+    liquidity_order = np.argsort(-volumes, kind="stable")[:RANKING_SIZE]
 
     return {
-        "momentum": momentum,
-        "liquidity": liquidity,
+        "momentum": [base[index] for index in momentum_order],
+        "liquidity": [base[index] for index in liquidity_order],
     }
 
 
@@ -111,8 +117,7 @@ def _confidence_label(score: float) -> Dict[str, str]:
     return {"label": "baixa", "tone": "warning"}
 
 
-def _liquidity_label(symbol: str, liquidity_rankings: List[Dict[str, Any]]) -> Dict[str, str]:
-    rank = next((index + 1 for index, item in enumerate(liquidity_rankings) if item["symbol"] == symbol), None)
+def _liquidity_label(rank: Optional[int]) -> Dict[str, str]:
     if rank == 1:
         return {"label": "lider", "tone": "success"}
     if rank and rank <= 3:
@@ -122,14 +127,8 @@ def _liquidity_label(symbol: str, liquidity_rankings: List[Dict[str, Any]]) -> D
     return {"label": "estreita", "tone": "warning"}
 
 
-def _execution_risk(
-    featured: Optional[Dict[str, Any]],
-    market_regime: Dict[str, Any],
-    rankings: Dict[str, List[Dict[str, Any]]],
-    authenticated: bool,
-    has_access: bool,
-) -> Dict[str, Any]:
-    if not featured:
+def _execution_risk(fragment: Optional[Dict[str, Any]], authenticated: bool, has_access: bool) -> Dict[str, Any]:
+    if not fragment:
         return {
             "label": "sem dados",
             "tone": "pending",
@@ -138,9 +137,7 @@ def _execution_risk(
             "blockers": ["O Radar nao retornou um ativo em foco nesta janela."],
         }
 
-    change_pct = abs(_to_float(featured.get("change24h")) * 100)
-    score = min(int(change_pct * 8), 95)
-    liquidity = _liquidity_label(featured["symbol"], rankings["liquidity"])
+    score = fragment["risk_score"]
     blockers: List[str] = []
 
     if not authenticated:
@@ -149,17 +146,7 @@ def _execution_risk(
     if not has_access:
         score += 15
         blockers.append("Modo de acesso em previa.")
-    if liquidity["label"] in {"adequada", "estreita"}:
-        score += 20 if liquidity["label"] == "estreita" else 10
-        blockers.append("Liquidez abaixo da lideranca do universo monitorado.")
-    if change_pct >= 5:
-        score += 20
-        blockers.append("Amplitude recente elevada no ativo em foco.")
-    elif change_pct >= 2:
-        score += 10
-    if market_regime.get("label") == "mercado misto":
-        score += 15
-        blockers.append("Regime sem dominancia clara entre compra e venda.")
+    blockers.extend(fragment["risk_blockers"])
 
     score = min(score, 95)
 
@@ -188,27 +175,116 @@ def _execution_risk(
     }
 
 
-def _build_focus_asset(
-    featured: Optional[Dict[str, Any]],
-    signal: Optional[Dict[str, Any]],
-    rankings: Dict[str, List[Dict[str, Any]]],
-) -> Optional[Dict[str, Any]]:
-    if not featured:
+class RadarSnapshot:
+    """
+    One refresh of the Radar universe, held as arrays.
+
+    Regime, rankings and the session-independent part of the execution risk
+    are computed for every symbol in a single pass, so an overview request is
+    a fragment lookup plus auth-specific decoration. Fragments are shared
+    between requests and must be treated as read-only.
+    """
+
+    def __init__(self, markets: List[Dict[str, Any]]):
+        self.markets = markets
+        self.created_at = time.monotonic()
+        changes = np.array([_to_float(item.get("change24h")) for item in markets], dtype=np.float64)
+        volumes = np.array([_to_float(item.get("volume")) for item in markets], dtype=np.float64)
+        scores = np.array([_to_float(item.get("score")) for item in markets], dtype=np.float64)
+
+        self.market_regime = _market_regime(changes)
+        self.rankings = _build_rankings(markets, changes, volumes, scores)
+        self.fragments = self._build_fragments(markets, changes)
+
+    def _build_fragments(self, markets: List[Dict[str, Any]], changes: np.ndarray) -> Dict[str, Dict[str, Any]]:
+        liquidity_rank: Dict[str, int] = {}
+        for index, item in enumerate(self.rankings["liquidity"]):
+            liquidity_rank.setdefault(item["symbol"], index + 1)
+
+        change_pct = np.abs(changes * 100)
+        risk_scores = np.minimum((change_pct * 8).astype(np.int64), 95)
+        risk_scores += np.where(change_pct >= 5, 20, np.where(change_pct >= 2, 10, 0))
+        mixed_regime = self.market_regime.get("label") == "mercado misto"
+        if mixed_regime:
+            risk_scores += 15
+
+        fragments: Dict[str, Dict[str, Any]] = {}
+        for index, item in enumerate(markets):
+            if item["symbol"] in fragments:
+                continue
+            signal = derive_signal_from_ticker(item)
+            liquidity = _liquidity_label(liquidity_rank.get(item["symbol"]))
+            score = int(risk_scores[index])
+            blockers: List[str] = []
+            if liquidity["label"] in {"adequada", "estreita"}:
+                score += 20 if liquidity["label"] == "estreita" else 10
+                blockers.append("Liquidez abaixo da lideranca do universo monitorado.")
+            if change_pct[index] >= 5:
+                blockers.append("Amplitude recente elevada no ativo em foco.")
+            if mixed_regime:
+                blockers.append("Regime sem dominancia clara entre compra e venda.")
+
+            signal_score = int(signal.get("score") or 0)
+            fragments[item["symbol"]] = {
+                "featured": item,
+                "signal": signal,
+                "focus_asset": {
+                    "symbol": item["symbol"],
+                    "price": item["price"],
+                    "change24h": item["change24h"],
+                    "volume": item["volume"],
+                    "score": signal_score,
+                    "confidence": _confidence_label(signal_score),
+                    "liquidity": liquidity,
+                },
+                "risk_score": score,
+                "risk_blockers": blockers,
+            }
+        return fragments
+
+    def fragment(self, active_symbol: Optional[str]) -> Optional[Dict[str, Any]]:
+        if active_symbol and active_symbol in self.fragments:
+            return self.fragments[active_symbol]
+        if self.markets:
+            return self.fragments[self.markets[0]["symbol"]]
         return None
 
-    score = int(signal.get("score") or 0) if signal else 0
-    confidence = _confidence_label(score)
-    liquidity = _liquidity_label(featured["symbol"], rankings["liquidity"])
 
-    return {
-        "symbol": featured["symbol"],
-        "price": featured["price"],
-        "change24h": featured["change24h"],
-        "volume": featured["volume"],
-        "score": score,
-        "confidence": confidence,
-        "liquidity": liquidity,
-    }
+class RadarRankingEngine:
+    """
+    Keeps the latest RadarSnapshot and rebuilds it after SNAPSHOT_TTL_SECONDS.
+
+    The snapshot does not depend on the requested timeframe (it only labels
+    the signal, applied per request), so one snapshot serves every request.
+    """
+
+    def __init__(self, ttl_seconds: float = SNAPSHOT_TTL_SECONDS, limit: int = 20):
+        self.ttl_seconds = ttl_seconds
+        self.limit = limit
+        self._snapshot: Optional[RadarSnapshot] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> RadarSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot.created_at < self.ttl_seconds:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - snapshot.created_at >= self.ttl_seconds:
+                snapshot = RadarSnapshot(get_radar_snapshot(limit=self.limit))
+                self._snapshot = snapshot
+            return snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+
+_ranking_engine = RadarRankingEngine()
+
+
+def get_ranking_engine() -> RadarRankingEngine:
+    return _ranking_engine
 
 
 def _build_hero(
@@ -328,17 +404,16 @@ def _build_next_action(
 
 
 def build_radar_overview(active_symbol: Optional[str], authenticated: bool, has_access: bool, timeframe: str = "24H") -> Dict[str, Any]:
-    markets = get_radar_snapshot(limit=20)
-    movers = markets[:6]
-    featured = next((item for item in markets if item["symbol"] == active_symbol), None) if active_symbol else None
-    if featured is None and movers:
-        featured = movers[0]
-
-    signal = derive_signal_from_ticker(featured, timeframe) if featured else None
-    market_regime = _market_regime(markets)
-    rankings = _build_rankings(markets)
-    focus_asset = _build_focus_asset(featured, signal, rankings)
-    execution_risk = _execution_risk(featured, market_regime, rankings, authenticated, has_access)
+    snapshot = get_ranking_engine().current()
+    markets = snapshot.markets
+    fragment = snapshot.fragment(active_symbol)
+    featured = fragment["featured"] if fragment else None
+    # fragments are shared between requests: copy before labelling with the timeframe
+    signal = {**fragment["signal"], "timeframe": timeframe} if fragment else None
+    market_regime = snapshot.market_regime
+    rankings = snapshot.rankings
+    focus_asset = fragment["focus_asset"] if fragment else None
+    execution_risk = _execution_risk(fragment, authenticated, has_access)
     next_action = _build_next_action(focus_asset, execution_risk, authenticated, has_access)
 
     if not authenticated:
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import json
+
 from flask import Blueprint, Response, abort, request
 
 from .institutional_service import fetch_combined_intel_post
-from .og_image_service import build_intel_og_image, build_intel_share_html, build_static_share_html
+from .og_image_service import build_intel_og_image
+from .share_page_cache import (
+    SHARE_CACHE_CONTROL,
+    intel_share_etag,
+    normalize_surface,
+    render_intel_share,
+    render_static_share,
+)
 
 SITE_ORIGIN = "https://snelabs.space"
 
@@ -34,27 +43,37 @@ STATIC_SHARE_PAGES = {
 share_bp = Blueprint("share", __name__)
 
 
+def _html_response(html: str | None, etag: str) -> Response:
+    response = Response(html or "", mimetype="text/html", status=200 if html is not None else 304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = SHARE_CACHE_CONTROL
+    return response
+
+
 @share_bp.get("/share/intel/<slug>")
 def share_intel_post(slug: str):
     post = fetch_combined_intel_post(slug)
     if not post:
         abort(404)
-    surface = request.args.get("surface", "share").strip().lower()
-    html = build_intel_share_html(post, surface="article" if surface == "article" else "share")
-    response = Response(html, mimetype="text/html")
-    response.headers["Cache-Control"] = "public, max-age=600, s-maxage=3600"
-    return response
+    surface = normalize_surface(request.args.get("surface", "share"))
+    etag = intel_share_etag(post, surface)
+    if etag in request.if_none_match:
+        # revalidations never touch the rendered page
+        return _html_response(None, etag)
+    html, etag = render_intel_share(post, surface)
+    return _html_response(html, etag)
 
 
 @share_bp.get("/share/page/<name>")
 def share_static_page(name: str):
-    payload = STATIC_SHARE_PAGES.get(name.strip().lower())
+    name = name.strip().lower()
+    payload = STATIC_SHARE_PAGES.get(name)
     if not payload:
         abort(404)
-    html = build_static_share_html(**payload)
-    response = Response(html, mimetype="text/html")
-    response.headers["Cache-Control"] = "public, max-age=600, s-maxage=3600"
-    return response
+    html, etag = render_static_share(name, json.dumps(payload, sort_keys=True))
+    if etag in request.if_none_match:
+        return _html_response(None, etag)
+    return _html_response(html, etag)
 
 
 @share_bp.get("/og/intel/<slug>.png")
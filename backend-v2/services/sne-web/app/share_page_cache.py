@@ -0,0 +1,102 @@
+"""
+Rendered-HTML cache for the share pages served by share_api.
+
+Intel share cards are keyed by a hash of the post fields the template reads,
+which also serves as their strong ETag: a crawler revalidation is answered
+from the post record alone, a regenerated post gets a new hash (and a cache
+miss) on its own, and distribution pre-renders both surfaces before a post
+goes out so preview validators and the first crawler wave hit the cache.
+Static share pages only change on deploy and are memoized per process.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from .og_image_service import build_intel_share_html, build_static_share_html
+from .utils.redis_safe import SafeRedis
+
+logger = logging.getLogger(__name__)
+
+# bump when the share templates change so cached pages and ETags roll over
+SHARE_TEMPLATE_VERSION = "v1"
+SHARE_HTML_KEY_PREFIX = f"share:html:{SHARE_TEMPLATE_VERSION}:intel:"
+SHARE_HTML_TTL_SECONDS = max(60, int(os.getenv("SHARE_HTML_TTL_SECONDS", str(7 * 24 * 60 * 60)) or 60))
+SHARE_SURFACES = ("share", "article")
+# browsers revalidate often; the CDN keeps pages longer and serves stale copies while it revalidates
+SHARE_CACHE_CONTROL = "public, max-age=300, s-maxage=3600, stale-while-revalidate=86400, stale-if-error=86400"
+
+_TEMPLATE_FIELDS = ("slug", "title", "excerpt", "subtitle")
+
+
+def _loads(raw: Optional[str]) -> Any:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except Exception:
+        return None
+
+
+def normalize_surface(surface: str | None) -> str:
+    return "article" if (surface or "").strip().lower() == "article" else "share"
+
+
+def intel_share_etag(post: Dict[str, Any], surface: str) -> str:
+    """Content hash of what build_intel_share_html renders for this post and surface."""
+    fields = {field: str(post.get(field) or "") for field in _TEMPLATE_FIELDS}
+    encoded = json.dumps([SHARE_TEMPLATE_VERSION, normalize_surface(surface), fields], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def _html_key(slug: str, surface: str) -> str:
+    return f"{SHARE_HTML_KEY_PREFIX}{slug}:{surface}"
+
+
+def render_intel_share(
+    post: Dict[str, Any],
+    surface: str = "share",
+    redis_client: SafeRedis | None = None,
+) -> Tuple[str, str]:
+    """Cached share HTML for a post; returns (html, etag)."""
+    surface = normalize_surface(surface)
+    etag = intel_share_etag(post, surface)
+    slug = str(post.get("slug") or "")
+    redis_client = redis_client or SafeRedis()
+
+    cached = _loads(redis_client.get(_html_key(slug, surface)))
+    if isinstance(cached, dict) and cached.get("etag") == etag and cached.get("html"):
+        return cached["html"], etag
+
+    html = build_intel_share_html(post, surface=surface)
+    redis_client.setex(
+        _html_key(slug, surface),
+        SHARE_HTML_TTL_SECONDS,
+        json.dumps({"etag": etag, "html": html}, ensure_ascii=False),
+    )
+    return html, etag
+
+
+def prerender_intel_share(post: Dict[str, Any], redis_client: SafeRedis | None = None) -> None:
+    """Render every surface of a post ahead of crawlers; failures only cost a later cache miss."""
+    if not post.get("slug"):
+        return
+    redis_client = redis_client or SafeRedis()
+    for surface in SHARE_SURFACES:
+        try:
+            render_intel_share(post, surface, redis_client)
+        except Exception as exc:
+            logger.warning("Share page pre-render failed for %s (%s): %s", post.get("slug"), surface, exc)
+
+
+@lru_cache(maxsize=16)
+def render_static_share(name: str, payload_json: str) -> Tuple[str, str]:
+    """Static share page HTML and its ETag; the payload is passed as JSON so it can key the memo."""
+    html = build_static_share_html(**json.loads(payload_json))
+    etag = hashlib.sha1(f"{SHARE_TEMPLATE_VERSION}\n{name}\n{html}".encode("utf-8")).hexdigest()
+    return html, etag
@@ -0,0 +1,234 @@
+"""
+Pre-rendered sitemaps for the SEO endpoints.
+
+Sitemaps are rebuilt only when the Intel post set changes: the external and
+institutional post stores call refresh_sitemaps() after they write, and the
+rebuild is skipped when the signature of both store indexes (slug -> content
+hash) is unchanged. Each document is stored rendered, with its gzip encoding,
+ETag and Last-Modified, so serving one is a single cache read. Intel URLs are
+sharded into several urlsets behind the sitemap index once they outgrow
+SEO_SITEMAP_SHARD_SIZE.
+"""
+
+from __future__ import annotations
+
+import base64
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from .collector_client import RADAR_MARKET_UNIVERSE
+from .utils.redis_safe import SafeRedis
+
+logger = logging.getLogger(__name__)
+
+SITE_ORIGIN = "https://snelabs.space"
+INTEL_TOPICS = ("tech", "economia", "geopolitica", "defi", "infra", "ia", "seguranca", "identidade")
+
+SITEMAP_VERSION = "v1"
+SITEMAP_KEY_PREFIX = f"seo:sitemaps:{SITEMAP_VERSION}:"
+MANIFEST_KEY = f"{SITEMAP_KEY_PREFIX}manifest"
+# the protocol allows 50k URLs per urlset; smaller shards keep each response light
+SITEMAP_SHARD_SIZE = max(1, min(int(os.getenv("SEO_SITEMAP_SHARD_SIZE", "5000") or 5000), 50_000))
+SITEMAP_GZIP = os.getenv("SEO_SITEMAP_GZIP", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+_REBUILD_LOCK = threading.Lock()
+
+
+def _doc_key(name: str) -> str:
+    return f"{SITEMAP_KEY_PREFIX}doc:{name}"
+
+
+def _loads(raw: Optional[str]) -> Any:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except Exception:
+        return None
+
+
+def iso_day(value: str | None = None) -> str:
+    if value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).date().isoformat()
+        except Exception:
+            pass
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def sitemap_path(name: str) -> str:
+    """Public path of a stored document: intel-1 keeps the historical intel-sitemap.xml URL."""
+    if name == "index":
+        return "/api/seo/sitemap.xml"
+    if name.startswith("intel-"):
+        page = int(name.split("-", 1)[1])
+        return "/api/seo/intel-sitemap.xml" if page == 1 else f"/api/seo/intel-sitemap-{page}.xml"
+    return f"/api/seo/{name}-sitemap.xml"
+
+
+def render_urlset(urls: Iterable[Tuple[str, str, str, str]]) -> str:
+    """urls: (loc, lastmod, changefreq, priority)."""
+    rows = [
+        f"""  <url>
+    <loc>{escape(loc)}</loc>
+    <lastmod>{lastmod}</lastmod>
+    <changefreq>{changefreq}</changefreq>
+    <priority>{priority}</priority>
+  </url>"""
+        for loc, lastmod, changefreq, priority in urls
+    ]
+    xml = "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
+    xml += "<urlset xmlns=\"http://www.sitemaps.org/schemas/sitemap/0.9\">\n"
+    xml += "\n".join(rows)
+    xml += "\n</urlset>\n"
+    return xml
+
+
+def render_sitemap_index(entries: Iterable[Tuple[str, str]]) -> str:
+    """entries: (loc, lastmod)."""
+    rows = [
+        f"""  <sitemap>
+    <loc>{escape(loc)}</loc>
+    <lastmod>{lastmod}</lastmod>
+  </sitemap>"""
+        for loc, lastmod in entries
+    ]
+    xml = "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
+    xml += "<sitemapindex xmlns=\"http://www.sitemaps.org/schemas/sitemap/0.9\">\n"
+    xml += "\n".join(rows)
+    xml += "\n</sitemapindex>\n"
+    return xml
+
+
+def _post_stores(redis_client: SafeRedis) -> list:
+    from . import institutional_service, intel_service
+
+    # institutional first, like fetch_combined_intel_post resolves slugs
+    return [institutional_service._post_store(redis_client), intel_service._post_store(redis_client)]
+
+
+def post_set_signature(stores: list) -> str:
+    """Changes whenever a post is added, removed or rewritten in either store."""
+    digest = hashlib.sha1()
+    for store in stores:
+        hashes = store.load_index().get("hashes") or {}
+        digest.update(store.namespace.encode("utf-8"))
+        digest.update(json.dumps(sorted(hashes.items())).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_sitemap_documents(stores: list, *, shard_size: int = SITEMAP_SHARD_SIZE) -> Dict[str, str]:
+    """Render every sitemap document from the store indexes; returns {name: xml}, index last."""
+    today = iso_day()
+    posts: List[Dict[str, Any]] = []
+    seen: set[str] = set()
+    taxonomy: Dict[str, set[str]] = {"topics": set(INTEL_TOPICS), "chains": set(), "assets": set()}
+    for store in stores:
+        for post in store.summaries():
+            slug = str(post.get("slug") or "").strip()
+            if slug and slug not in seen:
+                seen.add(slug)
+                posts.append(post)
+        for field, values in taxonomy.items():
+            values.update(value for value in store.facet_values(field) if value)
+    posts.sort(key=lambda post: str(post.get("generated_at") or ""), reverse=True)
+
+    static_urls = [
+        (f"{SITE_ORIGIN}/home", "daily", "1.0"),
+        (f"{SITE_ORIGIN}/radar", "daily", "0.9"),
+        (f"{SITE_ORIGIN}/intel", "hourly", "0.9"),
+        (f"{SITE_ORIGIN}/docs", "weekly", "0.7"),
+        (f"{SITE_ORIGIN}/pricing", "weekly", "0.7"),
+        (f"{SITE_ORIGIN}/status", "daily", "0.6"),
+    ]
+    topic_urls = [(f"{SITE_ORIGIN}/intel/topic/{topic}", "daily", "0.8") for topic in sorted(taxonomy["topics"])]
+    chain_urls = [(f"{SITE_ORIGIN}/intel/chain/{chain}", "daily", "0.8") for chain in sorted(taxonomy["chains"])]
+    asset_urls = [(f"{SITE_ORIGIN}/intel/asset/{asset}", "daily", "0.8") for asset in sorted(taxonomy["assets"])]
+    radar_urls = [(f"{SITE_ORIGIN}/radar/{symbol.lower()}", "hourly", "0.8") for symbol in sorted(RADAR_MARKET_UNIVERSE)]
+    core_urls = [(loc, today, changefreq, priority) for loc, changefreq, priority in [*static_urls, *topic_urls, *chain_urls, *asset_urls, *radar_urls]]
+
+    documents: Dict[str, str] = {"core": render_urlset(core_urls)}
+    index_entries = [(f"{SITE_ORIGIN}{sitemap_path('core')}", today)]
+
+    intel_urls = [
+        (f"{SITE_ORIGIN}/intel/{post['slug']}", iso_day(post.get("generated_at")), "weekly", "0.7")
+        for post in posts
+    ]
+    shards = [intel_urls[start:start + shard_size] for start in range(0, len(intel_urls), shard_size)] or [[]]
+    for page, shard in enumerate(shards, start=1):
+        name = f"intel-{page}"
+        documents[name] = render_urlset(shard)
+        index_entries.append((f"{SITE_ORIGIN}{sitemap_path(name)}", max((url[1] for url in shard), default=today)))
+
+    documents["index"] = render_sitemap_index(index_entries)
+    return documents
+
+
+def _encode_document(xml: str, previous: Dict[str, Any] | None, now: float) -> Dict[str, Any]:
+    etag = hashlib.sha1(xml.encode("utf-8")).hexdigest()
+    unchanged = isinstance(previous, dict) and previous.get("etag") == etag
+    document: Dict[str, Any] = {
+        "etag": etag,
+        # an unchanged document keeps its Last-Modified so crawlers keep getting 304s
+        "last_modified": previous.get("last_modified", now) if unchanged else now,
+        "xml": xml,
+    }
+    if SITEMAP_GZIP:
+        document["gzip"] = base64.b64encode(gzip.compress(xml.encode("utf-8"), mtime=0)).decode("ascii")
+    return document
+
+
+def refresh_sitemaps(*, force: bool = False, redis_client: SafeRedis | None = None) -> bool:
+    """Rebuild and store the sitemaps if the post set changed; returns whether it rebuilt."""
+    redis_client = redis_client or SafeRedis()
+    try:
+        with _REBUILD_LOCK:
+            stores = _post_stores(redis_client)
+            signature = post_set_signature(stores)
+            manifest = _loads(redis_client.get(MANIFEST_KEY)) or {}
+            if not force and manifest.get("signature") == signature:
+                return False
+
+            documents = build_sitemap_documents(stores)
+            names = list(documents)
+            previous = redis_client.mget([_doc_key(name) for name in names])
+            now = time.time()
+            for name, raw in zip(names, previous):
+                stored = _loads(raw)
+                encoded = _encode_document(documents[name], stored, now)
+                if isinstance(stored, dict) and stored.get("etag") == encoded["etag"]:
+                    continue
+                redis_client.set(_doc_key(name), json.dumps(encoded))
+            for name in set(manifest.get("documents") or []) - set(names):
+                redis_client.delete(_doc_key(name))
+            redis_client.set(
+                MANIFEST_KEY,
+                json.dumps({"signature": signature, "built_at": now, "documents": names}),
+            )
+            logger.info("Sitemaps rebuilt: documents=%s", len(names))
+            return True
+    except Exception as exc:
+        logger.warning("Sitemap rebuild failed: %s", exc)
+        return False
+
+
+def load_sitemap(name: str, redis_client: SafeRedis | None = None) -> Dict[str, Any] | None:
+    """Stored document {etag, last_modified, xml, gzip?}; builds once if the store is cold."""
+    redis_client = redis_client or SafeRedis()
+    document = _loads(redis_client.get(_doc_key(name)))
+    if isinstance(document, dict):
+        return document
+    manifest = _loads(redis_client.get(MANIFEST_KEY))
+    if isinstance(manifest, dict) and name not in (manifest.get("documents") or []):
+        return None
+    refresh_sitemaps(force=True, redis_client=redis_client)
+    document = _loads(redis_client.get(_doc_key(name)))
+    return document if isinstance(document, dict) else None
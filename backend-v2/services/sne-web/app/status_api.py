@@ -10,6 +10,7 @@ from flask import Blueprint, jsonify, session
 from sqlalchemy import text
 
 from .collector_client import COLLECTOR_URL, get_binance_data
+from .http_client import host_metrics
 from .extensions import db
 from .utils.redis_safe import SafeRedis
 
@@ -191,6 +192,7 @@ def system_metrics():
         "last_proof_minutes": None,
         "active_connections": None,
         "requests_per_minute": None,
+        "upstream_hosts": host_metrics(),
         "last_updated": datetime.now().isoformat()
     })
 
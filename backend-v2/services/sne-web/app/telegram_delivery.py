@@ -17,6 +17,8 @@ from typing import Any, Dict, List, Tuple
 
 import requests
 
+from . import http_client
+
 logger = logging.getLogger(__name__)
 
 TELEGRAM_MESSAGE_LIMIT = 3500
@@ -89,7 +91,7 @@ def send_telegram_text(
         last_error: str | None = None
         for attempt in range(retry_count):
             try:
-                response = requests.post(
+                response = http_client.post(
                     url,
                     json={
                         "chat_id": resolved_chat_id,
@@ -164,7 +166,7 @@ def send_telegram_photo(
         try:
             with BytesIO(image_bytes) as image_file:
                 image_file.name = "sne-radar-report.png"
-                response = requests.post(
+                response = http_client.post(
                     url,
                     data=payload,
                     files={"photo": ("sne-radar-report.png", image_file, "image/png")},
@@ -9,6 +9,7 @@ from typing import Any, Dict, Tuple
 
 import requests
 
+from . import http_client
 from .intel_enrichment import _truncate_response_body
 
 logger = logging.getLogger(__name__)
@@ -65,7 +66,7 @@ def send_threads_post(text: str, *, image_url: str | None = None) -> Tuple[bool,
         payload["alt_text"] = "Card operacional SNE RADAR com gráfico, estado, níveis e cenários."
 
     try:
-        create_response = requests.post(
+        create_response = http_client.post(
             f"{_threads_api_base()}/{user_id}/threads",
             data=payload,
             timeout=25,
@@ -76,7 +77,7 @@ def send_threads_post(text: str, *, image_url: str | None = None) -> Tuple[bool,
         if not creation_id:
             return False, creation, f"threads_missing_creation_id:{_truncate_response_body(create_response.text)}"
 
-        publish_response = requests.post(
+        publish_response = http_client.post(
             f"{_threads_api_base()}/{user_id}/threads_publish",
             data={
                 "creation_id": creation_id,
@@ -0,0 +1,391 @@
+"""
+Background watcher that confirms ActivationOrder payments from TRC-20 events.
+
+Instead of verifying one buyer-submitted tx hash at a time, the watcher
+reads USDT Transfer logs addressed to the treasury in confirmed (solidified)
+block ranges, matches them in bulk against open orders by buyer address and
+amount, and moves matched orders to payment_confirmed. Progress is
+checkpointed per block range, so RPC cost follows block production rather
+than request volume and orders confirm without any user action.
+
+reconcile_tron_payment stays as the manual/webhook path; both write the same
+order fields and an order bound by one is skipped by the other.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol
+import uuid
+
+from .checkout_service import CheckoutError
+from .config import Config
+from .extensions import db
+from .models import ActivationOrder
+from .tron_payments_service import (
+    _TRANSFER_TOPIC,
+    _expected_amount_units,
+    _normalize_hex,
+    _tron_address_to_hex41,
+    _tron_address_to_topic20,
+    _tron_post,
+)
+from .utils.redis_safe import SafeRedis
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KEY = "tron:payments:watcher:checkpoint"
+SCAN_LOCK_KEY = "tron:payments:watcher:scanning"
+MAX_RANGES_PER_TICK = 10
+# orders still waiting on the buyer's transfer; bound orders are never rematched
+WATCHED_STATUSES = ("awaiting_payment", "payment_seen")
+
+_THREAD: threading.Thread | None = None
+_THREAD_LOCK = threading.Lock()
+_PROCESS_TOKEN = f"{os.getpid()}:{uuid.uuid4().hex}"
+
+
+def _utcnow() -> datetime:
+    return datetime.utcnow()
+
+
+@dataclass(frozen=True)
+class TransferEvent:
+    tx_hash: str
+    block_number: int
+    log_index: int
+    from_topic: str
+    to_topic: str
+    amount_units: int
+
+
+def _hex_int(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    candidate = str(value or "0").strip().lower()
+    return int(candidate, 16) if candidate.startswith("0x") else int(candidate or 0)
+
+
+def parse_transfer_log(log_entry: Dict[str, Any]) -> TransferEvent | None:
+    """TransferEvent from an eth_getLogs entry, or None when it is not a USDT Transfer."""
+    if log_entry.get("removed"):
+        return None
+    topics = [_normalize_hex(topic) for topic in (log_entry.get("topics") or [])]
+    value_hex = _normalize_hex(log_entry.get("data"))
+    if len(topics) < 3 or topics[0] != _TRANSFER_TOPIC or not value_hex:
+        return None
+    return TransferEvent(
+        tx_hash=_normalize_hex(log_entry.get("transactionHash")),
+        block_number=_hex_int(log_entry.get("blockNumber")),
+        log_index=_hex_int(log_entry.get("logIndex")),
+        from_topic=topics[1][-40:],
+        to_topic=topics[2][-40:],
+        amount_units=int(value_hex, 16),
+    )
+
+
+class TransferSource(Protocol):
+    def confirmed_head(self) -> int: ...
+
+    def transfers(self, from_block: int, to_block: int) -> List[TransferEvent]: ...
+
+
+class TronRpcTransferSource:
+    """Solidified head from the wallet API and Transfer logs from the node's JSON-RPC (eth_getLogs)."""
+
+    def __init__(self, contract_address: str, treasury_address: str):
+        self.contract_hex20 = _tron_address_to_hex41(contract_address)[2:]
+        self.treasury_topic = _tron_address_to_topic20(treasury_address)
+
+    def confirmed_head(self) -> int:
+        block = _tron_post("/walletsolidity/getnowblock", {})
+        return int(((block.get("block_header") or {}).get("raw_data") or {}).get("number") or 0)
+
+    def transfers(self, from_block: int, to_block: int) -> List[TransferEvent]:
+        payload = _tron_post(
+            "/jsonrpc",
+            {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "eth_getLogs",
+                "params": [{
+                    "fromBlock": hex(from_block),
+                    "toBlock": hex(to_block),
+                    "address": f"0x{self.contract_hex20}",
+                    "topics": [f"0x{_TRANSFER_TOPIC}", None, f"0x{'0' * 24}{self.treasury_topic}"],
+                }],
+            },
+        )
+        if payload.get("error"):
+            raise CheckoutError("TRON_RPC_ERROR", "eth_getLogs failed", 502, {"error": payload["error"]})
+        events = [parse_transfer_log(entry) for entry in payload.get("result") or []]
+        return [event for event in events if event]
+
+
+class RecordedTransferSource:
+    """
+    Stand-in source replaying recorded eth_getLogs entries.
+
+    The recording is {"head": <confirmed block>, "logs": [<eth_getLogs entry>, ...]}.
+    """
+
+    def __init__(self, head: int, logs: Iterable[Dict[str, Any]]):
+        self.head = int(head)
+        self.logs = list(logs)
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> "RecordedTransferSource":
+        with open(path, encoding="utf-8") as handle:
+            recording = json.load(handle)
+        return cls(recording.get("head") or 0, recording.get("logs") or [])
+
+    def confirmed_head(self) -> int:
+        return self.head
+
+    def transfers(self, from_block: int, to_block: int) -> List[TransferEvent]:
+        self.calls += 1
+        events = [parse_transfer_log(entry) for entry in self.logs]
+        return [event for event in events if event and from_block <= event.block_number <= to_block]
+
+
+def _default_source() -> TransferSource:
+    treasury_address = (Config.TRON_TREASURY_ADDRESS or "").strip()
+    contract_address = (Config.TRON_USDT_CONTRACT or "").strip()
+    if not treasury_address or not contract_address:
+        raise CheckoutError("CONFIG_ERROR", "Tron treasury or USDT contract is not configured", 500)
+    return TronRpcTransferSource(contract_address, treasury_address)
+
+
+def load_checkpoint(redis_client: SafeRedis) -> int | None:
+    raw = redis_client.get(CHECKPOINT_KEY)
+    if not raw:
+        return None
+    try:
+        return int(json.loads(raw)["block"])
+    except Exception:
+        return None
+
+
+def _store_checkpoint(redis_client: SafeRedis, block: int) -> None:
+    redis_client.set(CHECKPOINT_KEY, json.dumps({"block": block, "updated_at": _utcnow().isoformat()}))
+
+
+def _open_orders_by_transfer() -> Dict[tuple[str, int], List[ActivationOrder]]:
+    """
+    Open orders keyed by (buyer topic, expected amount units), oldest first.
+
+    The rows stay locked until match_transfers commits; rows another
+    transaction holds (e.g. reconcile_tron_payment) are skipped this range.
+    """
+    orders = (
+        ActivationOrder.query
+        .filter(
+            ActivationOrder.status.in_(WATCHED_STATUSES),
+            ActivationOrder.buyer_tron_address.isnot(None),
+            ActivationOrder.payment_tx_hash.is_(None),
+        )
+        .order_by(ActivationOrder.created_at.asc())
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    grouped: Dict[tuple[str, int], List[ActivationOrder]] = {}
+    for order in orders:
+        try:
+            key = (_tron_address_to_topic20(order.buyer_tron_address), _expected_amount_units(order))
+        except CheckoutError:
+            logger.warning("Tron watcher skipped order %s: invalid buyer address", order.id)
+            continue
+        grouped.setdefault(key, []).append(order)
+    return grouped
+
+
+def _bound_tx_hashes(tx_hashes: List[str]) -> set[str]:
+    if not tx_hashes:
+        return set()
+    rows = (
+        db.session.query(ActivationOrder.payment_tx_hash)
+        .filter(ActivationOrder.payment_tx_hash.in_(tx_hashes))
+        .all()
+    )
+    return {row[0] for row in rows}
+
+
+def match_transfers(events: List[TransferEvent]) -> List[ActivationOrder]:
+    """
+    Bind transfers to open orders and mark them payment_confirmed.
+
+    One query loads the open orders and one checks which tx hashes are
+    already bound; everything is committed together. Each transfer pays at
+    most one order (the oldest with the same buyer and amount).
+    """
+    if not events:
+        return []
+    candidates = _open_orders_by_transfer()
+    if not candidates:
+        db.session.rollback()
+        return []
+    used = _bound_tx_hashes(sorted({event.tx_hash for event in events}))
+    treasury_address = (Config.TRON_TREASURY_ADDRESS or "").strip()
+    contract_address = (Config.TRON_USDT_CONTRACT or "").strip()
+
+    confirmed: List[ActivationOrder] = []
+    for event in sorted(events, key=lambda item: (item.block_number, item.log_index)):
+        if event.tx_hash in used:
+            continue
+        queue = candidates.get((event.from_topic, event.amount_units))
+        if not queue:
+            continue
+        order = queue.pop(0)
+        used.add(event.tx_hash)
+
+        metadata = dict(order.session_metadata or {})
+        metadata["tronPayment"] = {
+            "verifiedAt": _utcnow().isoformat(),
+            "txHash": event.tx_hash,
+            "blockNumber": event.block_number,
+            "from": order.buyer_tron_address,
+            "to": treasury_address,
+            "contract": contract_address,
+            "amountUnits": str(event.amount_units),
+            "source": "watcher",
+        }
+        order.payment_tx_hash = event.tx_hash
+        order.received_amount = order.expected_amount
+        order.payment_confirmed_at = _utcnow()
+        order.status = "payment_confirmed"
+        order.session_metadata = metadata
+        order.updated_at = _utcnow()
+        confirmed.append(order)
+
+    # commit (or end the transaction) either way so the row locks are released
+    db.session.commit()
+    return confirmed
+
+
+def _process_confirmed(orders: List[ActivationOrder]) -> None:
+    from .activation_service import process_activation_order
+
+    for order in orders:
+        try:
+            process_activation_order(order_id=order.id, auth_address=None, trusted=True)
+        except CheckoutError as exc:
+            logger.warning("Tron watcher activation deferred for %s: %s", order.id, exc.code)
+        except Exception as exc:
+            logger.error("Tron watcher activation failed for %s: %s", order.id, exc, exc_info=True)
+
+
+def scan_once(
+    source: Optional[TransferSource] = None,
+    redis_client: Optional[SafeRedis] = None,
+    *,
+    auto_process: bool | None = None,
+    lease: Callable[[], bool] | None = None,
+) -> Dict[str, Any]:
+    """
+    Scan confirmed blocks after the checkpoint (up to MAX_RANGES_PER_TICK ranges).
+
+    The checkpoint only advances after a range's matches are committed, so a
+    crash rescans that range; rematching is harmless because bound tx hashes
+    and bound orders are skipped. `lease` renews the scan lease before each
+    range; the scan stops early once it is lost.
+    """
+    source = source or _default_source()
+    redis_client = redis_client or SafeRedis()
+    auto_process = Config.TRON_WATCHER_AUTO_PROCESS if auto_process is None else auto_process
+    block_range = max(1, Config.TRON_WATCHER_BLOCK_RANGE)
+
+    head = source.confirmed_head()
+    checkpoint = load_checkpoint(redis_client)
+    if checkpoint is None:
+        checkpoint = max(0, head - Config.TRON_WATCHER_BACKFILL_BLOCKS)
+        _store_checkpoint(redis_client, checkpoint)
+
+    scanned_ranges = 0
+    events_seen = 0
+    confirmed: List[ActivationOrder] = []
+    while checkpoint < head and scanned_ranges < MAX_RANGES_PER_TICK:
+        if lease is not None and not lease():
+            logger.warning("Tron watcher lost its scan lease at block %s", checkpoint)
+            break
+        to_block = min(head, checkpoint + block_range)
+        events = source.transfers(checkpoint + 1, to_block)
+        events_seen += len(events)
+        confirmed.extend(match_transfers(events))
+        checkpoint = to_block
+        _store_checkpoint(redis_client, checkpoint)
+        scanned_ranges += 1
+
+    for order in confirmed:
+        logger.info("Tron watcher confirmed payment for %s: tx=%s", order.id, order.payment_tx_hash)
+    if auto_process and confirmed:
+        _process_confirmed(confirmed)
+
+    return {
+        "head": head,
+        "checkpoint": checkpoint,
+        "ranges": scanned_ranges,
+        "events": events_seen,
+        "confirmed": [order.id for order in confirmed],
+        "lag_blocks": head - checkpoint,
+    }
+
+
+def _claim_scan(redis_client: SafeRedis, ttl_seconds: int) -> bool:
+    # renewable lease: one process scans at a time and the checkpoint only moves forward.
+    # Renewal only extends a lease this process still holds; otherwise it is taken with SET NX.
+    if redis_client.expire_if_value(SCAN_LOCK_KEY, _PROCESS_TOKEN, ttl_seconds):
+        return True
+    return bool(redis_client.set_nx(SCAN_LOCK_KEY, _PROCESS_TOKEN, ttl_seconds))
+
+
+def _watcher_loop(app) -> None:
+    interval = max(3, Config.TRON_WATCHER_POLL_SECONDS)
+    logger.info("Tron payment watcher started: interval=%ss range=%s", interval, Config.TRON_WATCHER_BLOCK_RANGE)
+    redis_client = SafeRedis()
+    source: TransferSource | None = None
+    while True:
+        if _claim_scan(redis_client, interval * 4):
+            with app.app_context():
+                try:
+                    source = source or _default_source()
+                    result = scan_once(
+                        source,
+                        redis_client,
+                        lease=lambda: _claim_scan(redis_client, interval * 4),
+                    )
+                    if result["events"] or result["lag_blocks"]:
+                        logger.info("Tron watcher scan: %s", result)
+                except Exception as exc:
+                    db.session.rollback()
+                    logger.warning("Tron payment watcher scan failed: %s", exc)
+                finally:
+                    db.session.remove()
+        time.sleep(interval)
+
+
+def start_tron_payment_watcher(app) -> None:
+    if not Config.TRON_WATCHER_ENABLED:
+        logger.info("Tron payment watcher disabled")
+        return
+    if not (Config.TRON_RPC_URL and Config.TRON_TREASURY_ADDRESS and Config.TRON_USDT_CONTRACT):
+        logger.warning("Tron payment watcher not started: TRON_RPC_URL, treasury or USDT contract missing")
+        return
+
+    global _THREAD
+    with _THREAD_LOCK:
+        if _THREAD and _THREAD.is_alive():
+            return
+        _THREAD = threading.Thread(
+            target=_watcher_loop,
+            args=(app,),
+            name="tron-payment-watcher",
+            daemon=True,
+        )
+        _THREAD.start()
@@ -1,5 +1,7 @@
 """
 Tron payment verification and reconciliation for ActivationOrder.
+Orders are normally confirmed by tron_payment_watcher; this is the
+buyer/webhook path for a specific tx hash.
 """
 
 from __future__ import annotations
@@ -14,6 +16,7 @@ from typing import Any, Optional
 import requests
 from web3 import Web3
 
+from . import http_client
 from .checkout_service import CheckoutError, serialize_activation_order
 from .config import Config
 from .extensions import db
@@ -102,7 +105,7 @@ def _tron_rpc_url() -> str:
 def _tron_post(path: str, payload: dict[str, Any]) -> dict[str, Any]:
     url = f"{_tron_rpc_url()}{path}"
     try:
-        response = requests.post(
+        response = http_client.post(
             url,
             headers=_tron_headers(),
             json=payload,
@@ -117,11 +120,17 @@ def _tron_post(path: str, payload: dict[str, Any]) -> dict[str, Any]:
 
 
 def _fetch_tron_transaction(tx_hash: str) -> tuple[dict[str, Any], dict[str, Any]]:
-    transaction = _tron_post("/wallet/gettransactionbyid", {"value": tx_hash})
+    # both lookups are independent: issue them together instead of back to back
+    transaction, transaction_info = http_client.run_concurrently(
+        [
+            lambda: _tron_post("/wallet/gettransactionbyid", {"value": tx_hash}),
+            lambda: _tron_post("/walletsolidity/gettransactioninfobyid", {"value": tx_hash}),
+        ],
+        return_exceptions=False,
+    )
     if not transaction:
         raise CheckoutError("PAYMENT_NOT_FOUND", "Tron transaction not found", 404, {"txHash": tx_hash})
 
-    transaction_info = _tron_post("/walletsolidity/gettransactioninfobyid", {"value": tx_hash})
     if not transaction_info:
         raise CheckoutError("PAYMENT_NOT_CONFIRMED", "Tron transaction is not confirmed yet", 409, {"txHash": tx_hash})
 
@@ -241,6 +250,10 @@ def reconcile_tron_payment(
     if order.payment_tx_hash and _normalize_hex(order.payment_tx_hash) not in {"", normalized_tx_hash}:
         raise CheckoutError("TX_HASH_CONFLICT", "Order already bound to another transaction hash", 409)
 
+    if order.payment_confirmed_at and _normalize_hex(order.payment_tx_hash) == normalized_tx_hash:
+        # already verified (e.g. by the payment watcher): no need to hit the RPC again
+        return _after_payment_confirmed(order, auth_address=auth_address, auto_process=auto_process, trusted=trusted)
+
     duplicate_order = (
         ActivationOrder.query
         .filter(ActivationOrder.id != order.id, ActivationOrder.payment_tx_hash == normalized_tx_hash)
@@ -283,6 +296,16 @@ def reconcile_tron_payment(
 
     db.session.commit()
 
+    return _after_payment_confirmed(order, auth_address=auth_address, auto_process=auto_process, trusted=trusted)
+
+
+def _after_payment_confirmed(
+    order: ActivationOrder,
+    *,
+    auth_address: Optional[str],
+    auto_process: bool,
+    trusted: bool,
+) -> dict[str, Any]:
     if auto_process:
         from .activation_service import process_activation_order
 
@@ -8,7 +8,7 @@ import logging
 import json
 import time
 import threading
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 # Try to import redis, fallback if not available
 try:
@@ -75,6 +75,11 @@ class UpstashRedis:
         key = urllib.parse.quote(key, safe="")
         return self._get(f"get/{key}")
 
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Get de várias chaves numa só requisição."""
+        res = self._post_command(["MGET", *keys])
+        return res if isinstance(res, list) and len(res) == len(keys) else [None] * len(keys)
+
     def setex(self, key: str, time: int, value: Any) -> bool:
         """Set with expiration."""
         res = self._post_command(["SETEX", key, int(time), str(value)])
@@ -103,6 +108,45 @@ class UpstashRedis:
         res = self._post_command(["EXPIRE", key, int(time)])
         return res == 1 or res is True
 
+    def set_nx(self, key: str, value: Any, time: int) -> bool:
+        """Set só se a chave não existir, com expiração."""
+        res = self._post_command(["SET", key, str(value), "NX", "EX", int(time)])
+        return res == "OK"
+
+    def eval(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        """Executa um script Lua."""
+        return self._post_command(["EVAL", script, len(keys), *keys, *[str(arg) for arg in args]])
+
+    def rpush(self, key: str, value: Any) -> int:
+        """Append no fim da lista."""
+        res = self._post_command(["RPUSH", key, str(value)])
+        try:
+            return int(res or 0)
+        except:
+            return 0
+
+    def lrange(self, key: str, start: int, stop: int) -> List[str]:
+        """Fatia da lista."""
+        res = self._post_command(["LRANGE", key, int(start), int(stop)])
+        return res if isinstance(res, list) else []
+
+    def lrem(self, key: str, count: int, value: Any) -> int:
+        """Remove ocorrências de um valor da lista."""
+        res = self._post_command(["LREM", key, int(count), str(value)])
+        try:
+            return int(res or 0)
+        except:
+            return 0
+
+# compare-and-act: só mexe na chave se ela ainda guarda o valor do chamador (ex.: token de lease)
+_EXPIRE_IF_VALUE_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('expire', KEYS[1], ARGV[2]) else return 0 end"
+)
+_DELETE_IF_VALUE_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+
 class SafeRedis:
     """
     Wrapper para Redis que funciona mesmo quando Redis não está disponível.
@@ -163,6 +207,10 @@ class SafeRedis:
             _FALLBACK_STORE[key] = (current, time.time() + max(1, int(ttl_seconds)))
         return True
 
+    def _fallback_list(self, key: str) -> list:
+        value = self._fallback_get(key)
+        return value if isinstance(value, list) else []
+
     def _connect(self):
         """Tenta conectar ao Redis (Upstash REST ou TCP)"""
         # Primeiro tenta Upstash REST API
@@ -222,6 +270,23 @@ class SafeRedis:
             logger.warning(f"Redis get error: {str(e)}")
             return None
 
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Get de várias chaves em um round trip, com fallback"""
+        keys = list(keys)
+        if not keys:
+            return []
+        if not self.available:
+            return [self.get(key) for key in keys]
+        try:
+            if self.use_upstash:
+                values = self.upstash.mget(keys)
+            else:
+                values = self.redis.mget(keys)
+            return [value.decode("utf-8") if isinstance(value, bytes) else value for value in values]
+        except Exception as e:
+            logger.warning(f"Redis mget error: {str(e)}")
+            return [None] * len(keys)
+
     def set(self, key: str, value: Any) -> bool:
         """Set com fallback"""
         if not self.available:
@@ -287,6 +352,101 @@ class SafeRedis:
             logger.warning(f"Redis expire error: {str(e)}")
             return False
 
+    def set_nx(self, key: str, value: Any, time: int) -> bool:
+        """SET NX EX atômico com fallback: True só para quem criou a chave"""
+        if not self.available:
+            with _FALLBACK_LOCK:
+                if self._fallback_get(key) is not None:
+                    return False
+                return self._fallback_set(key, value, ttl_seconds=time)
+        try:
+            if self.use_upstash:
+                return self.upstash.set_nx(key, value, time)
+            return bool(self.redis.set(key, value, nx=True, ex=int(time)))
+        except Exception as e:
+            logger.warning(f"Redis set_nx error: {str(e)}")
+            return False
+
+    def _eval_if_value(self, script: str, key: str, value: Any, *args: Any) -> bool:
+        try:
+            if self.use_upstash:
+                res = self.upstash.eval(script, [key], [value, *args])
+            else:
+                res = self.redis.eval(script, 1, key, str(value), *[str(arg) for arg in args])
+            return bool(int(res or 0))
+        except Exception as e:
+            logger.warning(f"Redis eval error: {str(e)}")
+            return False
+
+    def expire_if_value(self, key: str, value: Any, time: int) -> bool:
+        """Renova o TTL só se a chave ainda guarda `value` (renovação de lease)"""
+        if not self.available:
+            with _FALLBACK_LOCK:
+                if self._fallback_get(key) != value:
+                    return False
+                return self._fallback_expire(key, time)
+        return self._eval_if_value(_EXPIRE_IF_VALUE_SCRIPT, key, value, int(time))
+
+    def delete_if_value(self, key: str, value: Any) -> bool:
+        """Apaga só se a chave ainda guarda `value` (liberação de lease)"""
+        if not self.available:
+            with _FALLBACK_LOCK:
+                if self._fallback_get(key) != value:
+                    return False
+                return bool(self._fallback_delete(key))
+        return self._eval_if_value(_DELETE_IF_VALUE_SCRIPT, key, value)
+
+    def rpush(self, key: str, value: Any) -> int:
+        """RPUSH com fallback"""
+        if not self.available:
+            with _FALLBACK_LOCK:
+                items = self._fallback_list(key) + [str(value)]
+                self._fallback_set(key, items)
+                return len(items)
+        try:
+            if self.use_upstash:
+                return self.upstash.rpush(key, value)
+            return int(self.redis.rpush(key, value))
+        except Exception as e:
+            logger.warning(f"Redis rpush error: {str(e)}")
+            return 0
+
+    def lrange(self, key: str, start: int, stop: int) -> List[str]:
+        """LRANGE com fallback (stop inclusivo, -1 = fim)"""
+        if not self.available:
+            items = self._fallback_list(key)
+            return items[start:None if stop == -1 else stop + 1]
+        try:
+            if self.use_upstash:
+                values = self.upstash.lrange(key, start, stop)
+            else:
+                values = self.redis.lrange(key, start, stop)
+            return [value.decode("utf-8") if isinstance(value, bytes) else value for value in values]
+        except Exception as e:
+            logger.warning(f"Redis lrange error: {str(e)}")
+            return []
+
+    def lrem(self, key: str, count: int, value: Any) -> int:
+        """LREM com fallback (count=0 remove todas as ocorrências)"""
+        if not self.available:
+            with _FALLBACK_LOCK:
+                items = self._fallback_list(key)
+                kept, removed = [], 0
+                for item in items:
+                    if item == str(value) and (count == 0 or removed < abs(count)):
+                        removed += 1
+                        continue
+                    kept.append(item)
+                self._fallback_set(key, kept)
+                return removed
+        try:
+            if self.use_upstash:
+                return self.upstash.lrem(key, count, value)
+            return int(self.redis.lrem(key, count, value))
+        except Exception as e:
+            logger.warning(f"Redis lrem error: {str(e)}")
+            return 0
+
     def ping(self) -> bool:
         """Test connection"""
         if not self.available:
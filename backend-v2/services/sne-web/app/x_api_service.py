@@ -11,9 +11,9 @@ import logging
 import os
 from typing import Any, Dict, List, Tuple
 
-import requests
 from requests_oauthlib import OAuth1
 
+from . import http_client
 from .utils.redis_safe import SafeRedis
 
 logger = logging.getLogger(__name__)
@@ -171,7 +171,7 @@ def _refresh_access_token() -> Tuple[bool, str | None]:
     if client_secret:
         payload["client_secret"] = client_secret
 
-    response = requests.post(
+    response = http_client.post(
         _token_url(),
         headers={"Content-Type": "application/x-www-form-urlencoded"},
         data=payload,
@@ -221,7 +221,7 @@ def _tweet_id(payload: Dict[str, Any] | None) -> str | None:
 def x_post_text(text: str, reply_to_id: str | None = None) -> Tuple[bool, Dict[str, Any] | None, str | None]:
     json_payload = _tweet_payload(text, reply_to_id)
     if _use_oauth1():
-        response = requests.post(
+        response = http_client.post(
             f"{_api_base()}/tweets",
             auth=_oauth1_auth(),
             headers={"Content-Type": "application/json"},
@@ -235,7 +235,7 @@ def x_post_text(text: str, reply_to_id: str | None = None) -> Tuple[bool, Dict[s
     if not access_token:
         return False, None, error
 
-    response = requests.post(
+    response = http_client.post(
         f"{_api_base()}/tweets",
         headers={
             "Authorization": f"Bearer {access_token}",
@@ -251,7 +251,7 @@ def x_post_text(text: str, reply_to_id: str | None = None) -> Tuple[bool, Dict[s
         access_token, error = _access_token()
         if not access_token:
             return False, None, error
-        response = requests.post(
+        response = http_client.post(
             f"{_api_base()}/tweets",
             headers={
                 "Authorization": f"Bearer {access_token}",
@@ -295,7 +295,7 @@ def x_get_authenticated_user(force: bool = False) -> Dict[str, Any] | None:
             return cached
 
     if _use_oauth1():
-        response = requests.get(
+        response = http_client.get(
             f"{_api_base()}/users/me",
             auth=_oauth1_auth(),
             timeout=20,
@@ -304,7 +304,7 @@ def x_get_authenticated_user(force: bool = False) -> Dict[str, Any] | None:
         access_token, error = _access_token()
         if not access_token:
             return None
-        response = requests.get(
+        response = http_client.get(
             f"{_api_base()}/users/me",
             headers={"Authorization": f"Bearer {access_token}"},
             timeout=20,
@@ -0,0 +1,13 @@
+"""
+Benchmarks do motor de análise
+
+Reproduz fixtures gravadas de klines/depth/ticker por um coletor local
+(benchmarks.coletor_local) e mede cada etapa do pipeline e dos indicadores
+(benchmarks.harness). Uso:
+
+    python -m benchmarks.harness --fixtures benchmarks/fixtures --saida resultados.json \
+        --baseline baseline.json
+
+benchmarks.kernels compara os kernels de indicadores com os loops que eles
+substituíram.
+"""
@@ -0,0 +1,137 @@
+"""
+Coletor local para benchmarks
+
+Substitui app.collector_client (e as chamadas diretas à API pública da
+Binance feitas pelos módulos do motor) por respostas servidas das fixtures,
+sem rede.
+"""
+
+import logging
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import requests
+
+from .fixtures import FixtureStore
+
+logger = logging.getLogger(__name__)
+
+BINANCE_API = "api.binance.com/api/v3/"
+
+
+class _Resposta:
+    """Resposta mínima compatível com o uso de requests.Response no motor"""
+
+    def __init__(self, conteudo: Any, status_code: int = 200):
+        self._conteudo = conteudo
+        self.status_code = status_code
+        self.text = "" if conteudo is None else str(conteudo)[:200]
+
+    def json(self):
+        return self._conteudo
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} (fixture ausente)")
+
+
+class ColetorLocal:
+    """Mesma interface do collector_client, servida pelas fixtures"""
+
+    def __init__(self, fixtures: FixtureStore, requests_get=None):
+        self.fixtures = fixtures
+        self._requests_get = requests_get or requests.get
+        self.chamadas: Dict[str, int] = {}
+
+    def _contar(self, endpoint: str):
+        self.chamadas[endpoint] = self.chamadas.get(endpoint, 0) + 1
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 100):
+        self._contar("klines")
+        dados = self.fixtures.klines(symbol, interval)
+        if not dados:
+            raise RuntimeError(f"Falha ao coletar dados: sem fixture para {symbol} {interval}")
+        return dados[-int(limit):]
+
+    def get_binance_data(self, endpoint: str, params: Optional[dict] = None):
+        endpoint = endpoint.lstrip("/")
+        params = params or {}
+        if endpoint == "klines":
+            return self.get_klines(params["symbol"], params["interval"], params.get("limit", 500))
+
+        self._contar(endpoint)
+        if endpoint == "depth":
+            depth = self.fixtures.depth(params["symbol"])
+            if depth is None:
+                raise RuntimeError(f"Falha ao coletar dados: sem depth para {params['symbol']}")
+            limite = int(params.get("limit", 100))
+            return {**depth, "bids": depth["bids"][:limite], "asks": depth["asks"][:limite]}
+        if endpoint == "ticker/24hr":
+            ticker = self.fixtures.ticker_24hr()
+            if "symbol" in params:
+                return next((t for t in ticker if t["symbol"] == params["symbol"].upper()), {})
+            return ticker
+        raise RuntimeError(f"Endpoint sem fixture: {endpoint}")
+
+    def _servir(self, url: str, params: Optional[dict]):
+        try:
+            return _Resposta(self.get_binance_data(url.split(BINANCE_API, 1)[1], params))
+        except (RuntimeError, KeyError):
+            return _Resposta(None, status_code=404)
+
+    def requests_get(self, url: str, params: Optional[dict] = None, **kwargs):
+        """requests.get substituto: URLs da Binance vêm das fixtures, o resto segue normal"""
+        if BINANCE_API not in url:
+            return self._requests_get(url, params=params, **kwargs)
+        return self._servir(url, params)
+
+    def http_request(self, request_original):
+        """HttpClient.request substituto (mesma regra de requests_get)"""
+        coletor = self
+
+        def request(cliente, method, url, **kwargs):
+            if method.upper() == "GET" and BINANCE_API in url:
+                return coletor._servir(url, kwargs.get("params"))
+            return request_original(cliente, method, url, **kwargs)
+        return request
+
+
+@contextmanager
+def instalar(coletor: ColetorLocal):
+    """
+    Ativa o coletor local enquanto o bloco roda
+
+    Troca requests.get, HttpClient.request e as funções de
+    app.collector_client, inclusive nos módulos do app que as importaram por nome.
+    """
+    trocas = [(requests, "get", coletor.requests_get)]
+    try:
+        import app.collector_client as collector_client
+        import app.radar_report_service  # noqa: F401  (importa get_klines por nome)
+        from app.http_client import HttpClient
+
+        trocas.append((HttpClient, "request", coletor.http_request(HttpClient.request)))
+
+        originais = {
+            collector_client.get_klines: coletor.get_klines,
+            collector_client.get_binance_data: coletor.get_binance_data,
+        }
+        for nome, modulo in list(sys.modules.items()):
+            if modulo is None or not (nome == "app" or nome.startswith("app.")):
+                continue
+            for atributo in ("get_klines", "get_binance_data"):
+                atual = getattr(modulo, atributo, None)
+                if atual in originais:
+                    trocas.append((modulo, atributo, originais[atual]))
+    except ImportError as e:
+        logger.warning(f"app.collector_client indisponível, só requests.get será substituído: {e}")
+
+    anteriores = [(alvo, nome, getattr(alvo, nome)) for alvo, nome, _ in trocas]
+    for alvo, nome, valor in trocas:
+        setattr(alvo, nome, valor)
+    try:
+        yield coletor
+    finally:
+        for alvo, nome, valor in reversed(anteriores):
+            setattr(alvo, nome, valor)
@@ -0,0 +1,175 @@
+"""
+Fixtures de mercado para os benchmarks
+
+Layout em disco (JSON no formato bruto da Binance, como o coletor devolve):
+
+    <dir>/klines/<SYMBOL>_<interval>.json
+    <dir>/depth/<SYMBOL>.json
+    <dir>/ticker_24hr.json
+    <dir>/intel_headlines.json   (entradas brutas das fontes de Intel)
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INTERVALOS_PADRAO = ("1m", "5m", "15m", "1h", "4h")
+SIMBOLOS_PADRAO = ("BTCUSDT", "ETHUSDT")
+
+_MS_POR_INTERVALO = {
+    "1m": 60_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "1d": 86_400_000,
+}
+
+
+def _gravar_json(caminho: str, conteudo: Any):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "w") as f:
+        json.dump(conteudo, f)
+
+
+def gravar_fixtures(destino: str, simbolos: Iterable[str] = SIMBOLOS_PADRAO,
+                    intervalos: Iterable[str] = INTERVALOS_PADRAO, limite: int = 1000):
+    """Grava um snapshot real (via collector_client) no layout das fixtures"""
+    from app.collector_client import get_binance_data, get_klines
+
+    for simbolo in simbolos:
+        for intervalo in intervalos:
+            _gravar_json(os.path.join(destino, "klines", f"{simbolo}_{intervalo}.json"),
+                         get_klines(simbolo, intervalo, limite))
+        _gravar_json(os.path.join(destino, "depth", f"{simbolo}.json"),
+                     get_binance_data("depth", {"symbol": simbolo, "limit": 1000}))
+    _gravar_json(os.path.join(destino, "ticker_24hr.json"), get_binance_data("ticker/24hr"))
+    gravar_manchetes(destino)
+    logger.info(f"Fixtures gravadas em {destino}")
+
+
+def gravar_manchetes(destino: str, por_fonte: int = 20):
+    """Grava as manchetes reais das fontes de Intel (um poll completo de DEFAULT_SOURCES)"""
+    from app.intel_sources import fetch_multi_source_entries
+
+    _gravar_json(os.path.join(destino, "intel_headlines.json"),
+                 fetch_multi_source_entries(limit_per_source=por_fonte))
+
+
+_VOCABULARIO_MANCHETES = (
+    ("Bitcoin", "Ethereum", "Solana", "Polygon", "Arbitrum", "Base", "USDC", "Tether", "Chainlink", "Uniswap"),
+    ("rallies", "slides", "faces", "expands", "launches", "pauses", "hits record", "weighs"),
+    ("after SEC ruling", "as Fed holds rates", "amid China trade policy", "on ETF inflows",
+     "after bridge exploit", "as OpenAI ships new model", "while BlackRock adds exposure",
+     "in Brazil stablecoin rules", "as Coinbase lists token", "after rollup upgrade"),
+)
+
+
+def _gerar_manchetes(rng, quantidade: int = 400) -> List[Dict[str, Any]]:
+    sujeitos, verbos, contextos = _VOCABULARIO_MANCHETES
+    manchetes = []
+    for i in range(quantidade):
+        titulo = " ".join([str(rng.choice(sujeitos)), str(rng.choice(verbos)), str(rng.choice(contextos))])
+        manchetes.append({
+            "id": f"sintetica:{i}",
+            "title": titulo,
+            "url": f"https://example.com/news/{i}-{titulo.lower().replace(' ', '-')}",
+            "source": "Sintética",
+            "source_key": "sintetica",
+            "source_tier": "media",
+            "author": "bench",
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "points": int(rng.integers(0, 300)),
+            "comments": int(rng.integers(0, 80)),
+            "tags": ["mercado", "macro"],
+        })
+    return manchetes
+
+
+def gerar_fixtures_sinteticas(destino: str, simbolos: Iterable[str] = SIMBOLOS_PADRAO,
+                              intervalos: Iterable[str] = INTERVALOS_PADRAO,
+                              barras: int = 5000, seed: int = 42):
+    """
+    Gera fixtures determinísticas no mesmo layout das gravadas
+
+    Útil para CI sem acesso ao coletor; a mesma seed gera sempre os mesmos dados.
+    """
+    from app.collector_client import RADAR_MARKET_UNIVERSE
+
+    rng = np.random.default_rng(seed)
+    inicio = 1_700_000_000_000
+    ticker = []
+    for simbolo in sorted(set(simbolos) | RADAR_MARKET_UNIVERSE):
+        preco_base = float(rng.uniform(0.5, 60000))
+        if simbolo in simbolos:
+            for intervalo in intervalos:
+                passo = _MS_POR_INTERVALO.get(intervalo, 3_600_000)
+                close = preco_base * np.exp(np.cumsum(rng.normal(0, 0.004, barras)))
+                open_ = np.concatenate(([preco_base], close[:-1]))
+                spread = np.abs(rng.normal(0, 0.003, barras)) * close
+                high = np.maximum(open_, close) + spread
+                low = np.minimum(open_, close) - spread
+                volume = rng.uniform(100, 5000, barras)
+                klines = [
+                    [inicio + i * passo, f"{open_[i]:.8f}", f"{high[i]:.8f}", f"{low[i]:.8f}",
+                     f"{close[i]:.8f}", f"{volume[i]:.4f}", inicio + (i + 1) * passo - 1,
+                     f"{volume[i] * close[i]:.4f}", int(volume[i] // 3), f"{volume[i] / 2:.4f}",
+                     f"{volume[i] * close[i] / 2:.4f}", "0"]
+                    for i in range(barras)
+                ]
+                _gravar_json(os.path.join(destino, "klines", f"{simbolo}_{intervalo}.json"), klines)
+
+            degraus = np.arange(1, 1001)
+            depth = {
+                "lastUpdateId": int(seed),
+                "bids": [[f"{preco_base * (1 - 0.0001 * d):.8f}", f"{q:.4f}"]
+                         for d, q in zip(degraus, rng.uniform(0.01, 5, 1000))],
+                "asks": [[f"{preco_base * (1 + 0.0001 * d):.8f}", f"{q:.4f}"]
+                         for d, q in zip(degraus, rng.uniform(0.01, 5, 1000))],
+            }
+            _gravar_json(os.path.join(destino, "depth", f"{simbolo}.json"), depth)
+
+        ticker.append({
+            "symbol": simbolo,
+            "lastPrice": f"{preco_base:.8f}",
+            "priceChangePercent": f"{rng.normal(0, 4):.3f}",
+            "quoteVolume": f"{rng.uniform(2e7, 2e9):.2f}",
+            "volume": f"{rng.uniform(1e4, 1e7):.2f}",
+        })
+    _gravar_json(os.path.join(destino, "ticker_24hr.json"), ticker)
+    _gravar_json(os.path.join(destino, "intel_headlines.json"), _gerar_manchetes(rng))
+    logger.info(f"Fixtures sintéticas ({barras} barras) geradas em {destino}")
+
+
+class FixtureStore:
+    """Leitura preguiçosa (com cache) das fixtures de um diretório"""
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        self._cache: Dict[str, Any] = {}
+
+    def _ler(self, *partes: str) -> Optional[Any]:
+        caminho = os.path.join(self.diretorio, *partes)
+        if caminho not in self._cache:
+            if not os.path.exists(caminho):
+                self._cache[caminho] = None
+            else:
+                with open(caminho) as f:
+                    self._cache[caminho] = json.load(f)
+        return self._cache[caminho]
+
+    def klines(self, simbolo: str, intervalo: str) -> List[list]:
+        return self._ler("klines", f"{simbolo.upper()}_{intervalo}.json") or []
+
+    def depth(self, simbolo: str) -> Optional[Dict[str, Any]]:
+        return self._ler("depth", f"{simbolo.upper()}.json")
+
+    def ticker_24hr(self) -> List[Dict[str, Any]]:
+        return self._ler("ticker_24hr.json") or []
+
+    def manchetes(self) -> List[Dict[str, Any]]:
+        return self._ler("intel_headlines.json") or []
+
+    def existe(self) -> bool:
+        return os.path.isdir(os.path.join(self.diretorio, "klines"))
@@ -0,0 +1,381 @@
+"""
+Harness de benchmark do motor de análise
+
+Mede p50/p95 de latência e pico de memória (tracemalloc) de:
+- indicadores e detectores isolados, em vários tamanhos de entrada;
+- cada etapa de motor_renan.analise_completa (instrumentada no próprio pipeline);
+- build_radar_report e render_radar_report_chart;
+- extração de entidades do Intel sobre um corpus de manchetes.
+
+Os dados vêm das fixtures via coletor local. O resultado é gravado em JSON e
+pode ser comparado com um baseline; regressões fazem o processo sair com 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .coletor_local import ColetorLocal, instalar
+from .fixtures import FixtureStore, gerar_fixtures_sinteticas
+
+logger = logging.getLogger(__name__)
+
+TAMANHOS_PADRAO = (200, 1000, 5000)
+SIMBOLO = "BTCUSDT"
+INTERVALO = "1h"
+
+# Funções chamadas por analise_completa que viram etapas medidas
+ETAPAS_MOTOR = (
+    "coletar_dados", "analisar_contexto", "analisar_estrutura", "analise_multitf",
+    "obter_zonas_magneticas", "detectar_padroes", "analisar_candle_atual",
+    "calcular_confluencia", "calcular_indicadores_avancados", "gerar_sinal_completo",
+    "gerar_sintese",
+)
+
+
+@dataclass
+class Medicao:
+    etapa: str
+    barras: Optional[int]
+    tempos: List[float] = field(default_factory=list)
+    picos_memoria: List[int] = field(default_factory=list)
+    erro: Optional[str] = None
+
+    def resumo(self) -> Dict[str, Any]:
+        linha: Dict[str, Any] = {"etapa": self.etapa, "barras": self.barras, "amostras": len(self.tempos)}
+        if self.erro:
+            linha["erro"] = self.erro
+        if self.tempos:
+            ms = np.asarray(self.tempos) * 1000
+            linha.update({
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                "media_ms": round(float(ms.mean()), 3),
+                "max_ms": round(float(ms.max()), 3),
+            })
+        if self.picos_memoria:
+            linha["pico_memoria_kb"] = round(max(self.picos_memoria) / 1024, 1)
+        return linha
+
+
+def frame_de_klines(klines: List[list]) -> pd.DataFrame:
+    """Mesmo DataFrame que motor_renan.coletar_dados monta a partir do coletor"""
+    df = pd.DataFrame([k[:6] for k in klines], columns=["timestamp", "open", "high", "low", "close", "volume"])
+    return df.astype({
+        "timestamp": "datetime64[ms]", "open": float, "high": float,
+        "low": float, "close": float, "volume": float,
+    }).set_index("timestamp")
+
+
+@contextlib.contextmanager
+def _silencioso():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _medir(etapa: str, barras: Optional[int], funcao: Callable[[], Any], repeticoes: int) -> Medicao:
+    """Aquece uma vez, mede `repeticoes` execuções e uma execução extra sob tracemalloc"""
+    medicao = Medicao(etapa, barras)
+    try:
+        with _silencioso():
+            funcao()
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                funcao()
+                medicao.tempos.append(time.perf_counter() - inicio)
+
+            tracemalloc.start()
+            try:
+                base = tracemalloc.get_traced_memory()[0]
+                funcao()
+                medicao.picos_memoria.append(tracemalloc.get_traced_memory()[1] - base)
+            finally:
+                tracemalloc.stop()
+    except Exception as e:
+        medicao.erro = f"{type(e).__name__}: {e}"
+    return medicao
+
+
+@contextlib.contextmanager
+def _instrumentar(modulo, nomes: Sequence[str], medicoes: Dict[str, Medicao], prefixo: str):
+    """Troca funções do módulo por versões que registram tempo e pico de memória"""
+    originais = {}
+
+    def _envolver(nome, funcao):
+        medicao = medicoes.setdefault(nome, Medicao(f"{prefixo}/{nome}", None))
+
+        def envolvida(*args, **kwargs):
+            rastreando = tracemalloc.is_tracing()
+            if rastreando:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                duracao = time.perf_counter() - inicio
+                if rastreando:
+                    medicao.picos_memoria.append(tracemalloc.get_traced_memory()[1] - base)
+                else:
+                    medicao.tempos.append(duracao)
+        return envolvida
+
+    for nome in nomes:
+        funcao = getattr(modulo, nome, None)
+        if funcao is not None:
+            originais[nome] = funcao
+            setattr(modulo, nome, _envolver(nome, funcao))
+    try:
+        yield
+    finally:
+        for nome, funcao in originais.items():
+            setattr(modulo, nome, funcao)
+
+
+def _etapas_indicadores(df: pd.DataFrame) -> Dict[str, Callable[[], Any]]:
+    import estrutura_mercado
+    import indicadores
+    import indicadores_avancados
+    import kernels_indicadores as kernels
+    import motor_padroes
+    import niveis_swing
+    import padroes_graficos
+    from calcular_suportes_resistencias import calcular_suportes_resistencias
+
+    def _sem_cache(funcao):
+        # o motor de swings memoriza por conteúdo; mede sempre o caminho frio
+        def executar():
+            niveis_swing._cache_swings.clear()
+            return funcao()
+        return executar
+
+    high, low, close, volume = (df[c].to_numpy() for c in ("high", "low", "close", "volume"))
+    return {
+        "indicadores.calcular_indicadores": lambda: indicadores.calcular_indicadores(df.copy()),
+        "indicadores_avancados.calcular_indicadores_avancados":
+            lambda: indicadores_avancados.calcular_indicadores_avancados(df.copy()),
+        "kernels.obv": lambda: kernels.obv(close, volume),
+        "kernels.parabolic_sar": lambda: kernels.parabolic_sar(high, low),
+        "kernels.volume_profile": lambda: kernels.volume_profile(low, high, volume),
+        "estrutura_mercado.analisar_estrutura": lambda: estrutura_mercado.analisar_estrutura(df),
+        "calcular_suportes_resistencias": _sem_cache(lambda: calcular_suportes_resistencias(df)),
+        "padroes_graficos.detectar_padroes": lambda: padroes_graficos.detectar_padroes(df),
+        "motor_padroes.avaliar_padroes": lambda: motor_padroes.avaliar_padroes(df),
+    }
+
+
+def medir_indicadores(fixtures: FixtureStore, tamanhos: Sequence[int], repeticoes: int) -> List[Medicao]:
+    klines = fixtures.klines(SIMBOLO, INTERVALO)
+    medicoes = []
+    for tamanho in tamanhos:
+        if len(klines) < tamanho:
+            logger.warning(f"Fixture {SIMBOLO} {INTERVALO} tem {len(klines)} barras; pulando tamanho {tamanho}")
+            continue
+        df = frame_de_klines(klines[-tamanho:])
+        for etapa, funcao in _etapas_indicadores(df).items():
+            medicoes.append(_medir(etapa, tamanho, funcao, repeticoes))
+    return medicoes
+
+
+def medir_pipeline(repeticoes: int) -> List[Medicao]:
+    """analise_completa inteira e cada uma das suas etapas"""
+    import motor_renan
+    import fluxo_ativo
+
+    por_etapa: Dict[str, Medicao] = {}
+    total = Medicao("motor_renan.analise_completa", None)
+    try:
+        with _silencioso(), \
+                _instrumentar(motor_renan, ETAPAS_MOTOR, por_etapa, "analise_completa"), \
+                _instrumentar(fluxo_ativo.FluxoAtivo, ("calcular_pressao_liquidez",), por_etapa, "analise_completa"):
+            motor_renan.analise_completa(SIMBOLO, INTERVALO)
+            for medicao in por_etapa.values():
+                medicao.tempos.clear()
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                motor_renan.analise_completa(SIMBOLO, INTERVALO)
+                total.tempos.append(time.perf_counter() - inicio)
+
+            tracemalloc.start()
+            try:
+                base = tracemalloc.get_traced_memory()[0]
+                motor_renan.analise_completa(SIMBOLO, INTERVALO)
+                total.picos_memoria.append(tracemalloc.get_traced_memory()[1] - base)
+            finally:
+                tracemalloc.stop()
+    except Exception as e:
+        total.erro = f"{type(e).__name__}: {e}"
+    return [total] + list(por_etapa.values())
+
+
+def medir_relatorios(repeticoes: int) -> List[Medicao]:
+    try:
+        from app.radar_report_service import build_radar_report
+    except ImportError as e:
+        return [Medicao("build_radar_report", None, erro=f"ImportError: {e}")]
+
+    medicoes = [_medir("build_radar_report", None, lambda: build_radar_report(SIMBOLO, INTERVALO), repeticoes)]
+    try:
+        from app.radar_report_visuals import render_radar_report_chart
+    except ImportError as e:
+        medicoes.append(Medicao("render_radar_report_chart", None, erro=f"ImportError: {e}"))
+        return medicoes
+
+    relatorio = build_radar_report(SIMBOLO, INTERVALO)
+    medicoes.append(_medir("render_radar_report_chart", None,
+                           lambda: render_radar_report_chart(relatorio), max(1, repeticoes // 2)))
+    return medicoes
+
+
+def medir_intel(fixtures: FixtureStore, repeticoes: int) -> List[Medicao]:
+    """Enriquecimento, curadoria e entidades visuais sobre todo o corpus de manchetes (caches limpos a cada passada)"""
+    manchetes = fixtures.manchetes()
+    if not manchetes:
+        return [Medicao("intel", None, erro="Sem intel_headlines.json nas fixtures")]
+    try:
+        from app import intel_enrichment, intel_service, intel_visuals
+    except ImportError as e:
+        return [Medicao("intel", None, erro=f"ImportError: {e}")]
+
+    textos = [f"{m['title']} {m['url']} {' '.join(m.get('tags', []))}" for m in manchetes]
+    editoriais = [{"title": m["title"], "summary": m.get("summary", "")} for m in manchetes]
+
+    def curadoria():
+        intel_service._relevance_hits_for_text.cache_clear()
+        return [intel_service._curation_score(m) for m in manchetes]
+
+    def visuais():
+        intel_visuals._haystack_matches.cache_clear()
+        return [intel_visuals.apply_visual_entities(p) for p in editoriais]
+
+    etapas = {
+        "intel_enrichment._extract_matches": lambda: [intel_enrichment._extract_matches(t) for t in textos],
+        "intel_service._curation_score": curadoria,
+        "intel_visuals.apply_visual_entities": visuais,
+    }
+    return [_medir(etapa, len(manchetes), funcao, repeticoes) for etapa, funcao in etapas.items()]
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def executar(fixtures_dir: str, tamanhos: Sequence[int] = TAMANHOS_PADRAO, repeticoes: int = 20,
+             grupos: Sequence[str] = ("indicadores", "pipeline", "relatorios", "intel")) -> Dict[str, Any]:
+    """Roda os grupos pedidos com o coletor local instalado e devolve o documento de resultados"""
+    fixtures = FixtureStore(fixtures_dir)
+    if not fixtures.existe():
+        raise FileNotFoundError(f"Fixtures não encontradas em {fixtures_dir} (use --gerar-sinteticas)")
+
+    coletor = ColetorLocal(fixtures)
+    medicoes: List[Medicao] = []
+    with instalar(coletor):
+        if "indicadores" in grupos:
+            medicoes += medir_indicadores(fixtures, tamanhos, repeticoes)
+        if "pipeline" in grupos:
+            medicoes += medir_pipeline(max(1, repeticoes // 4))
+        if "relatorios" in grupos:
+            medicoes += medir_relatorios(max(1, repeticoes // 4))
+        if "intel" in grupos:
+            medicoes += medir_intel(fixtures, repeticoes)
+
+    return {
+        "gerado_em": datetime.now(timezone.utc).isoformat(),
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "fixtures": os.path.abspath(fixtures_dir),
+        "repeticoes": repeticoes,
+        "chamadas_coletor": coletor.chamadas,
+        "resultados": [m.resumo() for m in medicoes],
+    }
+
+
+def comparar_com_baseline(atual: Dict[str, Any], baseline: Dict[str, Any], tolerancia: float = 0.25,
+                          tolerancia_memoria: float = 0.25, piso_ms: float = 1.0,
+                          piso_kb: float = 256.0) -> List[Dict[str, Any]]:
+    """
+    Regressões de p50/p95 e memória em relação ao baseline
+
+    Uma métrica regride quando passa de baseline * (1 + tolerância) e a
+    diferença absoluta supera o piso (evita ruído em etapas muito rápidas).
+    """
+    anteriores = {(r["etapa"], r.get("barras")): r for r in baseline.get("resultados", [])}
+    regressoes = []
+    for linha in atual.get("resultados", []):
+        anterior = anteriores.get((linha["etapa"], linha.get("barras")))
+        if not anterior:
+            continue
+        for metrica, tol, piso in (("p50_ms", tolerancia, piso_ms), ("p95_ms", tolerancia, piso_ms),
+                                   ("pico_memoria_kb", tolerancia_memoria, piso_kb)):
+            if metrica not in linha or metrica not in anterior:
+                continue
+            novo, velho = linha[metrica], anterior[metrica]
+            if novo > velho * (1 + tol) and novo - velho > piso:
+                regressoes.append({
+                    "etapa": linha["etapa"], "barras": linha.get("barras"), "metrica": metrica,
+                    "baseline": velho, "atual": novo, "variacao_pct": round((novo / velho - 1) * 100, 1),
+                })
+    return regressoes
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do motor de análise SNE")
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    parser.add_argument("--gerar-sinteticas", action="store_true",
+                        help="gera fixtures determinísticas no diretório antes de medir")
+    parser.add_argument("--tamanhos", default=",".join(map(str, TAMANHOS_PADRAO)))
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--grupos", default="indicadores,pipeline,relatorios,intel")
+    parser.add_argument("--saida", default="benchmark_resultados.json")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    tamanhos = [int(t) for t in args.tamanhos.split(",") if t]
+    if args.gerar_sinteticas:
+        gerar_fixtures_sinteticas(args.fixtures, barras=max(tamanhos))
+
+    resultado = executar(args.fixtures, tamanhos, args.repeticoes, args.grupos.split(","))
+    if args.baseline:
+        with open(args.baseline) as f:
+            resultado["regressoes"] = comparar_com_baseline(resultado, json.load(f), args.tolerancia)
+
+    with open(args.saida, "w") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+
+    for linha in resultado["resultados"]:
+        if "erro" in linha:
+            print(f"  {linha['etapa']:<60} ERRO {linha['erro']}")
+        else:
+            print(f"  {linha['etapa']:<60} {str(linha['barras'] or '-'):>6} "
+                  f"p50 {linha.get('p50_ms', 0):>10.3f} ms  p95 {linha.get('p95_ms', 0):>10.3f} ms  "
+                  f"mem {linha.get('pico_memoria_kb', 0):>10.1f} KB")
+    for regressao in resultado.get("regressoes", []):
+        print(f"  ⚠️ REGRESSÃO {regressao['etapa']} [{regressao['barras']}] {regressao['metrica']}: "
+              f"{regressao['baseline']} -> {regressao['atual']} (+{regressao['variacao_pct']}%)")
+    print(f"Resultados gravados em {args.saida}")
+    return 1 if resultado.get("regressoes") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Benchmark dos kernels de indicadores
+
+Compara cada kernel de kernels_indicadores com a implementação em loop que
+ele substituiu, em vários tamanhos de entrada. Uso:
+
+    python -m benchmarks.kernels
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+import kernels_indicadores as kernels
+
+
+def _obv_loop(df):
+    """Versão original de calcular_obv (referência do benchmark)"""
+    obv_ref = np.zeros(len(df))
+    obv_ref[0] = df['volume'].iloc[0]
+    for i in range(1, len(df)):
+        if df['close'].iloc[i] > df['close'].iloc[i - 1]:
+            obv_ref[i] = obv_ref[i - 1] + df['volume'].iloc[i]
+        elif df['close'].iloc[i] < df['close'].iloc[i - 1]:
+            obv_ref[i] = obv_ref[i - 1] - df['volume'].iloc[i]
+        else:
+            obv_ref[i] = obv_ref[i - 1]
+    return obv_ref
+
+
+def _psar_loop(df, af=0.02, max_af=0.2):
+    """Versão original de calcular_parabolic_sar (referência do benchmark)"""
+    high = df['high'].values
+    low = df['low'].values
+    sar = np.zeros(len(df))
+    trend = np.zeros(len(df))
+    af_current = af
+    sar[0] = low[0]
+    trend[0] = 1
+    for i in range(1, len(df)):
+        if trend[i - 1] == 1:
+            sar[i] = sar[i - 1] + af_current * (high[i - 1] - sar[i - 1])
+            if low[i] <= sar[i]:
+                trend[i] = -1
+                sar[i] = high[i - 1]
+                af_current = af
+            else:
+                trend[i] = 1
+                if high[i] > high[i - 1]:
+                    af_current = min(af_current + af, max_af)
+        else:
+            sar[i] = sar[i - 1] + af_current * (low[i - 1] - sar[i - 1])
+            if high[i] >= sar[i]:
+                trend[i] = 1
+                sar[i] = low[i - 1]
+                af_current = af
+            else:
+                trend[i] = -1
+                if low[i] < low[i - 1]:
+                    af_current = min(af_current + af, max_af)
+    return sar, trend
+
+
+def _volume_profile_mascaras(df, bins=20):
+    """Versão original de calcular_volume_profile (uma máscara por bin)"""
+    price_min = df['low'].min()
+    price_max = df['high'].max()
+    bin_size = (price_max - price_min) / bins
+    volume_profile_ref = np.zeros(bins)
+    for i in range(bins):
+        bin_start = price_min + i * bin_size
+        bin_end = price_min + (i + 1) * bin_size
+        mask = (df['low'] >= bin_start) & (df['high'] <= bin_end)
+        volume_profile_ref[i] = df[mask]['volume'].sum()
+    return volume_profile_ref
+
+
+def _dados_sinteticos(n, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 50000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    spread = np.abs(rng.normal(0, 0.002, n)) * close
+    return pd.DataFrame({
+        'open': close,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(1000, 10000, n).astype(float)
+    })
+
+
+def _cronometrar(funcao, repeticoes):
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def benchmark_kernels(tamanhos=(200, 5000, 500000)):
+    """
+    Compara cada kernel com a implementação anterior em vários tamanhos
+
+    Returns:
+        list de dicts {kernel, barras, anterior_ms, kernel_ms, speedup, confere}
+    """
+    linhas = []
+    for n in tamanhos:
+        df = _dados_sinteticos(n)
+        repeticoes = 5 if n <= 5000 else 1
+        casos = [
+            ('obv', lambda: _obv_loop(df), lambda: kernels.obv(df['close'].values, df['volume'].values),
+             lambda a, b: np.allclose(a, b)),
+            ('parabolic_sar', lambda: _psar_loop(df), lambda: kernels.parabolic_sar(df['high'].values, df['low'].values),
+             lambda a, b: np.allclose(a[0], b[0]) and np.array_equal(a[1], b[1])),
+            # perfil muda de propósito (alocação proporcional): confere só o volume total preservado
+            ('volume_profile', lambda: _volume_profile_mascaras(df),
+             lambda: kernels.volume_profile(df['low'].values, df['high'].values, df['volume'].values),
+             lambda a, b: bool(np.isclose(b['perfil'].sum(), df['volume'].sum()))),
+        ]
+        for nome, anterior, kernel, confere in casos:
+            tempo_anterior, ref = _cronometrar(anterior, repeticoes)
+            tempo_kernel, novo = _cronometrar(kernel, repeticoes)
+            linhas.append({
+                'kernel': nome,
+                'barras': n,
+                'anterior_ms': round(tempo_anterior * 1000, 3),
+                'kernel_ms': round(tempo_kernel * 1000, 3),
+                'speedup': round(tempo_anterior / tempo_kernel, 1) if tempo_kernel > 0 else None,
+                'confere': bool(confere(ref, novo))
+            })
+    return linhas
+
+
+def main():
+    print("🧪 Benchmark dos kernels de indicadores...")
+    for linha in benchmark_kernels():
+        print(f"  {linha['kernel']:<15} {linha['barras']:>7} barras | "
+              f"anterior {linha['anterior_ms']:>10.3f} ms | kernel {linha['kernel_ms']:>9.3f} ms | "
+              f"{linha['speedup']}x | confere={linha['confere']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ Identifica níveis chave de S/R usando múltiplos métodos
 import pandas as pd
 import numpy as np
 
+from niveis_swing import calcular_swings
+
 
 def calcular_range_atr(df, periodo=14):
     """
@@ -104,18 +106,13 @@ def calcular_suportes_resistencias(df, num_niveis=3):
         resistencias.extend([r1, r2, r3])
         suportes.extend([s1, s2, s3])
         
-        # 2. Máximas e mínimas locais (swing points)
+        # 2. Máximas e mínimas locais (swing points): janela [i-window, i+window)
         window = 20
         if len(df) >= window:
-            # Encontrar máximas locais (resistências)
-            for i in range(window, len(df) - window):
-                if df['high'].iloc[i] == df['high'].iloc[i-window:i+window].max():
-                    resistencias.append(df['high'].iloc[i])
-            
-            # Encontrar mínimas locais (suportes)
-            for i in range(window, len(df) - window):
-                if df['low'].iloc[i] == df['low'].iloc[i-window:i+window].min():
-                    suportes.append(df['low'].iloc[i])
+            swings = calcular_swings(df, antes=window, depois=window - 1)
+            limite = len(df) - window
+            resistencias.extend(swings['precos_topos'][swings['topos'] < limite].tolist())
+            suportes.extend(swings['precos_fundos'][swings['fundos'] < limite].tolist())
         
         # 3. Níveis psicológicos (números redondos)
         preco_atual = df['close'].iloc[-1]
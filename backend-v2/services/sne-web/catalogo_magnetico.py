@@ -1,12 +1,338 @@
 import pandas as pd
+import numpy as np
 import os
-from datetime import datetime
+import json
+import time
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+# Caminho para o arquivo CSV usado quando não há persistência compartilhada
+CAMINHO_CATALOGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogo_magnetico.csv")
+
+SIMBOLO_PADRAO = "BTCUSDT"
+TAMANHO_ZONA = 50
+
+# Evita alertas repetidos de compressão na mesma zona
+COOLDOWN_TEMPO = timedelta(minutes=15)
+cooldown_zonas = {}
+
+
+# ✅ Índice de Zonas por Símbolo
+class ZonasSimbolo:
+    """
+    Zonas de um símbolo em arrays ordenados por preço.
+
+    Consultas de zona mais próxima e de zonas dentro de uma margem usam busca
+    binária (O(log n)) sobre `zonas`.
+    """
+
+    __slots__ = ("zonas", "forca_total", "ocorrencias", "ultima_data", "_lista")
+
+    def __init__(self, zonas=(), forca_total=(), ocorrencias=(), ultima_data=()):
+        self.zonas = np.asarray(zonas, dtype=float)
+        self.forca_total = np.asarray(forca_total, dtype=float)
+        self.ocorrencias = np.asarray(ocorrencias, dtype=np.int64)
+        self.ultima_data = np.asarray(ultima_data, dtype=object)
+        self._lista = self.zonas.tolist()
+
+    def __len__(self):
+        return len(self.zonas)
+
+    def registro(self, i):
+        return {
+            "zona": float(self.zonas[i]),
+            "forca_total": round(float(self.forca_total[i]), 2),
+            "ocorrencias": int(self.ocorrencias[i]),
+            "ultima_data": self.ultima_data[i]
+        }
+
+    def na_margem(self, preco, margem):
+        """Índices das zonas em [preco - margem, preco + margem]"""
+        return range(bisect_left(self._lista, preco - margem), bisect_right(self._lista, preco + margem))
+
+    def mais_proxima(self, preco):
+        """Índice da zona mais próxima do preço (None se vazio)"""
+        if not self._lista:
+            return None
+        pos = bisect_left(self._lista, preco)
+        if pos == 0:
+            return 0
+        if pos == len(self._lista):
+            return pos - 1
+        return pos if self._lista[pos] - preco < preco - self._lista[pos - 1] else pos - 1
+
+    def ordenadas_por(self, campo, limite):
+        """Índices das `limite` zonas com maior valor do campo ('forca_total' ou 'forca_media')"""
+        if campo == "forca_media":
+            valores = self.forca_total / np.maximum(self.ocorrencias, 1)
+        else:
+            valores = self.forca_total
+        return np.argsort(-valores, kind="stable")[:limite]
+
+    def to_frame(self, symbol):
+        return pd.DataFrame({
+            "symbol": symbol,
+            "zona": self.zonas,
+            "forca_total": self.forca_total,
+            "ocorrencias": self.ocorrencias,
+            "ultima_data": self.ultima_data
+        })
+
+
+# ✅ Store de Zonas Magnéticas
+class ZonaStore:
+    """
+    Catálogo de zonas magnéticas por símbolo.
+
+    Cada lote de atualizações é agregado por zona e persistido antes de
+    retornar: os deltas vão para o Postgres (upsert aditivo, compartilhado
+    entre processos) e o símbolo é relido do banco antes de publicar o
+    snapshot no Redis, para não sobrescrevê-lo com um índice local defasado;
+    sem banco, os deltas são mesclados no índice e o catálogo é gravado no
+    CSV. Nada fica só em memória, então um restart não perde rupturas
+    registradas.
+    """
+
+    SNAPSHOT_KEY = "zonas:magneticas:{symbol}"
+
+    def __init__(self, db_connection=None, redis_client=None, caminho_csv=CAMINHO_CATALOGO,
+                 ttl_cache=60):
+        self.db = db_connection
+        self.redis = redis_client
+        self.caminho_csv = caminho_csv
+        self.ttl_cache = ttl_cache
+        self._indices = {}
+        self._carregado_em = {}
+        self._lock = threading.RLock()
+        self._csv_carregado = False
+
+    def ensure_schema(self):
+        if self.db is None:
+            return
+        with self.db.cursor() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS zonas_magneticas (
+                    symbol TEXT NOT NULL,
+                    zona DOUBLE PRECISION NOT NULL,
+                    forca_total DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    ocorrencias INTEGER NOT NULL DEFAULT 0,
+                    ultima_data TEXT,
+                    PRIMARY KEY (symbol, zona)
+                )
+            """)
+        self.db.commit()
+
+    # ---- escrita ----
+
+    def registrar(self, symbol, zona, forca, ocorrencias=1, data=None):
+        """Registra uma atualização de zona (persistida antes de retornar)"""
+        self.registrar_lote(symbol, [zona], [forca], [ocorrencias], [data])
+
+    def registrar_lote(self, symbol, zonas, forcas, ocorrencias, datas):
+        """Agrega um lote de atualizações por zona, persiste os deltas e atualiza o índice"""
+        data_padrao = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        pendentes = [
+            (symbol, float(z), float(f), int(o), d or data_padrao)
+            for z, f, o, d in zip(zonas, forcas, ocorrencias, datas)
+        ]
+        if not pendentes:
+            return
+        with self._lock:
+            deltas = pd.DataFrame(pendentes, columns=["symbol", "zona", "forca_total", "ocorrencias", "ultima_data"])
+            deltas = deltas.groupby(["symbol", "zona"], sort=False).agg(
+                forca_total=("forca_total", "sum"),
+                ocorrencias=("ocorrencias", "sum"),
+                ultima_data=("ultima_data", "max")
+            ).reset_index()
+
+            if self.db is None:
+                for simbolo, grupo in deltas.groupby("symbol", sort=False):
+                    if simbolo not in self._indices:
+                        self._carregar(simbolo)
+                    self._mesclar(simbolo, grupo)
+                self._gravar_csv()
+                return
+            self._persistir_deltas(deltas)
+            # o banco é a fonte da verdade: outros processos podem ter gravado desde a última leitura
+            for simbolo in deltas["symbol"].unique():
+                self._indices[simbolo] = self._ler_banco(simbolo)
+                self._carregado_em[simbolo] = time.time()
+                self._publicar_snapshot(simbolo)
+
+    def _mesclar(self, symbol, deltas):
+        base = self._indices[symbol].to_frame(symbol)
+        combinado = pd.concat([base, deltas], ignore_index=True) if len(base) else deltas
+        agregado = combinado.groupby("zona", sort=True).agg(
+            forca_total=("forca_total", "sum"),
+            ocorrencias=("ocorrencias", "sum"),
+            ultima_data=("ultima_data", "max")
+        )
+        self._indices[symbol] = ZonasSimbolo(
+            agregado.index.values, agregado["forca_total"].values,
+            agregado["ocorrencias"].values, agregado["ultima_data"].values
+        )
+
+    def _persistir_deltas(self, deltas):
+        if self.db is None:
+            return
+        try:
+            self._executar_upsert(deltas)
+        except Exception:
+            # a conexão é de longa duração: não deixa a transação abortada para a próxima escrita
+            self.db.rollback()
+            raise
+
+    def _executar_upsert(self, deltas):
+        with self.db.cursor() as cur:
+            cur.executemany("""
+                INSERT INTO zonas_magneticas (symbol, zona, forca_total, ocorrencias, ultima_data)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (symbol, zona) DO UPDATE SET
+                    forca_total = zonas_magneticas.forca_total + EXCLUDED.forca_total,
+                    ocorrencias = zonas_magneticas.ocorrencias + EXCLUDED.ocorrencias,
+                    ultima_data = GREATEST(zonas_magneticas.ultima_data, EXCLUDED.ultima_data)
+            """, [
+                (row.symbol, float(row.zona), float(row.forca_total), int(row.ocorrencias), row.ultima_data)
+                for row in deltas.itertuples(index=False)
+            ])
+        self.db.commit()
+
+    def _publicar_snapshot(self, symbol):
+        if self.redis is None or self.db is None:
+            return
+        indice = self._indices[symbol]
+        snapshot = {
+            "zonas": indice.zonas.tolist(),
+            "forca_total": indice.forca_total.tolist(),
+            "ocorrencias": indice.ocorrencias.tolist(),
+            "ultima_data": [str(d) for d in indice.ultima_data]
+        }
+        try:
+            self.redis.setex(self.SNAPSHOT_KEY.format(symbol=symbol), self.ttl_cache * 5, json.dumps(snapshot))
+        except Exception as e:
+            print(f"[CATÁLOGO] Falha ao publicar snapshot de {symbol}: {e}")
+
+    def _gravar_csv(self):
+        frames = [indice.to_frame(symbol) for symbol, indice in self._indices.items() if len(indice)]
+        if frames:
+            pd.concat(frames, ignore_index=True).to_csv(self.caminho_csv, index=False)
+
+    # ---- leitura ----
+
+    def _carregar(self, symbol):
+        """Lê o símbolo do Redis (snapshot), do Postgres ou do CSV local"""
+        indice = None
+        if self.db is not None:
+            bruto = None
+            if self.redis is not None:
+                try:
+                    bruto = self.redis.get(self.SNAPSHOT_KEY.format(symbol=symbol))
+                except Exception:
+                    bruto = None
+            if bruto:
+                snap = json.loads(bruto)
+                indice = ZonasSimbolo(snap["zonas"], snap["forca_total"], snap["ocorrencias"], snap["ultima_data"])
+            else:
+                indice = self._ler_banco(symbol)
+                self._indices[symbol] = indice
+                self._publicar_snapshot(symbol)
+        else:
+            self._carregar_csv()
+            indice = self._indices.get(symbol, ZonasSimbolo())
+
+        self._indices[symbol] = indice
+        self._carregado_em[symbol] = time.time()
+        return indice
+
+    def _ler_banco(self, symbol):
+        try:
+            with self.db.cursor() as cur:
+                cur.execute(
+                    "SELECT zona, forca_total, ocorrencias, ultima_data FROM zonas_magneticas "
+                    "WHERE symbol = %s ORDER BY zona", (symbol,)
+                )
+                linhas = cur.fetchall()
+        except Exception:
+            # a conexão é de longa duração: não deixa a transação abortada para a próxima leitura
+            self.db.rollback()
+            raise
+        return ZonasSimbolo(*zip(*linhas)) if linhas else ZonasSimbolo()
+
+    def _carregar_csv(self):
+        if self._csv_carregado:
+            return
+        self._csv_carregado = True
+        try:
+            catalogo = pd.read_csv(self.caminho_csv)
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return
+        if catalogo.empty or "zona" not in catalogo.columns:
+            return
+        # CSV antigo: sem coluna de símbolo e possivelmente sem agregados
+        if "symbol" not in catalogo.columns:
+            catalogo["symbol"] = SIMBOLO_PADRAO
+        for coluna, padrao in (("forca_total", 0.0), ("ocorrencias", 1), ("ultima_data", "")):
+            if coluna not in catalogo.columns:
+                catalogo[coluna] = padrao
+        catalogo = catalogo.fillna({"forca_total": 0.0, "ocorrencias": 1, "ultima_data": ""})
+        catalogo["ultima_data"] = catalogo["ultima_data"].astype(str)
+        for simbolo, grupo in catalogo.groupby("symbol", sort=False):
+            agregado = grupo.groupby("zona", sort=True).agg(
+                forca_total=("forca_total", "sum"),
+                ocorrencias=("ocorrencias", "sum"),
+                ultima_data=("ultima_data", "max")
+            )
+            self._indices[simbolo] = ZonasSimbolo(
+                agregado.index.values, agregado["forca_total"].values,
+                agregado["ocorrencias"].values.astype(np.int64), agregado["ultima_data"].values
+            )
+
+    def zonas(self, symbol=SIMBOLO_PADRAO):
+        """Índice atualizado do símbolo (recarrega do Redis/Postgres se expirado)"""
+        with self._lock:
+            indice = self._indices.get(symbol)
+            expirado = (self.db is not None and
+                        time.time() - self._carregado_em.get(symbol, 0) > self.ttl_cache)
+            if indice is None or expirado:
+                indice = self._carregar(symbol)
+            return indice
+
+    def zona_mais_proxima(self, symbol, preco):
+        indice = self.zonas(symbol)
+        i = indice.mais_proxima(preco)
+        return None if i is None else indice.registro(i)
+
+    def zonas_na_margem(self, symbol, preco, margem):
+        indice = self.zonas(symbol)
+        return [indice.registro(i) for i in indice.na_margem(preco, margem)]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_zona_store():
+    """Store compartilhado do processo (CSV local até configurar_store ser chamado)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ZonaStore()
+        return _store
+
+
+def configurar_store(db_connection=None, redis_client=None, **kwargs):
+    """Troca o store do processo por um com persistência compartilhada (Postgres/Redis)"""
+    global _store
+    store = ZonaStore(db_connection=db_connection, redis_client=redis_client, **kwargs)
+    store.ensure_schema()
+    with _store_lock:
+        _store = store
+    return store
 
-# Caminho para o arquivo CSV que armazena as zonas magnéticas
-CAMINHO_CATALOGO = "catalogo_magnetico.csv"
 
 # ✅ Atualização do Catálogo de Zonas Magnéticas
-def atualizar_catalogo(df):
+def atualizar_catalogo(df, symbol=SIMBOLO_PADRAO):
     """
     Atualiza o catálogo de zonas magnéticas com base nas rupturas detectadas no DataFrame.
     """
@@ -14,151 +340,82 @@ def atualizar_catalogo(df):
         print("[CATÁLOGO] Nenhuma ruptura detectada.")
         return
 
-    df_rupturas = df[df["ruptura"]].copy()
-    df_rupturas["zona"] = (df_rupturas["close"] // 50) * 50
-    df_rupturas["forca"] = df_rupturas["densidade"]
-
-    try:
-        catalogo = pd.read_csv(CAMINHO_CATALOGO)
-    except FileNotFoundError:
-        catalogo = pd.DataFrame(columns=["zona", "forca_total", "ocorrencias", "ultima_data"])
-
-    zonas_existentes = catalogo["zona"].values if not catalogo.empty else []
+    df_rupturas = df[df["ruptura"]]
+    zonas = (df_rupturas["close"] // TAMANHO_ZONA) * TAMANHO_ZONA
+    # Usar timestamp do DataFrame se disponível, senão usar o momento atual
+    if hasattr(df_rupturas.index, 'strftime'):
+        datas = df_rupturas.index.strftime('%Y-%m-%d %H:%M:%S')
+    else:
+        datas = [datetime.now().strftime('%Y-%m-%d %H:%M:%S')] * len(df_rupturas)
 
-    for idx, row in df_rupturas.iterrows():
-        zona = row["zona"]
-        densidade = row["forca"]
-        # Usar timestamp do DataFrame se disponível, senão usar índice
-        if hasattr(idx, 'strftime'):
-            data = idx.strftime('%Y-%m-%d %H:%M:%S')
-        else:
-            data = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    agregado = pd.DataFrame({
+        "zona": zonas.values,
+        "forca": df_rupturas["densidade"].values,
+        "data": list(datas)
+    }).groupby("zona", sort=False).agg(
+        forca=("forca", "sum"), ocorrencias=("forca", "size"), data=("data", "max")
+    )
 
-        if zona in zonas_existentes:
-            idx = catalogo.index[catalogo["zona"] == zona][0]
-            catalogo.at[idx, "forca_total"] += densidade
-            catalogo.at[idx, "ocorrencias"] += 1
-            catalogo.at[idx, "ultima_data"] = data
-        else:
-            novo = {
-                "zona": zona,
-                "forca_total": densidade,
-                "ocorrencias": 1,
-                "ultima_data": data
-            }
-            catalogo = pd.concat([catalogo, pd.DataFrame([novo])], ignore_index=True)
-
-    # Consolidar zonas duplicadas
-    if not catalogo.empty:
-        catalogo = catalogo.groupby('zona').agg({
-            'forca_total': 'sum',
-            'ocorrencias': 'sum',
-            'ultima_data': 'last'
-        }).reset_index()
-        catalogo = catalogo.sort_values('forca_total', ascending=False)
-    
-    catalogo.to_csv(CAMINHO_CATALOGO, index=False)
+    get_zona_store().registrar_lote(
+        symbol, agregado.index.values, agregado["forca"].values,
+        agregado["ocorrencias"].values, agregado["data"].values
+    )
     print(f"[CATÁLOGO] Atualizado com {len(df_rupturas)} rupturas.")
 
 # ✅ Exibir Zonas Relevantes
-def exibir_zonas_relevantes(limite=5):
+def exibir_zonas_relevantes(limite=5, symbol=SIMBOLO_PADRAO):
     """
     Retorna uma lista das zonas magnéticas mais relevantes com base na força média.
     """
-    try:
-        catalogo = pd.read_csv(CAMINHO_CATALOGO)
-    except FileNotFoundError:
-        # Não imprimir mensagem de erro repetidamente
-        return []
-
-    if catalogo.empty:
-        # Não imprimir mensagem de catálogo vazio repetidamente
-        return []
-
-    catalogo["forca_media"] = catalogo["forca_total"] / catalogo["ocorrencias"]
-    catalogo = catalogo.sort_values(by="forca_media", ascending=False)
-
-    zonas_relevantes = []
-    for _, row in catalogo.head(limite).iterrows():
-        zonas_relevantes.append({
-            "zona": float(row["zona"]),
-            "forca_total": round(row["forca_total"], 2),
-            "ocorrencias": int(row["ocorrencias"]),
-            "ultima_data": row["ultima_data"]
-        })
-
-    return zonas_relevantes
+    indice = get_zona_store().zonas(symbol)
+    return [indice.registro(i) for i in indice.ordenadas_por("forca_media", limite)]
 
 # ✅ Obter Zonas Magnéticas (Lista Simples)
-def obter_zonas_magneticas():
+def obter_zonas_magneticas(symbol=SIMBOLO_PADRAO):
     """
     Retorna lista simples com os valores das zonas magnéticas.
     Usado pelo modo_renan.py
     """
-    try:
-        catalogo = pd.read_csv(CAMINHO_CATALOGO)
-        if catalogo.empty:
-            return []
-        
-        # Retornar apenas os valores das zonas (top 10 mais fortes)
-        catalogo = catalogo.sort_values('forca_total', ascending=False)
-        return catalogo['zona'].head(10).tolist()
-    except FileNotFoundError:
-        return []
+    indice = get_zona_store().zonas(symbol)
+    # Retornar apenas os valores das zonas (top 10 mais fortes)
+    return indice.zonas[indice.ordenadas_por("forca_total", 10)].tolist()
 
 # ✅ Verificação de Ressonância
-def verificar_ressonancia(preco_atual, margem=10):
+def verificar_ressonancia(preco_atual, margem=10, symbol=SIMBOLO_PADRAO):
     """
     Verifica se o preço atual está em uma zona de ressonância mapeada.
     """
-    try:
-        catalogo = pd.read_csv(CAMINHO_CATALOGO)
-    except FileNotFoundError:
-        print("[ERRO] Catálogo Magnético não encontrado.")
-        return False
-
-    if catalogo.empty:
-        # Não imprimir mensagem de catálogo vazio repetidamente
-        return False
-
-    # Verifica se o preço está dentro da margem de alguma zona
-    zonas = catalogo["zona"].values
-    for zona in zonas:
-        if abs(preco_atual - zona) <= margem:
-            print(f"[RESSONÂNCIA] Preço {preco_atual} em zona magnética {zona}")
-            return True
-    
+    zona = get_zona_store().zona_mais_proxima(symbol, preco_atual)
+    if zona is not None and abs(preco_atual - zona["zona"]) <= margem:
+        print(f"[RESSONÂNCIA] Preço {preco_atual} em zona magnética {zona['zona']}")
+        return True
     return False
 
 # ✅ Identificação de Proximidade com Zona Magnética
-def identificar_proximidade_zona(preco_atual, limite=50):
+def identificar_proximidade_zona(preco_atual, limite=50, symbol=SIMBOLO_PADRAO):
     """
     Verifica se o preço está se aproximando de uma zona magnética.
+    Entre as zonas dentro do limite, retorna a de maior força média.
     """
-    zonas = exibir_zonas_relevantes()
-    for zona in zonas:
-        if abs(preco_atual - zona["zona"]) <= limite:
-            print(f"[ALERTA] Preço se aproximando da Zona {zona['zona']}")
-            return zona
-    return None
+    indice = get_zona_store().zonas(symbol)
+    faixa = indice.na_margem(preco_atual, limite)
+    if not faixa:
+        return None
+    forca_media = indice.forca_total[faixa.start:faixa.stop] / np.maximum(indice.ocorrencias[faixa.start:faixa.stop], 1)
+    zona = indice.registro(faixa.start + int(np.argmax(forca_media)))
+    print(f"[ALERTA] Preço se aproximando da Zona {zona['zona']}")
+    return zona
 
 # ✅ Registro de Rupturas
-def registrar_ruptura(preco, timestamp):
+def registrar_ruptura(preco, timestamp, symbol=SIMBOLO_PADRAO, forca=0.0):
     """
     Registra uma nova ruptura magnética no catálogo.
     """
-    if not os.path.exists(CAMINHO_CATALOGO):
-        df = pd.DataFrame(columns=["zona", "timestamp"])
-    else:
-        df = pd.read_csv(CAMINHO_CATALOGO)
-
-    nova_entrada = {"zona": preco, "timestamp": timestamp}
-    df = pd.concat([df, pd.DataFrame([nova_entrada])], ignore_index=True)
-    df.to_csv(CAMINHO_CATALOGO, index=False)
+    get_zona_store().registrar(symbol, preco, forca, 1, str(timestamp))
     print(f"🔴 Ruptura registrada em {preco} USDT | ⏱ {timestamp}")
 
 # ✅ Identificação de Compressão Magnética
-def identificar_compressao(df, margem=5):
+def identificar_compressao(df, margem=5, symbol=SIMBOLO_PADRAO):
     """
     Verifica se há compressão magnética no DataFrame, evitando alertas duplicados.
     Compressão ocorre quando os preços ficam restritos em uma faixa estreita por um período.
@@ -172,7 +429,7 @@ def identificar_compressao(df, margem=5):
     agora = datetime.now()
 
     # 🔎 Identifica zonas próximas de compressão
-    zona_proxima = identificar_proximidade_zona(preco_atual, margem)
+    zona_proxima = identificar_proximidade_zona(preco_atual, margem, symbol)
     if zona_proxima:
         zona_valor = zona_proxima["zona"]
 
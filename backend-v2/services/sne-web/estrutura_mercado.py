@@ -6,9 +6,10 @@ Analisa Higher Highs, Higher Lows, Suportes e Resistências
 """
 
 import pandas as pd
-import numpy as np
 from scipy.signal import find_peaks
 
+from niveis_swing import agrupar_precos
+
 
 def analisar_estrutura(dados):
     """
@@ -155,30 +156,11 @@ def agrupar_niveis(precos, preco_atual, tipo='suporte', tolerancia=0.005):
         if not precos:
             return []
         
-        # Agrupar níveis próximos
+        # Agrupar níveis próximos (passada única sobre os preços ordenados)
         niveis = []
-        precos_sorted = sorted(precos)
-        
-        grupo_atual = [precos_sorted[0]]
-        for preco in precos_sorted[1:]:
-            if abs(preco - grupo_atual[-1]) / grupo_atual[-1] < tolerancia:
-                grupo_atual.append(preco)
-            else:
-                # Finalizar grupo
-                nivel_medio = np.mean(grupo_atual)
-                forca = len(grupo_atual)
-                niveis.append({
-                    'preco': round(nivel_medio, 2),
-                    'forca': forca,
-                    'toques': forca,
-                    'distancia_pct': round(abs(nivel_medio - preco_atual) / preco_atual * 100, 2)
-                })
-                grupo_atual = [preco]
-        
-        # Último grupo
-        if grupo_atual:
-            nivel_medio = np.mean(grupo_atual)
-            forca = len(grupo_atual)
+        for grupo in agrupar_precos(precos, tolerancia):
+            nivel_medio = grupo['preco']
+            forca = grupo['toques']
             niveis.append({
                 'preco': round(nivel_medio, 2),
                 'forca': forca,
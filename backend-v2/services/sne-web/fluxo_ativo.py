@@ -4,8 +4,6 @@
 FLUXO ATIVO - Análise de Liquidez e DOM
 """
 
-import requests
-
 
 class FluxoAtivo:
     """Classe para análise de fluxo de liquidez e order book"""
@@ -16,9 +14,11 @@ class FluxoAtivo:
     def obter_depth(self, symbol: str, limit: int = 5000):
         """Obtém order book depth da Binance"""
         try:
+            from app.http_client import get
+
             url = f"{self.base_url}/depth"
             params = {"symbol": symbol, "limit": limit}
-            response = requests.get(url, params=params, timeout=5)
+            response = get(url, params=params, timeout=5)
             
             if response.status_code == 200:
                 return response.json()
@@ -14,6 +14,8 @@ warnings.filterwarnings('ignore')
 
 # Importar funções básicas do módulo original
 from indicadores import calcular_indicadores, detectar_padroes_candlestick
+from motor_padroes import avaliar_padroes, extrair_picos, cobre_janela
+import kernels_indicadores as kernels
 
 
 # ============================================================================
@@ -120,44 +122,7 @@ def calcular_adx(df, periodo=14):
 def calcular_parabolic_sar(df, af=0.02, max_af=0.2):
     """Calcula Parabolic SAR"""
     try:
-        high = df['high'].values
-        low = df['low'].values
-        close = df['close'].values
-        
-        sar = np.zeros(len(df))
-        trend = np.zeros(len(df))
-        af_current = af
-        
-        # Inicialização
-        sar[0] = low[0]
-        trend[0] = 1  # 1 = uptrend, -1 = downtrend
-        
-        for i in range(1, len(df)):
-            if trend[i-1] == 1:  # Uptrend
-                sar[i] = sar[i-1] + af_current * (high[i-1] - sar[i-1])
-                
-                # Verificar reversão
-                if low[i] <= sar[i]:
-                    trend[i] = -1
-                    sar[i] = high[i-1]
-                    af_current = af
-                else:
-                    trend[i] = 1
-                    if high[i] > high[i-1]:
-                        af_current = min(af_current + af, max_af)
-            else:  # Downtrend
-                sar[i] = sar[i-1] + af_current * (low[i-1] - sar[i-1])
-                
-                # Verificar reversão
-                if high[i] >= sar[i]:
-                    trend[i] = 1
-                    sar[i] = low[i-1]
-                    af_current = af
-                else:
-                    trend[i] = -1
-                    if low[i] < low[i-1]:
-                        af_current = min(af_current + af, max_af)
-        
+        sar, trend = kernels.parabolic_sar(df['high'].values, df['low'].values, af, max_af)
         df['PSAR'] = sar
         df['PSAR_Trend'] = trend
         return df
@@ -173,18 +138,7 @@ def calcular_parabolic_sar(df, af=0.02, max_af=0.2):
 def calcular_obv(df):
     """Calcula On Balance Volume (OBV)"""
     try:
-        obv = np.zeros(len(df))
-        obv[0] = df['volume'].iloc[0]
-        
-        for i in range(1, len(df)):
-            if df['close'].iloc[i] > df['close'].iloc[i-1]:
-                obv[i] = obv[i-1] + df['volume'].iloc[i]
-            elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-                obv[i] = obv[i-1] - df['volume'].iloc[i]
-            else:
-                obv[i] = obv[i-1]
-        
-        df['OBV'] = obv
+        df['OBV'] = kernels.obv(df['close'].values, df['volume'].values)
         return df
     except Exception as e:
         print(f"❌ Erro ao calcular OBV: {e}")
@@ -192,49 +146,13 @@ def calcular_obv(df):
 
 
 def calcular_volume_profile(df, bins=20):
-    """Calcula Volume Profile simplificado"""
+    """Calcula Volume Profile (volume de cada candle repartido entre os bins que ele cobre)"""
     try:
-        # Dividir preços em bins
-        price_min = df['low'].min()
-        price_max = df['high'].max()
-        bin_size = (price_max - price_min) / bins
-        
-        # Calcular volume por bin
-        volume_profile = np.zeros(bins)
-        bin_prices = np.zeros(bins)
-        
-        for i in range(bins):
-            bin_start = price_min + i * bin_size
-            bin_end = price_min + (i + 1) * bin_size
-            bin_prices[i] = (bin_start + bin_end) / 2
-            
-            # Volume neste range de preço
-            mask = (df['low'] >= bin_start) & (df['high'] <= bin_end)
-            volume_profile[i] = df[mask]['volume'].sum()
-        
-        # Encontrar POC (Point of Control)
-        poc_index = np.argmax(volume_profile)
-        poc_price = bin_prices[poc_index]
-        
-        # Value Area (70% do volume)
-        sorted_indices = np.argsort(volume_profile)[::-1]
-        cumulative_volume = 0
-        total_volume = np.sum(volume_profile)
-        value_area_indices = []
-        
-        for idx in sorted_indices:
-            cumulative_volume += volume_profile[idx]
-            value_area_indices.append(idx)
-            if cumulative_volume >= 0.7 * total_volume:
-                break
-        
-        val_prices = bin_prices[value_area_indices]
-        val_low = np.min(val_prices)
-        val_high = np.max(val_prices)
-        
-        df['Volume_Profile_POC'] = poc_price
-        df['Volume_Profile_VAL'] = val_low
-        df['Volume_Profile_VAH'] = val_high
+        perfil = kernels.volume_profile(df['low'].values, df['high'].values, df['volume'].values, bins)
+        
+        df['Volume_Profile_POC'] = perfil['poc']
+        df['Volume_Profile_VAL'] = perfil['val']
+        df['Volume_Profile_VAH'] = perfil['vah']
         
         return df
     except Exception as e:
@@ -289,8 +207,8 @@ def calcular_donchian_channels(df, periodo=20):
 # PADRÕES GRÁFICOS AVANÇADOS
 # ============================================================================
 
-def detectar_head_shoulders(df, lookback=20):
-    """Detecta padrão Head and Shoulders"""
+def detectar_head_shoulders(df, lookback=20, picos=None):
+    """Detecta padrão Head and Shoulders (picos: ConjuntoPicos compartilhado, opcional)"""
     try:
         if len(df) < lookback:
             return []
@@ -299,9 +217,10 @@ def detectar_head_shoulders(df, lookback=20):
         recent_data = df.tail(lookback)
         
         # Encontrar picos
-        from scipy.signal import find_peaks
+        if not cobre_janela(picos, df, lookback):
+            picos = extrair_picos(df, lookback)
         highs = recent_data['high'].values
-        peaks, _ = find_peaks(highs, distance=3, prominence=highs.std() * 0.5)
+        peaks = picos.pontos('topos', distancia=3, proeminencia=0.5, ultimas=lookback)
         
         if len(peaks) >= 3:
             # Verificar se os últimos 3 picos formam Head and Shoulders
@@ -326,8 +245,8 @@ def detectar_head_shoulders(df, lookback=20):
         return []
 
 
-def detectar_triangles(df, lookback=30):
-    """Detecta padrões de triângulos"""
+def detectar_triangles(df, lookback=30, picos=None):
+    """Detecta padrões de triângulos (picos: ConjuntoPicos compartilhado, opcional)"""
     try:
         if len(df) < lookback:
             return []
@@ -336,13 +255,14 @@ def detectar_triangles(df, lookback=30):
         recent_data = df.tail(lookback)
         
         # Encontrar máximos e mínimos
-        from scipy.signal import find_peaks, find_peaks
+        if not cobre_janela(picos, df, lookback):
+            picos = extrair_picos(df, lookback)
         
         highs = recent_data['high'].values
         lows = recent_data['low'].values
         
-        peaks, _ = find_peaks(highs, distance=3)
-        troughs, _ = find_peaks(-lows, distance=3)
+        peaks = picos.pontos('topos', distancia=3, ultimas=lookback)
+        troughs = picos.pontos('fundos', distancia=3, ultimas=lookback)
         
         if len(peaks) >= 2 and len(troughs) >= 2:
             # Verificar tendência dos máximos e mínimos
@@ -444,11 +364,11 @@ def calcular_indicadores_avancados(df):
         df = calcular_keltner_channels(df)
         df = calcular_donchian_channels(df)
         
-        # PADRÕES GRÁFICOS AVANÇADOS
-        padroes_avancados = []
-        padroes_avancados.extend(detectar_head_shoulders(df))
-        padroes_avancados.extend(detectar_triangles(df))
-        padroes_avancados.extend(detectar_flags_pennants(df))
+        # PADRÕES GRÁFICOS AVANÇADOS (uma extração de picos para todos)
+        padroes_avancados = [
+            padrao['padrao']
+            for padrao in avaliar_padroes(df, padroes=('ombro_cabeca_ombro', 'triangulo', 'flag'))
+        ]
         
         # Adicionar padrões ao DataFrame
         df['Padroes_Avancados'] = ', '.join(padroes_avancados) if padroes_avancados else 'Nenhum'
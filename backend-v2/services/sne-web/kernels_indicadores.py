@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KERNELS DE INDICADORES
+Implementações vetorizadas (NumPy, sem Numba) de OBV, Parabolic SAR e
+Volume Profile, usadas por indicadores_avancados. O comparativo com as
+versões anteriores fica em benchmarks/kernels.py
+"""
+
+import numpy as np
+
+
+def obv(close, volume):
+    """
+    On Balance Volume: soma acumulada de sign(Δclose) * volume
+
+    Returns:
+        np.ndarray (obv[0] = volume[0], como na versão em loop)
+    """
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    if len(close) == 0:
+        return np.zeros(0)
+    fluxo = np.empty(len(close))
+    fluxo[0] = volume[0]
+    fluxo[1:] = np.sign(np.diff(close)) * volume[1:]
+    return np.cumsum(fluxo)
+
+
+def parabolic_sar(high, low, af=0.02, max_af=0.2):
+    """
+    Parabolic SAR com loop enxuto sobre listas (sem acesso a pandas por barra)
+
+    Returns:
+        (sar, trend) como np.ndarray; trend 1 = alta, -1 = baixa
+    """
+    high = np.asarray(high, dtype=float).tolist()
+    low = np.asarray(low, dtype=float).tolist()
+    n = len(high)
+    sar = [0.0] * n
+    trend = [0.0] * n
+    if n == 0:
+        return np.zeros(0), np.zeros(0)
+
+    sar[0] = low[0]
+    trend[0] = 1.0
+    af_atual = af
+    sar_anterior = low[0]
+    tendencia = 1.0
+    for i in range(1, n):
+        if tendencia == 1.0:
+            valor = sar_anterior + af_atual * (high[i - 1] - sar_anterior)
+            if low[i] <= valor:
+                tendencia = -1.0
+                valor = high[i - 1]
+                af_atual = af
+            elif high[i] > high[i - 1]:
+                af_atual = min(af_atual + af, max_af)
+        else:
+            valor = sar_anterior + af_atual * (low[i - 1] - sar_anterior)
+            if high[i] >= valor:
+                tendencia = 1.0
+                valor = low[i - 1]
+                af_atual = af
+            elif low[i] < low[i - 1]:
+                af_atual = min(af_atual + af, max_af)
+        sar[i] = valor
+        trend[i] = tendencia
+        sar_anterior = valor
+    return np.array(sar), np.array(trend)
+
+
+def volume_profile(low, high, volume, bins=20, value_area=0.7):
+    """
+    Volume Profile com alocação proporcional
+
+    O volume de cada candle é distribuído uniformemente entre low e high e
+    repartido pelos bins na proporção da sobreposição (um candle que cruza
+    vários bins contribui para todos, em vez de ser descartado).
+
+    Returns:
+        dict com 'perfil', 'precos' (centro dos bins), 'poc', 'val', 'vah'
+    """
+    low = np.asarray(low, dtype=float)
+    high = np.asarray(high, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+
+    preco_min = low.min()
+    preco_max = high.max()
+    tamanho = (preco_max - preco_min) / bins
+    precos = preco_min + (np.arange(bins) + 0.5) * tamanho
+    if tamanho <= 0:
+        perfil = np.zeros(bins)
+        perfil[0] = volume.sum()
+    else:
+        escala = 1.0 / tamanho
+        # valores >= 0: truncar equivale a floor
+        bin_low = np.minimum(((low - preco_min) * escala).astype(np.int64), bins - 1)
+        bin_high = np.minimum(((high - preco_min) * escala).astype(np.int64), bins - 1)
+        amplitude = high - low
+        mesmo_bin = (bin_low == bin_high) | (amplitude <= 0)
+        densidade = np.divide(volume, amplitude, out=np.zeros_like(volume), where=~mesmo_bin)
+
+        # parcela no bin do low, no bin do high e nos bins inteiros entre eles
+        primeira = np.where(mesmo_bin, volume, (preco_min + (bin_low + 1) * tamanho - low) * densidade)
+        ultima = np.where(mesmo_bin, 0.0, (high - (preco_min + bin_high * tamanho)) * densidade)
+        cheio = tamanho * densidade
+        diferencas = (np.bincount(bin_low + 1, weights=cheio, minlength=bins + 1) -
+                      np.bincount(bin_high, weights=cheio, minlength=bins + 1))
+        perfil = (np.bincount(bin_low, weights=primeira, minlength=bins) +
+                  np.bincount(bin_high, weights=ultima, minlength=bins) +
+                  np.cumsum(diferencas)[:bins])
+
+    ordem = np.argsort(-perfil, kind='stable')
+    acumulado = np.cumsum(perfil[ordem])
+    corte = min(int(np.searchsorted(acumulado, value_area * acumulado[-1])), bins - 1)
+    area = precos[ordem[:corte + 1]]
+    return {
+        'perfil': perfil,
+        'precos': precos,
+        'poc': precos[ordem[0]],
+        'val': area.min(),
+        'vah': area.max()
+    }
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MOTOR DE PADRÕES GRÁFICOS
+Extrai topos e fundos uma única vez por frame e avalia todos os templates
+de padrão (wedges, triângulos, OCO, flags) sobre o mesmo conjunto
+"""
+
+import numpy as np
+from scipy.signal import find_peaks, peak_prominences
+
+
+JANELA_PADRAO = 100
+PADROES_DISPONIVEIS = ('wedge', 'triangulo', 'ombro_cabeca_ombro', 'flag')
+
+VIES_PADRAO = {
+    'RISING_WEDGE': 'BAIXA',
+    'FALLING_WEDGE': 'ALTA',
+    'TRIANGULO_ASCENDENTE': 'ALTA',
+    'TRIANGULO_DESCENDENTE': 'BAIXA',
+    'TRIANGULO_SIMETRICO': 'NEUTRO',
+    'HEAD_SHOULDERS': 'BAIXA',
+    'FLAG_ALTA': 'ALTA',
+    'FLAG_BAIXA': 'BAIXA',
+    'PENNANT': 'NEUTRO'
+}
+
+
+def _selecionar_por_distancia(picos, prioridade, distancia):
+    """Mesma regra do find_peaks(distance=...): o ponto mais alto elimina os vizinhos"""
+    manter = np.ones(len(picos), dtype=bool)
+    if len(picos) < 2 or np.diff(picos).min() >= distancia:
+        return manter
+    for j in np.argsort(prioridade)[::-1]:
+        if not manter[j]:
+            continue
+        k = j - 1
+        while k >= 0 and picos[j] - picos[k] < distancia:
+            manter[k] = False
+            k -= 1
+        k = j + 1
+        while k < len(picos) and picos[k] - picos[j] < distancia:
+            manter[k] = False
+            k += 1
+    return manter
+
+
+class ConjuntoPicos:
+    """
+    Topos e fundos de uma janela de candles, extraídos uma única vez
+
+    Os máximos/mínimos locais são extraídos uma vez sobre a janela inteira;
+    cada template pede o subconjunto que precisa (distância mínima,
+    proeminência em múltiplos do desvio padrão, últimas N barras) sem refazer
+    a extração. O recorte das últimas N barras mantém os picos cujo platô
+    começa depois da primeira barra do recorte (os demais não têm vizinho
+    menor à esquerda dentro dele) e recalcula as proeminências sobre o
+    recorte, que dependem das bordas: o resultado é o mesmo do find_peaks
+    chamado pelo template sobre as últimas N barras.
+    """
+
+    def __init__(self, high, low):
+        self.high = np.asarray(high, dtype=float)
+        self.low = np.asarray(low, dtype=float)
+        self.total = len(self.high)
+        self._extremos = {}
+        self._candidatos = {}
+        self._desvios = {}
+        self._cache = {}
+
+    def _valores(self, lado):
+        return self.high if lado == 'topos' else -self.low
+
+    def _extremos_janela(self, lado):
+        """Máximos locais da janela inteira e o início do platô de cada um"""
+        if lado not in self._extremos:
+            picos, props = find_peaks(self._valores(lado), plateau_size=1)
+            self._extremos[lado] = (picos, props['left_edges'])
+        return self._extremos[lado]
+
+    def _extremos_locais(self, lado, ultimas):
+        """Máximos locais e proeminências do recorte das últimas N barras"""
+        chave = (lado, ultimas)
+        if chave not in self._candidatos:
+            inicio = self.total - ultimas
+            picos, bordas = self._extremos_janela(lado)
+            picos = picos[bordas > inicio] - inicio
+            valores = self._valores(lado)[inicio:]
+            proeminencias = peak_prominences(valores, picos)[0] if len(picos) else np.empty(0)
+            self._candidatos[chave] = (picos, proeminencias)
+        return self._candidatos[chave]
+
+    def desvio(self, lado, ultimas):
+        """Desvio padrão de high (topos) ou low (fundos) nas últimas N barras"""
+        chave = (lado, ultimas)
+        if chave not in self._desvios:
+            serie = self.high if lado == 'topos' else self.low
+            self._desvios[chave] = np.std(serie[self.total - ultimas:])
+        return self._desvios[chave]
+
+    def pontos(self, lado='topos', distancia=1, proeminencia=0.0, ultimas=None):
+        """
+        Índices dos topos/fundos que passam nos filtros
+
+        Args:
+            lado: 'topos' ou 'fundos'
+            distancia: distância mínima entre pontos (como no find_peaks)
+            proeminencia: proeminência mínima em múltiplos do desvio padrão
+            ultimas: considera só as últimas N barras da janela
+
+        Returns:
+            np.ndarray de índices relativos ao início das últimas N barras
+        """
+        ultimas = self.total if ultimas is None else min(ultimas, self.total)
+        chave = (lado, distancia, proeminencia, ultimas)
+        if chave in self._cache:
+            return self._cache[chave]
+
+        picos, proeminencias = self._extremos_locais(lado, ultimas)
+
+        if distancia > 1 and len(picos) > 1:
+            valores = self._valores(lado)[self.total - ultimas:]
+            manter = _selecionar_por_distancia(picos, valores[picos], distancia)
+            picos = picos[manter]
+            proeminencias = proeminencias[manter]
+
+        if proeminencia > 0:
+            picos = picos[proeminencias >= self.desvio(lado, ultimas) * proeminencia]
+
+        self._cache[chave] = picos
+        return picos
+
+
+def extrair_picos(df, janela=JANELA_PADRAO):
+    """Extrai o conjunto de topos/fundos das últimas `janela` barras do frame"""
+    dados = df.tail(janela)
+    return ConjuntoPicos(dados['high'].values, dados['low'].values)
+
+
+def cobre_janela(picos, df, lookback):
+    """True se o conjunto de picos abrange as últimas `lookback` barras do frame"""
+    return picos is not None and picos.total >= min(lookback, len(df))
+
+
+def _padrao(nome, familia, detalhes=None):
+    from scanner_padroes import obter_estatisticas
+
+    return {
+        'padrao': nome,
+        'familia': familia,
+        'vies': VIES_PADRAO.get(nome, 'NEUTRO'),
+        'detalhes': detalhes or {},
+        'historico': obter_estatisticas().get(nome)
+    }
+
+
+def avaliar_padroes(df, picos=None, padroes=PADROES_DISPONIVEIS, janela=JANELA_PADRAO):
+    """
+    Avalia os templates de padrão sobre um único conjunto de picos
+
+    Args:
+        df: DataFrame com OHLCV
+        picos: ConjuntoPicos já extraído (opcional)
+        padroes: famílias a avaliar, na ordem do resultado (ver PADROES_DISPONIVEIS)
+        janela: barras usadas na extração quando picos não é informado
+
+    Returns:
+        list de dicts {padrao, familia, vies, detalhes, historico}
+    """
+    from padroes_graficos import detectar_wedges
+    from indicadores_avancados import (
+        detectar_head_shoulders, detectar_triangles, detectar_flags_pennants
+    )
+
+    if df is None or df.empty:
+        return []
+    if picos is None:
+        picos = extrair_picos(df, janela)
+
+    encontrados = []
+    for familia in padroes:
+        if familia == 'wedge':
+            wedge = detectar_wedges(df, picos=picos)
+            if wedge.get('wedge_detectado'):
+                encontrados.append(_padrao(wedge['tipo'], 'wedge', wedge))
+        elif familia == 'triangulo':
+            for nome in detectar_triangles(df, picos=picos):
+                encontrados.append(_padrao(nome, 'triangulo'))
+        elif familia == 'ombro_cabeca_ombro':
+            for nome in detectar_head_shoulders(df, picos=picos):
+                encontrados.append(_padrao(nome, 'ombro_cabeca_ombro'))
+        elif familia == 'flag':
+            for nome in detectar_flags_pennants(df):
+                encontrados.append(_padrao(nome, 'flag'))
+    return encontrados
+
+
+def detectar_padroes_lote(frames, padroes=PADROES_DISPONIVEIS, janela=JANELA_PADRAO):
+    """
+    Avalia os templates de padrão para vários símbolos em uma chamada
+
+    Cada símbolo custa uma única extração de picos, compartilhada por todos
+    os templates.
+
+    Args:
+        frames: dict símbolo -> DataFrame OHLCV
+
+    Returns:
+        dict símbolo -> lista de padrões
+    """
+    resultado = {}
+    for simbolo, df in frames.items():
+        if df is None or df.empty:
+            resultado[simbolo] = []
+            continue
+        resultado[simbolo] = avaliar_padroes(df, extrair_picos(df, janela), padroes, janela)
+    return resultado
@@ -11,7 +11,7 @@ from multi_timeframe import analise_multitf
 from confluencia import calcular_confluencia
 from fluxo_ativo import FluxoAtivo
 from catalogo_magnetico import obter_zonas_magneticas
-from padroes_graficos import detectar_padroes, detectar_wedges
+from padroes_graficos import detectar_padroes
 from indicadores import calcular_indicadores
 from indicadores_avancados import (
     calcular_indicadores_avancados,
@@ -31,68 +31,105 @@ except ImportError:
     requests = None
 
 
-def analise_completa(symbol="BTCUSDT", timeframe="1h"):
+class DadosIndisponiveis(Exception):
+    """Coletor não devolveu candles para o par/timeframe"""
+
+
+class AnaliseSecoes:
     """
-    SNE Scanner - Análise Completa Integrada
-    
-    Returns:
-        dict com todas as camadas de análise
+    Seções de analise_completa avaliadas sob demanda
+
+    Cada seção é uma função que pede suas dependências com obter(); o
+    resultado fica memorizado, então cada etapa roda no máximo uma vez e só
+    quando alguma seção pedida depende dela.
     """
-    print(f"\n🔄 SNE SCANNER - Analisando {symbol}...")
-    
-    # 1. COLETAR DADOS
+
+    def __init__(self, symbol, timeframe):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self._valores = {}
+
+    def obter(self, nome):
+        if nome not in self._valores:
+            self._valores[nome] = SECOES[nome](self)
+        return self._valores[nome]
+
+    def calculadas(self):
+        return list(self._valores)
+
+
+def _secao_dados(analise):
     print("   📊 Coletando dados...")
-    dados = coletar_dados(symbol, timeframe)
+    dados = coletar_dados(analise.symbol, analise.timeframe)
     if dados is None:
-        return {"erro": "Falha ao coletar dados"}
-    
-    # 2. ANÁLISES FUNDAMENTAIS
+        raise DadosIndisponiveis()
+    return dados
+
+
+def _secao_preco(analise):
+    return analise.obter('dados')['close'].iloc[-1]
+
+
+def _secao_contexto(analise):
     print("   🌍 Analisando contexto macro...")
-    contexto = analisar_contexto(dados)
-    
+    return analisar_contexto(analise.obter('dados'))
+
+
+def _secao_estrutura(analise):
     print("   📊 Analisando estrutura...")
-    estrutura = analisar_estrutura(dados)
-    
+    return analisar_estrutura(analise.obter('dados'))
+
+
+def _secao_mtf(analise):
     print("   ⏰ Análise multi-timeframe...")
-    mtf = analise_multitf(symbol)
-    
-    # 3. ANÁLISES AVANÇADAS
+    return analise_multitf(analise.symbol)
+
+
+def _secao_zonas(analise):
     print("   🧲 Detectando zonas magnéticas...")
-    zonas = obter_zonas_magneticas()
-    preco_atual = dados['close'].iloc[-1]
+    zonas = obter_zonas_magneticas(analise.symbol)
+    preco_atual = analise.obter('preco')
     zona_proxima = min(zonas, key=lambda z: abs(z - preco_atual)) if zonas else None
     dist_pct = abs(zona_proxima - preco_atual) / preco_atual * 100 if zona_proxima else 0
-    
+    return {
+        'zona_proxima': zona_proxima,
+        'distancia_pct': dist_pct
+    }
+
+
+def _secao_fluxo(analise):
     print("   🌊 Analisando fluxo DOM...")
-    fluxo_obj = FluxoAtivo()
-    fluxo = fluxo_obj.calcular_pressao_liquidez(symbol)
-    
-    # 4. PADRÕES GRÁFICOS (incluindo Wedges)
+    return FluxoAtivo().calcular_pressao_liquidez(analise.symbol)
+
+
+def _secao_padroes(analise):
     print("   🔺 Detectando padrões gráficos...")
-    padroes = detectar_padroes(dados)
-    wedges = detectar_wedges(dados)
-    
-    # 5. ANÁLISE DETALHADA DE CANDLES
+    return detectar_padroes(analise.obter('dados'))
+
+
+def _secao_wedges(analise):
+    return analise.obter('padroes')['wedges']
+
+
+def _secao_candles_detalhados(analise):
     print("   🕐 Analisando candle atual...")
-    candles_analise = analisar_candle_atual(dados, timeframe)
-    
-    # 6. CONFLUÊNCIA
+    return analisar_candle_atual(analise.obter('dados'), analise.timeframe)
+
+
+def _secao_confluencia(analise):
     print("   🧠 Calculando confluência...")
-    zonas_dict = {
-        'zona_proxima': zona_proxima,
-        'distancia_pct': dist_pct
-    }
-    conf = calcular_confluencia(mtf, fluxo, zonas_dict, None)
-    
-    # 7. INDICADORES BÁSICOS
+    return calcular_confluencia(analise.obter('mtf'), analise.obter('fluxo'), analise.obter('zonas'), None)
+
+
+def _secao_indicadores(analise):
+    dados = analise.obter('dados')
     ind = {
         'ema8': dados['EMA8'].iloc[-1],
         'ema21': dados['EMA21'].iloc[-1],
         'rsi': dados['RSI'].iloc[-1],
-        'preco': preco_atual
+        'preco': analise.obter('preco')
     }
-    
-    # 7.5. INDICADORES AVANÇADOS
+
     print("   🔬 Calculando indicadores avançados...")
     try:
         dados_avancados = calcular_indicadores_avancados(dados.copy())
@@ -128,15 +165,29 @@ def analise_completa(symbol="BTCUSDT", timeframe="1h"):
         ind['confluencia_avancada'] = None
         ind['sinal_completo'] = None
     
-    # 8. ANÁLISE COMPLETA DOS INDICADORES AVANÇADOS
+    return ind
+
+
+def _secao_analise_avancada(analise):
+    ind = analise.obter('indicadores')
     print("   🔬 Analisando indicadores avançados...")
-    analise_avancada = analisar_indicadores_avancados_completos(ind.get('indicadores_avancados', {}), ind.get('confluencia_avancada', {}), ind.get('sinal_completo', {}))
-    
-    # 9. SÍNTESE INTELIGENTE
+    return analisar_indicadores_avancados_completos(ind.get('indicadores_avancados', {}), ind.get('confluencia_avancada', {}), ind.get('sinal_completo', {}))
+
+
+def _secao_sintese(analise):
+    """Síntese já integrada com a gestão de risco e os níveis operacionais"""
+    dados = analise.obter('dados')
+    preco_atual = analise.obter('preco')
+    contexto = analise.obter('contexto')
+    estrutura = analise.obter('estrutura')
+    ind = analise.obter('indicadores')
+    timeframe = analise.timeframe
+
     print("   ✨ Gerando síntese...")
-    sintese = gerar_sintese(contexto, estrutura, mtf, conf, ind, fluxo, timeframe, padroes, wedges)
-    
-    # 9. GESTÃO DE RISCO PROFISSIONAL COM NÍVEIS OPERACIONAIS
+    sintese = gerar_sintese(contexto, estrutura, analise.obter('mtf'), analise.obter('confluencia'), ind,
+                            analise.obter('fluxo'), timeframe, analise.obter('padroes'), analise.obter('wedges'))
+
+    # GESTÃO DE RISCO PROFISSIONAL COM NÍVEIS OPERACIONAIS
     print("   🛡️ Aplicando gestão de risco com níveis precisos...")
     gestao_risco = GestaoRiscoProfissional(capital_base=10.0)
     
@@ -194,33 +245,121 @@ def analise_completa(symbol="BTCUSDT", timeframe="1h"):
     except Exception as e:
         print(f"   ⚠️ Erro na gestão de risco: {e}")
         sintese['gestao_risco'] = {'erro': f'Erro na gestão de risco: {str(e)}'}
-    
-    resultado = {
-        'symbol': symbol,
-        'timeframe': timeframe,
-        'contexto': contexto,
-        'estrutura': estrutura,
-        'mtf': mtf,
-        'indicadores': ind,
-        'analise_avancada': analise_avancada,
-        'zonas': zonas_dict,
-        'fluxo': fluxo,
-        'confluencia': conf,
-        'padroes': padroes,
-        'wedges': wedges,
-        'candles_detalhados': candles_analise,
-        'sintese': sintese,
-        'niveis_operacionais': {
-            'entry_price': sintese.get('entry_price', 0),
-            'stop_loss': sintese.get('stop_loss', 0),
-            'tp1': sintese.get('tp1', 0),
-            'tp2': sintese.get('tp2', 0),
-            'tp3': sintese.get('tp3', 0),
-            'rr_ratio': sintese.get('rr_ratio', 'N/A')
-        },
-        'gestao_risco': sintese.get('gestao_risco', {})
+
+    return sintese
+
+
+def _secao_niveis_operacionais(analise):
+    sintese = analise.obter('sintese')
+    return {
+        'entry_price': sintese.get('entry_price', 0),
+        'stop_loss': sintese.get('stop_loss', 0),
+        'tp1': sintese.get('tp1', 0),
+        'tp2': sintese.get('tp2', 0),
+        'tp3': sintese.get('tp3', 0),
+        'rr_ratio': sintese.get('rr_ratio', 'N/A')
     }
-    
+
+
+def _secao_gestao_risco(analise):
+    return analise.obter('sintese').get('gestao_risco', {})
+
+
+def _secao_relatorio(analise):
+    """Texto do relatório profissional (só quando pedido explicitamente)"""
+    resultado = _montar_resultado(analise, SECOES_PADRAO)
+    return gerar_relatorio_profissional(resultado)
+
+
+# Ordem de registro = ordem de cálculo da análise completa
+SECOES = {
+    'dados': _secao_dados,
+    'preco': _secao_preco,
+    'contexto': _secao_contexto,
+    'estrutura': _secao_estrutura,
+    'mtf': _secao_mtf,
+    'zonas': _secao_zonas,
+    'fluxo': _secao_fluxo,
+    'padroes': _secao_padroes,
+    'wedges': _secao_wedges,
+    'candles_detalhados': _secao_candles_detalhados,
+    'confluencia': _secao_confluencia,
+    'indicadores': _secao_indicadores,
+    'analise_avancada': _secao_analise_avancada,
+    'sintese': _secao_sintese,
+    'niveis_operacionais': _secao_niveis_operacionais,
+    'gestao_risco': _secao_gestao_risco,
+    'relatorio': _secao_relatorio,
+}
+
+# Seções devolvidas quando o chamador não escolhe (formato histórico)
+SECOES_PADRAO = (
+    'contexto', 'estrutura', 'mtf', 'indicadores', 'analise_avancada', 'zonas', 'fluxo',
+    'confluencia', 'padroes', 'wedges', 'candles_detalhados', 'sintese', 'niveis_operacionais',
+    'gestao_risco',
+)
+
+# Intermediários internos não são devolvidos ao chamador
+SECOES_INTERNAS = {'dados', 'preco'}
+
+ALIASES_SECOES = {
+    'niveis': 'niveis_operacionais',
+    'candles': 'candles_detalhados',
+    'gestao': 'gestao_risco',
+    'avancada': 'analise_avancada',
+}
+
+
+def normalizar_secoes(secoes):
+    """
+    Nomes pedidos (aceitando aliases) -> nomes de SECOES, na ordem de cálculo
+
+    Raises:
+        ValueError: seção desconhecida
+    """
+    if secoes is None:
+        return list(SECOES_PADRAO)
+    if isinstance(secoes, str):
+        secoes = [s for s in secoes.split(',') if s.strip()]
+    pedidas = set()
+    for nome in secoes:
+        nome = ALIASES_SECOES.get(str(nome).strip().lower(), str(nome).strip().lower())
+        if nome not in SECOES or nome in SECOES_INTERNAS:
+            raise ValueError(f"Seção desconhecida: {nome}")
+        pedidas.add(nome)
+    return [nome for nome in SECOES if nome in pedidas]
+
+
+def _montar_resultado(analise, secoes):
+    for nome in SECOES:
+        if nome in secoes:
+            analise.obter(nome)
+    resultado = {'symbol': analise.symbol, 'timeframe': analise.timeframe}
+    for nome in SECOES_PADRAO + tuple(n for n in SECOES if n not in SECOES_PADRAO):
+        if nome in secoes:
+            resultado[nome] = analise.obter(nome)
+    return resultado
+
+
+def analise_completa(symbol="BTCUSDT", timeframe="1h", secoes=None):
+    """
+    SNE Scanner - Análise Completa Integrada
+
+    Args:
+        secoes: seções desejadas (ex: ['sintese', 'niveis']); None = análise
+            completa no formato histórico. Só as etapas de que as seções
+            pedidas dependem são executadas.
+
+    Returns:
+        dict com as camadas de análise pedidas
+    """
+    print(f"\n🔄 SNE SCANNER - Analisando {symbol}...")
+    analise = AnaliseSecoes(symbol, timeframe)
+    try:
+        resultado = _montar_resultado(analise, normalizar_secoes(secoes))
+    except DadosIndisponiveis:
+        return {"erro": "Falha ao coletar dados"}
+
     print("   ✅ Análise completa!\n")
     return resultado
 
@@ -5,7 +5,8 @@ MULTI-TIMEFRAME ANALYSIS
 Análise automatizada em múltiplos timeframes
 """
 
-import requests
+from functools import partial
+
 import pandas as pd
 
 
@@ -20,11 +21,14 @@ def analise_multitf(symbol='BTCUSDT', timeframes=['1m', '5m', '15m', '1h', '4h']
     Returns:
         dict com análise por TF
     """
+    from app.http_client import run_concurrently
+
     resultados = {}
     
-    for tf in timeframes:
-        dados = buscar_dados_tf(symbol, tf)
-        if dados is not None:
+    # Busca os TFs em paralelo (uma conexão keep-alive por host, limitada por host)
+    todos_dados = run_concurrently([partial(buscar_dados_tf, symbol, tf) for tf in timeframes])
+    for tf, dados in zip(timeframes, todos_dados):
+        if dados is not None and not isinstance(dados, Exception):
             analise = analisar_tf(dados, tf)
             resultados[tf] = analise
     
@@ -41,9 +45,11 @@ def analise_multitf(symbol='BTCUSDT', timeframes=['1m', '5m', '15m', '1h', '4h']
 def buscar_dados_tf(symbol, interval, limit=100):
     """Busca dados de um timeframe"""
     try:
+        from app.http_client import get
+
         url = "https://api.binance.com/api/v3/klines"
         params = {"symbol": symbol, "interval": interval, "limit": limit}
-        response = requests.get(url, params=params, timeout=10)
+        response = get(url, params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -9,6 +9,8 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from niveis_swing import calcular_swings
+
 
 class NiveisOperacionais:
     """Classe para calcular níveis operacionais precisos"""
@@ -91,18 +93,15 @@ class NiveisOperacionais:
     def identificar_sr_niveis(self, df, lookback=20):
         """Identifica níveis de suporte e resistência"""
         try:
-            highs = df['high'].rolling(window=lookback, center=True).max()
-            lows = df['low'].rolling(window=lookback, center=True).min()
+            # Janela centrada de `lookback` barras (mesmo alinhamento de rolling(center=True))
+            swings = calcular_swings(df, antes=lookback // 2, depois=lookback - lookback // 2 - 1)
+            inicio, fim = lookback, len(df) - lookback
             
             # Identificar máximos e mínimos locais
-            resistance_levels = []
-            support_levels = []
-            
-            for i in range(lookback, len(df) - lookback):
-                if df['high'].iloc[i] == highs.iloc[i]:
-                    resistance_levels.append(df['high'].iloc[i])
-                if df['low'].iloc[i] == lows.iloc[i]:
-                    support_levels.append(df['low'].iloc[i])
+            topos = swings['topos']
+            fundos = swings['fundos']
+            resistance_levels = swings['precos_topos'][(topos >= inicio) & (topos < fim)].tolist()
+            support_levels = swings['precos_fundos'][(fundos >= inicio) & (fundos < fim)].tolist()
             
             # Ordenar e pegar os mais relevantes
             resistance_levels = sorted(resistance_levels, reverse=True)[:5]
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MOTOR DE SWINGS E NÍVEIS S/R
+Extremos locais por janela deslizante e agrupamento de níveis em uma passada,
+compartilhado por todos os calculadores de suporte/resistência
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+_CACHE_MAX = 64
+_cache_swings = OrderedDict()
+
+
+def extremos_janela(valores, antes, depois, modo='max'):
+    """
+    Máximo (ou mínimo) da janela [i-antes, i+depois] para cada barra
+
+    Usa views deslizantes (sem cópia) e reduz em C; barras sem janela
+    completa ficam NaN.
+
+    Args:
+        valores: array/Series de preços
+        antes: barras antes de i incluídas na janela
+        depois: barras depois de i incluídas na janela
+        modo: 'max' ou 'min'
+
+    Returns:
+        np.ndarray do mesmo tamanho de valores
+    """
+    valores = np.asarray(valores, dtype=float)
+    largura = antes + depois + 1
+    resultado = np.full(len(valores), np.nan)
+    if largura <= 0 or len(valores) < largura:
+        return resultado
+
+    janelas = sliding_window_view(valores, largura)
+    reducao = janelas.max(axis=1) if modo == 'max' else janelas.min(axis=1)
+    resultado[antes:len(valores) - depois] = reducao
+    return resultado
+
+
+def pontos_swing(valores, antes, depois, modo='max', inicio=None, fim=None):
+    """
+    Índices das barras que são o extremo da própria janela
+
+    Args:
+        valores: array/Series de preços
+        antes, depois: tamanho da janela em torno de cada barra
+        modo: 'max' (topos) ou 'min' (fundos)
+        inicio, fim: restringe a busca a [inicio, fim)
+
+    Returns:
+        np.ndarray de índices em ordem crescente
+    """
+    valores = np.asarray(valores, dtype=float)
+    extremos = extremos_janela(valores, antes, depois, modo)
+    mascara = valores == extremos
+    if inicio:
+        mascara[:inicio] = False
+    if fim is not None:
+        mascara[max(fim, 0):] = False
+    return np.flatnonzero(mascara)
+
+
+def agrupar_precos(precos, tolerancia=0.005):
+    """
+    Agrupa níveis próximos em uma única passada ordenada
+
+    Um preço entra no grupo do anterior (em ordem crescente) quando a distância
+    relativa é menor que a tolerância, como no agrupamento encadeado original.
+
+    Args:
+        precos: lista/array de preços
+        tolerancia: distância relativa máxima entre vizinhos do mesmo grupo
+
+    Returns:
+        list de dicts {preco, toques, minimo, maximo} em ordem de preço
+    """
+    precos = np.asarray(precos, dtype=float)
+    if precos.size == 0:
+        return []
+
+    ordem = np.argsort(precos, kind='stable')
+    ordenados = precos[ordem]
+    quebras = np.flatnonzero(np.diff(ordenados) / ordenados[:-1] >= tolerancia) + 1
+    inicios = np.concatenate(([0], quebras))
+
+    fins = np.concatenate((quebras, [len(ordenados)]))
+    toques = fins - inicios
+    # média por fatia (mesma soma do np.mean) para não mudar o arredondamento dos níveis
+    medias = [ordenados[a:b].mean() for a, b in zip(inicios, fins)]
+    minimos = ordenados[inicios]
+    maximos = np.maximum.reduceat(ordenados, inicios)
+
+    return [
+        {
+            'preco': media,
+            'toques': int(n),
+            'minimo': minimo,
+            'maximo': maximo
+        }
+        for media, n, minimo, maximo in zip(medias, toques, minimos, maximos)
+    ]
+
+
+def _chave_cache(df, antes, depois):
+    high = np.ascontiguousarray(df['high'].to_numpy(dtype=float))
+    low = np.ascontiguousarray(df['low'].to_numpy(dtype=float))
+    digest = hashlib.blake2b(high.tobytes(), digest_size=16)
+    digest.update(low.tobytes())
+    return (antes, depois, len(df), digest.digest())
+
+
+def calcular_swings(df, antes=20, depois=None):
+    """
+    Topos e fundos por janela deslizante, memorizados por conteúdo do frame
+
+    A chave inclui a janela: chamadas repetidas com a mesma janela sobre os
+    mesmos candles reutilizam o resultado. calcular_suportes_resistencias
+    (20/19) e NiveisOperacionais (10/9 por padrão) usam janelas diferentes
+    e portanto entradas separadas.
+
+    Returns:
+        dict com 'topos' e 'fundos' (índices) e os respectivos preços
+    """
+    depois = antes if depois is None else depois
+    chave = _chave_cache(df, antes, depois)
+    if chave in _cache_swings:
+        _cache_swings.move_to_end(chave)
+        return _cache_swings[chave]
+
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    topos = pontos_swing(high, antes, depois, 'max')
+    fundos = pontos_swing(low, antes, depois, 'min')
+    swings = {
+        'topos': topos,
+        'fundos': fundos,
+        'precos_topos': high[topos],
+        'precos_fundos': low[fundos],
+        'total_barras': len(df)
+    }
+
+    _cache_swings[chave] = swings
+    if len(_cache_swings) > _CACHE_MAX:
+        _cache_swings.popitem(last=False)
+    return swings
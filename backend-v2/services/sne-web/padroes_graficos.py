@@ -6,18 +6,21 @@ Detecta padrões técnicos e divergências
 """
 
 import pandas as pd
-import numpy as np
 from scipy.signal import find_peaks
 
+from motor_padroes import extrair_picos, cobre_janela
+from scanner_padroes import ajustar_confianca
+
 
 def detectar_padroes(dados):
     """Detecta padrões gráficos"""
+    picos = extrair_picos(dados)
     padroes = {
         'divergencias': detectar_divergencias(dados),
         'candlestick': padroes_candlestick(dados),
         'chartpatterns': padroes_chart(dados),
         'fibonacci': niveis_fibonacci(dados),
-        'wedges': detectar_wedges(dados)  # ← NOVA FUNÇÃO
+        'wedges': detectar_wedges(dados, picos=picos)
     }
     return padroes
 
@@ -114,7 +117,8 @@ def niveis_fibonacci(dados):
 
 
 def detectar_wedges(df, periodo_minimo=30, periodo_maximo=100, tolerancia=0.02, 
-                   min_touches=3, min_angle=10, max_angle=45, min_distance_pct=1.0):
+                   min_touches=3, min_angle=10, max_angle=45, min_distance_pct=1.0,
+                   picos=None):
     """
     Detecta padrões de Wedge (Cunha) no gráfico com parâmetros otimizados
     
@@ -127,6 +131,7 @@ def detectar_wedges(df, periodo_minimo=30, periodo_maximo=100, tolerancia=0.02,
         min_angle: Ângulo mínimo de convergência em graus (10°)
         max_angle: Ângulo máximo de convergência em graus (45°)
         min_distance_pct: Distância mínima entre linhas em % do preço (1%)
+        picos: ConjuntoPicos do motor_padroes já extraído do mesmo frame (opcional)
     
     Returns:
         Dict com informações do wedge detectado
@@ -142,12 +147,15 @@ def detectar_wedges(df, periodo_minimo=30, periodo_maximo=100, tolerancia=0.02,
         highs = dados['high'].values
         lows = dados['low'].values
         
-        # Detectar picos e vales usando scipy com parâmetros otimizados
+        # Topos e fundos do conjunto compartilhado (extraído uma vez por frame)
+        if not cobre_janela(picos, df, periodo_maximo):
+            picos = extrair_picos(df, periodo_maximo)
+        
         # Encontrar topos (peaks) - mais rigoroso
-        peaks, _ = find_peaks(highs, distance=5, prominence=np.std(highs)*0.7)
+        peaks = picos.pontos('topos', distancia=5, proeminencia=0.7, ultimas=len(dados))
         
         # Encontrar fundos (valleys) - mais rigoroso
-        valleys, _ = find_peaks(-lows, distance=5, prominence=np.std(lows)*0.7)
+        valleys = picos.pontos('fundos', distancia=5, proeminencia=0.7, ultimas=len(dados))
         
         # Validar número mínimo de toques
         if len(peaks) < min_touches or len(valleys) < min_touches:
@@ -225,10 +233,13 @@ def detectar_wedges(df, periodo_minimo=30, periodo_maximo=100, tolerancia=0.02,
                     'altura_wedge': altura_wedge,
                     'volume_medio': volume_medio,
                     'preco_atual': dados['close'].iloc[-1],
-                    'probabilidade_reversao': calcular_probabilidade_reversao(dados, 'RISING_WEDGE'),
+                    'probabilidade_reversao': ajustar_confianca(
+                        'RISING_WEDGE', calcular_probabilidade_reversao(dados, 'RISING_WEDGE')),
                     'alvo_teorico': calcular_alvo_wedge(dados, 'RISING_WEDGE', altura_wedge),
                     'stop_loss': calcular_stop_loss_wedge(dados, 'RISING_WEDGE'),
-                    'confianca': calcular_confianca_wedge(dados, convergencia, volume_medio),
+                    'confianca': ajustar_confianca(
+                        'RISING_WEDGE', calcular_confianca_wedge(dados, convergencia, volume_medio, picos),
+                        metrica='taxa_alvo'),
                     # Pontos para traçado visual
                     'pontos_resistencia': {'x': tops_x, 'y': tops_y},
                     'pontos_suporte': {'x': fundos_x, 'y': fundos_y},
@@ -263,10 +274,13 @@ def detectar_wedges(df, periodo_minimo=30, periodo_maximo=100, tolerancia=0.02,
                     'altura_wedge': altura_wedge,
                     'volume_medio': volume_medio,
                     'preco_atual': dados['close'].iloc[-1],
-                    'probabilidade_reversao': calcular_probabilidade_reversao(dados, 'FALLING_WEDGE'),
+                    'probabilidade_reversao': ajustar_confianca(
+                        'FALLING_WEDGE', calcular_probabilidade_reversao(dados, 'FALLING_WEDGE')),
                     'alvo_teorico': calcular_alvo_wedge(dados, 'FALLING_WEDGE', altura_wedge),
                     'stop_loss': calcular_stop_loss_wedge(dados, 'FALLING_WEDGE'),
-                    'confianca': calcular_confianca_wedge(dados, convergencia, volume_medio),
+                    'confianca': ajustar_confianca(
+                        'FALLING_WEDGE', calcular_confianca_wedge(dados, convergencia, volume_medio, picos),
+                        metrica='taxa_alvo'),
                     # Pontos para traçado visual
                     'pontos_resistencia': {'x': tops_x, 'y': tops_y},
                     'pontos_suporte': {'x': fundos_x, 'y': fundos_y},
@@ -419,7 +433,7 @@ def calcular_stop_loss_wedge(df, tipo_wedge):
         return None
 
 
-def calcular_confianca_wedge(df, convergencia, volume_medio):
+def calcular_confianca_wedge(df, convergencia, volume_medio, picos=None):
     """Calcula nível de confiança do padrão"""
     try:
         confianca = 50  # Base
@@ -440,11 +454,12 @@ def calcular_confianca_wedge(df, convergencia, volume_medio):
             confianca += 10
         
         # Padrão bem formado (múltiplos topos/fundos)
-        highs = df['high'].values
-        lows = df['low'].values
-        
-        peaks = find_peaks(highs, distance=3)[0]
-        valleys = find_peaks(-lows, distance=3)[0]
+        if cobre_janela(picos, df, len(df)):
+            peaks = picos.pontos('topos', distancia=3, ultimas=len(df))
+            valleys = picos.pontos('fundos', distancia=3, ultimas=len(df))
+        else:
+            peaks = find_peaks(df['high'].values, distance=3)[0]
+            valleys = find_peaks(-df['low'].values, distance=3)[0]
         
         if len(peaks) >= 3 and len(valleys) >= 3:
             confianca += 15
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SCANNER HISTÓRICO DE PADRÕES
+Desliza os templates do motor_padroes sobre o histórico de candles, registra
+cada padrão com rompimento e resultado, e devolve as estatísticas para
+calibrar as probabilidades/confiança dos detectores
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.signal import find_peaks, peak_prominences
+
+from motor_padroes import VIES_PADRAO, _selecionar_por_distancia
+
+
+# Arquivo com as estatísticas históricas por padrão
+CAMINHO_ESTATISTICAS = Path(__file__).parent / "estatisticas_padroes.json"
+
+PADROES_HISTORICOS = ('wedge', 'triangulo', 'ombro_cabeca_ombro')
+
+# janela, distância e proeminência (múltiplos do desvio) usados por cada detector
+CONFIG_TEMPLATES = {
+    'wedge': {'janela': 100, 'distancia': 5, 'proeminencia': 0.7},
+    'triangulo': {'janela': 30, 'distancia': 3, 'proeminencia': 0.0},
+    'ombro_cabeca_ombro': {'janela': 20, 'distancia': 3, 'proeminencia': 0.5}
+}
+
+# amostra de onde sai cada métrica (define o peso do histórico no ajuste)
+AMOSTRA_METRICA = {
+    'taxa_direcao': 'rompimentos',
+    'taxa_alvo': 'encerrados'
+}
+
+_estatisticas = None
+
+
+class PicosDeslizantes:
+    """
+    Topos (ou fundos) de uma janela que avança barra a barra
+
+    Os extremos locais da série inteira são extraídos uma única vez; a cada
+    barra só se recorta o trecho da janela, reaproveitando a seleção por
+    distância enquanto o conjunto de candidatos não muda e recalculando apenas
+    as proeminências (que dependem das bordas da janela).
+    """
+
+    def __init__(self, valores, janela, distancia=1, proeminencia=0.0):
+        self.valores = np.asarray(valores, dtype=float)
+        self.janela = janela
+        self.distancia = distancia
+        self.proeminencia = proeminencia
+        self.candidatos, _ = find_peaks(self.valores)
+        self.desvio = pd.Series(self.valores).rolling(janela).std(ddof=0).to_numpy()
+        # faixa de candidatos de cada janela (bordas não têm vizinho dos dois lados)
+        fins = np.arange(len(self.valores))
+        self._primeiro = np.searchsorted(self.candidatos, fins - janela + 1, side='right')
+        self._ultimo = np.searchsorted(self.candidatos, fins, side='left')
+        self._chave = None
+        self._selecionados = None
+
+    def pontos(self, fim):
+        """Índices absolutos dos pontos da janela que termina em `fim` (inclusive)"""
+        inicio = fim - self.janela + 1
+        a = self._primeiro[fim]
+        b = self._ultimo[fim]
+        picos = self.candidatos[a:b]
+
+        if self.distancia > 1 and len(picos) > 1:
+            if self._chave != (a, b):
+                manter = _selecionar_por_distancia(picos, self.valores[picos], self.distancia)
+                self._chave = (a, b)
+                self._selecionados = picos[manter]
+            picos = self._selecionados
+
+        if self.proeminencia > 0 and len(picos):
+            proeminencias = peak_prominences(self.valores[inicio:fim + 1], picos - inicio)[0]
+            picos = picos[proeminencias >= self.desvio[fim] * self.proeminencia]
+        return picos
+
+
+def _reta(x, y):
+    """(x0, y0, inclinação) da reta que passa pelos dois pontos"""
+    return float(x[0]), float(y[0]), float((y[1] - y[0]) / (x[1] - x[0]))
+
+
+def _template_wedge(topos, fundos, high, low, min_touches=3, tolerancia=0.02,
+                    min_angle=10, max_angle=45):
+    """Mesma geometria do detectar_wedges"""
+    if len(topos) < min_touches or len(fundos) < min_touches:
+        return None
+    topos, fundos = topos[-2:], fundos[-2:]
+    resistencia = _reta(topos, high[topos])
+    suporte = _reta(fundos, low[fundos])
+    inc_r, inc_s = resistencia[2], suporte[2]
+
+    angulo = abs(math.degrees(math.atan(inc_r)) - math.degrees(math.atan(inc_s)))
+    if angulo < min_angle or angulo > max_angle or abs(inc_r - inc_s) <= tolerancia:
+        return None
+
+    if inc_r > inc_s and inc_r > 0 and inc_s > 0:
+        tipo = 'RISING_WEDGE'
+    elif inc_s < inc_r and inc_r < 0 and inc_s < 0:
+        tipo = 'FALLING_WEDGE'
+    else:
+        return None
+    altura = high[topos].max() - low[fundos].min()
+    return tipo, (*topos, *fundos), resistencia, suporte, altura
+
+
+def _template_triangulo(topos, fundos, high, low):
+    """Mesma geometria do detectar_triangles"""
+    if len(topos) < 2 or len(fundos) < 2:
+        return None
+    topos, fundos = topos[-2:], fundos[-2:]
+    t, f = high[topos], low[fundos]
+
+    if abs(t[1] - t[0]) / t[0] < 0.02 and f[1] > f[0]:
+        tipo = 'TRIANGULO_ASCENDENTE'
+    elif abs(f[1] - f[0]) / f[0] < 0.02 and t[1] < t[0]:
+        tipo = 'TRIANGULO_DESCENDENTE'
+    elif t[1] < t[0] and f[1] > f[0]:
+        tipo = 'TRIANGULO_SIMETRICO'
+    else:
+        return None
+    return tipo, (*topos, *fundos), _reta(topos, t), _reta(fundos, f), t.max() - f.min()
+
+
+def _template_oco(topos, high, low):
+    """Mesma geometria do detectar_head_shoulders (linha de pescoço horizontal)"""
+    if len(topos) < 3:
+        return None
+    topos = topos[-3:]
+    valores = high[topos]
+    cabeca = np.argmax(valores)
+    ombros = np.delete(valores, cabeca)
+    if not (valores[cabeca] > ombros[0] * 1.02 and valores[cabeca] > ombros[1] * 1.02 and
+            abs(ombros[0] - ombros[1]) / max(ombros) < 0.05):
+        return None
+    pescoco = low[topos[0]:topos[-1] + 1].min()
+    return ('HEAD_SHOULDERS', tuple(topos), (float(topos[0]), float(valores[cabeca]), 0.0),
+            (float(topos[0]), float(pescoco), 0.0), valores[cabeca] - pescoco)
+
+
+def _atr(high, low, close, periodo=14):
+    anterior = np.concatenate(([np.nan], close[:-1]))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - anterior), np.abs(low - anterior)))
+    return pd.Series(tr).rolling(periodo).mean().to_numpy()
+
+
+def _resultado(evento, high, low, close, atr, horizonte):
+    """Rompimento e desfecho do padrão nas `horizonte` barras após a detecção"""
+    _, _, fim, resistencia, suporte, altura = evento
+    n = len(close)
+    barras = np.arange(fim + 1, min(fim + 1 + horizonte, n))
+    if len(barras) == 0:
+        return -1, 0, 'ABERTO'
+
+    linha_r = resistencia[1] + resistencia[2] * (barras - resistencia[0])
+    linha_s = suporte[1] + suporte[2] * (barras - suporte[0])
+    rompe = np.where(close[barras] > linha_r, 1, np.where(close[barras] < linha_s, -1, 0))
+    posicoes = np.flatnonzero(rompe)
+    if len(posicoes) == 0:
+        return -1, 0, 'SEM_ROMPIMENTO'
+
+    rompimento = int(barras[posicoes[0]])
+    direcao = int(rompe[posicoes[0]])
+    preco = close[rompimento]
+    risco = 1.5 * atr[rompimento] if np.isfinite(atr[rompimento]) else altura / 2
+    alvo = preco + direcao * altura
+    stop = preco - direcao * risco
+
+    seguintes = slice(rompimento + 1, min(rompimento + 1 + horizonte, n))
+    if direcao > 0:
+        atinge_alvo = np.flatnonzero(high[seguintes] >= alvo)
+        atinge_stop = np.flatnonzero(low[seguintes] <= stop)
+    else:
+        atinge_alvo = np.flatnonzero(low[seguintes] <= alvo)
+        atinge_stop = np.flatnonzero(high[seguintes] >= stop)
+
+    primeiro_alvo = atinge_alvo[0] if len(atinge_alvo) else n
+    primeiro_stop = atinge_stop[0] if len(atinge_stop) else n
+    if primeiro_alvo == n and primeiro_stop == n:
+        return rompimento, direcao, 'ABERTO'
+    # mesma barra nos dois: assume o stop (conservador)
+    return rompimento, direcao, 'ALVO' if primeiro_alvo < primeiro_stop else 'STOP'
+
+
+def escanear_historico(df, padroes=PADROES_HISTORICOS, passo=1, horizonte=50):
+    """
+    Varre o histórico detectando padrões em cada janela e avalia o desfecho
+
+    Cada padrão entra uma única vez na tabela (na primeira barra em que é
+    detectado com os mesmos pivôs).
+
+    Args:
+        df: DataFrame com OHLC
+        padroes: templates a varrer (ver PADROES_HISTORICOS)
+        passo: avança a janela de `passo` em `passo` barras
+        horizonte: barras após a detecção/rompimento usadas para o desfecho
+
+    Returns:
+        DataFrame com padrao, inicio, fim, rompimento, direcao, resultado
+        (inicio/fim/rompimento são posições no df; rompimento = -1 se não houve)
+    """
+    colunas = ['padrao', 'inicio', 'fim', 'rompimento', 'direcao', 'resultado']
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    close = df['close'].to_numpy(dtype=float)
+    n = len(close)
+
+    varreduras = []
+    for nome in padroes:
+        config = CONFIG_TEMPLATES[nome]
+        if n < config['janela']:
+            continue
+        topos = PicosDeslizantes(high, config['janela'], config['distancia'], config['proeminencia'])
+        fundos = None
+        if nome != 'ombro_cabeca_ombro':
+            fundos = PicosDeslizantes(-low, config['janela'], config['distancia'], config['proeminencia'])
+        varreduras.append((nome, config['janela'], topos, fundos))
+
+    eventos = []
+    vistos = set()
+    for nome, janela, topos, fundos in varreduras:
+        for fim in range(janela - 1, n, passo):
+            if nome == 'wedge':
+                padrao = _template_wedge(topos.pontos(fim), fundos.pontos(fim), high, low)
+            elif nome == 'triangulo':
+                padrao = _template_triangulo(topos.pontos(fim), fundos.pontos(fim), high, low)
+            else:
+                padrao = _template_oco(topos.pontos(fim), high, low)
+            if padrao is None:
+                continue
+
+            tipo, pivos, resistencia, suporte, altura = padrao
+            chave = (tipo, pivos)
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+            eventos.append((tipo, int(min(pivos)), fim, resistencia, suporte, altura))
+
+    if not eventos:
+        return pd.DataFrame(columns=colunas)
+
+    atr = _atr(high, low, close)
+    linhas = []
+    for evento in eventos:
+        rompimento, direcao, resultado = _resultado(evento, high, low, close, atr, horizonte)
+        linhas.append((evento[0], evento[1], evento[2], rompimento, direcao, resultado))
+
+    tabela = pd.DataFrame(linhas, columns=colunas)
+    tabela['padrao'] = tabela['padrao'].astype('category')
+    tabela['resultado'] = tabela['resultado'].astype('category')
+    tabela['direcao'] = tabela['direcao'].astype('int8')
+    return tabela.sort_values(['fim', 'padrao']).reset_index(drop=True)
+
+
+def estatisticas_padroes(eventos):
+    """
+    Estatísticas de desfecho por padrão a partir da tabela de eventos
+
+    taxa_direcao: fração dos rompimentos no sentido previsto pelo padrão
+    taxa_alvo: fração dos trades encerrados (ALVO/STOP) que atingiram o alvo
+
+    Returns:
+        dict padrao -> {eventos, rompimentos, encerrados, taxa_direcao, taxa_alvo}
+    """
+    estatisticas = {}
+    if eventos is None or len(eventos) == 0:
+        return estatisticas
+
+    for padrao, grupo in eventos.groupby('padrao', observed=True):
+        rompidos = grupo[grupo['rompimento'] >= 0]
+        vies = VIES_PADRAO.get(padrao, 'NEUTRO')
+        taxa_direcao = None
+        if vies != 'NEUTRO' and len(rompidos):
+            esperado = 1 if vies == 'ALTA' else -1
+            taxa_direcao = round(float((rompidos['direcao'] == esperado).mean()), 4)
+
+        encerrados = grupo[grupo['resultado'].isin(['ALVO', 'STOP'])]
+        taxa_alvo = None
+        if len(encerrados):
+            taxa_alvo = round(float((encerrados['resultado'] == 'ALVO').mean()), 4)
+
+        estatisticas[str(padrao)] = {
+            'eventos': int(len(grupo)),
+            'rompimentos': int(len(rompidos)),
+            'encerrados': int(len(encerrados)),
+            'taxa_direcao': taxa_direcao,
+            'taxa_alvo': taxa_alvo
+        }
+    return estatisticas
+
+
+def salvar_estatisticas(estatisticas, caminho=CAMINHO_ESTATISTICAS):
+    """Grava as estatísticas e passa a usá-las no ajuste de confiança"""
+    global _estatisticas
+    with open(caminho, 'w') as f:
+        json.dump(estatisticas, f, indent=2, ensure_ascii=False)
+    _estatisticas = estatisticas
+
+
+def obter_estatisticas(caminho=CAMINHO_ESTATISTICAS):
+    """Estatísticas históricas carregadas (lidas do arquivo na primeira chamada)"""
+    global _estatisticas
+    if _estatisticas is None:
+        _estatisticas = {}
+        if os.path.exists(caminho):
+            try:
+                with open(caminho) as f:
+                    _estatisticas = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Erro ao carregar estatísticas de padrões: {e}")
+    return _estatisticas
+
+
+def ajustar_confianca(padrao, valor, metrica='taxa_direcao', amostra_minima=30):
+    """
+    Combina uma probabilidade/confiança heurística (0-100) com o histórico
+
+    O peso do histórico cresce com o tamanho da amostra da métrica
+    (n / (n + amostra_minima)): rompimentos para taxa_direcao, trades
+    encerrados para taxa_alvo. Sem histórico o valor volta inalterado.
+    """
+    estatistica = obter_estatisticas().get(padrao)
+    if not estatistica or estatistica.get(metrica) is None:
+        return valor
+    amostras = int(estatistica.get(AMOSTRA_METRICA.get(metrica, 'rompimentos')) or 0)
+    peso = amostras / (amostras + amostra_minima)
+    return round((1 - peso) * valor + peso * estatistica[metrica] * 100, 1)
+
+
+def calibrar_padroes(frames, padroes=PADROES_HISTORICOS, passo=1, horizonte=50,
+                     caminho=CAMINHO_ESTATISTICAS):
+    """
+    Varre o histórico de vários símbolos e grava as estatísticas agregadas
+
+    Args:
+        frames: dict símbolo -> DataFrame OHLC
+
+    Returns:
+        (tabela de eventos com coluna 'symbol', estatísticas por padrão)
+    """
+    tabelas = []
+    for simbolo, df in frames.items():
+        tabela = escanear_historico(df, padroes, passo, horizonte)
+        if len(tabela):
+            tabelas.append(tabela.assign(symbol=simbolo))
+
+    eventos = pd.concat(tabelas, ignore_index=True) if tabelas else pd.DataFrame()
+    estatisticas = estatisticas_padroes(eventos)
+    salvar_estatisticas(estatisticas, caminho)
+    return eventos, estatisticas